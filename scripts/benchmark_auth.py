@@ -0,0 +1,181 @@
+"""
+权限检查基准测试
+
+对比 逐项查询(DataAccess) 的权限检查 与 内存权限快照 的每秒判定次数
+
+使用:
+    python scripts/benchmark_auth.py --groups 2000 --rounds 5000 --cache-mode MEMORY
+"""
+
+import argparse
+import asyncio
+from pathlib import Path
+import random
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import nonebot
+from nonebot.adapters.onebot.v11 import Adapter as OneBotV11Adapter
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--plugins", type=int, default=200)
+parser.add_argument("--groups", type=int, default=2000)
+parser.add_argument("--users", type=int, default=5000)
+parser.add_argument("--rounds", type=int, default=2000)
+parser.add_argument("--cache-mode", default="MEMORY")
+args = parser.parse_args()
+
+nonebot.init(
+    db_url="sqlite://:memory:",
+    cache_mode=args.cache_mode,
+    superusers=[],
+    log_level="WARNING",
+)
+nonebot.get_driver().register_adapter(OneBotV11Adapter)
+nonebot.load_plugin("nonebot_plugin_session")
+nonebot.load_plugin("nonebot_plugin_alconna")
+nonebot.load_plugin("nonebot_plugin_apscheduler")
+nonebot.load_plugin("zhenxun.builtin_plugins.hooks")
+
+
+async def seed():
+    from zhenxun.models.bot_console import BotConsole
+    from zhenxun.models.group_console import GroupConsole
+    from zhenxun.models.level_user import LevelUser
+    from zhenxun.models.plugin_info import PluginInfo
+    from zhenxun.utils.enum import PluginType
+
+    await PluginInfo.bulk_create(
+        [
+            PluginInfo(
+                module=f"plugin_{i}",
+                module_path=f"zhenxun.plugins.plugin_{i}",
+                name=f"插件{i}",
+                plugin_type=PluginType.NORMAL,
+                admin_level=i % 3,
+            )
+            for i in range(args.plugins)
+        ],
+        100,
+    )
+    await BotConsole.create(bot_id="bench_bot", platform="qq")
+    await GroupConsole.bulk_create(
+        [
+            GroupConsole(group_id=str(100000 + i), status=i % 50 != 0)
+            for i in range(args.groups)
+        ],
+        100,
+    )
+    await LevelUser.bulk_create(
+        [
+            LevelUser(
+                user_id=str(i), group_id=str(100000 + i % args.groups), user_level=5
+            )
+            for i in range(0, args.users, 7)
+        ],
+        100,
+    )
+
+
+def build_cases():
+    rnd = random.Random(0)
+    return [
+        (
+            f"plugin_{rnd.randrange(args.plugins)}",
+            str(rnd.randrange(args.users)),
+            str(100000 + rnd.randrange(args.groups)),
+        )
+        for _ in range(args.rounds)
+    ]
+
+
+async def legacy_decision(module: str, user_id: str, group_id: str):
+    """与 auth_checker 逐项检查相同的数据访问与判定"""
+    from nonebot_plugin_alconna import UniMessage
+    from nonebot_plugin_uninfo import (
+        Scene,
+        SceneType,
+        Session,
+        SupportAdapter,
+        SupportScope,
+        User,
+    )
+
+    from zhenxun.builtin_plugins.hooks.auth.auth_admin import auth_admin
+    from zhenxun.builtin_plugins.hooks.auth.auth_ban import is_ban
+    from zhenxun.builtin_plugins.hooks.auth.auth_bot import auth_bot
+    from zhenxun.builtin_plugins.hooks.auth.auth_group import auth_group
+    from zhenxun.builtin_plugins.hooks.auth.auth_plugin import auth_plugin
+    from zhenxun.builtin_plugins.hooks.auth.exception import SkipPluginException
+    from zhenxun.builtin_plugins.hooks.auth_checker import get_plugin_and_user
+    from zhenxun.utils.utils import EntityIDs
+
+    session = Session(
+        self_id="bench_bot",
+        adapter=SupportAdapter.onebot11,
+        scope=SupportScope.qq_client,
+        scene=Scene(group_id, SceneType.GROUP),
+        user=User(user_id),
+    )
+    entity = EntityIDs(user_id=user_id, group_id=group_id, channel_id=None)
+    plugin, _ = await get_plugin_and_user(module, user_id)
+    try:
+        await asyncio.gather(
+            is_ban(user_id, group_id),
+            auth_bot(plugin, "bench_bot"),
+            auth_group(plugin, entity, UniMessage("bench")),
+            auth_admin(plugin, session),
+            auth_plugin(plugin, session, None),  # type: ignore
+        )
+    except SkipPluginException:
+        return False
+    return True
+
+
+def snapshot_decision(module: str, user_id: str, group_id: str):
+    from zhenxun.builtin_plugins.hooks.auth.auth_snapshot import AuthSnapshot
+
+    return AuthSnapshot.decide(module, "bench_bot", user_id, group_id, "bench")
+
+
+async def main():
+    from zhenxun.builtin_plugins.hooks.auth.auth_snapshot import (
+        AuthAction,
+        AuthSnapshot,
+    )
+    from zhenxun.builtin_plugins.init.__init_cache import register_cache_types
+    from zhenxun.services.cache import CacheRoot
+    from zhenxun.services.db_context import disconnect, init
+
+    await init()
+    register_cache_types()
+    CacheRoot.enabled = True
+    await seed()
+    await AuthSnapshot.load()
+    cases = build_cases()
+
+    start = time.perf_counter()
+    legacy_result = [await legacy_decision(*case) for case in cases]
+    legacy = len(cases) / (time.perf_counter() - start)
+    snapshot_result = [
+        snapshot_decision(*case).action == AuthAction.PASS for case in cases
+    ]
+    mismatch = sum(a != b for a, b in zip(legacy_result, snapshot_result))
+
+    start = time.perf_counter()
+    for _ in range(20):
+        for case in cases:
+            snapshot_decision(*case)
+    snapshot = len(cases) * 20 / (time.perf_counter() - start)
+
+    print(f"cache_mode={args.cache_mode} groups={args.groups} rounds={args.rounds}")  # noqa: T201
+    print(f"逐项查询: {legacy:,.0f} 次/秒")  # noqa: T201
+    print(f"权限快照: {snapshot:,.0f} 次/秒 ({snapshot / legacy:.1f}x)")  # noqa: T201
+    print(f"判定结果不一致: {mismatch}/{len(cases)}")  # noqa: T201
+    await disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
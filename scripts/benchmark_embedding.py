@@ -0,0 +1,117 @@
+"""
+文本嵌入合并批处理与向量缓存基准测试
+
+模拟 --calls 次并发的单条文本嵌入调用（按泊松分布到达，文本按 Zipf 分布重复），
+对比 逐次请求 与 EmbeddingService(合并批处理+向量缓存) 的请求次数与延迟，
+服务端延迟为 --latency 毫秒加每条文本 --per-text 毫秒
+
+使用:
+    python scripts/benchmark_embedding.py --calls 5000 --rate 500
+"""
+
+import argparse
+import asyncio
+from pathlib import Path
+import random
+import statistics
+import sys
+import tempfile
+import time
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import nonebot
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--calls", type=int, default=5000)
+parser.add_argument("--rate", type=float, default=500, help="每秒调用次数")
+parser.add_argument("--vocab", type=int, default=3000, help="不同文本数量")
+parser.add_argument("--latency", type=float, default=80)
+parser.add_argument("--per-text", type=float, default=0.2)
+args = parser.parse_args()
+
+nonebot.init(log_level="WARNING")
+
+from zhenxun.services.log import logger  # noqa: F401, I001
+from zhenxun.services.llm.core import KeyStatusStore, LLMHttpClient
+from zhenxun.services.llm.embedding import EmbeddingService
+from zhenxun.services.llm.service import LLMModel
+from zhenxun.services.llm.types import ModelDetail, ProviderConfig
+from zhenxun.services.llm.types.capabilities import get_model_capabilities
+
+random.seed(0)
+
+
+class FakeModel(LLMModel):
+    requests = 0
+
+    async def _request_embeddings(self, texts, task_type="", **kwargs):
+        FakeModel.requests += 1
+        await asyncio.sleep((args.latency + args.per_text * len(texts)) / 1000)
+        return [[float(len(text))] * 256 for text in texts]
+
+
+def build_model() -> FakeModel:
+    detail = ModelDetail(model_name="text-embedding-3-small", is_embedding_model=True)
+    return FakeModel(
+        provider_config=ProviderConfig(
+            name="bench", api_key="k", api_type="openai", models=[detail]
+        ),
+        model_detail=detail,
+        key_store=KeyStatusStore(),
+        http_client=LLMHttpClient(),
+        capabilities=get_model_capabilities(detail.model_name),
+    )
+
+
+def build_workload() -> list[tuple[float, str]]:
+    weights = [1 / (i + 1) for i in range(args.vocab)]
+    texts = random.choices(range(args.vocab), weights, k=args.calls)
+    arrival = 0.0
+    workload = []
+    for i in texts:
+        arrival += random.expovariate(args.rate)
+        workload.append((arrival, f"文本{i}"))
+    return workload
+
+
+async def run(name: str, embed, workload: list[tuple[float, str]]):
+    FakeModel.requests = 0
+    latencies = []
+
+    async def _call(delay: float, text: str):
+        await asyncio.sleep(delay)
+        start = time.perf_counter()
+        await embed([text])
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(_call(delay, text) for delay, text in workload))
+    cost = time.perf_counter() - start
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(  # noqa: T201
+        f"{name}: 请求次数 {FakeModel.requests:,}/{len(workload):,} "
+        f"p50 {statistics.median(latencies):.1f}ms p99 {p99:.1f}ms 耗时 {cost:.1f}s"
+    )
+
+
+async def main():
+    workload = build_workload()
+    model = build_model()
+    await run("逐次请求", model._request_embeddings, workload)
+    with patch(
+        "zhenxun.services.llm.embedding.get_ai_config",
+        return_value={"embedding_cache": False},
+    ):
+        await run("合并批处理(无缓存)", model.generate_embeddings, workload)
+    with tempfile.TemporaryDirectory() as path:
+        EmbeddingService.path = Path(path)
+        await run("合并批处理+缓存(冷)", model.generate_embeddings, workload)
+        EmbeddingService.close()
+        await run("合并批处理+缓存(热)", model.generate_embeddings, workload)
+        EmbeddingService.close()
+
+
+asyncio.run(main())
@@ -0,0 +1,88 @@
+"""
+限制器基准测试
+
+测试 FreqLimiter/CountLimiter/UserBlockLimiter/RateLimiter 的每秒操作次数，
+以及写入大量不同键后的内存占用（键数量受 max_keys 限制）
+
+使用:
+    python scripts/benchmark_limiters.py --keys 10000000 --max-keys 100000
+"""
+
+import argparse
+import gc
+from pathlib import Path
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from zhenxun.utils.limiters import (
+    CountLimiter,
+    FreqLimiter,
+    RateLimiter,
+    UserBlockLimiter,
+)
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--keys", type=int, default=10_000_000)
+parser.add_argument("--max-keys", type=int, default=100_000)
+parser.add_argument("--rounds", type=int, default=1_000_000)
+args = parser.parse_args()
+
+
+def build_limiters(max_keys: int):
+    return {
+        "FreqLimiter": (
+            FreqLimiter(60, max_keys=max_keys),
+            lambda limiter, key: limiter.check(key) and limiter.start_cd(key),
+        ),
+        "CountLimiter": (
+            CountLimiter(5, max_keys=max_keys),
+            lambda limiter, key: limiter.check(key) and limiter.increase(key),
+        ),
+        "UserBlockLimiter": (
+            UserBlockLimiter(max_keys=max_keys),
+            lambda limiter, key: limiter.check(key) and limiter.set_true(key),
+        ),
+        "RateLimiter": (
+            RateLimiter(5, 60, max_keys=max_keys),
+            lambda limiter, key: limiter.check(key),
+        ),
+    }
+
+
+def bench_ops():
+    """热点键上的吞吐量，1000个活跃用户反复触发"""
+    for name, (limiter, op) in build_limiters(args.max_keys).items():
+        start = time.perf_counter()
+        for i in range(args.rounds):
+            op(limiter, i % 1000)
+        ops = args.rounds / (time.perf_counter() - start)
+        print(f"{name}: {ops:,.0f} 次/秒")  # noqa: T201
+
+
+def bench_memory():
+    """大量一次性键写入后的内存占用"""
+    for name, (limiter, op) in build_limiters(args.max_keys).items():
+        gc.collect()
+        tracemalloc.start()
+        start = time.perf_counter()
+        for i in range(args.keys):
+            op(limiter, f"user_{i}")
+        cost = time.perf_counter() - start
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(  # noqa: T201
+            f"{name}: 键数量 {len(limiter):,}/{args.keys:,} "
+            f"内存 {current / 1024 / 1024:.1f}MB (峰值 {peak / 1024 / 1024:.1f}MB) "
+            f"耗时 {cost:.1f}s"
+        )
+        assert len(limiter) <= args.max_keys, f"{name} 键数量超出上限"
+        del limiter
+
+
+if __name__ == "__main__":
+    print(f"keys={args.keys:,} max_keys={args.max_keys:,} rounds={args.rounds:,}")  # noqa: T201
+    bench_ops()
+    bench_memory()
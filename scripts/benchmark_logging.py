@@ -0,0 +1,59 @@
+"""
+日志基准测试
+
+测试日志等级未启用与启用时每秒可调用的日志次数
+
+使用:
+    python scripts/benchmark_logging.py --level INFO --rounds 200000 [--json]
+"""
+
+import argparse
+from pathlib import Path
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import nonebot
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--level", default="INFO")
+parser.add_argument("--rounds", type=int, default=200000)
+parser.add_argument("--json", action="store_true")
+args = parser.parse_args()
+
+nonebot.init(log_level=args.level, log_json=args.json)
+
+from loguru import logger as logger_
+from nonebot.log import logger_id
+
+from zhenxun.services.log import logger
+
+# 只测试文件写入，不输出到控制台
+logger_.remove(logger_id)
+
+payload = {"user_id": "123456", "group_id": "654321", "data": list(range(50))}
+
+
+def bench(name: str, func):
+    start = time.perf_counter()
+    for _ in range(args.rounds):
+        func()
+    ops = args.rounds / (time.perf_counter() - start)
+    print(f"{name}: {ops:,.0f} 次/秒")  # noqa: T201
+
+
+if __name__ == "__main__":
+    print(f"level={args.level} json={args.json} rounds={args.rounds:,}")  # noqa: T201
+    bench(
+        "debug 字符串 (未启用)",
+        lambda: logger.debug(f"缓存数据: {payload}", "Bench", session="123456"),
+    )
+    bench(
+        "debug 延迟构建 (未启用)",
+        lambda: logger.debug(lambda: f"缓存数据: {payload}", "Bench", session="123"),
+    )
+    bench(
+        "info 写入文件 (启用)",
+        lambda: logger.info(f"缓存数据: {payload}", "Bench", session="123456"),
+    )
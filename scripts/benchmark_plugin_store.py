@@ -0,0 +1,118 @@
+"""
+插件商店批量更新基准测试
+
+使用本地模拟的插件仓库（固定网络延迟），对比逐个安装插件
+与批量安装流程（并发解析、一次批量下载、合并安装依赖）的耗时
+
+使用:
+    python scripts/benchmark_plugin_store.py --plugins 40 --latency 0.1 --pip 2
+"""
+
+import argparse
+import asyncio
+from pathlib import Path
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+import nonebot
+import respx
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--plugins", type=int, default=40)
+parser.add_argument("--files", type=int, default=5, help="每个插件的文件数")
+parser.add_argument("--latency", type=float, default=0.1, help="模拟请求延迟(秒)")
+parser.add_argument("--pip", type=float, default=2, help="模拟单次依赖安装耗时(秒)")
+args = parser.parse_args()
+
+nonebot.init(log_level="WARNING")
+
+REPO_URL = "https://github.com/bench/plugins"
+RAW_FORMAT = "http://raw.bench/{owner}/{repo}/{branch}/{path}"
+
+
+def build_tree() -> dict:
+    files = []
+    for i in range(args.plugins):
+        files.extend(f"plugins/p{i}/file_{j}.py" for j in range(args.files))
+        files.append(f"plugins/p{i}/requirements.txt")
+    return {
+        "sha": "main",
+        "url": "",
+        "tree": [
+            {"path": path, "mode": "100644", "type": "blob", "sha": "", "url": ""}
+            for path in files
+        ],
+    }
+
+
+async def respond(request: httpx.Request) -> httpx.Response:
+    await asyncio.sleep(args.latency)
+    if "/git/trees/" in request.url.path:
+        return httpx.Response(200, json=build_tree())
+    if "/commits/" in request.url.path:
+        return httpx.Response(200, json={"sha": "main"})
+    return httpx.Response(200, text=request.url.path)
+
+
+def fake_pip(requirement_file: Path | list[Path], *, check: bool = False):
+    time.sleep(args.pip)
+
+
+async def main():
+    from aiocache import caches
+
+    from zhenxun.builtin_plugins.plugin_store import data_source
+    from zhenxun.builtin_plugins.plugin_store.data_source import (
+        InstallTask,
+        StoreManager,
+    )
+    from zhenxun.utils import http_utils
+    from zhenxun.utils.github_utils import models
+
+    # 未启动Bot，手动创建全局客户端
+    http_utils._client = httpx.AsyncClient()
+
+    async def fastest_raw_formats() -> list[str]:
+        return [RAW_FORMAT]
+
+    models.get_fastest_raw_formats = fastest_raw_formats  # type: ignore
+    data_source.VirtualEnvPackageManager.install_requirement = fake_pip  # type: ignore
+
+    def build_tasks() -> list[InstallTask]:
+        return [
+            InstallTask(f"p{i}", REPO_URL, f"plugins.p{i}", True)
+            for i in range(args.plugins)
+        ]
+
+    with (
+        respx.mock(assert_all_called=False) as router,
+        tempfile.TemporaryDirectory() as tmp,
+    ):
+        router.route().mock(side_effect=respond)
+        data_source.BASE_PATH = Path(tmp)
+
+        await caches.get("default").clear()
+        start = time.perf_counter()
+        for task in build_tasks():
+            await StoreManager.install_plugins([task])
+        sequential = time.perf_counter() - start
+
+        await caches.get("default").clear()
+        start = time.perf_counter()
+        tasks = await StoreManager.install_plugins(build_tasks())
+        batch = time.perf_counter() - start
+        assert not any(task.error for task in tasks)
+
+    print(  # noqa: T201
+        f"{args.plugins}个插件 每个{args.files + 1}个文件 延迟{args.latency}s "
+        f"依赖安装{args.pip}s\n"
+        f"逐个安装: {sequential:.2f}s\n"
+        f"批量安装: {batch:.2f}s ({sequential / batch:.1f}x)"
+    )
+
+
+asyncio.run(main())
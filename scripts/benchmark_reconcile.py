@@ -0,0 +1,168 @@
+"""
+群组/群成员同步对比基准测试
+
+对比 逐项线性查找 与 键索引对比(reconcile) 的耗时，只测试对比部分，不写入数据库；
+旧的群成员对比为平方复杂度，只运行前 --legacy-groups 个群并按比例估算总耗时
+
+使用:
+    python scripts/benchmark_reconcile.py --groups 10000 --members 500000
+"""
+
+import argparse
+from pathlib import Path
+import random
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import nonebot
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--groups", type=int, default=10_000)
+parser.add_argument("--members", type=int, default=500_000)
+parser.add_argument("--group-size", type=int, default=2000)
+parser.add_argument("--legacy-groups", type=int, default=3)
+parser.add_argument("--change-rate", type=float, default=0.05)
+args = parser.parse_args()
+
+nonebot.init(log_level="WARNING")
+
+from zhenxun.services.log import logger  # noqa: F401, I001
+from zhenxun.models.group_console import GroupConsole
+from zhenxun.models.group_member_info import GroupInfoUser
+from zhenxun.utils.reconcile import reconcile
+
+random.seed(0)
+
+
+def build_groups():
+    db = [
+        GroupConsole(group_id=str(i), group_name=f"群{i}", member_count=100)
+        for i in range(args.groups)
+    ]
+    remote = []
+    for i in range(args.groups):
+        changed = random.random() < args.change_rate
+        remote.append(
+            GroupConsole(
+                group_id=str(i if random.random() > args.change_rate else -i - 1),
+                group_name=f"群{i}{'*' if changed else ''}",
+                member_count=100,
+            )
+        )
+    return db, remote
+
+
+def legacy_groups(db_group: list[GroupConsole], group_list: list[GroupConsole]):
+    create_list = []
+    update_list = []
+    db_group_id = [(g.group_id, g.channel_id) for g in db_group]
+    for group in group_list:
+        if (group.group_id, group.channel_id) not in db_group_id:
+            create_list.append(group)
+        else:
+            _group = next(
+                g
+                for g in db_group
+                if g.group_id == group.group_id and g.channel_id == group.channel_id
+            )
+            _group.group_name = group.group_name
+            _group.max_member_count = group.max_member_count
+            _group.member_count = group.member_count
+            update_list.append(_group)
+    return create_list, update_list
+
+
+def build_members(group_id: str, size: int):
+    db = [
+        GroupInfoUser(user_id=str(i), group_id=group_id, user_name=f"u{i}")
+        for i in range(size)
+    ]
+    remote = [
+        GroupInfoUser(
+            user_id=str(i if random.random() > args.change_rate else size + i),
+            group_id=group_id,
+            user_name=f"u{i}{'*' if random.random() < args.change_rate else ''}",
+        )
+        for i in range(size)
+    ]
+    return db, remote
+
+
+def legacy_members(db_user: list[GroupInfoUser], members: list[GroupInfoUser]):
+    data_list = ([], [], [])
+    exist_member_list = []
+    for member in members:
+        db_user_uid = [u.user_id for u in db_user]
+        uid2name = {u.user_id: u.user_name for u in db_user}
+        if cnt := db_user_uid.count(member.user_id):
+            users = [u for u in db_user if u.user_id == member.user_id]
+            if cnt > 1:
+                data_list[2].extend(u.id for u in users[1:])
+            if member.user_name != uid2name.get(member.user_id):
+                users[0].user_name = member.user_name
+                data_list[1].append(users[0])
+        else:
+            data_list[0].append(member)
+        exist_member_list.append(member.user_id)
+    delete = [
+        uid for uid in (u.user_id for u in db_user) if uid not in exist_member_list
+    ]
+    return data_list, delete
+
+
+def timeit(func, *params) -> float:
+    start = time.perf_counter()
+    func(*params)
+    return time.perf_counter() - start
+
+
+def bench_groups():
+    db, remote = build_groups()
+    legacy = timeit(legacy_groups, db, remote)
+    db, remote = build_groups()
+    start = time.perf_counter()
+    result = reconcile(
+        db,
+        remote,
+        lambda g: (g.group_id, g.channel_id),
+        ["group_name", "max_member_count", "member_count"],
+    )
+    cost = time.perf_counter() - start
+    print(  # noqa: T201
+        f"群组 {args.groups:,}: 线性查找 {legacy:.3f}s 键索引 {cost:.3f}s "
+        f"(新增 {len(result.create)} 更新 {result.update_count} "
+        f"未变化 {result.unchanged})"
+    )
+
+
+def bench_members():
+    group_count = max(args.members // args.group_size, 1)
+    data = [build_members(str(i), args.group_size) for i in range(group_count)]
+    legacy_count = min(args.legacy_groups, group_count)
+    legacy = sum(
+        timeit(legacy_members, db, remote) for db, remote in data[:legacy_count]
+    )
+    data = [build_members(str(i), args.group_size) for i in range(group_count)]
+    start = time.perf_counter()
+    create = update = delete = 0
+    for db, remote in data:
+        result = reconcile(
+            db, remote, lambda u: u.user_id, ["user_name"], delete_missing=True
+        )
+        create += len(result.create)
+        update += result.update_count
+        delete += len(result.delete)
+    cost = time.perf_counter() - start
+    print(  # noqa: T201
+        f"群成员 {group_count * args.group_size:,} ({group_count} 个群): "
+        f"线性查找 约{legacy / legacy_count * group_count:.1f}s "
+        f"(实测 {legacy_count} 个群 {legacy:.2f}s) 键索引 {cost:.3f}s "
+        f"(新增 {create} 更新 {update} 删除 {delete})"
+    )
+
+
+if __name__ == "__main__":
+    bench_groups()
+    bench_members()
@@ -0,0 +1,109 @@
+from collections.abc import Callable
+
+import pytest
+from pytest_mock import MockerFixture
+
+
+@pytest.fixture
+async def limits(memory_db: Callable, mocker: MockerFixture):
+    await memory_db("zhenxun.models.plugin_info", "zhenxun.models.plugin_limit")
+
+    from zhenxun.builtin_plugins.hooks.auth.auth_limit import LimitManager
+    from zhenxun.models.plugin_info import PluginInfo
+    from zhenxun.models.plugin_limit import PluginLimit
+    from zhenxun.utils.enum import LimitWatchType, PluginLimitType
+
+    mocker.patch.object(LimitManager, "cd_limit", {})
+    mocker.patch.object(LimitManager, "block_limit", {})
+    mocker.patch.object(LimitManager, "count_limit", {})
+    plugin = await PluginInfo.create(module="p", module_path="a.p", name="p")
+    limit = await PluginLimit.create(
+        module="p",
+        module_path="a.p",
+        plugin=plugin,
+        limit_type=PluginLimitType.CD,
+        watch_type=LimitWatchType.USER,
+        cd=5,
+    )
+    await LimitManager.update_limits()
+    return LimitManager, limit
+
+
+async def test_remote_change_reloads_rule(limits):
+    from zhenxun.models.plugin_limit import PluginLimit
+    from zhenxun.utils.enum import CacheType
+
+    manager, limit = limits
+    key = f"{CacheType.LIMIT}:{limit.id}"
+    # 其他进程的修改不会触发本进程的数据变更监听
+    await PluginLimit.filter(id=limit.id).update(cd=30)
+    manager.on_cache_invalidate(CacheType.LIMIT, key, False)
+    manager.on_cache_invalidate(CacheType.PLUGINS, key, True)
+    assert not manager._sync_tasks
+    assert manager.cd_limit["p"].limiter.default_cd == 5
+
+    manager.on_cache_invalidate(CacheType.LIMIT, key, True)
+    for task in list(manager._sync_tasks):
+        await task
+    assert manager.cd_limit["p"].limiter.default_cd == 30
+
+    await PluginLimit.filter(id=limit.id).delete()
+    manager.on_cache_invalidate(CacheType.LIMIT, key, True)
+    for task in list(manager._sync_tasks):
+        await task
+    assert "p" not in manager.cd_limit
+
+
+async def test_local_change_is_published(limits, mocker: MockerFixture):
+    from zhenxun.services.cache import CacheManager, CacheRoot, cache_config
+    from zhenxun.services.cache.config import CacheMode
+    from zhenxun.utils.enum import CacheType
+
+    manager, limit = limits
+    mocker.patch.object(cache_config, "cache_mode", CacheMode.REDIS)
+    mocker.patch.object(CacheManager, "_enabled", True)
+    mocker.patch.object(CacheManager, "_registry", {})
+    CacheRoot.register(CacheType.LIMIT)
+    backend = mocker.MagicMock(client=mocker.AsyncMock(), delete=mocker.AsyncMock())
+    mocker.patch.object(CacheRoot, "_cache_backend", backend)
+
+    limit.cd = 10
+    await limit.save(update_fields=["cd"])
+    assert manager.cd_limit["p"].limiter.default_cd == 10
+    backend.client.publish.assert_awaited_once()
+    channel, message = backend.client.publish.await_args.args
+    assert message.endswith(f"|1|{CacheType.LIMIT}:{limit.id}")
+
+
+async def test_type_invalidation_keeps_state(limits):
+    from zhenxun.models.plugin_limit import PluginLimit
+    from zhenxun.utils.enum import CacheType, LimitWatchType, PluginLimitType
+
+    manager, limit = limits
+    manager.cd_limit["p"].limiter.start_cd("u1")
+    other = await PluginLimit.create(
+        module="q",
+        module_path="a.q",
+        plugin_id=limit.plugin_id,
+        limit_type=PluginLimitType.COUNT,
+        watch_type=LimitWatchType.USER,
+        max_count=1,
+    )
+
+    # 加载期间收到的失效消息在加载结束后同步
+    manager.is_updating = True
+    manager.on_cache_invalidate(CacheType.LIMIT, f"{CacheType.LIMIT}:1", True)
+    manager.is_updating = False
+    await manager.update_limits()
+    for task in list(manager._sync_tasks):
+        await task
+    assert "q" in manager.count_limit
+
+    # 整个类型失效时逐条比对，参数未变的限制保留CD状态
+    await PluginLimit.filter(id=other.id).update(status=False)
+    manager.cd_limit["p"].limiter.start_cd("u1")
+    manager.on_cache_invalidate(CacheType.LIMIT, None, True)
+    for task in list(manager._sync_tasks):
+        await task
+    assert not manager.cd_limit["p"].limiter.check("u1")
+    assert "q" not in manager.count_limit
@@ -0,0 +1,156 @@
+from collections.abc import Callable
+
+import pytest
+from pytest_mock import MockerFixture
+
+MODELS = (
+    "zhenxun.models.plugin_info",
+    "zhenxun.models.bot_console",
+    "zhenxun.models.group_console",
+    "zhenxun.models.ban_console",
+    "zhenxun.models.level_user",
+)
+
+
+@pytest.fixture
+async def snapshot(memory_db: Callable, mocker: MockerFixture):
+    await memory_db(*MODELS)
+
+    from zhenxun.builtin_plugins.hooks.auth.auth_snapshot import (
+        AuthIndex,
+        AuthSnapshot,
+    )
+
+    mocker.patch.object(AuthSnapshot, "_index", AuthIndex())
+    mocker.patch.object(AuthSnapshot, "is_ready", False)
+    await AuthSnapshot.load()
+    return AuthSnapshot
+
+
+async def test_bulk_writes_reload_snapshot(snapshot, mocker: MockerFixture):
+    from zhenxun.models.bot_console import BotConsole
+    from zhenxun.models.group_console import GroupConsole
+    from zhenxun.models.plugin_info import PluginInfo
+    from zhenxun.services.cache import CacheRoot
+    from zhenxun.utils.enum import CacheType
+
+    await BotConsole.create(bot_id="1", platform="qq", status=True)
+    await GroupConsole.create(group_id="100", group_name="g")
+    assert snapshot.is_ready
+    assert snapshot._index.bots["1"].status
+    assert "100" in snapshot._index.groups
+
+    # 不经过 Model 保存的写入
+    await BotConsole.set_bot_status(False, "1")
+    assert not snapshot._index.bots["1"].status
+    await GroupConsole.filter(group_id="100").update(level=-1)
+    await CacheRoot.invalidate_cache(CacheType.GROUPS)
+    # 重建期间继续使用旧索引
+    assert snapshot.is_ready
+    assert snapshot._index.groups["100"].level == 5
+    await snapshot._reload_task
+    assert snapshot._index.groups["100"].level == -1
+
+    # 本进程单条失效已增量更新，不重建
+    load = mocker.spy(snapshot, "load")
+    await CacheRoot.invalidate_cache(CacheType.PLUGINS, "x")
+    assert not snapshot._sync_tasks
+    CacheRoot._notify_invalidate("OTHER", None, True)
+    assert load.call_count == 0
+    assert not await PluginInfo.all().exists()
+
+
+async def test_remote_key_reloads_row(snapshot, mocker: MockerFixture):
+    from zhenxun.models.ban_console import BanConsole
+    from zhenxun.models.level_user import LevelUser
+    from zhenxun.services.cache import CacheRoot
+    from zhenxun.utils.enum import CacheType
+
+    async def notify(cache_type: str, key: str):
+        CacheRoot._notify_invalidate(cache_type, f"{cache_type}:{key}", True)
+        for task in list(snapshot._sync_tasks):
+            await task
+
+    load = mocker.spy(snapshot, "load")
+    # 其他进程的写入不会触发本进程的数据变更监听
+    await LevelUser.bulk_create(
+        [
+            LevelUser(user_id="u_1", group_id="g", user_level=5),
+            LevelUser(user_id="u", group_id="1_g", user_level=3),
+        ]
+    )
+    await BanConsole.bulk_create(
+        [BanConsole(user_id="u", ban_level=9, ban_time=0, duration=-1, operator="x")]
+    )
+    await notify(CacheType.LEVEL, "u_1_g")
+    await notify(CacheType.BAN, "u_")
+    assert snapshot._index.levels == {("u_1", "g"): 5, ("u", "1_g"): 3}
+    assert snapshot.get_ban_time("u", None) == -1
+
+    await LevelUser.filter(user_id="u_1").delete()
+    await notify(CacheType.LEVEL, "u_1_g")
+    assert snapshot._index.levels == {("u", "1_g"): 3}
+    assert load.call_count == 0
+
+
+def test_decide_order(mocker: MockerFixture):
+    import time
+
+    from zhenxun.builtin_plugins.hooks.auth.auth_snapshot import (
+        AuthAction,
+        AuthIndex,
+        AuthNotice,
+        AuthSnapshot,
+        BanEntry,
+        BotEntry,
+        GroupEntry,
+    )
+    from zhenxun.models.plugin_info import PluginInfo
+    from zhenxun.utils.enum import BlockType, PluginType
+
+    def plugin(module: str, **kwargs) -> PluginInfo:
+        kwargs.setdefault("plugin_type", PluginType.NORMAL)
+        return PluginInfo(module=module, name=module, **kwargs)
+
+    index = AuthIndex()
+    for p in (
+        plugin("normal", cost_gold=10),
+        plugin("hidden", plugin_type=PluginType.HIDDEN),
+        plugin("admin", admin_level=5),
+        plugin("high", level=9),
+        plugin("group_only", block_type=BlockType.PRIVATE),
+        plugin("off", status=False, block_type=BlockType.ALL),
+    ):
+        index.plugins[p.module] = p
+    index.bots["bot"] = BotEntry(True, frozenset({"blocked_by_bot"}))
+    index.bots["sleep"] = BotEntry(False, frozenset())
+    index.groups["g"] = GroupEntry(5, True, False, frozenset({"admin"}), frozenset())
+    index.groups["super"] = GroupEntry(5, True, True, frozenset(), frozenset())
+    index.groups["asleep"] = GroupEntry(5, False, False, frozenset(), frozenset())
+    index.bans[("banned", None)] = BanEntry(int(time.time()), 100)
+    index.levels[("u", "g")] = 3
+    mocker.patch.object(AuthSnapshot, "_index", index)
+
+    def decide(module: str, user="u", group="g", bot="bot", gold=100, text=""):
+        return AuthSnapshot.decide(
+            module, bot, user, group, text, {"root"}, user_gold=gold
+        )
+
+    assert decide("unknown").action == AuthAction.EXEMPT
+    assert decide("hidden", gold=0).action == AuthAction.EXEMPT
+    assert decide("normal", gold=5).notice == AuthNotice.COST
+    assert decide("normal", user="root", bot="sleep").action == AuthAction.SUPERUSER
+    banned = decide("normal", user="banned")
+    assert (banned.notice, 0 < banned.ban_time <= 100) == (AuthNotice.BAN, True)
+    assert decide("normal", bot="sleep").action == AuthAction.SKIP
+    assert decide("normal", group="missing").action == AuthAction.SKIP
+    assert decide("normal", group="asleep").action == AuthAction.SKIP
+    assert decide("normal", group="asleep", text="醒来").action == AuthAction.PASS
+    assert decide("high").action == AuthAction.SKIP
+    assert decide("admin").notice == AuthNotice.ADMIN_GROUP
+    assert decide("group_only", group=None).notice == AuthNotice.PRIVATE_BLOCK_TYPE
+    assert decide("off").notice == AuthNotice.GLOBAL_BLOCK
+    assert decide("off", group="super").action == AuthAction.SUPERUSER
+
+    passed = decide("normal")
+    assert (passed.action, passed.cost_gold) == (AuthAction.PASS, 10)
@@ -0,0 +1,90 @@
+from collections import deque
+from collections.abc import Callable
+
+from nonebot.adapters.onebot.v11 import Message, MessageSegment
+import pytest
+from pytest_mock import MockerFixture
+
+
+@pytest.fixture
+async def hook(memory_db: Callable, mocker: MockerFixture):
+    await memory_db("zhenxun.models.bot_message_store")
+
+    from zhenxun.builtin_plugins.hooks import call_hook
+    from zhenxun.utils.manager.message_manager import MessageManager
+
+    mocker.patch.object(MessageManager, "data", {})
+    mocker.patch.object(call_hook.bot_message_pipeline, "_buffer", deque())
+    mocker.patch.object(call_hook.PlatformUtils, "get_platform", return_value="qq")
+    record = mocker.patch.object(call_hook.Config, "get_config", return_value=True)
+    return call_hook, record
+
+
+async def test_sent_messages_are_batched(hook, mocker: MockerFixture):
+    from zhenxun.models.bot_message_store import BotMessageStore
+    from zhenxun.utils.enum import BotSentType
+    from zhenxun.utils.manager.message_manager import MessageManager
+
+    call_hook, record = hook
+    bot = mocker.Mock(self_id="bot")
+    message = Message([MessageSegment.at(1), MessageSegment.text(" hi")])
+    await call_hook.handle_api_result(
+        bot,
+        None,
+        "send_msg",
+        {"user_id": 1, "group_id": 2, "message": message, "message_type": "group"},
+        {"message_id": 10},
+    )
+    await call_hook.handle_api_result(
+        bot, None, "send_msg", {"user_id": 1, "message": "plain"}, {"message_id": 11}
+    )
+    # 失败或其他API调用不记录
+    await call_hook.handle_api_result(
+        bot, Exception(), "send_msg", {"user_id": 1}, {"message_id": 12}
+    )
+    assert MessageManager.get("1") == ["10", "11"]
+    assert not await BotMessageStore.exists()
+
+    pipeline = call_hook.bot_message_pipeline
+    assert len(pipeline) == 2
+    assert await pipeline.flush() == 2
+    rows = (
+        await BotMessageStore.all()
+        .order_by("id")
+        .values(
+            "bot_id",
+            "user_id",
+            "group_id",
+            "sent_type",
+            "text",
+            "plain_text",
+            "platform",
+        )
+    )
+    assert rows == [
+        {
+            "bot_id": "bot",
+            "user_id": "1",
+            "group_id": "2",
+            "sent_type": BotSentType.GROUP,
+            "text": "@1 hi",
+            "plain_text": " hi",
+            "platform": "qq",
+        },
+        {
+            "bot_id": "bot",
+            "user_id": "1",
+            "group_id": None,
+            "sent_type": BotSentType.PRIVATE,
+            "text": "plain",
+            "plain_text": "plain",
+            "platform": "qq",
+        },
+    ]
+
+    record.return_value = False
+    await call_hook.handle_api_result(
+        bot, None, "send_msg", {"user_id": 1, "message": "x"}, {"message_id": 13}
+    )
+    assert len(pipeline) == 0
+    assert "13" in MessageManager.data["1"]
@@ -0,0 +1,58 @@
+from collections.abc import Callable
+from pathlib import Path
+
+from pytest_mock import MockerFixture
+
+MODELS = ("zhenxun.models.plugin_info", "zhenxun.models.plugin_limit")
+
+
+def build_plugins(version: str = "0.1"):
+    from zhenxun.models.plugin_info import PluginInfo
+    from zhenxun.utils.enum import PluginType
+
+    return [
+        PluginInfo(
+            module=f"p{i}",
+            module_path=f"zhenxun.plugins.p{i}",
+            name=f"插件{i}",
+            version=version if i == 0 else "0.1",
+            plugin_type=PluginType.NORMAL,
+        )
+        for i in range(3)
+    ]
+
+
+async def test_sync_plugin_info(memory_db: Callable):
+    from zhenxun.builtin_plugins.init.init_plugin import sync_plugin_info
+    from zhenxun.models.plugin_info import PluginInfo
+
+    await memory_db(*MODELS)
+    assert await sync_plugin_info(build_plugins()) == (3, 0)
+    # 用户修改的字段不会被覆盖
+    await PluginInfo.filter(module="p0").update(level=1)
+
+    assert await sync_plugin_info(build_plugins()) == (0, 0)
+    assert await sync_plugin_info(build_plugins("0.2")) == (0, 1)
+    plugin = await PluginInfo.get(module="p0")
+    assert (plugin.version, plugin.level) == ("0.2", 1)
+    assert await PluginInfo.all().count() == 3
+
+
+def test_limit_file_unchanged(mocker: MockerFixture, tmp_path: Path):
+    from zhenxun.builtin_plugins.init.manager import Manager
+    from zhenxun.configs.utils import PluginCdBlock
+
+    manager = Manager()
+    manager.cd_file = tmp_path / "plugins2cd.yaml"
+    manager.cd_data["p0"] = PluginCdBlock(cd=5)
+    manager.save_cd_file()
+    content = manager.cd_file.read_text(encoding="utf8")
+    assert "p0" in content
+
+    write_text = mocker.spy(Path, "write_text")
+    manager.save_cd_file()
+    write_text.assert_not_called()
+
+    manager.cd_data["p0"] = PluginCdBlock(cd=10)
+    manager.save_cd_file()
+    write_text.assert_called_once()
@@ -0,0 +1,99 @@
+from pathlib import Path
+
+import httpx
+import pytest
+from pytest_mock import MockerFixture
+from respx import MockRouter
+
+REPO_URL = "https://github.com/test/plugins"
+RAW_FORMAT = "http://raw.test/{owner}/{repo}/{branch}/{path}"
+
+
+def build_tree(plugins: list[str]) -> dict:
+    files = []
+    for name in plugins:
+        files.extend(
+            (f"plugins/{name}/__init__.py", f"plugins/{name}/requirements.txt")
+        )
+    return {
+        "sha": "main",
+        "url": "",
+        "tree": [
+            {"path": path, "mode": "100644", "type": "blob", "sha": "", "url": ""}
+            for path in files
+        ],
+    }
+
+
+@pytest.fixture
+def fake_repo(mocked_api: MockRouter, mocker: MockerFixture, tmp_path: Path):
+    from zhenxun.builtin_plugins.plugin_store import data_source
+
+    mocker.patch.object(data_source, "BASE_PATH", tmp_path)
+    mocker.patch(
+        "zhenxun.utils.github_utils.models.get_fastest_raw_formats",
+        return_value=[RAW_FORMAT],
+    )
+    mocked_api.get(url__regex=r".*/repos/test/plugins/commits/.*").respond(404)
+    mocked_api.get(url__regex=r".*/repos/test/plugins/git/trees/.*").respond(
+        json=build_tree(["a", "b", "c"])
+    )
+    mocked_api.get(url__regex=r"http://raw\.test/.*").mock(
+        side_effect=lambda request: httpx.Response(200, text=request.url.path)
+    )
+    return mocker.patch.object(
+        data_source.VirtualEnvPackageManager, "install_requirement"
+    )
+
+
+async def test_install_plugins(fake_repo, tmp_path: Path):
+    from zhenxun.builtin_plugins.plugin_store.data_source import (
+        InstallTask,
+        StoreManager,
+    )
+
+    tasks = [
+        InstallTask(name, REPO_URL, f"plugins.{name}", True)
+        for name in ("a", "b", "missing")
+    ]
+    await StoreManager.install_plugins(tasks)
+
+    assert [task.error is None for task in tasks] == [True, True, False]
+    for name in ("a", "b"):
+        assert (tmp_path / "plugins" / name / "__init__.py").is_file()
+    # 所有插件的依赖合并为一次安装
+    fake_repo.assert_called_once()
+    assert sorted(fake_repo.call_args.args[0]) == [
+        tmp_path / "plugins" / name / "requirements.txt" for name in ("a", "b")
+    ]
+
+
+async def test_install_plugins_requirement_fallback(fake_repo, tmp_path: Path):
+    from subprocess import CalledProcessError
+
+    from zhenxun.builtin_plugins.plugin_store.data_source import (
+        InstallTask,
+        StoreManager,
+    )
+
+    bad = tmp_path / "plugins" / "b" / "requirements.txt"
+
+    def install(requirement_file, *, check=False):
+        files = (
+            requirement_file
+            if isinstance(requirement_file, list)
+            else [requirement_file]
+        )
+        if bad in files:
+            raise CalledProcessError(1, "pip", stderr="conflict")
+        return ""
+
+    fake_repo.side_effect = install
+    tasks = [
+        InstallTask(name, REPO_URL, f"plugins.{name}", True) for name in ("a", "b", "c")
+    ]
+    await StoreManager.install_plugins(tasks)
+
+    # 合并安装失败后逐个插件安装，只有依赖冲突的插件失败
+    assert [task.error for task in tasks] == [None, "依赖安装失败: conflict", None]
+    assert fake_repo.call_count == 4
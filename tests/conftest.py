@@ -96,6 +96,14 @@ def _init_bot(nonebug_init: None):
     }
 
 
+@pytest.fixture(scope="session", autouse=True)
+def _mirror_health_file(_init_bot: None, tmp_path_factory: pytest.TempPathFactory):
+    """镜像健康度在关闭时保存，测试中写入临时目录"""
+    from zhenxun.utils.manager.mirror_manager import MirrorManager
+
+    MirrorManager.file = tmp_path_factory.mktemp("mirror") / "mirror_health.json"
+
+
 @pytest.fixture
 async def app(app: App, tmp_path: Path, mocker: MockerFixture):
     from zhenxun.services.db_context import disconnect, init
@@ -142,3 +150,21 @@ def create_bot() -> Callable:
 @pytest.fixture
 def mocked_api(respx_mock: MockRouter):
     return respx_mock
+
+
+@pytest.fixture
+async def memory_db():
+    """只注册指定模型的内存数据库，用于不依赖插件加载的服务测试"""
+    from tortoise import Tortoise, connections
+
+    async def _init(*modules: str):
+        # 丢弃其他用例遗留的连接，这些连接可能已被关闭
+        for alias in list(connections._get_storage()):
+            connections.discard(alias)
+        await Tortoise.init(
+            db_url="sqlite://:memory:", modules={"models": list(modules)}
+        )
+        await Tortoise.generate_schemas()
+
+    yield _init
+    await Tortoise.close_connections()
@@ -0,0 +1,87 @@
+import asyncio
+import time
+
+from nonebot.adapters.onebot.v11.exception import ActionFailed
+import pytest
+from pytest_mock import MockerFixture
+
+
+async def test_token_bucket_burst_and_rate():
+    from zhenxun.utils.broadcast import TokenBucket
+
+    bucket = TokenBucket(20, 2)
+    start = time.monotonic()
+    await bucket.acquire()
+    await bucket.acquire()
+    assert time.monotonic() - start < 0.04
+    await bucket.acquire()
+    assert time.monotonic() - start >= 0.045
+
+    unlimited = TokenBucket(0)
+    start = time.monotonic()
+    await asyncio.gather(*(unlimited.acquire() for _ in range(100)))
+    assert time.monotonic() - start < 0.04
+
+
+@pytest.fixture
+def config(mocker: MockerFixture) -> dict:
+    from zhenxun.utils.broadcast import BroadcastScheduler
+
+    config = {"BOT_RATE": 0, "BOT_BURST": 3, "PLATFORM_RATE": {}, "MAX_RETRY": 1}
+    mocker.patch(
+        "zhenxun.utils.broadcast.Config.get_config",
+        side_effect=lambda module, key, *args, **kwargs: config[key],
+    )
+    mocker.patch.object(BroadcastScheduler, "bot_buckets", {})
+    mocker.patch.object(BroadcastScheduler, "platform_buckets", {})
+    return config
+
+
+async def test_scheduler_retries_and_counts(config: dict, mocker: MockerFixture):
+    from zhenxun.utils.broadcast import BroadcastLane, BroadcastScheduler
+
+    sleep = asyncio.sleep
+    delays = []
+
+    async def fast_sleep(delay: float):
+        # 进度报告按原间隔等待，重试退避立即返回
+        if delay >= 60:
+            await sleep(delay)
+        else:
+            delays.append(delay)
+            await sleep(0)
+
+    mocker.patch("zhenxun.utils.broadcast.asyncio.sleep", side_effect=fast_sleep)
+    failures = {"2": 1, "4": 2}
+    sent = []
+
+    async def send(bot, group) -> bool:
+        if failures.get(group.group_id, 0) > 0:
+            failures[group.group_id] -= 1
+            raise ActionFailed(retcode=100)
+        if group.group_id == "5":
+            raise ValueError("bad message")
+        sent.append((bot.self_id, group.group_id))
+        return group.group_id != "3"
+
+    def lane(self_id: str, *group_ids: str) -> BroadcastLane:
+        groups = [mocker.Mock(group_id=g, channel_id=None) for g in group_ids]
+        return BroadcastLane(mocker.Mock(self_id=self_id), "qq", groups)
+
+    progress = await BroadcastScheduler(send, progress_interval=3600).run(
+        [lane("b1", "1", "2", "3"), lane("b2", "4", "5")]
+    )
+    assert (progress.total, progress.done) == (5, 5)
+    assert (progress.success, progress.skipped, progress.failed) == (2, 1, 2)
+    assert sent == [("b1", "1"), ("b1", "2"), ("b1", "3")]
+    # 每个群组失败后退避一次，超过重试次数后计为失败
+    assert len(delays) == 2
+    assert all(1 <= d < 2 for d in delays)
+
+    # 令牌桶按Bot共享，配置修改后下次广播生效
+    assert set(BroadcastScheduler.bot_buckets) == {"b1", "b2"}
+    config["BOT_RATE"] = 5
+    config["PLATFORM_RATE"] = {"qq": 10}
+    await BroadcastScheduler(send, progress_interval=3600).run([lane("b1", "1")])
+    assert BroadcastScheduler.bot_buckets["b1"].rate == 5
+    assert BroadcastScheduler.platform_buckets["qq"].capacity == 10
@@ -0,0 +1,67 @@
+from aiocache import SimpleMemoryCache
+from aiocache.serializers import JsonSerializer
+from pydantic import BaseModel
+import pytest
+from pytest_mock import MockerFixture
+
+
+class Item(BaseModel):
+    name: str
+    tags: list[str]
+
+
+@pytest.fixture
+def cache(mocker: MockerFixture):
+    from zhenxun.services.cache import CacheManager, CacheRoot, cache_config
+    from zhenxun.services.cache.config import CacheMode
+
+    mocker.patch.object(cache_config, "cache_mode", CacheMode.HYBRID)
+    mocker.patch.object(CacheManager, "_enabled", True)
+    mocker.patch.object(
+        CacheRoot, "_cache_backend", SimpleMemoryCache(serializer=JsonSerializer())
+    )
+    mocker.patch.object(CacheRoot, "_local_cache", None)
+    mocker.patch.object(CacheManager, "_registry", {})
+    CacheRoot.register("TEST_ITEM", Item)
+    CacheRoot.register("TEST_RAW")
+    return CacheRoot
+
+
+async def test_local_tier_returns_copies(cache):
+    await cache.set("TEST_ITEM", "a", Item(name="a", tags=["x"]))
+    await cache.set("TEST_RAW", "b", {"tags": ["x"]})
+
+    first = await cache.get("TEST_ITEM", "a")
+    first.tags.append("mutated")
+    second = await cache.get("TEST_ITEM", "a")
+    assert isinstance(second, Item)
+    assert second.tags == ["x"]
+    assert first is not second
+
+    raw = (await cache.get_many("TEST_RAW", ["b"]))[0]
+    raw["tags"].append("mutated")
+    assert await cache.get("TEST_RAW", "b") == {"tags": ["x"]}
+    assert cache.get_tier_stats()["local"]["hits"] >= 3
+
+    # 远程命中后写入本地缓存层的数据同样不与调用方共享
+    cache.local_cache.clear()
+    remote = await cache.get("TEST_ITEM", "a")
+    remote.tags.clear()
+    assert (await cache.get("TEST_ITEM", "a")).tags == ["x"]
+
+
+async def test_local_tier_ttl_and_publish(cache, mocker: MockerFixture):
+    publish = mocker.patch.object(cache, "_publish_invalidation")
+    cache.register("TEST_FOREVER", expire=0)
+    await cache.set("TEST_FOREVER", "a", {"v": 1}, publish=False)
+    await cache.set_many("TEST_RAW", [("b", 1)], publish=False)
+    publish.assert_not_called()
+
+    # 远程永不过期时本地缓存层仍按自身过期时间失效
+    cache.local_cache.clear()
+    assert await cache.get("TEST_FOREVER", "a") == {"v": 1}
+    expire_at, _ = cache.local_cache._data["TEST_FOREVER:a"]
+    assert expire_at
+
+    await cache.set("TEST_RAW", "b", 2)
+    publish.assert_called_once_with("TEST_RAW:b")
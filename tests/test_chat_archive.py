@@ -0,0 +1,84 @@
+from collections.abc import Callable
+from datetime import datetime, timedelta
+import json
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+
+@pytest.fixture
+async def archive(memory_db: Callable, mocker: MockerFixture, tmp_path: Path):
+    from zhenxun.utils.manager.chat_archive_manager import ChatArchiveManager
+
+    await memory_db("zhenxun.models.chat_history")
+    mocker.patch("zhenxun.utils.manager.chat_archive_manager.ARCHIVE_PATH", tmp_path)
+    mocker.patch.object(ChatArchiveManager, "index_file", tmp_path / "index.json")
+    mocker.patch.object(ChatArchiveManager, "_index", None)
+    return ChatArchiveManager
+
+
+async def test_archive_read_only_before_cutoff(archive, mocker: MockerFixture):
+    from zhenxun.models.chat_history import ChatHistory
+
+    old = datetime.now() - timedelta(days=60)
+    await archive.write(
+        [
+            {"id": 1, "user_id": "u", "group_id": "g1", "create_time": old},
+            {"id": 2, "user_id": "u", "group_id": None, "create_time": old},
+        ]
+    )
+    await ChatHistory.create(id=10, user_id="u", group_id="g1", text="new")
+    read = mocker.spy(archive, "read")
+
+    assert len(await ChatHistory.get_message("u", "g1", "group", days=7)) == 1
+    assert len(await ChatHistory.get_message("u", "g2", "group", days=90)) == 0
+    assert (
+        len(await ChatHistory.get_message("u", "g1", "group", include_archive=False))
+        == 1
+    )
+    assert read.call_count == 0
+
+    assert len(await ChatHistory.get_message("u", "g1", "group", days=90)) == 2
+    assert len(await ChatHistory.get_message("u", "g1", "group")) == 2
+    messages = await ChatHistory.get_message("u", "", "user", msg_type="private")
+    assert [m.id for m in messages] == [2]
+    assert read.call_count == 3
+
+
+async def test_rank_includes_archive(archive):
+    from zhenxun.models.chat_history import ChatHistory
+    from zhenxun.utils.manager.leaderboard_manager import LeaderboardManager
+
+    old = datetime.now() - timedelta(days=60)
+    await archive.write(
+        [
+            {"id": i, "user_id": "a", "group_id": "g1", "create_time": old}
+            for i in range(1, 4)
+        ]
+    )
+    await ChatHistory.create(id=10, user_id="a", group_id="g1", text="new")
+    for i in range(11, 13):
+        await ChatHistory.create(id=i, user_id="b", group_id="g1", text="new")
+
+    assert await ChatHistory.get_group_msg_rank("g1") == [("a", 4), ("b", 2)]
+    assert await ChatHistory.get_group_msg_rank(None, limit=1, order="ASC") == [
+        ("b", 2)
+    ]
+    recent = (datetime.now() - timedelta(days=7), datetime.now())
+    assert await ChatHistory.get_group_msg_rank("g1", date_scope=recent) == [
+        ("b", 2),
+        ("a", 1),
+    ]
+    assert sorted(await LeaderboardManager._load_chat("g1")) == [("a", 4), ("b", 2)]
+
+
+def test_legacy_index_cutoff(archive):
+    archive.index_file.write_text(
+        json.dumps({"months": ["2024-11", "2024-12"], "first": {"g1": "x"}}),
+        encoding="utf8",
+    )
+    assert archive.cutoff_time("g1").replace(tzinfo=None) == datetime(2025, 1, 1)
+    assert archive.cutoff_time("g2") is None
+    assert archive.has_archive(datetime(2024, 12, 31), "g1")
+    assert not archive.has_archive(datetime(2025, 1, 2), "g1")
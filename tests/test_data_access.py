@@ -0,0 +1,117 @@
+import asyncio
+from collections.abc import Callable
+
+from aiocache import SimpleMemoryCache
+from aiocache.serializers import JsonSerializer
+import pytest
+from pytest_mock import MockerFixture
+
+
+@pytest.fixture
+async def dao(memory_db: Callable, mocker: MockerFixture):
+    await memory_db("zhenxun.models.user_console")
+
+    from zhenxun.models.user_console import UserConsole
+    from zhenxun.services.cache import CacheManager, CacheRoot, cache_config
+    from zhenxun.services.cache.config import CacheMode
+    from zhenxun.services.data_access import DataAccess
+    from zhenxun.utils.enum import CacheType
+
+    mocker.patch.object(cache_config, "cache_mode", CacheMode.MEMORY)
+    mocker.patch.object(CacheManager, "_enabled", True)
+    mocker.patch.object(
+        CacheRoot, "_cache_backend", SimpleMemoryCache(serializer=JsonSerializer())
+    )
+    mocker.patch.object(CacheManager, "_registry", {})
+    mocker.patch.object(DataAccess, "_cache_stats", {})
+    CacheRoot.register(CacheType.USERS, UserConsole)
+    await UserConsole.create(user_id="u1", uid=1)
+    await UserConsole.create(user_id="u2", uid=2, gold=5)
+    return DataAccess(UserConsole)
+
+
+async def test_get_many_batches_misses(dao, mocker: MockerFixture):
+    from zhenxun.models.user_console import UserConsole
+
+    query = mocker.spy(UserConsole, "filter")
+    result = await dao.get_many(["u2", "missing", "u1"])
+    assert [u and u.user_id for u in result] == ["u2", None, "u1"]
+    assert query.call_count == 1
+
+    # 命中与空结果都从缓存返回，不再查询数据库
+    result = await dao.get_many(["u1", "missing", "u2"])
+    assert [u and u.gold for u in result] == [100, None, 5]
+    assert query.call_count == 1
+    stats = dao._cache_stats[dao.cache_type]
+    assert (stats["hits"], stats["null_hits"], stats["misses"]) == (2, 1, 3)
+
+
+async def test_get_many_large_batch(dao, mocker: MockerFixture):
+    from zhenxun.models.user_console import UserConsole
+
+    query = mocker.spy(UserConsole, "filter")
+    keys = [f"x{i}" for i in range(1200)] + ["u1", "u1"]
+    result = await dao.get_many(keys)
+    assert [u.uid for u in result if u] == [1, 1]
+    assert query.call_count == 1
+
+
+def test_build_many_queries():
+    from zhenxun.services.data_access import DataAccess
+
+    keys = [{"user_id": str(i), "group_id": "g"} for i in range(250)]
+    keys += [{"user_id": "u", "group_id": None}, {"user_id": "u", "group_id": "h"}]
+    queries = DataAccess._build_many_queries(keys)
+    assert len(queries) == 1
+    children = queries[0].children
+    assert [
+        (c.filters.get("group_id"), len(c.filters.get("user_id__in", [])))
+        for c in children
+    ] == [("g", 250), (None, 1), ("h", 1)]
+    assert children[1].filters == {"group_id__isnull": True, "user_id__in": ["u"]}
+
+
+async def test_cache_batch_api(dao):
+    from zhenxun.models.user_console import UserConsole
+
+    users = await UserConsole.all().order_by("uid")
+    assert await dao.cache.set_many([(u.user_id, u) for u in users])
+    result = await dao.cache.get_many(["u2", "missing", "u1"])
+    assert [u and u.uid for u in result] == [2, None, 1]
+
+    assert await dao.cache.delete_many(["u1"])
+    assert [u and u.uid for u in await dao.cache.get_many(["u1", "u2"])] == [None, 2]
+
+
+async def test_get_or_none_single_flight(dao, mocker: MockerFixture):
+    from zhenxun.models.user_console import UserConsole
+
+    calls = 0
+    get_or_none = UserConsole.get_or_none
+
+    async def slow_get_or_none(*args, **kwargs):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return await get_or_none(*args, **kwargs)
+
+    slow_get_or_none.__qualname__ = "UserConsole.get_or_none"
+    mocker.patch.object(UserConsole, "get_or_none", slow_get_or_none)
+
+    results = await asyncio.gather(*(dao.get_or_none(user_id="u1") for _ in range(5)))
+    assert calls == 1
+    assert {u.uid for u in results} == {1}
+    # 合并的调用方获得副本
+    assert len({id(u) for u in results}) == 5
+    assert dao._cache_stats[dao.cache_type]["coalesced"] == 4
+    assert not dao._inflight
+
+    # 单个调用方取消不影响其他等待同一查询的调用方
+    first = asyncio.create_task(dao.get_or_none(user_id="u9"))
+    second = asyncio.create_task(dao.get_or_none(user_id="u9"))
+    await asyncio.sleep(0)
+    first.cancel()
+    assert await second is None
+    assert calls == 2
+    assert await dao.get_or_none(user_id="u9") is None
+    assert calls == 2
@@ -0,0 +1,150 @@
+import hashlib
+import json
+from pathlib import Path
+
+import httpx
+from pytest_mock import MockerFixture
+from respx import MockRouter
+
+URL = "http://download.test/file.zip"
+MIRROR = "http://mirror.test/file.zip"
+DATA = bytes(range(256)) * 4
+
+
+def serve_range(request: httpx.Request) -> httpx.Response:
+    """按 Range 请求头返回内容，If-Range 不匹配时返回完整内容"""
+    headers = {"Accept-Ranges": "bytes", "ETag": '"v1"'}
+    value = request.headers.get("Range")
+    if not value or request.headers.get("If-Range", '"v1"') != '"v1"':
+        return httpx.Response(200, content=DATA, headers=headers)
+    start, end = value.removeprefix("bytes=").split("-")
+    stop = int(end) + 1 if end else len(DATA)
+    return httpx.Response(
+        206,
+        content=DATA[int(start) : stop],
+        headers={**headers, "Content-Range": f"bytes {start}-{stop - 1}/{len(DATA)}"},
+    )
+
+
+def write_part(path: Path, data: bytes, url: str = URL, validator: str = '"v1"'):
+    path.write_bytes(data)
+    path.with_name(f"{path.name}.meta").write_text(
+        json.dumps(
+            {"url": url, "validator": validator, "size": len(DATA), "range": None}
+        ),
+        encoding="utf-8",
+    )
+
+
+async def test_resume_from_part(mocked_api: MockRouter, tmp_path: Path):
+    from zhenxun.utils.http_utils import AsyncHttpx
+
+    path = tmp_path / "file.zip"
+    write_part(tmp_path / "file.zip.part", DATA[:100])
+    route = mocked_api.get(URL).mock(side_effect=serve_range)
+
+    assert await AsyncHttpx.download_file(
+        URL, path, sha256=hashlib.sha256(DATA).hexdigest()
+    )
+    request = route.calls.last.request
+    assert request.headers["Range"] == "bytes=100-"
+    assert request.headers["If-Range"] == '"v1"'
+    assert path.read_bytes() == DATA
+    assert list(tmp_path.iterdir()) == [path]
+
+
+async def test_discard_unverified_part(mocked_api: MockRouter, tmp_path: Path):
+    from zhenxun.utils.http_utils import AsyncHttpx
+
+    path = tmp_path / "file.zip"
+    part = tmp_path / "file.zip.part"
+    route = mocked_api.get(URL).mock(side_effect=serve_range)
+
+    # 没有来源记录、来源不同或缺少校验值时从头下载
+    for write in (
+        lambda: part.write_bytes(b"x" * 100),
+        lambda: write_part(part, b"x" * 100, url=MIRROR),
+        lambda: write_part(part, b"x" * 100, validator=""),
+    ):
+        write()
+        assert await AsyncHttpx.download_file(URL, path)
+        assert "Range" not in route.calls.last.request.headers
+        assert path.read_bytes() == DATA
+
+    # 远程文件已更新，If-Range 不匹配时服务器返回完整内容
+    write_part(part, b"x" * 100, validator='"v0"')
+    assert await AsyncHttpx.download_file(URL, path)
+    assert route.calls.last.request.headers["If-Range"] == '"v0"'
+    assert path.read_bytes() == DATA
+
+    # 校验值相同但文件大小变化时丢弃已有内容后重试
+    write_part(part, b"x" * 100)
+    meta = part.with_name("file.zip.part.meta")
+    meta.write_text(meta.read_text().replace(str(len(DATA)), "10"))
+    calls = route.call_count
+    assert await AsyncHttpx.download_file(URL, path)
+    assert route.call_count == calls + 2
+    assert path.read_bytes() == DATA
+    assert list(tmp_path.iterdir()) == [path]
+
+
+async def test_hash_mismatch(mocked_api: MockRouter, tmp_path: Path):
+    from zhenxun.utils.http_utils import AsyncHttpx
+
+    path = tmp_path / "file.zip"
+    path.write_bytes(b"old")
+    mocked_api.get(URL).mock(return_value=httpx.Response(200, content=DATA))
+
+    assert not await AsyncHttpx.download_file(URL, path, sha256="0" * 64)
+    # 校验失败时不替换原文件
+    assert path.read_bytes() == b"old"
+    assert not (tmp_path / "file.zip.part").exists()
+
+
+async def test_chunked_download(
+    mocked_api: MockRouter, mocker: MockerFixture, tmp_path: Path
+):
+    from zhenxun.utils import http_utils
+    from zhenxun.utils.http_utils import AsyncHttpx
+
+    mocker.patch.object(http_utils, "CHUNK_MIN_SIZE", 1)
+    mocked_api.head(URL).mock(
+        return_value=httpx.Response(
+            200,
+            headers={"Accept-Ranges": "bytes", "Content-Length": str(len(DATA))},
+        )
+    )
+    route = mocked_api.get(URL).mock(side_effect=serve_range)
+
+    path = tmp_path / "file.zip"
+    # 连接数不同的上次下载遗留的分块
+    for i in range(3):
+        write_part(tmp_path / f"file.zip.part{i}", b"x" * 10)
+    (tmp_path / "file.zip.part5").write_bytes(b"x")
+    assert await AsyncHttpx.download_file(URL, path, connections=4)
+    assert route.call_count == 4
+    assert path.read_bytes() == DATA
+    assert list(tmp_path.iterdir()) == [path]
+
+
+async def test_gather_prefers_healthy_mirror(
+    mocked_api: MockRouter, mocker: MockerFixture, tmp_path: Path
+):
+    from zhenxun.utils.http_utils import AsyncHttpx
+    from zhenxun.utils.manager.mirror_manager import MirrorManager
+
+    mocker.patch.object(MirrorManager, "_loaded", True)
+    mocker.patch.object(MirrorManager, "probe_urls", {})
+    mocker.patch.object(MirrorManager, "stats", {})
+    MirrorManager.probe_urls.update({"download.test": URL, "mirror.test": MIRROR})
+    MirrorManager.record(URL, 500)
+    MirrorManager.record(MIRROR, 50)
+    slow = mocked_api.get(URL).mock(return_value=httpx.Response(200, content=DATA))
+    fast = mocked_api.get(MIRROR).mock(return_value=httpx.Response(200, content=DATA))
+
+    result = await AsyncHttpx.gather_download_file(
+        [[URL, MIRROR]], [tmp_path / "file.zip"]
+    )
+    assert result == [True]
+    assert fast.call_count == 1
+    assert slow.call_count == 0
@@ -0,0 +1,102 @@
+import asyncio
+from pathlib import Path
+
+import httpx
+import pytest
+from pytest_mock import MockerFixture
+from respx import MockRouter
+
+URL = "http://image.test/avatar.png"
+
+
+@pytest.fixture
+def image_cache(mocker: MockerFixture, tmp_path: Path):
+    from zhenxun.services import image_cache
+    from zhenxun.services.image_cache import ImageCache
+
+    mocker.patch.object(image_cache, "CACHE_PATH", tmp_path)
+    mocker.patch.object(ImageCache, "index", type(ImageCache.index)())
+    mocker.patch.object(ImageCache, "refs", {})
+    mocker.patch.object(ImageCache, "total_size", 0)
+    mocker.patch.object(ImageCache, "_loaded", True)
+    mocker.patch.object(ImageCache, "_metrics", dict.fromkeys(ImageCache._metrics, 0))
+    return ImageCache
+
+
+async def test_hit_and_revalidate(image_cache, mocked_api: MockRouter):
+    route = mocked_api.get(URL).mock(
+        return_value=httpx.Response(200, content=b"img", headers={"ETag": "v1"})
+    )
+    assert await image_cache.get(URL) == b"img"
+    assert await image_cache.get(URL) == b"img"
+    assert route.call_count == 1
+
+    # 过期后携带ETag验证，未修改时使用缓存
+    image_cache.index[URL].expire = 0
+    route.mock(return_value=httpx.Response(304))
+    assert await image_cache.get(URL) == b"img"
+    assert route.calls.last.request.headers["If-None-Match"] == "v1"
+    metrics = image_cache.get_metrics()
+    assert metrics["hits"] == 1
+    assert metrics["revalidated"] == 1
+
+
+async def test_stale_on_error(image_cache, mocked_api: MockRouter):
+    route = mocked_api.get(URL).mock(return_value=httpx.Response(200, content=b"img"))
+    assert await image_cache.get(URL) == b"img"
+    image_cache.index[URL].expire = 0
+    route.mock(return_value=httpx.Response(500))
+    assert await image_cache.get(URL) == b"img"
+    assert image_cache.get_metrics()["stale"] == 1
+
+
+async def test_single_flight(image_cache, mocked_api: MockRouter):
+    async def slow(_):
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, content=b"img")
+
+    route = mocked_api.get(URL).mock(side_effect=slow)
+    result = await asyncio.gather(*(image_cache.get(URL) for _ in range(5)))
+    assert result == [b"img"] * 5
+    assert route.call_count == 1
+
+
+async def test_dedupe_and_evict(image_cache, mocked_api: MockRouter, mocker):
+    mocked_api.get(url__startswith="http://image.test/same").mock(
+        return_value=httpx.Response(200, content=b"x" * 600 * 1024)
+    )
+    mocked_api.get("http://image.test/other").mock(
+        return_value=httpx.Response(200, content=b"y" * 600 * 1024)
+    )
+    await image_cache.prefetch(["http://image.test/same1", "http://image.test/same2"])
+    # 相同内容只保存一份
+    assert len(image_cache.index) == 2
+    assert len(image_cache.refs) == 1
+
+    mocker.patch(
+        "zhenxun.services.image_cache.Config.get_config",
+        side_effect=lambda module, key, *_: 1 if key == "MAX_SIZE" else 86400,
+    )
+    await image_cache.get("http://image.test/other")
+    assert list(image_cache.index) == ["http://image.test/other"]
+    assert image_cache.total_size == 600 * 1024
+
+
+async def test_expired_same_content(image_cache, mocked_api: MockRouter):
+    route = mocked_api.get(URL).mock(
+        return_value=httpx.Response(200, content=b"img", headers={"ETag": "v1"})
+    )
+    assert await image_cache.get(URL) == b"img"
+    digest = image_cache.index[URL].digest
+
+    # 过期后源站不支持304，返回相同内容
+    image_cache.index[URL].expire = 0
+    route.mock(return_value=httpx.Response(200, content=b"img", headers={"ETag": "v2"}))
+    assert await image_cache.get(URL) == b"img"
+    entry = image_cache.index[URL]
+    assert entry.expire > 0
+    assert entry.etag == "v2"
+    assert image_cache.refs == {digest: 1}
+    assert image_cache._blob_path(digest).exists()
+    assert await image_cache.get(URL) == b"img"
+    assert route.call_count == 2
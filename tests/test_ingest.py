@@ -0,0 +1,160 @@
+from collections.abc import Callable
+import json
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+
+@pytest.fixture
+async def pipeline(memory_db: Callable, mocker: MockerFixture, tmp_path: Path):
+    from zhenxun.models.chat_history import ChatHistory
+    from zhenxun.services.ingest import IngestPipeline
+
+    await memory_db("zhenxun.models.chat_history")
+    mocker.patch("zhenxun.services.ingest.SPOOL_PATH", tmp_path)
+    mocker.patch.object(IngestPipeline, "_pipelines", {})
+    return IngestPipeline(
+        "test_chat",
+        ChatHistory,
+        ("user_id", "group_id", "text"),
+        max_size=10,
+        batch_size=4,
+    )
+
+
+async def test_put_nowait_drops_when_full(pipeline):
+    for i in range(10):
+        assert pipeline.put_nowait((str(i), "g", "t"))
+    assert not pipeline.put_nowait(("x", "g", "t"))
+    metrics = pipeline.get_metrics()
+    assert metrics["queue_depth"] == 10
+    assert metrics["dropped"] == 1
+
+
+async def test_flush_dead_letters_bad_rows(pipeline):
+    from zhenxun.models.chat_history import ChatHistory
+
+    rows = [("1", "g", "a"), ("2", "g", "b"), (None, "g", "bad"), ("3", "g", "c")]
+    rows += [("4", "g", "d"), (None, "g", "bad2")]
+    for row in rows:
+        pipeline.put_nowait(row)
+
+    assert await pipeline.flush() == 4
+    assert sorted(await ChatHistory.all().values_list("user_id", flat=True)) == [
+        "1",
+        "2",
+        "3",
+        "4",
+    ]
+    metrics = pipeline.get_metrics()
+    assert metrics["queue_depth"] == 0
+    assert metrics["dead_lettered"] == 2
+    dead = pipeline.dead_letter_file.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)[2] for line in dead] == ["bad", "bad2"]
+
+
+async def test_flush_keeps_rows_on_transient_error(pipeline, mocker: MockerFixture):
+    from tortoise.exceptions import DBConnectionError, OperationalError
+
+    from zhenxun.models.chat_history import ChatHistory
+
+    for i in range(3):
+        pipeline.put_nowait((str(i), "g", "t"))
+    insert = mocker.patch.object(
+        pipeline, "_insert", side_effect=DBConnectionError("down")
+    )
+    for _ in range(5):
+        assert await pipeline.flush() == 0
+    assert len(pipeline) == 3
+    assert pipeline._retries == 5
+    # 退避期间入队不会提前唤醒刷新任务
+    pipeline._wakeup.clear()
+    for i in range(3, 6):
+        pipeline.put_nowait((str(i), "g", "t"))
+    assert not pipeline._wakeup.is_set()
+
+    # OperationalError 始终视为暂时不可用，不会写入死信文件
+    insert.side_effect = OperationalError("database is locked")
+    for _ in range(10):
+        assert await pipeline.flush() == 0
+    assert len(pipeline) == 6
+    assert pipeline.get_metrics()["dead_lettered"] == 0
+
+    mocker.stopall()
+    assert await pipeline.flush() == 6
+    assert pipeline._retries == 0
+    assert await ChatHistory.all().count() == 6
+
+
+async def test_flush_keeps_rows_when_every_row_fails(pipeline, mocker: MockerFixture):
+    from tortoise.exceptions import IntegrityError
+
+    from zhenxun.services.ingest import MAX_DEAD_RUN
+
+    pipeline.max_size = 20
+    for i in range(MAX_DEAD_RUN + 2):
+        pipeline.put_nowait((str(i), "g", "t"))
+    mocker.patch.object(pipeline, "_insert", side_effect=IntegrityError("broken"))
+    # 没有任何记录可以写入时不拆分成整批死信
+    assert await pipeline.flush() == 0
+    assert len(pipeline) == MAX_DEAD_RUN + 2
+    assert pipeline._buffer[0][0] == "0"
+    assert pipeline.get_metrics()["dead_lettered"] == 0
+    assert not pipeline.dead_letter_file.exists()
+
+
+async def test_flush_batches_and_notifies(pipeline):
+    from zhenxun.models.chat_history import ChatHistory
+
+    flushed = []
+
+    async def listener(rows):
+        flushed.append(
+            [(row["user_id"], row["create_time"] is not None) for row in rows]
+        )
+
+    pipeline.add_flush_listener(listener)
+    for i in range(6):
+        await pipeline.put((str(i), "g", "t"))
+    assert pipeline._wakeup.is_set()
+
+    assert await pipeline.flush() == 6
+    assert [len(batch) for batch in flushed] == [4, 2]
+    assert all(has_time for batch in flushed for _, has_time in batch)
+    assert await ChatHistory.all().count() == 6
+    metrics = pipeline.get_metrics()
+    assert (metrics["inserted"], metrics["flushes"], metrics["queue_depth"]) == (
+        6,
+        2,
+        0,
+    )
+
+
+async def test_spool_replay(pipeline, mocker: MockerFixture):
+    from zhenxun.models.chat_history import ChatHistory
+
+    mocker.patch("zhenxun.services.ingest.Config.get_config", return_value=True)
+    await pipeline.start()
+    pipeline.put_nowait(("1", "g", "t"))
+    pipeline.put_nowait(("2", "g", "t"))
+    # 入队时只记录待写入的行，由后台任务批量落盘
+    assert pipeline.spool_file.read_text(encoding="utf-8") == ""
+    await pipeline._write_spool()
+    # 模拟异常退出，任务被取消且未写入数据库
+    pipeline._task.cancel()
+    pipeline._spool_task.cancel()
+    pipeline._spool.close()
+    pipeline._task = pipeline._spool_task = pipeline._spool = None
+    pipeline._buffer.clear()
+    with pipeline.spool_file.open("a", encoding="utf-8") as f:
+        f.write('["3", "g"')
+
+    await pipeline.start()
+    assert pipeline.get_metrics()["replayed"] == 2
+    await pipeline.stop()
+    assert sorted(await ChatHistory.all().values_list("user_id", flat=True)) == [
+        "1",
+        "2",
+    ]
+    assert pipeline.spool_file.read_text(encoding="utf-8") == ""
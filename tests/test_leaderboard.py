@@ -0,0 +1,151 @@
+from collections.abc import Callable
+import random
+
+import pytest
+from pytest_mock import MockerFixture
+
+MODELS = (
+    "zhenxun.models.user_console",
+    "zhenxun.models.user_gold_log",
+    "zhenxun.models.goods_info",
+    "zhenxun.models.group_member_info",
+    "zhenxun.models.sign_user",
+    "zhenxun.models.chat_history",
+    "zhenxun.models.statistics_rollup",
+)
+
+
+@pytest.fixture
+async def leaderboard(memory_db: Callable):
+    from zhenxun.utils.manager.leaderboard_manager import LeaderboardManager
+
+    await memory_db(*MODELS)
+    yield LeaderboardManager
+    LeaderboardManager._boards.clear()
+    LeaderboardManager._built_time.clear()
+    LeaderboardManager._user_groups.clear()
+    LeaderboardManager._group_members.clear()
+
+
+def test_board_rank_and_top():
+    from zhenxun.utils.manager.leaderboard_manager import Leaderboard
+
+    board = Leaderboard([("a", 10), ("b", 30), ("c", 20), ("d", 20)])
+    assert board.top(2) == [("b", 30), ("c", 20)]
+    assert board.rank("b") == 1
+    # 分数相同时名次相同
+    assert board.rank("c") == board.rank("d") == 2
+    assert board.rank("x") is None
+
+    board.incr("a", 25)
+    assert board.top(1) == [("a", 35)]
+    assert board.rank("b") == 2
+
+    board.remove("a")
+    assert board.rank("a") is None
+    assert board.top(1) == [("b", 30)]
+    assert len(board) == 3
+
+
+def test_board_buckets(mocker: MockerFixture):
+    from zhenxun.utils.manager.leaderboard_manager import Leaderboard
+
+    mocker.patch("zhenxun.utils.manager.leaderboard_manager.BUCKET_SIZE", 2)
+    rng = random.Random(0)
+    scores = {str(i): float(rng.randint(0, 20)) for i in range(30)}
+    board = Leaderboard(scores.items())
+    for _ in range(200):
+        uid = str(rng.randint(0, 40))
+        if rng.random() < 0.2:
+            board.remove(uid)
+            scores.pop(uid, None)
+        else:
+            board.set(uid, float(rng.randint(0, 20)))
+            scores[uid] = board.get(uid)  # type: ignore
+    assert all(len(bucket) <= 4 for bucket in board._buckets)
+
+    expected = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+    assert board.top(len(scores) + 1) == expected
+    assert board.top(7) == expected[:7]
+    for uid, score in scores.items():
+        assert board.rank(uid) == sum(s > score for s in scores.values()) + 1
+
+
+async def test_gold_rank_incremental(leaderboard):
+    from zhenxun.models.group_member_info import GroupInfoUser
+    from zhenxun.models.user_console import UserConsole
+
+    await UserConsole.bulk_create(
+        [UserConsole(user_id=str(i), uid=i, gold=i * 10) for i in range(1, 11)]
+    )
+    await GroupInfoUser.bulk_create(
+        [GroupInfoUser(user_id=str(i), group_id="g", user_name="") for i in (1, 2, 3)]
+    )
+
+    top, rank = await leaderboard.get_rank(leaderboard.GOLD, "1", 2)
+    assert top == [("10", 100), ("9", 90)]
+    assert rank == 10
+    top, rank = await leaderboard.get_rank(leaderboard.GOLD, "1", 2, "g")
+    assert top == [("3", 30), ("2", 20)]
+    assert rank == 3
+
+    await UserConsole.add_gold("1", 1000, "test")
+    top, rank = await leaderboard.get_rank(leaderboard.GOLD, "1", 1)
+    assert top == [("1", 1010)]
+    assert rank == 1
+    _, rank = await leaderboard.get_rank(leaderboard.GOLD, "1", 1, "g")
+    assert rank == 1
+
+    # 不在群组中的用户不进入群组排行
+    await UserConsole.add_gold("5", 5000, "test")
+    top, rank = await leaderboard.get_rank(leaderboard.GOLD, "5", 1, "g")
+    assert top == [("1", 1010)]
+    assert rank is None
+
+
+async def test_member_leave_rebuilds_group(leaderboard):
+    from zhenxun.models.group_member_info import GroupInfoUser
+    from zhenxun.models.user_console import UserConsole
+
+    await UserConsole.bulk_create(
+        [UserConsole(user_id=str(i), uid=i, gold=i) for i in (1, 2)]
+    )
+    for i in (1, 2):
+        await GroupInfoUser.create(user_id=str(i), group_id="g", user_name="")
+    _, rank = await leaderboard.get_rank(leaderboard.GOLD, "2", 1, "g")
+    assert rank == 1
+
+    member = await GroupInfoUser.get(user_id="2", group_id="g")
+    await member.delete()
+    await UserConsole.add_gold("2", 10, "test")
+    top, rank = await leaderboard.get_rank(leaderboard.GOLD, "2", 5, "g")
+    assert top == [("1", 1)]
+    assert rank is None
+
+
+async def test_chat_flush(leaderboard):
+    board = await leaderboard.get_board(leaderboard.CHAT, "g")
+    assert len(board) == 0
+    await leaderboard.on_chat_flush(
+        [
+            {"user_id": "1", "group_id": "g"},
+            {"user_id": "1", "group_id": "g"},
+            {"user_id": "2", "group_id": "other"},
+        ]
+    )
+    assert board.top(5) == [("1", 2)]
+
+
+async def test_group_boards_are_bounded(leaderboard, mocker: MockerFixture):
+    mocker.patch.object(leaderboard, "MAX_GROUP_BOARDS", 2)
+    for group_id in ("a", "b"):
+        await leaderboard.get_board(leaderboard.GOLD, group_id)
+    await leaderboard.get_board(leaderboard.GOLD, "a")
+    await leaderboard.get_board(leaderboard.CHAT, "c")
+    # 全局排行不计入数量，最久未查询的群组排行被移除
+    assert set(leaderboard._boards) == {
+        (leaderboard.GOLD, None),
+        (leaderboard.GOLD, "a"),
+        (leaderboard.CHAT, "c"),
+    }
+    assert (leaderboard.GOLD, "b") not in leaderboard._built_time
@@ -0,0 +1,109 @@
+import pytest
+from pytest_mock import MockerFixture
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(mocker: MockerFixture) -> Clock:
+    clock = Clock()
+    mocker.patch("zhenxun.utils.limiters.time", clock)
+    return clock
+
+
+def test_freq_limiter_expiry_and_sweep(clock: Clock):
+    from zhenxun.utils.limiters import SWEEP_INTERVAL, FreqLimiter
+
+    limiter = FreqLimiter(10)
+    assert limiter.check("a")
+    assert len(limiter) == 0
+
+    limiter.start_cd("a")
+    limiter.start_cd("b", 100)
+    assert not limiter.check("a")
+    assert limiter.left_time("a") == 10
+    clock.now += 10
+    assert limiter.check("a")
+    assert not limiter.check("b")
+
+    # 过期状态在写入时按间隔清理
+    clock.now += SWEEP_INTERVAL
+    limiter.start_cd("c")
+    assert set(limiter._data) == {"b", "c"}
+
+
+def test_key_table_keeps_active_keys(clock: Clock):
+    from zhenxun.utils.limiters import FreqLimiter
+
+    limiter = FreqLimiter(10, max_keys=3)
+    limiter.start_cd("a", 100)
+    limiter.start_cd("b", 5)
+    limiter.start_cd("c", 50)
+    # 已满时优先淘汰最接近失效的键
+    limiter.start_cd("d")
+    assert set(limiter._data) == {"a", "c", "d"}
+    assert not limiter.check("a")
+
+    # 已过期的键先被清理，不影响仍在冷却中的键
+    clock.now += 20
+    limiter.start_cd("e")
+    assert set(limiter._data) == {"a", "c", "e"}
+    limiter.start_cd("f")
+    assert set(limiter._data) == {"a", "c", "f"}
+    assert not limiter.check("c")
+
+
+def test_key_table_evicts_least_used(clock: Clock):
+    from zhenxun.utils.limiters import CountLimiter, UserBlockLimiter
+
+    limiter = CountLimiter(2, max_keys=3)
+    for key in ("a", "b", "c"):
+        limiter.increase(key)
+    limiter.increase("a")
+    limiter.increase("d")
+    assert list(limiter.count) == ["c", "a", "d"]
+    assert not limiter.check("a")
+    assert limiter.get_num("b") == 0
+
+    block = UserBlockLimiter(max_keys=1)
+    block.set_true("a")
+    block.set_true("b")
+    assert block.check("a")
+    assert not block.check("b")
+    clock.now += block.timeout + 1
+    assert block.check("b")
+    assert len(block) == 0
+
+
+def test_count_limiter_resets_next_day(clock: Clock):
+    from zhenxun.utils.limiters import CountLimiter
+
+    limiter = CountLimiter(1)
+    limiter.increase("a")
+    assert not limiter.check("a")
+    clock.now = limiter._reset_at
+    assert limiter.check("a")
+    assert len(limiter) == 0
+
+
+def test_rate_limiter_burst_and_refill(clock: Clock):
+    from zhenxun.utils.limiters import RateLimiter
+
+    limiter = RateLimiter(3, 6)
+    assert all(limiter.check("a") for _ in range(3))
+    assert not limiter.check("a")
+    assert limiter.left_time("a") == pytest.approx(2)
+    clock.now += 2
+    assert limiter.check("a")
+    assert not limiter.check("a")
+    clock.now += 6
+    assert all(limiter.check("a") for _ in range(3))
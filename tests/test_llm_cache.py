@@ -0,0 +1,182 @@
+import json
+from pathlib import Path
+
+import httpx
+import pytest
+from pytest_mock import MockerFixture
+from respx import MockRouter
+
+API_BASE = "http://llm.test"
+
+
+def completion(text: str, total_tokens: int = 10) -> httpx.Response:
+    return httpx.Response(
+        200,
+        json={
+            "choices": [
+                {"message": {"role": "assistant", "content": text}, "index": 0}
+            ],
+            "usage": {"total_tokens": total_tokens},
+        },
+    )
+
+
+@pytest.fixture
+def cache_config(mocker: MockerFixture) -> dict:
+    from zhenxun.services.llm.cache import LLMResponseCache
+
+    config = {
+        "max_retries_llm": 0,
+        "retry_delay_llm": 0,
+        "response_cache_ttl": 60,
+        "response_cache_size": 2,
+        "semantic_cache_model": None,
+        "semantic_cache_threshold": 0.9,
+    }
+    mocker.patch("zhenxun.services.llm.service.get_ai_config", return_value=config)
+    mocker.patch("zhenxun.services.llm.cache.get_ai_config", return_value=config)
+    LLMResponseCache.clear()
+    for key in LLMResponseCache._metrics:
+        LLMResponseCache._metrics[key] = 0
+    return config
+
+
+@pytest.fixture
+def model(cache_config: dict, tmp_path: Path):
+    from zhenxun.services.llm.config import LLMGenerationConfig
+    from zhenxun.services.llm.core import KeyStatusStore, LLMHttpClient
+    from zhenxun.services.llm.service import LLMModel
+    from zhenxun.services.llm.types import ModelDetail, ProviderConfig
+    from zhenxun.services.llm.types.capabilities import get_model_capabilities
+
+    key_store = KeyStatusStore()
+    key_store._file_path = tmp_path / "key_status.json"
+    detail = ModelDetail(model_name="gpt-4o")
+    return LLMModel(
+        provider_config=ProviderConfig(
+            name="test",
+            api_key=["k1"],
+            api_base=API_BASE,
+            api_type="openai",
+            models=[detail],
+        ),
+        model_detail=detail,
+        key_store=key_store,
+        http_client=LLMHttpClient(),
+        capabilities=get_model_capabilities("gpt-4o"),
+        config_override=LLMGenerationConfig(enable_caching=True),
+    )
+
+
+async def test_exact_cache(model, mocked_api: MockRouter):
+    from zhenxun.services.llm.cache import LLMResponseCache
+    from zhenxun.services.llm.config import LLMGenerationConfig
+    from zhenxun.services.llm.types import LLMMessage
+
+    route = mocked_api.post(f"{API_BASE}/v1/chat/completions").mock(
+        return_value=completion("answer")
+    )
+
+    first = await model.generate_response([LLMMessage.user("hi")])
+    second = await model.generate_response([LLMMessage.user(" hi ")])
+    assert route.call_count == 1
+    assert second.text == first.text == "answer"
+    assert second.cache_info.cache_hit
+
+    second.text = "changed"
+    third = await model.generate_response([LLMMessage.user("hi")])
+    assert third.text == "answer"
+
+    await model.generate_response([LLMMessage.user("hi")], temperature=0.1)
+    await model.generate_response(
+        [LLMMessage.user("hi")], config=LLMGenerationConfig(enable_caching=False)
+    )
+    assert route.call_count == 3
+
+    stats = LLMResponseCache.get_stats()
+    assert stats["hits"] == 2
+    assert stats["bypass"] == 1
+    assert stats["saved_tokens"] == 20
+    assert stats["hit_rate"] == 0.5
+
+
+async def test_cache_is_opt_in(model, mocked_api: MockRouter):
+    from zhenxun.services.llm.cache import LLMResponseCache
+    from zhenxun.services.llm.config import LLMGenerationConfig
+    from zhenxun.services.llm.types import LLMMessage
+
+    route = mocked_api.post(f"{API_BASE}/v1/chat/completions").mock(
+        return_value=completion("answer")
+    )
+    model._generation_config = None
+    # 未启用缓存的采样输出不缓存
+    for _ in range(2):
+        await model.generate_response([LLMMessage.user("hi")], temperature=0.7)
+    assert route.call_count == 2
+    assert not LLMResponseCache.entries
+
+    # temperature为0时输出稳定，默认缓存
+    for _ in range(2):
+        await model.generate_response([LLMMessage.user("hi")], temperature=0)
+    assert route.call_count == 3
+
+    model.temperature = 0
+    assert LLMResponseCache.is_cacheable(None, None, model.temperature)
+    assert not LLMResponseCache.is_cacheable(
+        LLMGenerationConfig(temperature=0, enable_caching=False), None
+    )
+
+
+async def test_cache_eviction_and_expire(model, cache_config, mocked_api: MockRouter):
+    from zhenxun.services.llm.cache import LLMResponseCache
+    from zhenxun.services.llm.types import LLMMessage
+
+    route = mocked_api.post(f"{API_BASE}/v1/chat/completions").mock(
+        return_value=completion("answer")
+    )
+    for prompt in ["a", "b", "c"]:
+        await model.generate_response([LLMMessage.user(prompt)])
+    assert len(LLMResponseCache.entries) == 2
+    assert LLMResponseCache.get_stats()["evictions"] == 1
+
+    await model.generate_response([LLMMessage.user("a")])
+    assert route.call_count == 4
+
+    for entry in LLMResponseCache.entries.values():
+        entry.expire = 0
+    await model.generate_response([LLMMessage.user("c")])
+    assert route.call_count == 5
+
+
+async def test_semantic_cache(
+    model, cache_config, mocker: MockerFixture, mocked_api: MockRouter
+):
+    from zhenxun.services.llm.cache import LLMResponseCache
+    from zhenxun.services.llm.types import LLMMessage
+
+    cache_config["semantic_cache_model"] = "test/embedding"
+    vectors = {"今天天气怎么样": [1.0, 0.0], "今天天气如何": [0.96, 0.28]}
+    vectors["讲个笑话"] = [0.0, 1.0]
+
+    async def embed(text: str):
+        return vectors[text]
+
+    mocker.patch.object(LLMResponseCache, "_embed", side_effect=embed)
+    route = mocked_api.post(f"{API_BASE}/v1/chat/completions").mock(
+        return_value=completion("晴")
+    )
+
+    await model.generate_response([LLMMessage.user("今天天气怎么样")])
+    response = await model.generate_response([LLMMessage.user("今天天气如何")])
+    assert route.call_count == 1
+    assert response.cache_info.cache_hit
+
+    await model.generate_response([LLMMessage.user("讲个笑话")])
+    await model.generate_response(
+        [LLMMessage.system("你是猫娘"), LLMMessage.user("今天天气如何")]
+    )
+    assert route.call_count == 3
+    assert LLMResponseCache.get_stats()["semantic_hits"] == 1
+    assert json.loads(route.calls.last.request.content)["messages"][0]["role"] == (
+        "system"
+    )
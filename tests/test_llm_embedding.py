@@ -0,0 +1,144 @@
+import asyncio
+import json
+from pathlib import Path
+
+import httpx
+import pytest
+from pytest_mock import MockerFixture
+from respx import MockRouter
+
+API_BASE = "http://llm.test"
+
+
+def embeddings(request: httpx.Request) -> httpx.Response:
+    texts = json.loads(request.content)["input"]
+    return httpx.Response(
+        200,
+        json={
+            "data": [
+                {"index": i, "embedding": [float(len(text)), 0.5]}
+                for i, text in enumerate(texts)
+            ]
+        },
+    )
+
+
+@pytest.fixture
+def model(mocker: MockerFixture, tmp_path: Path):
+    from zhenxun.services.llm.core import KeyStatusStore, LLMHttpClient
+    from zhenxun.services.llm.embedding import EmbeddingService
+    from zhenxun.services.llm.service import LLMModel
+    from zhenxun.services.llm.types import ModelDetail, ProviderConfig
+    from zhenxun.services.llm.types.capabilities import get_model_capabilities
+
+    config = {
+        "max_retries_llm": 0,
+        "retry_delay_llm": 0,
+        "embedding_batch_window": 5,
+        "embedding_cache": True,
+    }
+    mocker.patch("zhenxun.services.llm.service.get_ai_config", return_value=config)
+    mocker.patch("zhenxun.services.llm.embedding.get_ai_config", return_value=config)
+    mocker.patch.object(EmbeddingService, "path", tmp_path / "embeddings")
+    EmbeddingService.close()
+    for key in EmbeddingService._metrics:
+        EmbeddingService._metrics[key] = 0
+
+    key_store = KeyStatusStore()
+    key_store._file_path = tmp_path / "key_status.json"
+    detail = ModelDetail(model_name="text-embedding-3-small", is_embedding_model=True)
+    yield LLMModel(
+        provider_config=ProviderConfig(
+            name="test",
+            api_key=["k1"],
+            api_base=API_BASE,
+            api_type="openai",
+            models=[detail],
+        ),
+        model_detail=detail,
+        key_store=key_store,
+        http_client=LLMHttpClient(),
+        capabilities=get_model_capabilities("text-embedding-3-small"),
+    )
+    EmbeddingService.close()
+
+
+async def test_coalesce_and_cache(model, mocked_api: MockRouter):
+    from zhenxun.services.llm.embedding import EmbeddingService
+
+    route = mocked_api.post(f"{API_BASE}/v1/embeddings").mock(side_effect=embeddings)
+    texts = ["a", "bb", "a", "ccc"]
+    results = await asyncio.gather(*(model.generate_embeddings([t]) for t in texts))
+
+    assert route.call_count == 1
+    assert json.loads(route.calls.last.request.content)["input"] == ["a", "bb", "ccc"]
+    assert [r[0][0] for r in results] == [1.0, 2.0, 1.0, 3.0]
+
+    assert await model.generate_embeddings(["ccc", "a"]) == [[3.0, 0.5], [1.0, 0.5]]
+    assert route.call_count == 1
+
+    EmbeddingService.close()
+    assert await model.generate_embeddings(["bb"]) == [[2.0, 0.5]]
+    assert route.call_count == 1
+
+    stats = EmbeddingService.get_stats()
+    assert stats["coalesced"] == 1
+    assert stats["cache_hits"] == 3
+    assert stats["saved_requests"] == 5
+    assert stats["cached_vectors"] == 3
+
+
+async def test_batch_size_and_failure(
+    model, mocker: MockerFixture, mocked_api: MockRouter
+):
+    from zhenxun.services.llm.adapters.openai import OpenAIAdapter
+    from zhenxun.services.llm.embedding import EmbeddingService
+    from zhenxun.services.llm.types import LLMException
+
+    mocker.patch.object(OpenAIAdapter, "get_max_embedding_batch_size", return_value=2)
+    route = mocked_api.post(f"{API_BASE}/v1/embeddings").mock(side_effect=embeddings)
+    vectors = await model.generate_embeddings(["a", "bb", "ccc", "dddd", "eeeee"])
+    assert [v[0] for v in vectors] == [1.0, 2.0, 3.0, 4.0, 5.0]
+    assert route.call_count == 3
+
+    route.mock(side_effect=None, return_value=httpx.Response(500, text="error"))
+    calls = [model.generate_embeddings(["x"]), model.generate_embeddings(["yy"])]
+    results = await asyncio.gather(*calls, return_exceptions=True)
+    assert all(isinstance(r, LLMException) for r in results)
+    assert not EmbeddingService._inflight
+    assert EmbeddingService.get_stats()["cached_vectors"] == 5
+
+
+async def test_batch_holds_job_slot(
+    model, mocker: MockerFixture, mocked_api: MockRouter
+):
+    from zhenxun.services.llm.scheduler import LLMJobScheduler, PriorityStats
+    from zhenxun.services.llm.types import LLMPriority
+
+    mocker.patch.object(LLMJobScheduler, "_get_max_running", return_value=1)
+    mocker.patch.object(LLMJobScheduler, "_running", 0)
+    mocker.patch.object(LLMJobScheduler, "_queue", [])
+    mocker.patch.object(LLMJobScheduler, "_finish_tags", {})
+    mocker.patch.object(
+        LLMJobScheduler, "_stats", {p: PriorityStats() for p in LLMPriority}
+    )
+    running = []
+
+    def request(request: httpx.Request) -> httpx.Response:
+        running.append(LLMJobScheduler._running)
+        return embeddings(request)
+
+    route = mocked_api.post(f"{API_BASE}/v1/embeddings").mock(side_effect=request)
+    async with LLMJobScheduler.slot(LLMPriority.BATCH):
+        task = asyncio.gather(
+            model.generate_embeddings(["a"], priority=LLMPriority.BATCH),
+            model.generate_embeddings(["bb"], priority=LLMPriority.BACKGROUND),
+        )
+        await asyncio.sleep(0.05)
+        # 合并等待期间不占用名额，批次按其中最高的优先级排队
+        assert route.call_count == 0
+        assert LLMJobScheduler._stats[LLMPriority.BACKGROUND].queued == 1
+    assert [v[0][0] for v in await task] == [1.0, 2.0]
+    assert route.call_count == 1
+    assert running == [1]
+    assert LLMJobScheduler._running == 0
@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+from pytest_mock import MockerFixture
+
+
+@pytest.fixture
+def scheduler(mocker: MockerFixture):
+    from zhenxun.services.llm.scheduler import LLMJobScheduler, PriorityStats
+    from zhenxun.services.llm.types import LLMPriority
+
+    mocker.patch.object(LLMJobScheduler, "_get_max_running", return_value=1)
+    mocker.patch.object(LLMJobScheduler, "_running", 0)
+    mocker.patch.object(LLMJobScheduler, "_queue", [])
+    mocker.patch.object(LLMJobScheduler, "_virtual_time", 0.0)
+    mocker.patch.object(LLMJobScheduler, "_finish_tags", {})
+    mocker.patch.object(
+        LLMJobScheduler, "_stats", {p: PriorityStats() for p in LLMPriority}
+    )
+    return LLMJobScheduler
+
+
+async def test_weighted_fair_order(scheduler):
+    from zhenxun.services.llm.types import LLMPriority
+
+    order = []
+    release = asyncio.Event()
+
+    async def job(name: str):
+        order.append(name)
+
+    blocker = asyncio.create_task(scheduler.run(release.wait(), owner="x"))
+    await asyncio.sleep(0)
+    jobs = [
+        ("a0", LLMPriority.INTERACTIVE, "group:a"),
+        ("a1", LLMPriority.INTERACTIVE, "group:a"),
+        ("bulk0", LLMPriority.BATCH, "bulk"),
+        ("bulk1", LLMPriority.BATCH, "bulk"),
+        ("bulk2", LLMPriority.BATCH, "bulk"),
+        ("b0", LLMPriority.INTERACTIVE, "group:b"),
+        ("b1", LLMPriority.INTERACTIVE, "group:b"),
+    ]
+    tasks = [
+        asyncio.create_task(scheduler.run(job(name), priority, owner))
+        for name, priority, owner in jobs
+    ]
+    await asyncio.sleep(0)
+    assert scheduler.get_stats()["queued"] == 7
+
+    release.set()
+    await asyncio.gather(blocker, *tasks)
+    assert order == ["a0", "bulk0", "b0", "a1", "b1", "bulk1", "bulk2"]
+    stats = scheduler.get_stats()
+    assert stats["running"] == 0
+    assert stats["priorities"]["batch"]["completed"] == 3
+
+
+async def test_cancel_and_deadline(scheduler):
+    from zhenxun.services.llm.types import LLMErrorCode, LLMException
+
+    running = asyncio.create_task(scheduler.run(asyncio.sleep(10)))
+    queued = asyncio.create_task(scheduler.run(asyncio.sleep(0)))
+    await asyncio.sleep(0)
+    queued.cancel()
+    await asyncio.gather(queued, return_exceptions=True)
+    assert scheduler.get_stats()["queued"] == 0
+
+    with pytest.raises(LLMException) as exc_info:
+        await scheduler.run(asyncio.sleep(0), timeout=0.01)
+    assert exc_info.value.code == LLMErrorCode.API_TIMEOUT
+
+    running.cancel()
+    await asyncio.gather(running, return_exceptions=True)
+    assert scheduler.get_stats()["running"] == 0
+
+    with pytest.raises(LLMException) as exc_info:
+        await scheduler.run(asyncio.sleep(10), timeout=0.01)
+    assert exc_info.value.code == LLMErrorCode.API_TIMEOUT
+    assert await scheduler.run(asyncio.sleep(0, "ok")) == "ok"
+
+    stats = scheduler.get_stats()["priorities"]["interactive"]
+    assert stats["cancelled"] == 1
+    assert stats["expired"] == 2
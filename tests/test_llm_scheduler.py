@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+from pytest_mock import MockerFixture
+
+
+@pytest.fixture
+def scheduler(mocker: MockerFixture):
+    from zhenxun.services.llm.core import ProviderScheduler
+
+    mocker.patch.object(ProviderScheduler, "_get_max_concurrency", return_value=4)
+    return ProviderScheduler()
+
+
+async def test_route_by_latency_and_capacity(scheduler):
+    keys = ["a", "b"]
+    slot_a = await scheduler.acquire("p", keys)
+    slot_b = await scheduler.acquire("p", keys)
+    assert (slot_a.api_key, slot_b.api_key) == ("a", "b")
+    scheduler.release(slot_a, 500)
+    scheduler.release(slot_b, 200)
+
+    slots = [await scheduler.acquire("p", keys) for _ in range(4)]
+    assert [s.api_key for s in slots] == ["b", "b", "a", "b"]
+    for s in slots:
+        scheduler.release(s)
+
+    excluded = await scheduler.acquire("p", keys, exclude_keys={"b"})
+    assert excluded.api_key == "a"
+    scheduler.release(excluded)
+    assert scheduler.get_stats("p")["in_flight"] == 0
+
+
+async def test_aimd_window(scheduler):
+    from zhenxun.services.llm.core import ConcurrencyWindow
+
+    window = ConcurrencyWindow(4)
+    for _ in range(12):
+        window.on_success(100, 6, 0.3)
+    assert window.limit == pytest.approx(6, abs=0.2)
+    assert window.on_congestion(10, 1)
+    assert not window.on_congestion(10.5, 1)
+    assert window.limit == pytest.approx(3, abs=0.1)
+    window.limit = 1.5
+    window.on_congestion(20, 1)
+    assert window.limit == 1
+
+    slot = await scheduler.acquire("p", ["k"])
+    scheduler.release(slot, congested=True)
+    assert scheduler.get_stats("p")["limit"] == 2
+
+
+async def test_queue_and_deadline(scheduler):
+    from zhenxun.services.llm.types import LLMErrorCode, LLMException
+
+    slots = [await scheduler.acquire("p", ["k"]) for _ in range(4)]
+    waiter = asyncio.create_task(scheduler.acquire("p", ["k"], timeout=5))
+    cancelled = asyncio.create_task(scheduler.acquire("p", ["k"], timeout=5))
+    await asyncio.sleep(0)
+    assert scheduler.get_stats("p")["queue_depth"] == 2
+
+    cancelled.cancel()
+    await asyncio.gather(cancelled, return_exceptions=True)
+    assert scheduler.get_stats("p")["queue_depth"] == 1
+
+    with pytest.raises(LLMException) as exc_info:
+        await scheduler.acquire("p", ["k"], timeout=0.01)
+    assert exc_info.value.code == LLMErrorCode.API_TIMEOUT
+
+    scheduler.release(slots[0], 100)
+    slot = await asyncio.wait_for(waiter, 1)
+    assert slot.api_key == "k"
+    stats = scheduler.get_stats("p")
+    assert stats["queue_depth"] == 0
+    assert stats["timeouts"] == 1
+    assert stats["max_queue_depth"] == 2
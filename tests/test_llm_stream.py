@@ -0,0 +1,188 @@
+from collections.abc import AsyncIterator
+import json
+from pathlib import Path
+
+import httpx
+import pytest
+from pytest_mock import MockerFixture
+from respx import MockRouter
+
+API_BASE = "http://llm.test"
+
+
+def sse(*events: dict | str) -> bytes:
+    return "".join(
+        f"data: {e if isinstance(e, str) else json.dumps(e)}\n\n" for e in events
+    ).encode()
+
+
+def openai_delta(**delta) -> dict:
+    return {"choices": [{"delta": delta, "finish_reason": None}]}
+
+
+@pytest.fixture
+def build_model(mocker: MockerFixture, tmp_path: Path):
+    from zhenxun.services.llm.core import KeyStatusStore, LLMHttpClient, stream_stats
+    from zhenxun.services.llm.service import LLMModel
+    from zhenxun.services.llm.types import ModelDetail, ProviderConfig
+    from zhenxun.services.llm.types.capabilities import get_model_capabilities
+
+    mocker.patch(
+        "zhenxun.services.llm.service.get_ai_config",
+        return_value={"max_retries_llm": 1, "retry_delay_llm": 0},
+    )
+    stream_stats.clear()
+
+    def _build(api_type: str, model_name: str, api_key: list[str] | None = None):
+        key_store = KeyStatusStore()
+        key_store._file_path = tmp_path / "key_status.json"
+        detail = ModelDetail(model_name=model_name)
+        return LLMModel(
+            provider_config=ProviderConfig(
+                name="test",
+                api_key=api_key or ["k1"],
+                api_base=API_BASE,
+                api_type=api_type,
+                models=[detail],
+            ),
+            model_detail=detail,
+            key_store=key_store,
+            http_client=LLMHttpClient(),
+            capabilities=get_model_capabilities(model_name),
+        )
+
+    return _build
+
+
+async def collect(stream: AsyncIterator) -> list:
+    return [chunk async for chunk in stream]
+
+
+async def test_iter_sse_events():
+    from zhenxun.services.llm.adapters.base import iter_sse_events
+
+    async def lines():
+        for line in [": ping", "", "event: x", 'data: {"a":', "data: 1}", ""]:
+            yield line
+        yield 'data: {"b": 2}\r'
+        yield ""
+        yield "data: [DONE]"
+        yield ""
+        yield 'data: {"c": 3}'
+
+    assert await collect(iter_sse_events(lines())) == [{"a": 1}, {"b": 2}]
+
+
+async def test_openai_stream(build_model, mocked_api: MockRouter):
+    from zhenxun.services.llm.core import stream_stats
+    from zhenxun.services.llm.types import LLMMessage, LLMStreamCollector
+
+    route = mocked_api.post(f"{API_BASE}/v1/chat/completions").mock(
+        return_value=httpx.Response(
+            200,
+            content=sse(
+                openai_delta(content="你好"),
+                openai_delta(content="，世界"),
+                openai_delta(
+                    tool_calls=[
+                        {
+                            "index": 0,
+                            "id": "call_1",
+                            "type": "function",
+                            "function": {"name": "get", "arguments": '{"a"'},
+                        }
+                    ]
+                ),
+                openai_delta(
+                    tool_calls=[{"index": 0, "function": {"arguments": ":1}"}}]
+                ),
+                {"choices": [], "usage": {"total_tokens": 5}},
+                "[DONE]",
+            ),
+        )
+    )
+    model = build_model("openai", "gpt-4o")
+    collector = LLMStreamCollector()
+    async for chunk in model.generate_stream([LLMMessage.user("hi")]):
+        collector.add(chunk)
+
+    body = json.loads(route.calls.last.request.content)
+    assert body["stream"] is True
+    response = collector.to_response()
+    assert response.text == "你好，世界"
+    assert response.usage_info == {"total_tokens": 5}
+    assert response.tool_calls[0].id == "call_1"
+    assert response.tool_calls[0].function.arguments == '{"a":1}'
+    assert stream_stats["test"].count == 1
+
+
+async def test_gemini_stream(build_model, mocked_api: MockRouter):
+    from zhenxun.services.llm.types import LLMMessage
+
+    mocked_api.post(
+        f"{API_BASE}/v1beta/models/gemini-2.0-flash:streamGenerateContent",
+        params={"alt": "sse"},
+    ).mock(
+        return_value=httpx.Response(
+            200,
+            content=sse(
+                {"candidates": [{"content": {"parts": [{"text": "a"}]}}]},
+                {
+                    "candidates": [
+                        {
+                            "content": {
+                                "parts": [{"functionCall": {"name": "f", "args": {}}}]
+                            },
+                            "finishReason": "STOP",
+                        }
+                    ],
+                    "usageMetadata": {"totalTokenCount": 3},
+                },
+            ),
+        )
+    )
+    model = build_model("gemini", "gemini-2.0-flash")
+    chunks = await collect(model.generate_stream([LLMMessage.user("hi")]))
+    assert [c.text for c in chunks] == ["a", ""]
+    assert chunks[1].tool_calls[0].name == "f"
+    assert chunks[1].finish_reason == "STOP"
+
+
+async def test_stream_retry_before_first_chunk(build_model, mocked_api: MockRouter):
+    from zhenxun.services.llm.types import LLMMessage
+
+    route = mocked_api.post(f"{API_BASE}/v1/chat/completions")
+    route.side_effect = [
+        httpx.Response(429, text="rate limited"),
+        httpx.Response(200, content=sse(openai_delta(content="ok"), "[DONE]")),
+    ]
+    model = build_model("openai", "gpt-4o", ["k1", "k2"])
+    chunks = await collect(model.generate_stream([LLMMessage.user("hi")]))
+    assert [c.text for c in chunks] == ["ok"]
+    keys = [call.request.headers["Authorization"] for call in route.calls]
+    assert keys[0] != keys[1]
+
+
+async def test_iter_sentences():
+    from zhenxun.services.llm.types import LLMStreamChunk
+    from zhenxun.services.llm.utils import iter_sentences
+
+    async def stream():
+        for text in ["第一句话。第二", "句话还没", "说完！", "x" * 12, "尾巴"]:
+            yield LLMStreamChunk(text=text)
+
+    assert await collect(iter_sentences(stream(), min_length=5, max_length=10)) == [
+        "第一句话。",
+        "第二句话还没说完！",
+        "x" * 10,
+        "xx尾巴",
+    ]
+
+    async def long_stream():
+        yield LLMStreamChunk(text="一二三四五。六七八九十。十一十二十三十四。")
+        yield LLMStreamChunk(text="y" * 25)
+
+    # 一次收到多句时按最大长度内的最后一个句末切分
+    assert await collect(
+        iter_sentences(long_stream(), min_length=5, max_length=15)
+    ) == ["一二三四五。六七八九十。", "十一十二十三十四。", "y" * 15, "y" * 10]
@@ -0,0 +1,52 @@
+from datetime import date
+from pathlib import Path
+
+from pytest_mock import MockerFixture
+
+
+def test_disabled_level_skips_formatting(mocker: MockerFixture):
+    from loguru import logger as logger_
+
+    from zhenxun.services.log import logger
+
+    mocker.patch.object(logger, "level_no", logger_.level("INFO").no)
+    messages: list[str] = []
+    sink = logger_.add(messages.append, level="TRACE", format="{message}")
+    build = mocker.Mock(return_value="lazy")
+    try:
+        assert not logger.is_enabled("debug")
+        assert logger.is_enabled("warning")
+        logger.debug(build, "TEST", session=1, e=ValueError("x"))
+        logger.trace("skipped")
+        build.assert_not_called()
+
+        logger.info(build, "TEST", session=1, group_id=2)
+        logger.warning("warned", e=ValueError("x"))
+    finally:
+        logger_.remove(sink)
+    build.assert_called_once()
+    assert len(messages) == 2
+    assert "lazy" in messages[0]
+    assert "CMD[TEST]" in messages[0]
+    assert "ValueError: x" in messages[1]
+
+
+def test_writer_rotates_and_cleans(mocker: MockerFixture, tmp_path: Path):
+    from zhenxun.services.log import LogWriter
+
+    mocker.patch("zhenxun.services.log.LOG_PATH", tmp_path)
+    old = tmp_path / "test_2000-01-01.log"
+    old.write_text("old")
+    other = tmp_path / "test_other.log"
+    other.write_text("other")
+
+    writer = LogWriter("test_")
+    writer.write("a\n")
+    writer.write("b\n")
+    writer.stop()
+    assert not writer._thread.is_alive()
+
+    today = tmp_path / f"test_{date.today():%Y-%m-%d}.log"
+    assert today.read_text(encoding="utf8") == "a\nb\n"
+    assert not old.exists()
+    assert other.exists()
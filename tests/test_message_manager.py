@@ -0,0 +1,30 @@
+from pytest_mock import MockerFixture
+
+
+def test_message_ring_overwrites_oldest():
+    from zhenxun.utils.manager.message_manager import MessageRing
+
+    ring = MessageRing(3)
+    for msg_id in ("1", "2", "2", "3"):
+        ring.add(msg_id)
+    assert ring.to_list() == ["1", "2", "3"]
+
+    ring.add("4")
+    assert ring.to_list() == ["2", "3", "4"]
+    assert "1" not in ring
+    assert "4" in ring
+    assert len(ring) == 3
+
+
+def test_message_manager_keeps_per_user_ids(mocker: MockerFixture):
+    from zhenxun.utils.manager.message_manager import MessageManager
+
+    mocker.patch.object(MessageManager, "data", {})
+    mocker.patch.object(MessageManager, "max_size", 2)
+    for msg_id in ("1", "2", "3"):
+        MessageManager.add("u1", msg_id)
+    MessageManager.add("u2", "1")
+    assert MessageManager.get("u1") == ["2", "3"]
+    assert not MessageManager.check("u1", "1")
+    assert MessageManager.check("u2", "1")
+    assert MessageManager.get("u3") == []
@@ -0,0 +1,75 @@
+import asyncio
+from pathlib import Path
+
+import httpx
+import pytest
+from pytest_mock import MockerFixture
+from respx import MockRouter
+
+FAST = "http://fast.test/"
+SLOW = "http://slow.test/"
+
+
+@pytest.fixture
+def mirror_manager(mocker: MockerFixture, tmp_path: Path):
+    from zhenxun.utils.manager.mirror_manager import MirrorManager
+
+    mocker.patch.object(MirrorManager, "file", tmp_path / "mirror_health.json")
+    mocker.patch.object(MirrorManager, "stats", {})
+    mocker.patch.object(MirrorManager, "probe_urls", {})
+    mocker.patch.object(MirrorManager, "_loaded", True)
+    mocker.patch.object(MirrorManager, "_probing", None)
+    return MirrorManager
+
+
+async def test_rank_by_outcomes(mirror_manager, mocked_api: MockRouter):
+    mocked_api.head(FAST).mock(return_value=httpx.Response(200))
+    mocked_api.head(SLOW).mock(return_value=httpx.Response(200))
+    mirror_manager.register([SLOW, FAST])
+    await mirror_manager._probing
+
+    mirror_manager.record(f"{SLOW}file", 800)
+    mirror_manager.record(f"{FAST}file", 50)
+    assert mirror_manager.rank([f"{SLOW}a", f"{FAST}a"]) == [f"{FAST}a", f"{SLOW}a"]
+
+    # 连续失败的站点排到后面
+    for _ in range(5):
+        mirror_manager.record(f"{FAST}file", None)
+    assert mirror_manager.rank([FAST, SLOW]) == [SLOW, FAST]
+
+    # 未注册的站点不记录
+    mirror_manager.record("http://other.test/", 1)
+    assert "other.test" not in mirror_manager.stats
+
+
+async def test_rank_without_probe(mirror_manager, mocked_api: MockRouter):
+    from zhenxun.utils.github_utils.func import get_fastest_raw_formats
+
+    route = mocked_api.route(method="HEAD").mock(return_value=httpx.Response(200))
+    formats = await get_fastest_raw_formats()
+    await mirror_manager._probing
+    assert route.call_count == len(formats)
+
+    # 之后的调用只读取健康度
+    await get_fastest_raw_formats()
+    await asyncio.sleep(0)
+    assert route.call_count == len(formats)
+
+
+def test_persist(mirror_manager):
+    mirror_manager.probe_urls["fast.test"] = FAST
+    mirror_manager.record(FAST, 100)
+    mirror_manager.save()
+
+    mirror_manager.stats.clear()
+    mirror_manager._load()
+    assert mirror_manager.stats["fast.test"].latency == 100
+
+
+async def test_probe_client_error(mirror_manager, mocked_api: MockRouter):
+    mocked_api.head(FAST).mock(return_value=httpx.Response(200))
+    mocked_api.head(SLOW).mock(return_value=httpx.Response(404))
+    mirror_manager.probe_urls.update({"fast.test": FAST, "slow.test": SLOW})
+    await mirror_manager.probe([FAST, SLOW])
+    assert mirror_manager.stats["fast.test"].failure == 0
+    assert mirror_manager.stats["slow.test"].failure == 1
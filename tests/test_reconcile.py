@@ -0,0 +1,57 @@
+from collections.abc import Callable
+
+MODELS = ("zhenxun.models.group_member_info",)
+
+
+def test_reconcile_diff():
+    from zhenxun.models.group_member_info import GroupInfoUser
+    from zhenxun.utils.reconcile import reconcile
+
+    existing = [
+        GroupInfoUser(id=1, user_id="u1", group_id="g", user_name="a"),
+        GroupInfoUser(id=2, user_id="u2", group_id="g", user_name="b"),
+        GroupInfoUser(id=3, user_id="u2", group_id="g", user_name="b"),
+        GroupInfoUser(id=4, user_id="u3", group_id="g", user_name="c"),
+    ]
+    incoming = [
+        GroupInfoUser(user_id="u1", group_id="g", user_name="a"),
+        GroupInfoUser(user_id="u2", group_id="g", user_name="bb"),
+        GroupInfoUser(user_id="u4", group_id="g", user_name="d"),
+        GroupInfoUser(user_id="u4", group_id="g", user_name="dd"),
+    ]
+    result = reconcile(
+        existing, incoming, lambda u: u.user_id, ["user_name"], delete_missing=True
+    )
+    assert [u.user_name for u in result.create] == ["d"]
+    assert list(result.update) == [("user_name",)]
+    assert [u.id for u in result.update[("user_name",)]] == [2]
+    assert existing[1].user_name == "bb"
+    assert sorted(u.id for u in result.delete) == [3, 4]
+    assert result.unchanged == 1
+
+    result = reconcile(existing, incoming, lambda u: u.user_id, ["user_name"])
+    assert [u.id for u in result.delete] == [3]
+
+
+async def test_apply_reconcile(memory_db: Callable):
+    from zhenxun.models.group_member_info import GroupInfoUser
+    from zhenxun.utils.reconcile import apply_reconcile, reconcile
+
+    await memory_db(*MODELS)
+    for uid in ("u1", "u2", "u3"):
+        await GroupInfoUser.create(user_id=uid, group_id="g", user_name=uid)
+    result = reconcile(
+        await GroupInfoUser.filter(group_id="g").all(),
+        [
+            GroupInfoUser(user_id="u1", group_id="g", user_name="u1"),
+            GroupInfoUser(user_id="u2", group_id="g", user_name="new"),
+            GroupInfoUser(user_id="u4", group_id="g", user_name="u4"),
+        ],
+        lambda u: u.user_id,
+        ["user_name"],
+        delete_missing=True,
+    )
+    await apply_reconcile(GroupInfoUser, result, 2)
+    assert dict(
+        await GroupInfoUser.filter(group_id="g").values_list("user_id", "user_name")
+    ) == {"u1": "u1", "u2": "new", "u4": "u4"}
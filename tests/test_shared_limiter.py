@@ -0,0 +1,128 @@
+import asyncio
+from datetime import datetime, timedelta
+import time
+from typing import Any
+
+import pytest
+from pytest_mock import MockerFixture
+
+
+class FakeRedis:
+    """按 HIT_SCRIPT 的参数布局在内存中执行限制脚本"""
+
+    def __init__(self):
+        self.now = int(time.time() * 1000)
+        self.data: dict[str, tuple[int, int]] = {}
+        """键: (值, 过期时间戳毫秒)"""
+        self.error: Exception | None = None
+
+    def _pttl(self, key: str) -> int:
+        if key in self.data and self.data[key][1] <= self.now:
+            del self.data[key]
+        return self.data[key][1] - self.now if key in self.data else -2
+
+    def register_script(self, script: str):
+        return self._run
+
+    async def _run(self, keys: list[str], args: list[Any]) -> list[int]:
+        if self.error:
+            raise self.error
+        for i, key in enumerate(keys):
+            kind, p1, p2 = args[i * 3 : i * 3 + 3]
+            ttl = self._pttl(key)
+            if kind == "cd":
+                if ttl > 0:
+                    return [i + 1, ttl]
+                self.data[key] = (1, self.now + p1)
+            elif kind == "block":
+                if ttl > 0:
+                    return [i + 1, ttl]
+                self.data[key] = (1, self.now + p1)
+            elif kind == "count":
+                num = self.data[key][0] if ttl > 0 else 0
+                if num >= p1:
+                    return [i + 1, ttl]
+                self.data[key] = (num + 1, p2)
+        return [0, 0]
+
+    async def delete(self, key: str):
+        self.data.pop(key, None)
+
+
+@pytest.fixture
+def redis(mocker: MockerFixture) -> FakeRedis:
+    from zhenxun.services.cache import CacheRoot, cache_config
+    from zhenxun.services.cache.config import CacheMode
+    from zhenxun.services.cache.shared_limiter import SharedLimiter
+
+    client = FakeRedis()
+    mocker.patch.object(cache_config, "redis_limiter", True)
+    mocker.patch.object(cache_config, "cache_mode", CacheMode.REDIS)
+    mocker.patch.object(cache_config, "redis_host", "127.0.0.1")
+    mocker.patch.object(CacheRoot, "_cache_backend", mocker.Mock(client=client))
+    mocker.patch.object(SharedLimiter, "_script", None)
+    mocker.patch.object(SharedLimiter, "_retry_at", 0)
+    return client
+
+
+async def test_hit_checks_limits_in_order(redis: FakeRedis):
+    from zhenxun.services.cache.shared_limiter import SharedLimiter
+
+    cd = SharedLimiter.cd("plugin", "u1", 10)
+    block = SharedLimiter.block("plugin", "u1", 30)
+    assert await SharedLimiter.hit([cd, block]) == (-1, 0)
+
+    # 第一个限制触发时不再记录后续限制
+    redis.now += 4000
+    assert await SharedLimiter.hit([cd, block]) == (0, 6)
+    redis.now += 6000
+    assert await SharedLimiter.hit([cd, block]) == (1, 20)
+    assert redis.data[cd[0]][1] == redis.now + 10000
+
+    SharedLimiter.release("plugin", "u1")
+    await asyncio.gather(*SharedLimiter._tasks)
+    assert block[0] not in redis.data
+    redis.now += 10000
+    assert await SharedLimiter.hit([cd, block]) == (-1, 0)
+
+
+async def test_count_expires_next_day(redis: FakeRedis):
+    from zhenxun.services.cache.shared_limiter import SharedLimiter
+
+    count = SharedLimiter.count("plugin", "g1", 2)
+    tomorrow = datetime.combine(
+        datetime.now().date() + timedelta(days=1), datetime.min.time()
+    )
+    assert count[3] == int(tomorrow.timestamp() * 1000)
+    assert f"{datetime.now():%Y%m%d}" in count[0]
+
+    assert await SharedLimiter.hit([count]) == (-1, 0)
+    assert await SharedLimiter.hit([count]) == (-1, 0)
+    index, left = await SharedLimiter.hit([count])
+    assert index == 0
+    assert left == pytest.approx((count[3] - redis.now) / 1000)
+
+    redis.now = count[3]
+    assert await SharedLimiter.hit([count]) == (-1, 0)
+
+
+async def test_fallback_when_unavailable(redis: FakeRedis, mocker: MockerFixture):
+    from zhenxun.services.cache import cache_config
+    from zhenxun.services.cache.config import CacheMode
+    from zhenxun.services.cache.shared_limiter import SharedLimiter
+
+    cd = SharedLimiter.cd("plugin", "u1", 10)
+    redis.error = ConnectionError("down")
+    assert await SharedLimiter.hit([cd]) is None
+    assert SharedLimiter._retry_at > time.monotonic()
+
+    # 失败后在重试间隔内直接使用进程内限制器
+    redis.error = None
+    assert await SharedLimiter.hit([cd]) is None
+    assert not SharedLimiter.release("plugin", "u1")
+    assert not redis.data
+
+    SharedLimiter._retry_at = 0
+    assert await SharedLimiter.hit([cd]) == (-1, 0)
+    mocker.patch.object(cache_config, "cache_mode", CacheMode.MEMORY)
+    assert await SharedLimiter.hit([cd]) is None
@@ -0,0 +1,140 @@
+from collections.abc import Callable
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+
+@pytest.fixture
+async def rollup(memory_db: Callable):
+    from zhenxun.models.statistics_rollup import StatisticsRollup
+
+    await memory_db("zhenxun.models.statistics_rollup")
+    return StatisticsRollup
+
+
+async def test_add_rows_same_hour(rollup):
+    now = datetime(2024, 5, 1, 10, 15)
+    rows = [
+        {"create_time": now, "bot_id": "b", "group_id": "g", "user_id": "u1"},
+        {"create_time": now, "bot_id": "b", "group_id": "g", "user_id": "u2"},
+    ]
+    await rollup.add_rows(rollup.CHAT, rows)
+    await rollup.add_rows(rollup.CHAT, rows[:1])
+    await rollup.add_rows(
+        rollup.CHAT,
+        [{"create_time": now + timedelta(minutes=30), "group_id": "g", "user_id": "u1"}]
+        + rows[:1],
+    )
+
+    hours = await rollup.filter(period=rollup.HOUR).order_by("user_id", "bot_id")
+    assert [(r.bot_id, r.user_id, r.num) for r in hours] == [
+        ("", "u1", 1),
+        ("b", "u1", 3),
+        ("b", "u2", 1),
+    ]
+    assert await rollup.total(rollup.CHAT) == 5
+    assert await rollup.total(rollup.CHAT, user_id="u1") == 4
+
+
+async def test_range_query_matches_raw_counts(rollup):
+    base = datetime(2024, 5, 1)
+    times = [base + timedelta(hours=h, minutes=20) for h in range(0, 72, 5)]
+    await rollup.add_rows(
+        rollup.CALL,
+        [{"create_time": t, "user_id": "u", "plugin_name": "p"} for t in times],
+    )
+
+    def expected(start, end):
+        return sum(
+            (start is None or t >= start) and (end is None or t < end) for t in times
+        )
+
+    ranges = [
+        (None, None),
+        (base + timedelta(hours=3), None),
+        (None, base + timedelta(days=2, hours=7)),
+        (base + timedelta(hours=10), base + timedelta(hours=20)),
+        (base + timedelta(hours=22), base + timedelta(days=2, hours=1)),
+        (base + timedelta(days=1), base + timedelta(days=2)),
+    ]
+    for start, end in ranges:
+        assert await rollup.total(rollup.CALL, start, end) == expected(start, end)
+
+    # 整天部分只读取天汇总
+    query = rollup.range_query(base + timedelta(hours=22), base + timedelta(days=3))
+    rows = await rollup.filter(query, kind=rollup.CALL).values_list("period", "bucket")
+    assert {period for period, bucket in rows if bucket.day == 2} == {rollup.DAY}
+    assert await rollup.top(
+        rollup.CALL, "plugin_name", base, base + timedelta(days=1)
+    ) == [("p", expected(base, base + timedelta(days=1)))]
+
+
+async def test_init_backfills_automatically(
+    memory_db: Callable, mocker: MockerFixture, tmp_path: Path
+):
+    from zhenxun.models.chat_history import ChatHistory
+    from zhenxun.models.statistics_rollup import StatisticsRollup
+    from zhenxun.utils.manager.rollup_manager import RollupManager
+
+    await memory_db(
+        "zhenxun.models.statistics_rollup",
+        "zhenxun.models.chat_history",
+        "zhenxun.models.statistics",
+    )
+    mocker.patch.object(RollupManager, "file", tmp_path / "rollup.json")
+    mocker.patch.object(RollupManager, "_state", {})
+    mocker.patch.object(RollupManager, "_backfill_task", None)
+    mocker.patch.object(StatisticsRollup, "ready", False)
+
+    # 全新安装没有历史数据，直接使用汇总
+    await RollupManager.init()
+    assert StatisticsRollup.ready
+    assert RollupManager._backfill_task is None
+
+    # 已有历史数据时启动后自动在后台补全
+    RollupManager.file.unlink()
+    StatisticsRollup.ready = False
+    await ChatHistory.create(user_id="u", group_id="g", text="t")
+    await RollupManager.init()
+    assert not StatisticsRollup.ready
+    assert RollupManager._backfill_task
+    await RollupManager._backfill_task
+    assert StatisticsRollup.ready
+    assert await StatisticsRollup.total(StatisticsRollup.CHAT) == 1
+
+
+async def test_rollup_shares_insert_transaction(
+    memory_db: Callable, mocker: MockerFixture, tmp_path: Path
+):
+    from zhenxun.models.chat_history import ChatHistory
+    from zhenxun.models.statistics_rollup import StatisticsRollup
+    from zhenxun.services.ingest import IngestPipeline
+
+    await memory_db("zhenxun.models.statistics_rollup", "zhenxun.models.chat_history")
+    mocker.patch("zhenxun.services.ingest.SPOOL_PATH", tmp_path)
+    mocker.patch.object(IngestPipeline, "_pipelines", {})
+    pipeline = IngestPipeline(
+        "test_rollup", ChatHistory, ("user_id", "group_id", "text")
+    )
+
+    async def add_rows(rows):
+        await StatisticsRollup.add_rows(StatisticsRollup.CHAT, rows)
+
+    pipeline.add_flush_listener(add_rows, transactional=True)
+    pipeline.put_nowait(("u", "g", "t"))
+    # 汇总失败时原始记录一同回滚，保留在队列中等待重试
+    mocker.patch.object(
+        StatisticsRollup, "add_rows", side_effect=RuntimeError("rollup")
+    )
+    assert await pipeline.flush() == 0
+    assert len(pipeline) == 1
+    assert not await ChatHistory.all().exists()
+    assert pipeline.get_metrics()["dead_lettered"] == 0
+
+    mocker.stopall()
+    pipeline._retry_at = 0
+    assert await pipeline.flush() == 1
+    assert await ChatHistory.all().count() == 1
+    assert await StatisticsRollup.total(StatisticsRollup.CHAT) == 1
@@ -10,26 +10,23 @@ from zhenxun.models.group_member_info import GroupInfoUser
 from zhenxun.models.level_user import LevelUser
 from zhenxun.services.log import logger
 from zhenxun.utils.platform import PlatformUtils
+from zhenxun.utils.reconcile import apply_reconcile, reconcile
 
 
 class MemberUpdateManage:
     @classmethod
     async def __handle_user(
-        cls,
-        member: Member,
-        db_user: list[GroupInfoUser],
-        group_id: str,
-        data_list: tuple[list, list, list],
-        platform: str | None,
-    ):
+        cls, member: Member, group_id: str, platform: str | None
+    ) -> GroupInfoUser:
         """单个成员操作
 
         参数:
             member: Member
-            db_user: db成员数据
             group_id: 群组id
-            data_list: 数据列表
             platform: 平台
+
+        返回:
+            GroupInfoUser: 成员数据
         """
         driver = nonebot.get_driver()
         default_auth = Config.get_config("admin_bot_manage", "ADMIN_DEFAULT_AUTH")
@@ -37,8 +34,6 @@ class MemberUpdateManage:
             r"[\x00-\x09\x0b-\x1f\x7f-\x9f]", "", member.nick or member.user.name or ""
         )
         role = member.role
-        db_user_uid = [u.user_id for u in db_user]
-        uid2name = {u.user_id: u.user_name for u in db_user}
         if member.id in driver.config.superusers:
             await LevelUser.set_level(member.id, group_id, 9)
         elif role and default_auth:
@@ -49,25 +44,13 @@ class MemberUpdateManage:
                     await LevelUser.set_level(member.id, group_id, default_auth + 1)
                 elif role.id == "ADMINISTRATOR":
                     await LevelUser.set_level(member.id, group_id, default_auth)
-        if cnt := db_user_uid.count(member.id):
-            users = [u for u in db_user if u.user_id == member.id]
-            if cnt > 1:
-                for u in users[1:]:
-                    data_list[2].append(u.id)
-            if nickname != uid2name.get(member.id):
-                user = users[0]
-                user.user_name = nickname
-                data_list[1].append(user)
-        else:
-            data_list[0].append(
-                GroupInfoUser(
-                    user_id=member.id,
-                    group_id=group_id,
-                    user_name=nickname,
-                    user_join_time=member.joined_at or datetime.now(),
-                    platform=platform,
-                )
-            )
+        return GroupInfoUser(
+            user_id=member.id,
+            group_id=group_id,
+            user_name=nickname,
+            user_join_time=member.joined_at or datetime.now(),
+            platform=platform,
+        )
 
     @classmethod
     async def update_group_member(cls, bot: Bot, group_id: str) -> str:
@@ -94,19 +77,22 @@ class MemberUpdateManage:
                 )
                 return "更新群组失败，群组不存在..."
             members = await interface.get_members(SceneType.GROUP, group_list[0].id)
-            db_user = await GroupInfoUser.filter(group_id=group_id).all()
-            db_user_uid = [u.user_id for u in db_user]
-            data_list = ([], [], [])
-            exist_member_list = []
+            member_list = []
             for member in members:
                 logger.debug(f"即将更新群组成员: {member}", "更新群组成员信息")
-                await cls.__handle_user(member, db_user, group_id, data_list, platform)
-                exist_member_list.append(member.id)
-            if data_list[0]:
+                member_list.append(await cls.__handle_user(member, group_id, platform))
+            result = reconcile(
+                await GroupInfoUser.filter(group_id=group_id).all(),
+                member_list,
+                lambda u: u.user_id,
+                ["user_name"],
+                delete_missing=True,
+            )
+            if result.create:
                 try:
-                    await GroupInfoUser.bulk_create(data_list[0], 30)
+                    await GroupInfoUser.bulk_create(result.create, 30)
                     logger.debug(
-                        f"创建用户数据 {len(data_list[0])} 条",
+                        f"创建用户数据 {len(result.create)} 条",
                         "更新群组成员信息",
                         target=group_id,
                     )
@@ -115,7 +101,7 @@ class MemberUpdateManage:
                         f"批量创建用户数据失败: {e}，开始进行逐个存储",
                         "更新群组成员信息",
                     )
-                    for u in data_list[0]:
+                    for u in result.create:
                         try:
                             await u.save()
                         except Exception as e:
@@ -123,25 +109,17 @@ class MemberUpdateManage:
                                 f"创建用户 {u.user_name}({u.user_id}) 数据失败: {e}",
                                 "更新群组成员信息",
                             )
-            if data_list[1]:
-                await GroupInfoUser.bulk_update(data_list[1], ["user_name"], 30)
+                result.create.clear()
+            await apply_reconcile(GroupInfoUser, result, 30)
+            if result.update:
                 logger.debug(
-                    f"更新户数据 {len(data_list[1])} 条",
+                    f"更新户数据 {result.update_count} 条",
                     "更新群组成员信息",
                     target=group_id,
                 )
-            if data_list[2]:
-                await GroupInfoUser.filter(id__in=data_list[2]).delete()
-                logger.debug(f"删除重复数据 Ids: {data_list[2]}", "更新群组成员信息")
-
-            if delete_member_list := [
-                uid for uid in db_user_uid if uid not in exist_member_list
-            ]:
-                await GroupInfoUser.filter(
-                    user_id__in=delete_member_list, group_id=group_id
-                ).delete()
+            if result.delete:
                 logger.info(
-                    f"删除已退群用户 {len(delete_member_list)} 条",
+                    f"删除已退群及重复用户 {len(result.delete)} 条",
                     "更新群组成员信息",
                     group_id=group_id,
                     platform="qq",
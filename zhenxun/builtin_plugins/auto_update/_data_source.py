@@ -230,7 +230,9 @@ class UpdateManager:
         download_file = (
             DOWNLOAD_GZ_FILE if version_type == "release" else DOWNLOAD_ZIP_FILE
         )
-        if await AsyncHttpx.download_file(url, download_file, stream=True):
+        if await AsyncHttpx.download_file(
+            url, download_file, stream=True, connections=4
+        ):
             logger.debug("下载真寻最新版文件完成...", COMMAND)
             await _file_handle(new_version)
             result = "版本更新完成"
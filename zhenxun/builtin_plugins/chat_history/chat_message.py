@@ -1,14 +1,15 @@
 from nonebot import on_message
 from nonebot.plugin import PluginMetadata
 from nonebot_plugin_alconna import UniMsg
-from nonebot_plugin_apscheduler import scheduler
 from nonebot_plugin_uninfo import Uninfo
 
 from zhenxun.configs.config import Config
 from zhenxun.configs.utils import PluginExtraData, RegisterConfig
 from zhenxun.models.chat_history import ChatHistory
-from zhenxun.services.log import logger
+from zhenxun.services.ingest import IngestPipeline
 from zhenxun.utils.enum import PluginType
+from zhenxun.utils.manager.leaderboard_manager import LeaderboardManager
+from zhenxun.utils.manager.rollup_manager import RollupManager
 from zhenxun.utils.utils import get_entity_ids
 
 __plugin_meta__ = PluginMetadata(
@@ -39,34 +40,26 @@ def rule(message: UniMsg) -> bool:
 
 chat_history = on_message(rule=rule, priority=1, block=False)
 
-TEMP_LIST = []
+chat_pipeline = IngestPipeline(
+    "chat_history",
+    ChatHistory,
+    ("user_id", "group_id", "text", "plain_text", "bot_id", "platform"),
+)
+chat_pipeline.add_flush_listener(RollupManager.on_chat_flush, transactional=True)
+chat_pipeline.add_flush_listener(LeaderboardManager.on_chat_flush)
 
 
 @chat_history.handle()
 async def _(message: UniMsg, session: Uninfo):
     entity = get_entity_ids(session)
-    TEMP_LIST.append(
-        ChatHistory(
-            user_id=entity.user_id,
-            group_id=entity.group_id,
-            text=str(message),
-            plain_text=message.extract_plain_text(),
-            bot_id=session.self_id,
-            platform=session.platform,
+    # 响应器优先级最高，队列已满时不等待，避免阻塞消息处理
+    chat_pipeline.put_nowait(
+        (
+            entity.user_id,
+            entity.group_id,
+            str(message),
+            message.extract_plain_text(),
+            session.self_id,
+            session.platform,
         )
     )
-
-
-@scheduler.scheduled_job(
-    "interval",
-    minutes=1,
-)
-async def _():
-    try:
-        message_list = TEMP_LIST.copy()
-        TEMP_LIST.clear()
-        if message_list:
-            await ChatHistory.bulk_create(message_list)
-            logger.debug(f"批量添加聊天记录 {len(message_list)} 条", "定时任务")
-    except Exception as e:
-        logger.warning("存储聊天记录失败", "chat_history", e=e)
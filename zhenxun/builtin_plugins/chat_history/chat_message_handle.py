@@ -1,3 +1,4 @@
+import asyncio
 from datetime import datetime, timedelta
 from io import BytesIO
 
@@ -22,6 +23,7 @@ from zhenxun.models.group_member_info import GroupInfoUser
 from zhenxun.services.log import logger
 from zhenxun.utils.enum import PluginType
 from zhenxun.utils.image_utils import BuildImage, ImageTemplate
+from zhenxun.utils.manager.leaderboard_manager import LeaderboardManager
 from zhenxun.utils.message import MessageUtils
 from zhenxun.utils.platform import PlatformUtils
 
@@ -90,6 +92,28 @@ _matcher.shortcut(
 )
 
 
+async def build_avatar(uid: str, size: int = 40) -> tuple[BuildImage, int, int]:
+    """获取圆形头像，获取失败时使用灰色占位
+
+    参数:
+        uid: 用户id
+        size: 头像大小
+
+    返回:
+        tuple[BuildImage, int, int]: 头像与宽高
+    """
+    try:
+        if avatar_bytes := await PlatformUtils.get_user_avatar(uid, "qq"):
+            avatar_img = BuildImage(size, size, background=BytesIO(avatar_bytes))
+        else:
+            avatar_img = BuildImage(size, size, color="#CCCCCC")
+    except Exception as e:
+        logger.warning(f"获取用户头像失败: {e}", "chat_history")
+        avatar_img = BuildImage(size, size, color="#CCCCCC")
+    await avatar_img.circle()
+    return avatar_img, size, size
+
+
 @_matcher.handle()
 async def _(
     session: EventSession,
@@ -120,49 +144,37 @@ async def _(
     if not show_quit_member:
         fetch_count = count.result * 2
 
-    if rank_data := await ChatHistory.get_group_msg_rank(
-        group_id, fetch_count, "DES" if arparma.find("des") else "DESC", date_scope
-    ):
-        idx = 1
-        data_list = []
-
-        for uid, num in rank_data:
-            if len(data_list) >= count.result:
-                break
-
-            user_in_group = await GroupInfoUser.filter(
-                user_id=uid, group_id=group_id
-            ).first()
-
-            if not user_in_group and not show_quit_member:
-                continue
-
-            if user_in_group:
-                user_name = user_in_group.user_name
-            else:
-                user_name = f"{uid}(已退群)"
-
-            avatar_size = 40
-            try:
-                avatar_bytes = await PlatformUtils.get_user_avatar(str(uid), "qq")
-                if avatar_bytes:
-                    avatar_img = BuildImage(
-                        avatar_size, avatar_size, background=BytesIO(avatar_bytes)
-                    )
-                    await avatar_img.circle()
-                    avatar_tuple = (avatar_img, avatar_size, avatar_size)
-                else:
-                    avatar_img = BuildImage(avatar_size, avatar_size, color="#CCCCCC")
-                    await avatar_img.circle()
-                    avatar_tuple = (avatar_img, avatar_size, avatar_size)
-            except Exception as e:
-                logger.warning(f"获取用户头像失败: {e}", "chat_history")
-                avatar_img = BuildImage(avatar_size, avatar_size, color="#CCCCCC")
-                await avatar_img.circle()
-                avatar_tuple = (avatar_img, avatar_size, avatar_size)
-
-            data_list.append([idx, avatar_tuple, user_name, num])
-            idx += 1
+    order = "DES" if arparma.find("des") else "DESC"
+    if not date_scope and order == "DESC":
+        board = await LeaderboardManager.get_board(LeaderboardManager.CHAT, group_id)
+        rank_data = board.top(fetch_count)
+    else:
+        rank_data = await ChatHistory.get_group_msg_rank(
+            group_id, fetch_count, order, date_scope
+        )
+    if rank_data:
+        uid2name = dict(
+            await GroupInfoUser.filter(
+                user_id__in=[uid for uid, _ in rank_data], group_id=group_id
+            ).values_list("user_id", "user_name")
+        )
+        if not show_quit_member:
+            rank_data = [item for item in rank_data if item[0] in uid2name]
+        rank_data = rank_data[: count.result]
+        avatar_list = await asyncio.gather(
+            *(build_avatar(str(uid)) for uid, _ in rank_data)
+        )
+        data_list = [
+            [
+                idx,
+                avatar,
+                uid2name[uid] if uid in uid2name else f"{uid}(已退群)",
+                int(num),
+            ]
+            for idx, ((uid, num), avatar) in enumerate(
+                zip(rank_data, avatar_list), start=1
+            )
+        ]
         if not date_scope:
             if date_scope := await ChatHistory.get_group_first_msg_datetime(group_id):
                 date_scope = date_scope.astimezone(
@@ -0,0 +1,129 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from nonebot_plugin_apscheduler import scheduler
+from tortoise.expressions import Q
+
+from zhenxun.configs.config import Config
+from zhenxun.models.chat_history import ChatHistory
+from zhenxun.models.statistics_rollup import StatisticsRollup
+from zhenxun.services.log import logger
+from zhenxun.utils.manager.chat_archive_manager import ChatArchiveManager
+
+Config.add_plugin_config(
+    "chat_history",
+    "RETENTION_DAYS",
+    0,
+    help="聊天记录在数据库中的保留天数，超过的记录将被归档并删除，0为永久保留",
+    default_value=0,
+    type=int,
+)
+
+Config.add_plugin_config(
+    "chat_history",
+    "GROUP_RETENTION_DAYS",
+    {},
+    help="指定群组的聊天记录保留天数，覆盖RETENTION_DAYS，0为永久保留，"
+    "例如 {'123456': 30}",
+    default_value={},
+    type=dict[str, int],
+)
+
+Config.add_plugin_config(
+    "chat_history",
+    "ARCHIVE",
+    True,
+    help="删除过期聊天记录前是否归档至 data/chat_history/archive",
+    default_value=True,
+    type=bool,
+)
+
+BATCH_SIZE = 1000
+"""单次删除条数，避免长时间锁表"""
+BATCH_INTERVAL = 0.5
+"""两次删除之间的间隔（秒）"""
+
+FIELDS = (
+    "id",
+    "user_id",
+    "group_id",
+    "text",
+    "plain_text",
+    "create_time",
+    "bot_id",
+    "platform",
+)
+
+
+async def move_expired(cutoff: datetime, query: Q) -> int:
+    """分批归档并删除过期聊天记录
+
+    参数:
+        cutoff: 早于该时间的记录为过期记录
+        query: 记录筛选条件
+
+    返回:
+        int: 删除条数
+    """
+    archive = Config.get_config("chat_history", "ARCHIVE")
+    total = 0
+    while True:
+        rows = (
+            await ChatHistory.filter(query, create_time__lt=cutoff)
+            .order_by("id")
+            .limit(BATCH_SIZE)
+            .values(*FIELDS)
+        )
+        if not rows:
+            break
+        if archive:
+            await ChatArchiveManager.write(rows)
+        await ChatHistory.filter(id__in=[row["id"] for row in rows]).delete()
+        total += len(rows)
+        await asyncio.sleep(BATCH_INTERVAL)
+    return total
+
+
+async def apply_retention() -> int:
+    """按保留策略清理聊天记录
+
+    返回:
+        int: 删除条数
+    """
+    if not StatisticsRollup.ready:
+        # 汇总补全只读取数据库中的记录，补全完成前删除会使汇总遗漏这些记录
+        logger.info("统计汇总尚未补全，跳过聊天记录保留策略", "chat_history")
+        return 0
+    now = datetime.now()
+    default_days = Config.get_config("chat_history", "RETENTION_DAYS") or 0
+    group_days: dict[str, int] = (
+        Config.get_config("chat_history", "GROUP_RETENTION_DAYS") or {}
+    )
+    total = 0
+    for group_id, days in group_days.items():
+        if days > 0:
+            total += await move_expired(
+                now - timedelta(days=days), Q(group_id=str(group_id))
+            )
+    if default_days > 0:
+        query = Q()
+        if group_days:
+            # NOT IN 不包含NULL，私聊记录需要单独加入
+            query = Q(group_id__isnull=True) | Q(
+                group_id__not_in=[str(g) for g in group_days]
+            )
+        total += await move_expired(now - timedelta(days=default_days), query)
+    return total
+
+
+@scheduler.scheduled_job(
+    "cron",
+    hour=4,
+    minute=10,
+)
+async def _():
+    try:
+        if total := await apply_retention():
+            logger.info(f"聊天记录保留策略已清理 {total} 条记录", "chat_history")
+    except Exception as e:
+        logger.error("执行聊天记录保留策略失败", "chat_history", e=e)
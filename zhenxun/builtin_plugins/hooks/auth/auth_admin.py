@@ -32,30 +32,22 @@ async def auth_admin(plugin: PluginInfo, session: Uninfo):
         entity = get_entity_ids(session)
         level_dao = DataAccess(LevelUser)
 
-        # 并行查询用户权限数据
+        # 全局权限与群组权限合并为一次批量查询
         global_user: LevelUser | None = None
         group_users: LevelUser | None = None
-
-        # 查询全局权限
-        global_user_task = level_dao.safe_get_or_none(
-            user_id=session.user.id, group_id__isnull=True
-        )
-
-        # 如果在群组中，查询群组权限
-        group_users_task = None
+        keys: list[dict[str, str | None]] = [
+            {"user_id": session.user.id, "group_id": None}
+        ]
         if entity.group_id:
-            group_users_task = level_dao.safe_get_or_none(
-                user_id=session.user.id, group_id=entity.group_id
-            )
+            keys.append({"user_id": session.user.id, "group_id": entity.group_id})
 
         # 等待查询完成，添加超时控制
         try:
             results = await asyncio.wait_for(
-                asyncio.gather(global_user_task, group_users_task or asyncio.sleep(0)),
-                timeout=DB_TIMEOUT_SECONDS,
+                level_dao.get_many(keys), timeout=DB_TIMEOUT_SECONDS
             )
             global_user = results[0]
-            group_users = results[1] if group_users_task else None
+            group_users = results[1] if entity.group_id else None
         except asyncio.TimeoutError:
             logger.error(f"查询用户权限超时: user_id={session.user.id}", LOGGER_COMMAND)
             # 超时时不阻塞，继续执行
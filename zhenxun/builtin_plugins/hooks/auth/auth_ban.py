@@ -67,22 +67,20 @@ async def is_ban(user_id: str | None, group_id: str | None) -> int:
     user = None
 
     try:
-        # 并行查询用户和群组的 ban 记录
-        tasks = []
+        # 用户在群组中的ban记录和全局ban记录合并为一次批量查询
+        keys = []
         if user_id and group_id:
-            tasks.append(ban_dao.safe_get_or_none(user_id=user_id, group_id=group_id))
+            keys.append({"user_id": user_id, "group_id": group_id})
         if user_id:
-            tasks.append(
-                ban_dao.safe_get_or_none(user_id=user_id, group_id__isnull=True)
-            )
+            keys.append({"user_id": user_id, "group_id": None})
 
-        # 等待所有查询完成，添加超时控制
-        if tasks:
+        # 等待查询完成，添加超时控制
+        if keys:
             try:
                 ban_records = await asyncio.wait_for(
-                    asyncio.gather(*tasks), timeout=DB_TIMEOUT_SECONDS
+                    ban_dao.get_many(keys), timeout=DB_TIMEOUT_SECONDS
                 )
-                if len(tasks) == 2:
+                if len(keys) == 2:
                     group_user, user = ban_records
                 elif user_id and group_id:
                     group_user = ban_records[0]
@@ -1,4 +1,5 @@
 import asyncio
+from collections.abc import Coroutine
 import time
 from typing import ClassVar
 
@@ -8,9 +9,12 @@ from pydantic import BaseModel
 
 from zhenxun.models.plugin_info import PluginInfo
 from zhenxun.models.plugin_limit import PluginLimit
+from zhenxun.services.cache import CacheRoot
+from zhenxun.services.cache.config import CACHE_KEY_SEPARATOR
+from zhenxun.services.cache.shared_limiter import SharedLimiter
 from zhenxun.services.db_context import DB_TIMEOUT_SECONDS
 from zhenxun.services.log import logger
-from zhenxun.utils.enum import LimitWatchType, PluginLimitType
+from zhenxun.utils.enum import CacheType, LimitWatchType, PluginLimitType
 from zhenxun.utils.limiters import CountLimiter, FreqLimiter, UserBlockLimiter
 from zhenxun.utils.manager.priority_manager import PriorityLifecycle
 from zhenxun.utils.message import MessageUtils
@@ -23,9 +27,9 @@ from .exception import SkipPluginException
 driver = nonebot.get_driver()
 
 
-@PriorityLifecycle.on_startup(priority=5)
+@PriorityLifecycle.on_startup(priority=6)
 async def _():
-    """初始化限制"""
+    """插件数据初始化完成后加载限制"""
     await LimitManager.init_limit()
 
 
@@ -38,23 +42,29 @@ class Limit(BaseModel):
 
 
 class LimitManager:
-    add_module: ClassVar[list] = []
-    last_update_time: ClassVar[float] = 0
-    update_interval: ClassVar[float] = 6000  # 1小时更新一次
-    is_updating: ClassVar[bool] = False  # 防止并发更新
+    is_loaded: ClassVar[bool] = False
+    """是否已加载全部限制，之后由PluginLimit变更事件增量更新"""
+    is_updating: ClassVar[bool] = False  # 防止并发加载
+    _sync_pending: ClassVar[bool] = False
+    """加载期间收到其他进程的变更，加载结束后需要重新同步"""
 
     cd_limit: ClassVar[dict[str, Limit]] = {}
     block_limit: ClassVar[dict[str, Limit]] = {}
     count_limit: ClassVar[dict[str, Limit]] = {}
 
-    # 模块限制缓存，避免频繁查询数据库
-    module_limit_cache: ClassVar[dict[str, tuple[float, list[PluginLimit]]]] = {}
-    module_cache_ttl: ClassVar[float] = 60  # 模块缓存有效期（秒）
+    rule_events: ClassVar[dict[str, int]] = {
+        "created": 0,
+        "updated": 0,
+        "kept": 0,
+        "removed": 0,
+    }
+    """限制规则变更事件计数，kept为参数未变、保留计数状态的更新"""
+
+    _sync_tasks: ClassVar[set[asyncio.Task]] = set()
 
     @classmethod
     async def init_limit(cls):
         """初始化限制"""
-        cls.last_update_time = time.time()
         try:
             await asyncio.wait_for(cls.update_limits(), timeout=DB_TIMEOUT_SECONDS * 2)
         except asyncio.TimeoutError:
@@ -62,7 +72,7 @@ class LimitManager:
 
     @classmethod
     async def update_limits(cls):
-        """更新限制信息"""
+        """加载全部限制信息"""
         # 防止并发更新
         if cls.is_updating:
             return
@@ -76,46 +86,178 @@ class LimitManager:
                 )
             except asyncio.TimeoutError:
                 logger.error("查询限制信息超时", LOGGER_COMMAND)
-                cls.is_updating = False
                 return
 
-            # 清空旧数据
-            cls.add_module = []
             cls.cd_limit = {}
             cls.block_limit = {}
             cls.count_limit = {}
-            # 添加新数据
             for limit in limit_list:
                 cls.add_limit(limit)
+            cls.is_loaded = True
 
-            cls.last_update_time = time.time()
             elapsed = time.time() - start_time
             if elapsed > WARNING_THRESHOLD:  # 记录耗时超过500ms的更新
                 logger.warning(f"更新限制信息耗时: {elapsed:.3f}s", LOGGER_COMMAND)
         finally:
             cls.is_updating = False
+            if cls._sync_pending:
+                cls.__run_sync(cls.sync_limits())
+
+    @classmethod
+    async def sync_limits(cls):
+        """重新读取全部限制并逐条更新，参数未变的限制保留CD与计数状态
+
+        同一模块同一类型仍只保留一个限制，与全量加载一致
+        """
+        if cls.is_updating:
+            cls._sync_pending = True
+            return
+        cls.is_updating = True
+        try:
+            while True:
+                cls._sync_pending = False
+                try:
+                    limit_list = await asyncio.wait_for(
+                        PluginLimit.all(), timeout=DB_TIMEOUT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    logger.error("同步限制信息超时", LOGGER_COMMAND)
+                    return
+                exists = {limit.id for limit in limit_list}
+                for limit_dict in (cls.cd_limit, cls.block_limit, cls.count_limit):
+                    for current in list(limit_dict.values()):
+                        if current.limit.id not in exists:
+                            cls.on_limit_change(current.limit, True)
+                # 先移除停用的规则，使同类型的其他规则可以补上
+                limit_list.sort(key=lambda limit: limit.status)
+                for limit in limit_list:
+                    cls.on_limit_change(limit, False)
+                for limit in limit_list:
+                    if limit.status and limit.module not in cls.__get_limit_dict(
+                        limit.limit_type
+                    ):
+                        cls.on_limit_change(limit, False)
+                if not cls._sync_pending:
+                    break
+        finally:
+            cls.is_updating = False
+
+    @classmethod
+    def __get_limit_dict(cls, limit_type: PluginLimitType) -> dict[str, Limit]:
+        if limit_type == PluginLimitType.BLOCK:
+            return cls.block_limit
+        if limit_type == PluginLimitType.CD:
+            return cls.cd_limit
+        return cls.count_limit
+
+    @classmethod
+    def __build_limit(cls, limit: PluginLimit) -> Limit:
+        if limit.limit_type == PluginLimitType.BLOCK:
+            return Limit(limit=limit, limiter=UserBlockLimiter())
+        if limit.limit_type == PluginLimitType.CD:
+            return Limit(limit=limit, limiter=FreqLimiter(limit.cd))
+        return Limit(limit=limit, limiter=CountLimiter(limit.max_count))
+
+    @classmethod
+    def __same_params(cls, current: Limit, limit: PluginLimit) -> bool:
+        """限制器参数是否与规则一致，实例可能被原地修改，因此与限制器比较"""
+        limiter = current.limiter
+        if isinstance(limiter, FreqLimiter):
+            return limiter.default_cd == limit.cd
+        if isinstance(limiter, CountLimiter):
+            return limiter.max == limit.max_count
+        return True
 
     @classmethod
     def add_limit(cls, limit: PluginLimit):
-        """添加限制
+        """添加限制，同一模块同一类型只保留一个限制
 
         参数:
             limit: PluginLimit
         """
-        if limit.module not in cls.add_module:
-            cls.add_module.append(limit.module)
-            if limit.limit_type == PluginLimitType.BLOCK:
-                cls.block_limit[limit.module] = Limit(
-                    limit=limit, limiter=UserBlockLimiter()
-                )
-            elif limit.limit_type == PluginLimitType.CD:
-                cls.cd_limit[limit.module] = Limit(
-                    limit=limit, limiter=FreqLimiter(limit.cd)
-                )
-            elif limit.limit_type == PluginLimitType.COUNT:
-                cls.count_limit[limit.module] = Limit(
-                    limit=limit, limiter=CountLimiter(limit.max_count)
-                )
+        limit_dict = cls.__get_limit_dict(limit.limit_type)
+        if limit.module not in limit_dict:
+            limit_dict[limit.module] = cls.__build_limit(limit)
+
+    @classmethod
+    def on_limit_change(cls, limit: PluginLimit, deleted: bool):
+        """PluginLimit变更时只更新对应模块的限制
+
+        参数:
+            limit: 变更的PluginLimit
+            deleted: 是否被删除
+        """
+        # 限制类型被修改时移除旧类型下的同一规则
+        for limit_type in PluginLimitType:
+            limit_dict = cls.__get_limit_dict(limit_type)
+            current = limit_dict.get(limit.module)
+            if current and current.limit.id == limit.id:
+                if deleted or not limit.status or limit_type != limit.limit_type:
+                    del limit_dict[limit.module]
+                    cls.rule_events["removed"] += 1
+        if deleted or not limit.status:
+            return
+        limit_dict = cls.__get_limit_dict(limit.limit_type)
+        current = limit_dict.get(limit.module)
+        if current is None:
+            limit_dict[limit.module] = cls.__build_limit(limit)
+            cls.rule_events["created"] += 1
+        elif current.limit.id != limit.id:
+            # 已存在同类型的其他规则，与全量加载时的行为保持一致
+            return
+        elif cls.__same_params(current, limit):
+            # 参数未变时保留限制器中的CD与计数状态
+            current.limit = limit
+            cls.rule_events["kept"] += 1
+        else:
+            limit_dict[limit.module] = cls.__build_limit(limit)
+            cls.rule_events["updated"] += 1
+        logger.debug(
+            f"更新模块 {limit.module} 的 {limit.limit_type} 限制", LOGGER_COMMAND
+        )
+
+    @classmethod
+    async def reload_limit(cls, limit_id: int):
+        """从数据库重新读取单条限制，用于同步其他进程的修改
+
+        参数:
+            limit_id: PluginLimit id
+        """
+        limit = await PluginLimit.get_or_none(id=limit_id)
+        if limit is not None:
+            cls.on_limit_change(limit, False)
+            return
+        for limit_dict in (cls.cd_limit, cls.block_limit, cls.count_limit):
+            for current in list(limit_dict.values()):
+                if current.limit.id == limit_id:
+                    cls.on_limit_change(current.limit, True)
+
+    @classmethod
+    def on_cache_invalidate(
+        cls, cache_type: str | None, cache_key: str | None, remote: bool
+    ):
+        """其他进程修改PluginLimit时通过缓存失效消息同步
+
+        参数:
+            cache_type: 缓存类型
+            cache_key: 完整缓存键
+            remote: 是否来自其他进程
+        """
+        if not remote or cache_type != CacheType.LIMIT or not cls.is_loaded:
+            return
+        if cache_key is None or cls.is_updating:
+            # 加载期间的变更合并为一次同步，在加载结束后执行
+            cls.__run_sync(cls.sync_limits())
+            return
+        limit_id = cache_key.partition(CACHE_KEY_SEPARATOR)[2]
+        if limit_id.isdigit():
+            cls.__run_sync(cls.reload_limit(int(limit_id)))
+
+    @classmethod
+    def __run_sync(cls, coro: Coroutine):
+        task = asyncio.create_task(coro)
+        cls._sync_tasks.add(task)
+        task.add_done_callback(cls._sync_tasks.discard)
 
     @classmethod
     def unblock(
@@ -132,9 +274,7 @@ class LimitManager:
         if limit_model := cls.block_limit.get(module):
             limit = limit_model.limit
             limiter: UserBlockLimiter = limit_model.limiter  # type: ignore
-            key_type = user_id
-            if group_id and limit.watch_type == LimitWatchType.GROUP:
-                key_type = channel_id or group_id
+            key_type = cls.__get_key(limit, user_id, group_id, channel_id)
             logger.debug(
                 f"解除对象: {key_type} 的block限制",
                 LOGGER_COMMAND,
@@ -142,46 +282,30 @@ class LimitManager:
                 group_id=group_id,
             )
             limiter.set_false(key_type)
+            SharedLimiter.release(limit.module, key_type)
 
     @classmethod
-    async def get_module_limits(cls, module: str) -> list[PluginLimit]:
-        """获取模块的限制信息，使用缓存减少数据库查询
+    def __get_key(
+        cls,
+        limit: PluginLimit,
+        user_id: str,
+        group_id: str | None,
+        channel_id: str | None,
+    ) -> str:
+        """获取限制对象
 
         参数:
-            module: 模块名
+            limit: PluginLimit
+            user_id: 用户id
+            group_id: 群组id
+            channel_id: 频道id
 
         返回:
-            list[PluginLimit]: 限制列表
+            str: 用户id或群组/频道id
         """
-        current_time = time.time()
-
-        # 检查缓存
-        if module in cls.module_limit_cache:
-            cache_time, limits = cls.module_limit_cache[module]
-            if current_time - cache_time < cls.module_cache_ttl:
-                return limits
-
-        # 缓存不存在或已过期，从数据库查询
-        try:
-            start_time = time.time()
-            limits = await asyncio.wait_for(
-                PluginLimit.filter(module=module, status=True).all(),
-                timeout=DB_TIMEOUT_SECONDS,
-            )
-            elapsed = time.time() - start_time
-            if elapsed > WARNING_THRESHOLD:  # 记录耗时超过500ms的查询
-                logger.warning(
-                    f"查询模块限制信息耗时: {elapsed:.3f}s, 模块: {module}",
-                    LOGGER_COMMAND,
-                )
-
-            # 更新缓存
-            cls.module_limit_cache[module] = (current_time, limits)
-            return limits
-        except asyncio.TimeoutError:
-            logger.error(f"查询模块限制信息超时: {module}", LOGGER_COMMAND)
-            # 超时时返回空列表，避免阻塞
-            return []
+        if group_id and limit.watch_type == LimitWatchType.GROUP:
+            return channel_id or group_id
+        return user_id
 
     @classmethod
     async def check(
@@ -204,28 +328,26 @@ class LimitManager:
         """
         start_time = time.time()
 
-        # 定期更新全局限制信息
-        if (
-            time.time() - cls.last_update_time > cls.update_interval
-            and not cls.is_updating
-        ):
-            # 使用异步任务更新，避免阻塞当前请求
-            asyncio.create_task(cls.update_limits())  # noqa: RUF006
-
-        # 如果模块不在已加载列表中，只加载该模块的限制
-        if module not in cls.add_module:
-            limits = await cls.get_module_limits(module)
-            for limit in limits:
-                cls.add_limit(limit)
+        # 启动时加载失败的情况下重新加载
+        if not cls.is_loaded:
+            await cls.update_limits()
 
         # 检查各种限制
         try:
-            if limit_model := cls.cd_limit.get(module):
-                await cls.__check(limit_model, user_id, group_id, channel_id)
-            if limit_model := cls.block_limit.get(module):
-                await cls.__check(limit_model, user_id, group_id, channel_id)
-            if limit_model := cls.count_limit.get(module):
-                await cls.__check(limit_model, user_id, group_id, channel_id)
+            limit_models = [
+                limit_model
+                for limit_model in (
+                    cls.cd_limit.get(module),
+                    cls.block_limit.get(module),
+                    cls.count_limit.get(module),
+                )
+                if limit_model
+            ]
+            if not await cls.__check_shared(
+                limit_models, user_id, group_id, channel_id
+            ):
+                for limit_model in limit_models:
+                    await cls.__check(limit_model, user_id, group_id, channel_id)
         finally:
             # 记录总执行时间
             elapsed = time.time() - start_time
@@ -265,28 +387,12 @@ class LimitManager:
             or (group_id and limit.watch_type == LimitWatchType.GROUP)
             or (not group_id and limit.watch_type == LimitWatchType.USER)
         )
-        key_type = user_id
-        if group_id and limit.watch_type == LimitWatchType.GROUP:
-            key_type = channel_id or group_id
+        key_type = cls.__get_key(limit, user_id, group_id, channel_id)
         if is_limit and not limiter.check(key_type):
-            if limit.result:
-                format_kwargs = {}
-                if isinstance(limiter, FreqLimiter):
-                    left_time = limiter.left_time(key_type)
-                    cd_str = TimeUtils.format_duration(left_time)
-                    format_kwargs = {"cd": cd_str}
-                try:
-                    await asyncio.wait_for(
-                        MessageUtils.build_message(
-                            limit.result, format_args=format_kwargs
-                        ).send(),
-                        timeout=DB_TIMEOUT_SECONDS,
-                    )
-                except asyncio.TimeoutError:
-                    logger.error(f"发送限制消息超时: {limit.module}", LOGGER_COMMAND)
-            raise SkipPluginException(
-                f"{limit.module}({limit.limit_type}) 正在限制中..."
+            left_time = (
+                limiter.left_time(key_type) if isinstance(limiter, FreqLimiter) else 0
             )
+            await cls.__limited(limit_model, left_time)
         else:
             logger.debug(
                 f"开始进行限制 {limit.module}({limit.limit_type})...",
@@ -301,6 +407,74 @@ class LimitManager:
             if isinstance(limiter, CountLimiter):
                 limiter.increase(key_type)
 
+    @classmethod
+    async def __check_shared(
+        cls,
+        limit_models: list[Limit],
+        user_id: str,
+        group_id: str | None,
+        channel_id: str | None,
+    ) -> bool:
+        """使用Redis共享状态检测限制，所有限制只需一次往返
+
+        参数:
+            limit_models: Limit列表
+            user_id: 用户id
+            group_id: 群组id
+            channel_id: 频道id
+
+        返回:
+            bool: 是否已完成检测，未启用或Redis不可用时返回False
+
+        异常:
+            SkipPluginException: 触发限制
+        """
+        ops = []
+        for limit_model in limit_models:
+            limit = limit_model.limit
+            limiter = limit_model.limiter
+            key_type = cls.__get_key(limit, user_id, group_id, channel_id)
+            if isinstance(limiter, FreqLimiter):
+                ops.append(SharedLimiter.cd(limit.module, key_type, limit.cd))
+            elif isinstance(limiter, UserBlockLimiter):
+                ops.append(SharedLimiter.block(limit.module, key_type, limiter.timeout))
+            else:
+                ops.append(SharedLimiter.count(limit.module, key_type, limit.max_count))
+        result = await SharedLimiter.hit(ops)
+        if result is None:
+            return False
+        index, left_time = result
+        if index >= 0:
+            await cls.__limited(limit_models[index], left_time)
+        return True
+
+    @classmethod
+    async def __limited(cls, limit_model: Limit, left_time: float):
+        """发送限制提示
+
+        参数:
+            limit_model: Limit
+            left_time: CD剩余时间
+
+        异常:
+            SkipPluginException: 触发限制
+        """
+        limit = limit_model.limit
+        if limit.result:
+            format_kwargs = {}
+            if isinstance(limit_model.limiter, FreqLimiter):
+                format_kwargs = {"cd": TimeUtils.format_duration(left_time)}
+            try:
+                await asyncio.wait_for(
+                    MessageUtils.build_message(
+                        limit.result, format_args=format_kwargs
+                    ).send(),
+                    timeout=DB_TIMEOUT_SECONDS,
+                )
+            except asyncio.TimeoutError:
+                logger.error(f"发送限制消息超时: {limit.module}", LOGGER_COMMAND)
+        raise SkipPluginException(f"{limit.module}({limit.limit_type}) 正在限制中...")
+
 
 async def auth_limit(plugin: PluginInfo, session: Uninfo):
     """插件限制
@@ -320,3 +494,7 @@ async def auth_limit(plugin: PluginInfo, session: Uninfo):
     except asyncio.TimeoutError:
         logger.error(f"检查插件限制超时: {plugin.module}", LOGGER_COMMAND)
         # 超时时不抛出异常，允许继续执行
+
+
+PluginLimit.add_change_listener(LimitManager.on_limit_change)
+CacheRoot.add_invalidate_listener(LimitManager.on_cache_invalidate)
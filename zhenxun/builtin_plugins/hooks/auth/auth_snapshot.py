@@ -0,0 +1,637 @@
+"""
+权限快照
+
+在进程内维护 PluginInfo、BotConsole、GroupConsole、BanConsole、LevelUser 的只读索引，
+通过 Model 的数据变更监听器增量更新；
+其他进程的单条缓存失效消息只重新读取对应的记录，
+整个缓存类型失效（如 queryset.update 后调用 invalidate_cache）时在后台全量重建，
+重建期间继续使用旧索引，另外定时全量重建兜底。
+快照就绪后，一次完整的权限判定只是纯内存计算，不需要任何 await。
+"""
+
+import asyncio
+from collections.abc import Container
+from dataclasses import dataclass
+import sys
+import time
+from typing import Any, ClassVar
+
+from nonebot_plugin_alconna import At
+from nonebot_plugin_apscheduler import scheduler
+from nonebot_plugin_uninfo import Uninfo
+from tortoise.expressions import Q
+
+from zhenxun.configs.config import Config
+from zhenxun.models.ban_console import BanConsole
+from zhenxun.models.bot_console import BotConsole
+from zhenxun.models.group_console import GroupConsole
+from zhenxun.models.level_user import LevelUser
+from zhenxun.models.plugin_info import PluginInfo
+from zhenxun.services.cache import CacheRoot
+from zhenxun.services.cache.config import CACHE_KEY_SEPARATOR, COMPOSITE_KEY_SEPARATOR
+from zhenxun.services.db_context import Model
+from zhenxun.services.log import logger
+from zhenxun.utils.common_utils import CommonUtils
+from zhenxun.utils.enum import BlockType, CacheType, PluginType
+from zhenxun.utils.manager.priority_manager import PriorityLifecycle
+from zhenxun.utils.utils import EntityIDs
+
+from .auth_ban import calculate_ban_time, format_time
+from .config import LOGGER_COMMAND, SNAPSHOT_REFRESH_INTERVAL, SwitchEnum
+from .utils import freq, send_message
+
+if sys.version_info >= (3, 11):
+    from enum import StrEnum
+else:
+    from strenum import StrEnum
+
+Config.add_plugin_config(
+    "hook",
+    "AUTH_SNAPSHOT",
+    True,
+    help="权限检查使用内存快照，关闭后每次权限检查都会逐项查询数据库/缓存",
+    default_value=True,
+    type=bool,
+)
+
+MAX_LOAD_ROUNDS = 3
+"""重建期间数据持续变化时的最大重新读取次数"""
+
+
+class AuthAction(StrEnum):
+    PASS = "PASS"
+    """通过"""
+    SUPERUSER = "SUPERUSER"
+    """超级用户/超级用户指定群，跳过后续检查"""
+    EXEMPT = "EXEMPT"
+    """跳过权限检查"""
+    SKIP = "SKIP"
+    """阻断"""
+
+
+class AuthNotice(StrEnum):
+    COST = "COST"
+    """金币不足"""
+    BAN = "BAN"
+    """用户被ban"""
+    ADMIN_GROUP = "ADMIN_GROUP"
+    """群内管理员权限不足"""
+    ADMIN_GLOBAL = "ADMIN_GLOBAL"
+    """全局管理员权限不足"""
+    GROUP_SUPERUSER_BLOCK = "GROUP_SUPERUSER_BLOCK"
+    """超级用户禁用了该群此功能"""
+    GROUP_BLOCK = "GROUP_BLOCK"
+    """该群未开启此功能"""
+    GROUP_BLOCK_TYPE = "GROUP_BLOCK_TYPE"
+    """功能在群组中被禁用"""
+    PRIVATE_BLOCK_TYPE = "PRIVATE_BLOCK_TYPE"
+    """功能在私聊中被禁用"""
+    GLOBAL_BLOCK = "GLOBAL_BLOCK"
+    """全局未开启此功能"""
+
+
+@dataclass(slots=True)
+class BotEntry:
+    status: bool
+    block_plugins: frozenset[str]
+
+
+@dataclass(slots=True)
+class GroupEntry:
+    level: int
+    status: bool
+    is_super: bool
+    block_plugins: frozenset[str]
+    superuser_block_plugins: frozenset[str]
+
+
+@dataclass(slots=True)
+class BanEntry:
+    ban_time: int
+    duration: int
+
+
+@dataclass(slots=True)
+class AuthDecision:
+    action: AuthAction
+    reason: str = ""
+    plugin: PluginInfo | None = None
+    cost_gold: int = 0
+    notice: AuthNotice | None = None
+    ban_time: int = 0
+
+
+def _module_set(data: str | None) -> frozenset[str]:
+    return frozenset(CommonUtils.convert_module_format(data or ""))
+
+
+def _key_filter(values: dict[str, str | None]) -> Q:
+    """缓存键字段值对应的查询条件，空值在缓存键中为空字符串"""
+    conditions = [
+        Q(**{field: value})
+        if value
+        else Q(**{f"{field}__isnull": True}) | Q(**{field: ""})
+        for field, value in values.items()
+    ]
+    return Q(*conditions)
+
+
+class AuthIndex:
+    """权限数据索引"""
+
+    __slots__ = ("bans", "bots", "groups", "levels", "plugins")
+
+    def __init__(self):
+        self.plugins: dict[str, PluginInfo] = {}
+        self.bots: dict[str, BotEntry] = {}
+        self.groups: dict[str, GroupEntry] = {}
+        self.bans: dict[tuple[str | None, str | None], BanEntry] = {}
+        self.levels: dict[tuple[str, str | None], int] = {}
+
+    def apply_plugin(self, plugin: PluginInfo, deleted: bool):
+        current = self.plugins.get(plugin.module)
+        if deleted:
+            if current is not None and current.id == plugin.id:
+                del self.plugins[plugin.module]
+        elif current is None or (current.id or 0) <= (plugin.id or 0):
+            # module 不唯一时与 safe_get_or_none 保持一致，保留最新的记录
+            self.plugins[plugin.module] = plugin
+
+    def apply_bot(self, bot: BotConsole, deleted: bool):
+        if deleted:
+            self.bots.pop(bot.bot_id, None)
+        else:
+            self.bots[bot.bot_id] = BotEntry(
+                status=bot.status, block_plugins=_module_set(bot.block_plugins)
+            )
+
+    def apply_group(self, group: GroupConsole, deleted: bool):
+        if group.channel_id:
+            return
+        if deleted:
+            self.groups.pop(group.group_id, None)
+        else:
+            self.groups[group.group_id] = GroupEntry(
+                level=group.level,
+                status=group.status,
+                is_super=group.is_super,
+                block_plugins=_module_set(group.block_plugin),
+                superuser_block_plugins=_module_set(group.superuser_block_plugin),
+            )
+
+    def apply_ban(self, ban: BanConsole, deleted: bool):
+        key = (ban.user_id, ban.group_id)
+        if deleted:
+            self.bans.pop(key, None)
+        else:
+            self.bans[key] = BanEntry(ban_time=ban.ban_time, duration=ban.duration)
+
+    def apply_level(self, level: LevelUser, deleted: bool):
+        key = (level.user_id, level.group_id)
+        if deleted:
+            self.levels.pop(key, None)
+        else:
+            self.levels[key] = level.user_level
+
+    def discard(self, method: str, values: dict[str, Any]):
+        """移除缓存键对应的记录，按缓存键重新读取前清除旧数据
+
+        参数:
+            method: 对应的 apply 方法名
+            values: 缓存键字段值
+        """
+        if method == "apply_plugin":
+            self.plugins.pop(values["module"], None)
+        elif method == "apply_bot":
+            self.bots.pop(values["bot_id"], None)
+        elif method == "apply_group":
+            if not values["channel_id"]:
+                self.groups.pop(values["group_id"], None)
+        else:
+            target = self.bans if method == "apply_ban" else self.levels
+            target.pop((values["user_id"], values["group_id"]), None)
+
+
+class AuthSnapshot:
+    """权限快照"""
+
+    version: ClassVar[int] = 0
+    """快照版本，每次数据变更或重建时递增"""
+    is_ready: ClassVar[bool] = False
+    """是否完成首次加载"""
+    last_load_time: ClassVar[float] = 0
+
+    SOURCES: ClassVar[dict[str, tuple[type[Model], str]]] = {
+        CacheType.PLUGINS: (PluginInfo, "apply_plugin"),
+        CacheType.BOT: (BotConsole, "apply_bot"),
+        CacheType.GROUPS: (GroupConsole, "apply_group"),
+        CacheType.BAN: (BanConsole, "apply_ban"),
+        CacheType.LEVEL: (LevelUser, "apply_level"),
+    }
+    """快照数据对应的缓存类型，值为模型与索引的 apply 方法名"""
+
+    _index: ClassVar[AuthIndex] = AuthIndex()
+    _loading: ClassVar[bool] = False
+    _stale: ClassVar[bool] = False
+    _pending: ClassVar[list[tuple[str, Any, bool]]] = []
+    _reload_task: ClassVar[asyncio.Task | None] = None
+    _sync_tasks: ClassVar[set[asyncio.Task]] = set()
+
+    @classmethod
+    def is_enabled(cls) -> bool:
+        """快照是否可用于权限检查"""
+        return cls.is_ready and bool(Config.get_config("hook", "AUTH_SNAPSHOT"))
+
+    @classmethod
+    def _apply(cls, method: str, instance: Any, deleted: bool):
+        getattr(cls._index, method)(instance, deleted)
+        if cls._loading:
+            # 重建期间的变更需要在新索引上重放，避免被旧数据覆盖
+            cls._pending.append((method, instance, deleted))
+        cls.version += 1
+
+    @classmethod
+    def invalidate(cls):
+        """标记快照失效并在后台全量重建，重建完成前继续使用旧索引"""
+        cls._stale = True
+        cls.version += 1
+        if not cls._loading:
+            cls._reload_task = asyncio.create_task(cls.load())
+
+    @classmethod
+    def _on_cache_invalidate(
+        cls, cache_type: str | None, cache_key: str | None, remote: bool
+    ):
+        """缓存失效监听
+
+        本进程的单条失效已由数据变更监听器增量更新，只处理整个类型的失效；
+        其他进程的单条失效重新读取对应的记录
+        """
+        if cache_type is not None and cache_type not in cls.SOURCES:
+            return
+        if cache_type is None or cache_key is None:
+            cls.invalidate()
+        elif remote:
+            task = asyncio.create_task(cls.reload_key(cache_type, cache_key))
+            cls._sync_tasks.add(task)
+            task.add_done_callback(cls._sync_tasks.discard)
+
+    @classmethod
+    async def reload_key(cls, cache_type: str, cache_key: str):
+        """从数据库重新读取缓存键对应的记录，用于同步其他进程的修改
+
+        参数:
+            cache_type: 缓存类型
+            cache_key: 完整缓存键
+        """
+        model, method = cls.SOURCES[cache_type]
+        key = cache_key.partition(CACHE_KEY_SEPARATOR)[2]
+        key_field = model.get_cache_key_field()
+        if isinstance(key_field, str):
+            candidates = [{key_field: key}]
+        else:
+            # 复合键以分隔符拼接，字段值中可能包含分隔符，尝试所有拆分方式
+            parts = key.split(COMPOSITE_KEY_SEPARATOR)
+            candidates = [
+                {
+                    key_field[0]: COMPOSITE_KEY_SEPARATOR.join(parts[:i]) or None,
+                    key_field[1]: COMPOSITE_KEY_SEPARATOR.join(parts[i:]) or None,
+                }
+                for i in range(1, len(parts))
+            ]
+        if not candidates:
+            return
+        query = Q(*(_key_filter(values) for values in candidates), join_type=Q.OR)
+        try:
+            rows = [
+                row
+                for row in await model.filter(query).all()
+                if model.get_cache_key(row) == key
+            ]
+        except Exception as e:
+            logger.warning(
+                f"重新读取权限数据 {cache_key} 失败，全量重建", LOGGER_COMMAND, e=e
+            )
+            cls.invalidate()
+            return
+        if cls._loading:
+            # 正在重建的索引可能读取了旧数据，重新读取
+            cls._stale = True
+            return
+        for values in candidates:
+            cls._index.discard(method, values)
+        for row in rows:
+            getattr(cls._index, method)(row, False)
+        cls.version += 1
+
+    @classmethod
+    async def load(cls):
+        """全量重建快照"""
+        if cls._loading:
+            return
+        start_time = time.time()
+        cls._loading = True
+        try:
+            for _ in range(MAX_LOAD_ROUNDS):
+                cls._stale = False
+                cls._pending = []
+                index = AuthIndex()
+                for plugin in await PluginInfo.all():
+                    index.apply_plugin(plugin, False)
+                for bot in await BotConsole.all():
+                    index.apply_bot(bot, False)
+                for group in await GroupConsole.filter(channel_id__isnull=True).all():
+                    index.apply_group(group, False)
+                for ban in await BanConsole.all():
+                    index.apply_ban(ban, False)
+                for level in await LevelUser.all():
+                    index.apply_level(level, False)
+                if not cls._stale:
+                    break
+                # 重建期间数据被批量修改，已读取的数据可能是旧的，重新读取
+            else:
+                # 数据持续变化时使用最后一次读取的数据，由定时重建兜底
+                logger.debug("权限快照重建期间数据持续变化", LOGGER_COMMAND)
+            for method, instance, deleted in cls._pending:
+                getattr(index, method)(instance, deleted)
+            cls._index = index
+            cls.version += 1
+            cls.is_ready = True
+            cls.last_load_time = time.time()
+            logger.debug(
+                f"权限快照重建完成 v{cls.version}, 插件: {len(index.plugins)},"
+                f" 群组: {len(index.groups)}, 耗时: {time.time() - start_time:.3f}s",
+                LOGGER_COMMAND,
+            )
+        except Exception as e:
+            logger.error("权限快照重建失败", LOGGER_COMMAND, e=e)
+        finally:
+            cls._loading = False
+            cls._pending = []
+
+    @classmethod
+    def get_plugin(cls, module: str) -> PluginInfo | None:
+        return cls._index.plugins.get(module)
+
+    @classmethod
+    def get_ban_time(cls, user_id: str, group_id: str | None) -> int:
+        """与 auth_ban.is_ban 一致的ban剩余时间计算
+
+        返回:
+            int: ban的剩余时间，-1为永久，0表示未被ban
+        """
+        bans = cls._index.bans
+        max_ban_time = 0
+        records = [bans.get((user_id, None))]
+        if group_id:
+            records.append(bans.get((user_id, group_id)))
+        for record in records:
+            if record and (record.duration > 0 or record.duration == -1):
+                ban_time = calculate_ban_time(record)  # type: ignore
+                if ban_time == -1:
+                    return -1
+                max_ban_time = max(max_ban_time, ban_time)
+        return max_ban_time
+
+    @classmethod
+    def decide(
+        cls,
+        module: str,
+        bot_id: str,
+        user_id: str,
+        group_id: str | None,
+        text: str = "",
+        superusers: Container[str] = (),
+        user_gold: int | None = None,
+        check_ban: bool = True,
+    ) -> AuthDecision:
+        """纯内存权限判定，顺序与 auth_checker 各项检查一致，返回第一个阻断结果
+
+        参数:
+            module: 插件模块名
+            bot_id: bot id
+            user_id: 用户id
+            group_id: 群组id
+            text: 消息纯文本
+            superusers: 超级用户
+            user_gold: 用户金币，插件无需金币时可为None
+            check_ban: 是否进行ban检查
+
+        返回:
+            AuthDecision: 判定结果
+        """
+        index = cls._index
+        plugin = index.plugins.get(module)
+        if not plugin:
+            return AuthDecision(
+                AuthAction.EXEMPT, f"插件:{module} 数据不存在，已跳过权限检查..."
+            )
+        name = f"{plugin.name}({plugin.module})"
+        if plugin.plugin_type == PluginType.HIDDEN:
+            return AuthDecision(
+                AuthAction.EXEMPT,
+                f"插件: {plugin.name}:{plugin.module} 为HIDDEN，已跳过权限检查...",
+                plugin,
+            )
+        if (user_gold or 0) < plugin.cost_gold:
+            return AuthDecision(
+                AuthAction.SKIP, f"{name} 金币限制...", plugin, notice=AuthNotice.COST
+            )
+        is_superuser = user_id in superusers
+        if is_superuser and (
+            plugin.plugin_type == PluginType.SUPERUSER or not plugin.limit_superuser
+        ):
+            return AuthDecision(AuthAction.SUPERUSER, plugin=plugin)
+        cost_gold = plugin.cost_gold
+
+        if check_ban and not is_superuser:
+            if ban_time := cls.get_ban_time(user_id, group_id):
+                return AuthDecision(
+                    AuthAction.SKIP,
+                    "用户处于黑名单中...",
+                    plugin,
+                    notice=AuthNotice.BAN,
+                    ban_time=ban_time,
+                )
+
+        bot = index.bots.get(bot_id)
+        if not bot or not bot.status:
+            return AuthDecision(AuthAction.SKIP, "Bot不存在或休眠中阻断权限检测...")
+        if plugin.module in bot.block_plugins:
+            return AuthDecision(
+                AuthAction.SKIP, f"Bot插件 {name} 权限检查结果为关闭...", plugin
+            )
+
+        group = None
+        if group_id:
+            group = index.groups.get(group_id)
+            if not group:
+                return AuthDecision(AuthAction.SKIP, "群组信息不存在...", plugin)
+            if group.level < 0:
+                return AuthDecision(
+                    AuthAction.SKIP, "群组黑名单, 目标群组群权限权限-1...", plugin
+                )
+            if text.strip() != SwitchEnum.ENABLE and not group.status:
+                return AuthDecision(AuthAction.SKIP, "群组休眠状态...", plugin)
+            if plugin.level > group.level:
+                return AuthDecision(
+                    AuthAction.SKIP,
+                    f"{name} 群等级限制，该功能需要的群等级: {plugin.level}...",
+                    plugin,
+                )
+
+        if plugin.admin_level:
+            global_level = index.levels.get((user_id, None))
+            group_level = index.levels.get((user_id, group_id)) if group_id else None
+            if group_level is not None:
+                if max(global_level or 0, group_level) < plugin.admin_level:
+                    return AuthDecision(
+                        AuthAction.SKIP,
+                        f"{name} 管理员权限不足...",
+                        plugin,
+                        notice=AuthNotice.ADMIN_GROUP,
+                    )
+            elif global_level is not None and global_level < plugin.admin_level:
+                return AuthDecision(
+                    AuthAction.SKIP,
+                    f"{name} 管理员权限不足...",
+                    plugin,
+                    notice=AuthNotice.ADMIN_GLOBAL,
+                )
+
+        if group:
+            if plugin.module in group.superuser_block_plugins:
+                return AuthDecision(
+                    AuthAction.SKIP,
+                    f"{name} 超级管理员禁用了该群此功能...",
+                    plugin,
+                    notice=AuthNotice.GROUP_SUPERUSER_BLOCK,
+                )
+            if plugin.module in group.block_plugins:
+                return AuthDecision(
+                    AuthAction.SKIP,
+                    f"{name} 未开启此功能...",
+                    plugin,
+                    notice=AuthNotice.GROUP_BLOCK,
+                )
+            if plugin.block_type == BlockType.GROUP:
+                return AuthDecision(
+                    AuthAction.SKIP,
+                    f"{name}该插件在群组中已被禁用...",
+                    plugin,
+                    notice=AuthNotice.GROUP_BLOCK_TYPE,
+                )
+        elif plugin.block_type == BlockType.PRIVATE:
+            return AuthDecision(
+                AuthAction.SKIP,
+                f"{name} 该插件在私聊中已被禁用...",
+                plugin,
+                notice=AuthNotice.PRIVATE_BLOCK_TYPE,
+            )
+
+        if not plugin.status and plugin.block_type == BlockType.ALL:
+            if group and group.is_super:
+                return AuthDecision(
+                    AuthAction.SUPERUSER, plugin=plugin, cost_gold=cost_gold
+                )
+            return AuthDecision(
+                AuthAction.SKIP,
+                f"{name} 全局未开启此功能...",
+                plugin,
+                notice=AuthNotice.GLOBAL_BLOCK,
+            )
+        return AuthDecision(AuthAction.PASS, plugin=plugin, cost_gold=cost_gold)
+
+
+async def send_auth_notice(
+    decision: AuthDecision, session: Uninfo, entity: EntityIDs, is_poke: bool
+):
+    """发送判定结果对应的提示消息，提示频率限制与各项检查保持一致
+
+    参数:
+        decision: 判定结果
+        session: Uninfo
+        entity: 实体ID信息
+        is_poke: 是否为戳一戳
+    """
+    plugin = decision.plugin
+    notice = decision.notice
+    if not plugin or not notice:
+        return
+    if notice == AuthNotice.COST:
+        await send_message(session, f"金币不足..该功能需要{plugin.cost_gold}金币..")
+    elif notice == AuthNotice.BAN:
+        time_str = format_time(decision.ban_time)
+        ban_result = Config.get_config("hook", "BAN_RESULT")
+        if (
+            not plugin.ignore_prompt
+            and decision.ban_time != -1
+            and ban_result
+            and freq.is_send_limit_message(plugin, entity.user_id, False)
+        ):
+            await send_message(
+                session,
+                [
+                    At(flag="user", target=entity.user_id),
+                    f"{ban_result}\n在..在 {time_str} 后才会理你喔",
+                ],
+                entity.user_id,
+            )
+    elif notice == AuthNotice.ADMIN_GROUP:
+        await send_message(
+            session,
+            [
+                At(flag="user", target=entity.user_id),
+                f"你的权限不足喔，该功能需要的权限等级: {plugin.admin_level}",
+            ],
+            entity.user_id,
+        )
+    elif notice == AuthNotice.ADMIN_GLOBAL:
+        await send_message(
+            session, f"你的权限不足喔，该功能需要的权限等级: {plugin.admin_level}"
+        )
+    elif notice == AuthNotice.PRIVATE_BLOCK_TYPE:
+        if freq.is_send_limit_message(plugin, entity.user_id, is_poke):
+            await send_message(session, "该功能在私聊中已被禁用...")
+    else:
+        sid = entity.group_id or entity.user_id
+        message = {
+            AuthNotice.GROUP_SUPERUSER_BLOCK: "超级管理员禁用了该群此功能...",
+            AuthNotice.GROUP_BLOCK: "该群未开启此功能...",
+            AuthNotice.GROUP_BLOCK_TYPE: "该功能在群组中已被禁用...",
+            AuthNotice.GLOBAL_BLOCK: "全局未开启此功能...",
+        }[notice]
+        if freq.is_send_limit_message(plugin, sid, is_poke):
+            await send_message(session, message, sid)
+
+
+PluginInfo.add_change_listener(
+    lambda instance, deleted: AuthSnapshot._apply("apply_plugin", instance, deleted)
+)
+BotConsole.add_change_listener(
+    lambda instance, deleted: AuthSnapshot._apply("apply_bot", instance, deleted)
+)
+GroupConsole.add_change_listener(
+    lambda instance, deleted: AuthSnapshot._apply("apply_group", instance, deleted)
+)
+BanConsole.add_change_listener(
+    lambda instance, deleted: AuthSnapshot._apply("apply_ban", instance, deleted)
+)
+LevelUser.add_change_listener(
+    lambda instance, deleted: AuthSnapshot._apply("apply_level", instance, deleted)
+)
+CacheRoot.add_invalidate_listener(AuthSnapshot._on_cache_invalidate)
+
+
+@PriorityLifecycle.on_startup(priority=6)
+async def _():
+    """插件数据初始化完成后加载权限快照"""
+    await AuthSnapshot.load()
+
+
+@scheduler.scheduled_job(
+    "interval",
+    seconds=SNAPSHOT_REFRESH_INTERVAL,
+)
+async def _():
+    await AuthSnapshot.load()
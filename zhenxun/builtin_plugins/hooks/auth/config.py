@@ -14,3 +14,5 @@ class SwitchEnum(StrEnum):
 
 
 WARNING_THRESHOLD = 0.5  # 警告阈值（秒）
+
+SNAPSHOT_REFRESH_INTERVAL = 300  # 权限快照全量重建间隔（秒）
@@ -18,12 +18,18 @@ from zhenxun.utils.platform import PlatformUtils
 from zhenxun.utils.utils import get_entity_ids
 
 from .auth.auth_admin import auth_admin
-from .auth.auth_ban import auth_ban
+from .auth.auth_ban import auth_ban, check_plugin_type
 from .auth.auth_bot import auth_bot
 from .auth.auth_cost import auth_cost
 from .auth.auth_group import auth_group
 from .auth.auth_limit import LimitManager, auth_limit
 from .auth.auth_plugin import auth_plugin
+from .auth.auth_snapshot import (
+    AuthAction,
+    AuthNotice,
+    AuthSnapshot,
+    send_auth_notice,
+)
 from .auth.bot_filter import bot_filter
 from .auth.config import LOGGER_COMMAND, WARNING_THRESHOLD
 from .auth.exception import (
@@ -31,6 +37,7 @@ from .auth.exception import (
     PermissionExemption,
     SkipPluginException,
 )
+from .auth.utils import is_poke
 
 # 超时设置（秒）
 TIMEOUT_SECONDS = 5.0
@@ -139,6 +146,8 @@ async def get_plugin_and_user(
         plugin, user = await with_timeout(
             asyncio.gather(plugin_task, user_task), name="get_plugin_and_user"
         )
+    except IntegrityError as e:
+        raise PermissionExemption("重复创建用户，已跳过该次权限检查...") from e
     except asyncio.TimeoutError:
         # 如果并行查询超时，尝试串行查询
         logger.warning("并行查询超时，尝试串行查询", LOGGER_COMMAND)
@@ -155,13 +164,6 @@ async def get_plugin_and_user(
         raise PermissionExemption(
             f"插件: {plugin.name}:{plugin.module} 为HIDDEN，已跳过权限检查..."
         )
-    user = None
-    try:
-        user = await user_dao.get_by_func_or_none(
-            UserConsole.get_user, False, user_id=user_id
-        )
-    except IntegrityError as e:
-        raise PermissionExemption("重复创建用户，已跳过该次权限检查...") from e
     if not user:
         raise PermissionExemption("用户数据不存在，已跳过权限检查...")
     return plugin, user
@@ -250,6 +252,91 @@ async def time_hook(coro, name, time_dict):
             time_dict[name] = f"{time.time() - start:.3f}s"
 
 
+async def auth_by_snapshot(
+    matcher: Matcher,
+    event: Event,
+    bot: Bot,
+    session: Uninfo,
+    message: UniMsg,
+    hook_times: dict,
+) -> int:
+    """基于权限快照的权限检查，判定本身为纯内存计算
+
+    参数:
+        matcher: matcher
+        event: Event
+        bot: bot
+        session: Uninfo
+        message: UniMsg
+        hook_times: 各项耗时记录
+
+    异常:
+        PermissionExemption: 跳过权限检查
+        IsSuperuserException: 超级用户
+        SkipPluginException: 阻断
+
+    返回:
+        int: 调用插件金币费用
+    """
+    entity = get_entity_ids(session)
+    module = matcher.plugin_name or ""
+    user_gold = None
+    plugin = AuthSnapshot.get_plugin(module)
+    if plugin and plugin.cost_gold > 0:
+        # 仅在插件需要金币时才查询用户数据
+        user_start = time.time()
+        user_dao = DataAccess(UserConsole)
+        try:
+            user = await with_timeout(
+                user_dao.get_by_func_or_none(
+                    UserConsole.get_user, False, user_id=entity.user_id
+                ),
+                name="get_user",
+            )
+        except IntegrityError as e:
+            raise PermissionExemption("重复创建用户，已跳过该次权限检查...") from e
+        except asyncio.TimeoutError:
+            raise PermissionExemption("获取用户数据超时，请稍后再试...")
+        if not user:
+            raise PermissionExemption("用户数据不存在，已跳过权限检查...")
+        user_gold = user.gold
+        hook_times["get_user"] = f"{time.time() - user_start:.3f}s"
+
+    decide_start = time.time()
+    decision = AuthSnapshot.decide(
+        module,
+        bot.self_id,
+        entity.user_id,
+        entity.group_id,
+        message.extract_plain_text(),
+        bot.config.superusers,
+        user_gold,
+        check_plugin_type(matcher),
+    )
+    hook_times["snapshot_decide"] = f"{time.time() - decide_start:.6f}s"
+
+    if decision.action == AuthAction.EXEMPT:
+        raise PermissionExemption(decision.reason)
+    if decision.action == AuthAction.SUPERUSER and not decision.cost_gold:
+        raise IsSuperuserException()
+    if decision.notice == AuthNotice.COST:
+        await send_auth_notice(decision, session, entity, False)
+        raise SkipPluginException(decision.reason)
+
+    bot_filter(session)
+
+    if decision.action == AuthAction.SKIP:
+        if decision.notice:
+            await send_auth_notice(decision, session, entity, is_poke(event))
+        raise SkipPluginException(decision.reason)
+    if decision.action == AuthAction.SUPERUSER:
+        logger.debug("超级用户指定群跳过权限检测...", LOGGER_COMMAND, session=session)
+        return decision.cost_gold
+    if decision.plugin:
+        await time_hook(auth_limit(decision.plugin, session), "auth_limit", hook_times)
+    return decision.cost_gold
+
+
 async def auth(
     matcher: Matcher,
     event: Event,
@@ -280,66 +367,80 @@ async def auth(
         if not module:
             raise PermissionExemption("Matcher插件名称不存在...")
 
-        # 获取插件和用户数据
-        plugin_user_start = time.time()
-        try:
-            plugin, user = await with_timeout(
-                get_plugin_and_user(module, entity.user_id), name="get_plugin_and_user"
-            )
-            hook_times["get_plugin_user"] = f"{time.time() - plugin_user_start:.3f}s"
-        except asyncio.TimeoutError:
-            logger.error(
-                f"获取插件和用户数据超时，模块: {module}",
-                LOGGER_COMMAND,
-                session=session,
-            )
-            raise PermissionExemption("获取插件和用户数据超时，请稍后再试...")
-
-        # 获取插件费用
-        cost_start = time.time()
-        try:
-            cost_gold = await with_timeout(
-                get_plugin_cost(bot, user, plugin, session), name="get_plugin_cost"
-            )
-            hook_times["cost_gold"] = f"{time.time() - cost_start:.3f}s"
-        except asyncio.TimeoutError:
-            logger.error(
-                f"获取插件费用超时，模块: {module}", LOGGER_COMMAND, session=session
-            )
-            # 继续执行，不阻止权限检查
-
-        # 执行 bot_filter
-        bot_filter(session)
-
-        # 并行执行所有 hook 检查，并记录执行时间
-        hooks_start = time.time()
-
-        # 创建所有 hook 任务
-        hook_tasks = [
-            time_hook(auth_ban(matcher, bot, session), "auth_ban", hook_times),
-            time_hook(auth_bot(plugin, bot.self_id), "auth_bot", hook_times),
-            time_hook(auth_group(plugin, entity, message), "auth_group", hook_times),
-            time_hook(auth_admin(plugin, session), "auth_admin", hook_times),
-            time_hook(auth_plugin(plugin, session, event), "auth_plugin", hook_times),
-            time_hook(auth_limit(plugin, session), "auth_limit", hook_times),
-        ]
-
-        # 使用 gather 并行执行所有 hook，但添加总体超时控制
-        try:
-            await with_timeout(
-                asyncio.gather(*hook_tasks),
-                timeout=TIMEOUT_SECONDS * 2,  # 给总体执行更多时间
-                name="auth_hooks_gather",
+        if AuthSnapshot.is_enabled():
+            hooks_start = time.time()
+            cost_gold = await auth_by_snapshot(
+                matcher, event, bot, session, message, hook_times
             )
-        except asyncio.TimeoutError:
-            logger.error(
-                f"权限检查 hooks 总体执行超时，模块: {module}",
-                LOGGER_COMMAND,
-                session=session,
-            )
-            # 不抛出异常，允许继续执行
-
-        hooks_time = time.time() - hooks_start
+            hooks_time = time.time() - hooks_start
+        else:
+            # 获取插件和用户数据
+            plugin_user_start = time.time()
+            try:
+                plugin, user = await with_timeout(
+                    get_plugin_and_user(module, entity.user_id),
+                    name="get_plugin_and_user",
+                )
+                hook_times["get_plugin_user"] = (
+                    f"{time.time() - plugin_user_start:.3f}s"
+                )
+            except asyncio.TimeoutError:
+                logger.error(
+                    f"获取插件和用户数据超时，模块: {module}",
+                    LOGGER_COMMAND,
+                    session=session,
+                )
+                raise PermissionExemption("获取插件和用户数据超时，请稍后再试...")
+
+            # 获取插件费用
+            cost_start = time.time()
+            try:
+                cost_gold = await with_timeout(
+                    get_plugin_cost(bot, user, plugin, session), name="get_plugin_cost"
+                )
+                hook_times["cost_gold"] = f"{time.time() - cost_start:.3f}s"
+            except asyncio.TimeoutError:
+                logger.error(
+                    f"获取插件费用超时，模块: {module}", LOGGER_COMMAND, session=session
+                )
+                # 继续执行，不阻止权限检查
+
+            # 执行 bot_filter
+            bot_filter(session)
+
+            # 并行执行所有 hook 检查，并记录执行时间
+            hooks_start = time.time()
+
+            # 创建所有 hook 任务
+            hook_tasks = [
+                time_hook(auth_ban(matcher, bot, session), "auth_ban", hook_times),
+                time_hook(auth_bot(plugin, bot.self_id), "auth_bot", hook_times),
+                time_hook(
+                    auth_group(plugin, entity, message), "auth_group", hook_times
+                ),
+                time_hook(auth_admin(plugin, session), "auth_admin", hook_times),
+                time_hook(
+                    auth_plugin(plugin, session, event), "auth_plugin", hook_times
+                ),
+                time_hook(auth_limit(plugin, session), "auth_limit", hook_times),
+            ]
+
+            # 使用 gather 并行执行所有 hook，但添加总体超时控制
+            try:
+                await with_timeout(
+                    asyncio.gather(*hook_tasks),
+                    timeout=TIMEOUT_SECONDS * 2,  # 给总体执行更多时间
+                    name="auth_hooks_gather",
+                )
+            except asyncio.TimeoutError:
+                logger.error(
+                    f"权限检查 hooks 总体执行超时，模块: {module}",
+                    LOGGER_COMMAND,
+                    session=session,
+                )
+                # 不抛出异常，允许继续执行
+
+            hooks_time = time.time() - hooks_start
 
     except SkipPluginException as e:
         LimitManager.unblock(module, entity.user_id, entity.group_id, entity.channel_id)
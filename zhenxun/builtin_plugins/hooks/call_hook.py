@@ -4,6 +4,7 @@ from nonebot.adapters import Bot, Message
 
 from zhenxun.configs.config import Config
 from zhenxun.models.bot_message_store import BotMessageStore
+from zhenxun.services.ingest import IngestPipeline
 from zhenxun.services.log import logger
 from zhenxun.utils.enum import BotSentType
 from zhenxun.utils.manager.message_manager import MessageManager
@@ -11,6 +12,15 @@ from zhenxun.utils.platform import PlatformUtils
 
 LOG_COMMAND = "MessageHook"
 
+bot_message_pipeline = IngestPipeline(
+    "bot_message_store",
+    BotMessageStore,
+    ("bot_id", "user_id", "group_id", "sent_type", "text", "plain_text", "platform"),
+    max_size=5000,
+    batch_size=200,
+    flush_interval=10,
+)
+
 
 def replace_message(message: Message) -> str:
     """将消息中的at、image、record、face替换为字符串
@@ -21,23 +31,23 @@ def replace_message(message: Message) -> str:
     返回:
         str: 文本消息
     """
-    result = ""
+    if isinstance(message, str):
+        return message
+    result = []
     for msg in message:
         if isinstance(msg, str):
-            result += msg
+            result.append(msg)
         elif msg.type == "at":
-            result += f"@{msg.data['qq']}"
+            result.append(f"@{msg.data['qq']}")
         elif msg.type == "image":
-            result += "[image]"
+            result.append("[image]")
         elif msg.type == "record":
-            result += "[record]"
+            result.append("[record]")
         elif msg.type == "face":
-            result += f"[face:{msg.data['id']}]"
-        elif msg.type == "reply":
-            result += ""
-        else:
-            result += str(msg)
-    return result
+            result.append(f"[face:{msg.data['id']}]")
+        elif msg.type != "reply":
+            result.append(str(msg))
+    return "".join(result)
 
 
 @Bot.on_called_api
@@ -56,7 +66,8 @@ async def handle_api_result(
         if user_id and message_id:
             MessageManager.add(str(user_id), str(message_id))
             logger.debug(
-                f"收集消息id，user_id: {user_id}, msg_id: {message_id}", LOG_COMMAND
+                lambda: f"收集消息id，user_id: {user_id}, msg_id: {message_id}",
+                LOG_COMMAND,
             )
     except Exception as e:
         logger.warning(
@@ -65,20 +76,20 @@ async def handle_api_result(
     if not Config.get_config("hook", "RECORD_BOT_SENT_MESSAGES"):
         return
     try:
-        await BotMessageStore.create(
-            bot_id=bot.self_id,
-            user_id=user_id,
-            group_id=group_id,
-            sent_type=BotSentType.GROUP
-            if message_type == "group"
-            else BotSentType.PRIVATE,
-            text=replace_message(message),
-            plain_text=message.extract_plain_text()
-            if isinstance(message, Message)
-            else replace_message(message),
-            platform=PlatformUtils.get_platform(bot),
+        text = replace_message(message)
+        # 在调用API的流程中执行，队列已满时不等待，避免拖慢消息发送
+        bot_message_pipeline.put_nowait(
+            (
+                bot.self_id,
+                user_id,
+                group_id,
+                BotSentType.GROUP if message_type == "group" else BotSentType.PRIVATE,
+                text,
+                message.extract_plain_text() if isinstance(message, Message) else text,
+                PlatformUtils.get_platform(bot),
+            )
         )
-        logger.debug(f"消息发送记录，message: {message}")
+        logger.debug(lambda: f"消息发送记录，message: {text}", LOG_COMMAND)
     except Exception as e:
         logger.warning(
             f"消息发送记录发生错误...data: {data}, result: {result}",
@@ -9,6 +9,7 @@ from zhenxun.models.bot_console import BotConsole
 from zhenxun.models.group_console import GroupConsole
 from zhenxun.models.level_user import LevelUser
 from zhenxun.models.plugin_info import PluginInfo
+from zhenxun.models.plugin_limit import PluginLimit
 from zhenxun.models.user_console import UserConsole
 from zhenxun.services.cache import CacheRegistry, cache_config
 from zhenxun.services.cache.config import CacheMode
@@ -27,6 +28,7 @@ def register_cache_types():
         CacheType.LEVEL, LevelUser, key_format="{user_id}_{group_id}"
     )
     CacheRegistry.register(CacheType.BAN, BanConsole, key_format="{user_id}_{group_id}")
+    CacheRegistry.register(CacheType.LIMIT, PluginLimit)
 
     if cache_config.cache_mode == CacheMode.NONE:
         logger.info("缓存功能已禁用，将直接从数据库获取数据")
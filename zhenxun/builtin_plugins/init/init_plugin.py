@@ -1,4 +1,6 @@
-import asyncio
+import hashlib
+import time
+from typing import Any
 
 import aiofiles
 import nonebot
@@ -14,9 +16,11 @@ from zhenxun.models.group_console import GroupConsole
 from zhenxun.models.plugin_info import PluginInfo
 from zhenxun.models.plugin_limit import PluginLimit
 from zhenxun.models.task_info import TaskInfo
+from zhenxun.services.cache import CacheRoot
 from zhenxun.services.log import logger
 from zhenxun.utils.enum import (
     BlockType,
+    CacheType,
     LimitCheckType,
     LimitWatchType,
     PluginLimitType,
@@ -98,73 +102,76 @@ async def _handle_setting(
         )
 
 
+SYNC_FIELDS = (
+    "name",
+    "author",
+    "version",
+    "admin_level",
+    "plugin_type",
+    "is_show",
+)
+"""启动时由插件元数据覆盖的字段"""
+
+sync_metrics: dict[str, Any] = {}
+"""最近一次启动同步的统计"""
+
+
+def get_metadata_hash(plugin: PluginInfo) -> str:
+    """计算插件元数据指纹
+
+    参数:
+        plugin: PluginInfo
+
+    返回:
+        str: 指纹
+    """
+    data = [str(getattr(plugin, field)) for field in SYNC_FIELDS]
+    return hashlib.sha256(json.dumps(data).encode()).hexdigest()
+
+
+async def sync_plugin_info(plugin_list: list[PluginInfo]) -> tuple[int, int]:
+    """同步插件元数据，只写入新增与元数据指纹变化的插件
+
+    参数:
+        plugin_list: 由插件元数据生成的插件信息
+
+    返回:
+        tuple[int, int]: 新增数量，更新数量
+    """
+    module2hash = dict(
+        await PluginInfo.all().values_list("module_path", "metadata_hash")
+    )
+    upsert_list = []
+    for plugin in plugin_list:
+        plugin.metadata_hash = get_metadata_hash(plugin)
+        if module2hash.get(plugin.module_path, "") != plugin.metadata_hash:
+            upsert_list.append(plugin)
+    if upsert_list:
+        # 新插件插入，已存在的插件只更新元数据字段
+        await PluginInfo.bulk_create(
+            upsert_list,
+            50,
+            on_conflict=["module_path"],
+            update_fields=[*SYNC_FIELDS, "metadata_hash"],
+        )
+        await CacheRoot.invalidate_cache(CacheType.PLUGINS)
+    created = sum(p.module_path not in module2hash for p in upsert_list)
+    return created, len(upsert_list) - created
+
+
 @PriorityLifecycle.on_startup(priority=5)
 async def _():
     """
     初始化插件数据配置
     """
+    start = time.perf_counter()
     plugin_list: list[PluginInfo] = []
     limit_list: list[PluginLimit] = []
-    module2id = {}
     load_plugin = []
-    if module_list := await PluginInfo.all().values("id", "module_path"):
-        module2id = {m["module_path"]: m["id"] for m in module_list}
     for plugin in get_loaded_plugins():
         load_plugin.append(plugin.module_name)
         await _handle_setting(plugin, plugin_list, limit_list)
-    create_list = []
-    update_list = []
-    update_task_list = []
-    for plugin in plugin_list:
-        if plugin.module_path not in module2id:
-            create_list.append(plugin)
-        else:
-            plugin.id = module2id[plugin.module_path]
-            update_task_list.append(
-                plugin.save(
-                    update_fields=[
-                        "name",
-                        "author",
-                        "version",
-                        "admin_level",
-                        "plugin_type",
-                        "is_show",
-                    ]
-                )
-            )
-            update_list.append(plugin)
-    if create_list:
-        await PluginInfo.bulk_create(create_list, 10)
-    if update_task_list:
-        await asyncio.gather(*update_task_list)
-    # if update_list:
-    #     # TODO: 批量更新无法更新plugin_type: tortoise.exceptions.OperationalError:
-    #           column "superuser" does not exist
-    #     pass
-    # await PluginInfo.bulk_update(
-    #     update_list,
-    #     ["name", "author", "version", "admin_level", "plugin_type"],
-    #     10,
-    # )
-    # for limit in limit_list:
-    #     limit_create = []
-    #     plugins = []
-    #     if module_path_list := [limit.module_path for limit in limit_list]:
-    #         plugins = await PluginInfo.get_plugins(module_path__in=module_path_list)
-    #     if plugins:
-    #         for limit in limit_list:
-    #             if lmt := [p for p in plugins if p.module_path == limit.module_path]:
-    #                 plugin = lmt[0]
-    #                 """不在数据库中"""
-    #                 limit_type_list = [
-    #                     _limit.limit_type
-    #                     for _limit in await plugin.plugin_limit.all()  # type: ignore
-    #                 ]
-    #                 if limit.limit_type not in limit_type_list:
-    #                     limit.plugin = plugin
-    #                     limit_create.append(limit)
-    #     if limit_create:
-    #         await PluginLimit.bulk_create(limit_create, 10)
+    created, updated = await sync_plugin_info(plugin_list)
     await data_migration()
     await PluginInfo.filter(module_path__in=load_plugin).update(load_status=True)
     await PluginInfo.filter(module_path__not_in=load_plugin).update(load_status=False)
@@ -175,7 +182,21 @@ async def _():
                 """不存在，添加"""
                 manager.add(limit.module, limit)
     manager.save_file()
-    await manager.load_to_db()
+    limit_changed = await manager.load_to_db()
+    sync_metrics.update(
+        total=len(plugin_list),
+        created=created,
+        updated=updated,
+        unchanged=len(plugin_list) - created - updated,
+        limit_changed=limit_changed,
+        cost=round((time.perf_counter() - start) * 1000, 2),
+    )
+    logger.info(
+        f"插件数据同步完成，共 {len(plugin_list)} 个插件，新增 {created} 个，"
+        f"更新 {updated} 个，"
+        f"限制变更 {limit_changed} 条，耗时 {sync_metrics['cost']}ms",
+        "初始化插件数据",
+    )
 
 
 async def data_migration():
@@ -1,4 +1,5 @@
 from copy import deepcopy
+from io import StringIO
 
 from ruamel.yaml import YAML
 
@@ -13,6 +14,15 @@ _yaml = YAML(pure=True)
 _yaml.indent = 2
 _yaml.allow_unicode = True
 
+LIMIT_UPDATE_FIELDS = (
+    "status",
+    "check_type",
+    "watch_type",
+    "result",
+    "cd",
+    "max_count",
+)
+"""由配置文件覆盖的限制字段"""
 
 CD_TEST = """需要cd的功能
 自定义的功能需要cd也可以在此配置
@@ -193,13 +203,17 @@ class Manager:
             file = self.cd_file
         elif type_ == "PluginCountLimit":
             file = self.count_file
-        with open(file, "w", encoding="utf8") as f:
-            _yaml.dump({type_: temp_data}, f)
-        with open(file, encoding="utf8") as rf:
-            _data = _yaml.load(rf)
+        buffer = StringIO()
+        _yaml.dump({type_: temp_data}, buffer)
+        _data = _yaml.load(buffer.getvalue())
         _data.yaml_set_comment_before_after_key(after=after, key=type_)
-        with open(file, "w", encoding="utf8") as wf:
-            _yaml.dump(_data, wf)
+        buffer = StringIO()
+        _yaml.dump(_data, buffer)
+        content = buffer.getvalue()
+        # 内容未变化时不重写文件
+        if file.exists() and file.read_text(encoding="utf8") == content:
+            return
+        file.write_text(content, encoding="utf8")
 
     def __load_cd_file(self):
         self.cd_data: dict[str, PluginCdBlock] = {}
@@ -296,6 +310,10 @@ class Manager:
             db_data.max_count = limit.max_count  # type: ignore
         return db_data, False
 
+    @staticmethod
+    def __get_values(limit: PluginLimit) -> tuple:
+        return tuple(getattr(limit, field) for field in LIMIT_UPDATE_FIELDS)
+
     def __get_file_data(self, limit_type: PluginLimitType) -> dict:
         """获取文件数据
 
@@ -348,12 +366,13 @@ class Manager:
                         )
                     continue
                 db_data = [limit for limit in db_type_limits if limit.module == k]
+                old_values = self.__get_values(db_data[0]) if db_data else None
                 db_data, is_create = self.__set_data(
                     k, db_data[0] if db_data else None, v, limit_type, module2plugin
                 )
                 if is_create:
                     create_list.append(db_data)
-                else:
+                elif self.__get_values(db_data) != old_values:
                     update_list.append(db_data)
         else:
             delete_list = [limit.id for limit in db_type_limits]
@@ -389,24 +408,19 @@ class Manager:
         all_delete = delete_list + delete_list1 + delete_list2
         return all_create, all_update, all_delete
 
-    async def load_to_db(self):
-        """读取配置文件"""
+    async def load_to_db(self) -> int:
+        """读取配置文件，只写入有变化的限制
+
+        返回:
+            int: 新增、修改与删除的限制数量
+        """
 
         create_list, update_list, delete_list = await self.__set_all_limit()
         if create_list:
             await PluginLimit.bulk_create(create_list)
         if update_list:
             for limit in update_list:
-                await limit.save(
-                    update_fields=[
-                        "status",
-                        "check_type",
-                        "watch_type",
-                        "result",
-                        "cd",
-                        "max_count",
-                    ]
-                )
+                await limit.save(update_fields=list(LIMIT_UPDATE_FIELDS))
             # TODO: tortoise.exceptions.OperationalError:syntax error at or near "GROUP"
             # await PluginLimit.bulk_update(
             #     update_list,
@@ -416,6 +430,7 @@ class Manager:
             await PluginLimit.filter(id__in=delete_list).delete()
         cnt = await PluginLimit.filter(status=True).count()
         logger.info(f"已经加载 {cnt} 个插件限制.")
+        return len(create_list) + len(update_list) + len(delete_list)
 
 
 manager = Manager()
@@ -47,6 +47,9 @@ __plugin_meta__ = PluginMetadata(
 
     llm reset-key <ProviderName> [--key <api_key>]
       - 重置提供商的所有或指定API Key的失败状态。
+
+    llm stats
+      - 查看LLM任务调度与各提供商的排队情况。
     """,
     extra=PluginExtraData(
         author="HibiKier",
@@ -71,6 +74,7 @@ llm_cmd = on_alconna(
             Option("--key", Args["api_key", str], help_text="指定要重置的API Key"),
             help_text="重置API Key状态",
         ),
+        Subcommand("stats", help_text="查看任务调度统计"),
         Option("--all", action=store_true, help_text="显示所有条目"),
     ),
     permission=SUPERUSER,
@@ -169,3 +173,12 @@ async def handle_reset_key(
 
     success, message = await DataSource.reset_key(provider_name.result, key_to_reset)
     await llm_cmd.finish(message)
+
+
+@llm_cmd.assign("stats")
+async def handle_stats(arp: Arparma):
+    """处理 'llm stats' 命令"""
+    logger.info("查看LLM任务调度统计", command="LLM Manage", session=arp.header_result)
+    stats = await DataSource.get_scheduler_stats()
+    image = await Presenters.format_scheduler_stats_as_image(stats)
+    await llm_cmd.finish(MessageUtils.build_message(image))
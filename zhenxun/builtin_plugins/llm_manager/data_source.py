@@ -103,6 +103,19 @@ class DataSource:
 
         return sorted_stats_list
 
+    @staticmethod
+    async def get_scheduler_stats() -> dict[str, Any]:
+        """获取LLM任务调度与各提供商的排队统计"""
+        from zhenxun.services.llm.core import provider_scheduler
+        from zhenxun.services.llm.manager import get_configured_providers
+        from zhenxun.services.llm.scheduler import LLMJobScheduler
+
+        providers = {}
+        for provider in get_configured_providers():
+            if stats := provider_scheduler.get_stats(provider.name):
+                providers[provider.name] = stats
+        return {"jobs": LLMJobScheduler.get_stats(), "providers": providers}
+
     @staticmethod
     async def reset_key(provider_name: str, api_key: str | None) -> tuple[bool, str]:
         """重置API Key状态"""
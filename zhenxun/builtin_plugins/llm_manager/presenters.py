@@ -144,6 +144,7 @@ class Presenters:
             "总调用",
             "成功率",
             "平均延迟(s)",
+            "并发",
             "上次错误",
             "建议操作",
         ]
@@ -178,6 +179,12 @@ class Presenters:
             avg_latency = key_info["avg_latency"]
             avg_latency_text = f"{avg_latency / 1000:.2f}" if avg_latency > 0 else "N/A"
 
+            concurrency_text = (
+                f"{key_info['in_flight']}/{key_info['concurrency_limit']}"
+                if "concurrency_limit" in key_info
+                else "-"
+            )
+
             last_error = key_info.get("last_error") or "-"
             if len(last_error) > 25:
                 last_error = last_error[:22] + "..."
@@ -189,6 +196,7 @@ class Presenters:
                     total_calls_text,
                     success_rate_text,
                     avg_latency_text,
+                    concurrency_text,
                     last_error,
                     key_info["suggested_action"],
                 ]
@@ -202,3 +210,59 @@ class Presenters:
             text_style=_status_row_style,
             column_space=15,
         )
+
+    @staticmethod
+    async def format_scheduler_stats_as_image(stats: dict[str, Any]) -> BuildImage:
+        """将任务调度统计格式化为表格图片"""
+        jobs = stats["jobs"]
+        priority_names = {
+            "interactive": "交互",
+            "background": "后台",
+            "batch": "批量",
+        }
+        column_name = [
+            "类型",
+            "执行中",
+            "排队中",
+            "已完成",
+            "已取消",
+            "超时",
+            "平均等待(ms)",
+            "最长等待(ms)",
+        ]
+        data_list = [
+            [
+                f"任务-{priority_names.get(priority, priority)}",
+                item["running"],
+                item["queued"],
+                item["completed"],
+                item["cancelled"],
+                item["expired"],
+                f"{item['avg_wait']:.0f}",
+                f"{item['max_wait']:.0f}",
+            ]
+            for priority, item in jobs["priorities"].items()
+        ]
+        data_list.extend(
+            [
+                f"提供商-{name}",
+                f"{item['in_flight']}/{item['limit']}",
+                item["queue_depth"],
+                "-",
+                "-",
+                item["timeouts"],
+                "-",
+                "-",
+            ]
+            for name, item in stats["providers"].items()
+        )
+        return await ImageTemplate.table_page(
+            head_text="📊 LLM任务调度",
+            tip_text=(
+                f"执行中 {jobs['running']}/{jobs['max_running']}，"
+                f"排队中 {jobs['queued']}"
+            ),
+            column_name=column_name,
+            data_list=data_list,
+            column_space=15,
+        )
@@ -1,5 +1,9 @@
+import asyncio
+from collections.abc import Callable
+from dataclasses import dataclass, field
 from pathlib import Path
 import shutil
+from subprocess import CalledProcessError
 
 from aiocache import cached
 import ujson as json
@@ -10,7 +14,7 @@ from zhenxun.models.plugin_info import PluginInfo
 from zhenxun.services.log import logger
 from zhenxun.services.plugin_init import PluginInitManager
 from zhenxun.utils.github_utils import GithubUtils
-from zhenxun.utils.github_utils.models import RepoAPI
+from zhenxun.utils.github_utils.models import RepoInfo
 from zhenxun.utils.http_utils import AsyncHttpx
 from zhenxun.utils.image_utils import BuildImage, ImageTemplate, RowStyle
 from zhenxun.utils.manager.virtual_env_package_manager import VirtualEnvPackageManager
@@ -40,14 +44,49 @@ def row_style(column: str, text: str) -> RowStyle:
     return style
 
 
-def install_requirement(plugin_path: Path):
-    requirement_files = ["requirement.txt", "requirements.txt"]
-    requirement_paths = [plugin_path / file for file in requirement_files]
+def find_requirement(plugin_path: Path) -> Path | None:
+    """获取插件目录下的依赖文件
 
-    if existing_requirements := next(
-        (path for path in requirement_paths if path.exists()), None
-    ):
-        VirtualEnvPackageManager.install_requirement(existing_requirements)
+    参数:
+        plugin_path: 插件目录
+
+    返回:
+        Path | None: 依赖文件路径
+    """
+    requirement_files = ["requirement.txt", "requirements.txt"]
+    return next(
+        (
+            path
+            for path in (plugin_path / file for file in requirement_files)
+            if path.exists()
+        ),
+        None,
+    )
+
+
+@dataclass(eq=False)
+class InstallTask:
+    """插件安装任务，按对象区分，可作为字典键"""
+
+    name: str
+    """插件名称"""
+    github_url: str
+    """仓库地址"""
+    module_path: str
+    """模块路径"""
+    is_dir: bool
+    """是否为文件夹插件"""
+    is_external: bool = False
+    """是否为扩展仓库插件"""
+    repo_info: RepoInfo | None = None
+    files: list[str] = field(default_factory=list)
+    """需要下载的仓库文件"""
+    base_path: Path = BASE_PATH
+    """下载根目录"""
+    plugin_path: Path = BASE_PATH
+    """插件目录"""
+    error: str | None = None
+    """失败原因"""
 
 
 class StoreManager:
@@ -228,16 +267,30 @@ class StoreManager:
         is_dir: bool,
         is_external: bool = False,
     ):
-        repo_api: RepoAPI
-        repo_info = GithubUtils.parse_github_url(github_url)
+        task = InstallTask(module_path, github_url, module_path, is_dir, is_external)
+        await cls.install_plugins([task])
+        if task.error:
+            raise Exception(task.error)
+        return True
+
+    @classmethod
+    async def _resolve_task(cls, task: InstallTask):
+        """获取插件需要下载的文件
+
+        参数:
+            task: 安装任务
+        """
+        repo_info = GithubUtils.parse_github_url(task.github_url)
         if await repo_info.update_repo_commit():
             logger.info(f"获取最新提交: {repo_info.branch}", LOG_COMMAND)
         else:
             logger.warning(f"获取最新提交失败: {repo_info}", LOG_COMMAND)
         logger.debug(f"成功获取仓库信息: {repo_info}", LOG_COMMAND)
         for repo_api in GithubUtils.iter_api_strategies():
+            # 并发解析多个仓库时不能共用策略实例上的仓库数据
+            strategy = type(repo_api.strategy)()
             try:
-                await repo_api.parse_repo_info(repo_info)
+                strategy.body = await strategy.parse_repo_info(repo_info)
                 break
             except Exception as e:
                 logger.warning(
@@ -248,51 +301,135 @@ class StoreManager:
                 continue
         else:
             raise ValueError("所有API获取插件文件失败，请检查网络连接")
-        if module_path == ".":
-            module_path = ""
+        module_path = "" if task.module_path == "." else task.module_path
         replace_module_path = module_path.replace(".", "/")
-        files = repo_api.get_files(
-            module_path=replace_module_path + ("" if is_dir else ".py"),
-            is_dir=is_dir,
+        files = strategy.get_files(
+            module_path=replace_module_path + ("" if task.is_dir else ".py"),
+            is_dir=task.is_dir,
         )
-        download_urls = [await repo_info.get_raw_download_urls(file) for file in files]
-        base_path = BASE_PATH / "plugins" if is_external else BASE_PATH
-        base_path = base_path if module_path else base_path / repo_info.repo
-        download_paths: list[Path | str] = [base_path / file for file in files]
-        logger.debug(f"插件下载路径: {download_paths}", LOG_COMMAND)
-        result = await AsyncHttpx.gather_download_file(download_urls, download_paths)
-        for _id, success in enumerate(result):
-            if not success:
-                break
-        else:
-            # 安装依赖
-            plugin_path = base_path / "/".join(module_path.split("."))
+        if not files:
+            raise ValueError(f"仓库中未找到插件文件: {task.module_path}")
+        for req_file in (REQ_TXT_FILE_STRING, "requirement.txt"):
             try:
-                req_files = repo_api.get_files(
-                    f"{replace_module_path}/{REQ_TXT_FILE_STRING}", False
-                )
-                req_files.extend(
-                    repo_api.get_files(f"{replace_module_path}/requirement.txt", False)
-                )
-                logger.debug(f"获取插件依赖文件列表: {req_files}", LOG_COMMAND)
-                req_download_urls = [
-                    await repo_info.get_raw_download_urls(file) for file in req_files
-                ]
-                req_paths: list[Path | str] = [plugin_path / file for file in req_files]
-                logger.debug(f"插件依赖文件下载路径: {req_paths}", LOG_COMMAND)
-                if req_files:
-                    result = await AsyncHttpx.gather_download_file(
-                        req_download_urls, req_paths
+                files.extend(
+                    file
+                    for file in strategy.get_files(
+                        f"{replace_module_path}/{req_file}", False
                     )
-                    for success in result:
-                        if not success:
-                            raise Exception("插件依赖文件下载失败")
-                    logger.debug(f"插件依赖文件列表: {req_paths}", LOG_COMMAND)
-                    install_requirement(plugin_path)
+                    if file not in files
+                )
             except ValueError as e:
                 logger.warning("未获取到依赖文件路径...", e=e)
-            return True
-        raise Exception("插件下载失败...")
+        base_path = BASE_PATH / "plugins" if task.is_external else BASE_PATH
+        task.repo_info = repo_info
+        task.files = files
+        task.base_path = base_path if module_path else base_path / repo_info.repo
+        task.plugin_path = task.base_path / replace_module_path
+
+    @classmethod
+    async def _install_requirements(
+        cls, requirements: dict[InstallTask, Path], progress: Callable[..., None]
+    ):
+        """安装插件依赖，合并安装失败时逐个插件安装以定位失败的插件
+
+        参数:
+            requirements: 安装任务与其依赖文件
+            progress: 进度回调
+        """
+        logger.debug(f"插件依赖文件列表: {list(requirements.values())}", LOG_COMMAND)
+        try:
+            await asyncio.to_thread(
+                VirtualEnvPackageManager.install_requirement,
+                list(requirements.values()),
+                check=True,
+            )
+        except (CalledProcessError, OSError) as e:
+            if len(requirements) == 1:
+                task = next(iter(requirements))
+                task.error = f"依赖安装失败: {getattr(e, 'stderr', None) or e}"
+                progress(task, "依赖安装失败")
+                return
+            logger.warning("合并安装插件依赖失败，逐个插件安装依赖", LOG_COMMAND)
+        else:
+            for task in requirements:
+                progress(task, "依赖安装完成")
+            return
+        for task, path in requirements.items():
+            try:
+                await asyncio.to_thread(
+                    VirtualEnvPackageManager.install_requirement, path, check=True
+                )
+            except (CalledProcessError, OSError) as e:
+                task.error = f"依赖安装失败: {getattr(e, 'stderr', None) or e}"
+                progress(task, "依赖安装失败")
+            else:
+                progress(task, "依赖安装完成")
+
+    @classmethod
+    async def install_plugins(cls, tasks: list[InstallTask]) -> list[InstallTask]:
+        """批量安装插件
+
+        说明:
+            并发获取所有插件的仓库文件，所有文件在一次批量下载中完成，
+            下载成功的插件的依赖文件合并为一次安装并在线程中执行，
+            合并安装失败时逐个插件安装，只有依赖安装失败的插件记为失败
+
+        参数:
+            tasks: 安装任务，结果写入各任务的 error
+
+        返回:
+            list[InstallTask]: 安装任务
+        """
+        total = len(tasks)
+        index = {task: i for i, task in enumerate(tasks, 1)}
+
+        def progress(task: InstallTask, stage: str):
+            prefix = f"[{index[task]}/{total}] 插件 {task.name}"
+            if task.error:
+                logger.warning(f"{prefix} {stage}: {task.error}", LOG_COMMAND)
+            else:
+                logger.info(f"{prefix} {stage}", LOG_COMMAND)
+
+        async def _resolve(task: InstallTask):
+            try:
+                await cls._resolve_task(task)
+            except Exception as e:
+                logger.error(f"获取插件 {task.name} 文件失败", LOG_COMMAND, e=e)
+                task.error = str(e)
+                progress(task, "获取文件失败")
+            else:
+                progress(task, f"获取文件完成，共 {len(task.files)} 个文件")
+
+        await asyncio.gather(*(_resolve(task) for task in tasks))
+
+        owners: list[InstallTask] = []
+        download_urls: list[list[str]] = []
+        download_paths: list[Path | str] = []
+        for task in tasks:
+            if task.error or not task.repo_info:
+                continue
+            for file in task.files:
+                owners.append(task)
+                download_urls.append(await task.repo_info.get_raw_download_urls(file))
+                download_paths.append(task.base_path / file)
+        logger.debug(f"插件下载路径: {download_paths}", LOG_COMMAND)
+        result = await AsyncHttpx.gather_download_file(download_urls, download_paths)
+        for task, success in zip(owners, result):
+            if not success:
+                task.error = "插件下载失败..."
+        for task in dict.fromkeys(owners):
+            progress(task, "下载失败" if task.error else "下载完成")
+
+        if requirements := {
+            task: path
+            for task in tasks
+            if not task.error and (path := find_requirement(task.plugin_path))
+        }:
+            await cls._install_requirements(requirements, progress)
+
+        for task in tasks:
+            progress(task, "安装失败" if task.error else "安装完成")
+        return tasks
 
     @classmethod
     async def remove_plugin(cls, plugin_id: str) -> str:
@@ -422,49 +559,40 @@ class StoreManager:
         """
         plugin_list: list[StorePluginInfo] = await cls.get_data()
         plugin_name_list = [p.name for p in plugin_list]
-        update_failed_list = []
-        update_success_list = []
         result = "--已更新{}个插件 {}个失败 {}个成功--"
         logger.info(f"尝试更新全部插件 {plugin_name_list}", LOG_COMMAND)
+        db_plugin_list = await cls.get_loaded_plugins("module", "version")
+        suc_plugin = {p[0]: (p[1] or "Unknown") for p in db_plugin_list}
+        tasks = []
         for plugin_info in plugin_list:
-            try:
-                db_plugin_list = await cls.get_loaded_plugins("module", "version")
-                suc_plugin = {p[0]: (p[1] or "Unknown") for p in db_plugin_list}
-                if plugin_info.module not in [p[0] for p in db_plugin_list]:
-                    logger.debug(
-                        f"插件 {plugin_info.name}({plugin_info.module}) 未安装，跳过",
-                        LOG_COMMAND,
-                    )
-                    continue
-                if cls.check_version_is_new(plugin_info, suc_plugin):
-                    logger.debug(
-                        f"插件 {plugin_info.name}({plugin_info.module}) "
-                        "已是最新版本，跳过",
-                        LOG_COMMAND,
-                    )
-                    continue
-                logger.info(
-                    f"正在更新插件 {plugin_info.name}({plugin_info.module})",
+            if plugin_info.module not in suc_plugin:
+                logger.debug(
+                    f"插件 {plugin_info.name}({plugin_info.module}) 未安装，跳过",
+                    LOG_COMMAND,
+                )
+                continue
+            if cls.check_version_is_new(plugin_info, suc_plugin):
+                logger.debug(
+                    f"插件 {plugin_info.name}({plugin_info.module}) 已是最新版本，跳过",
                     LOG_COMMAND,
                 )
-                is_external = True
-                if plugin_info.github_url is None:
-                    plugin_info.github_url = DEFAULT_GITHUB_URL
-                    is_external = False
-                await cls.install_plugin_with_repo(
-                    plugin_info.github_url,
+                continue
+            logger.info(
+                f"正在更新插件 {plugin_info.name}({plugin_info.module})",
+                LOG_COMMAND,
+            )
+            tasks.append(
+                InstallTask(
+                    plugin_info.name,
+                    plugin_info.github_url or DEFAULT_GITHUB_URL,
                     plugin_info.module_path,
                     plugin_info.is_dir,
-                    is_external,
-                )
-                update_success_list.append(plugin_info.name)
-            except Exception as e:
-                logger.error(
-                    f"更新插件 {plugin_info.name}({plugin_info.module}) 失败",
-                    LOG_COMMAND,
-                    e=e,
+                    plugin_info.github_url is not None,
                 )
-                update_failed_list.append(plugin_info.name)
+            )
+        await cls.install_plugins(tasks)
+        update_success_list = [task.name for task in tasks if not task.error]
+        update_failed_list = [task.name for task in tasks if task.error]
         if not update_success_list and not update_failed_list:
             return "全部插件已是最新版本"
         if update_success_list:
@@ -22,6 +22,7 @@ from zhenxun.models.user_props_log import UserPropsLog
 from zhenxun.services.log import logger
 from zhenxun.utils.enum import GoldHandle, PropHandle
 from zhenxun.utils.image_utils import BuildImage, ImageTemplate
+from zhenxun.utils.manager.leaderboard_manager import LeaderboardManager
 from zhenxun.utils.platform import PlatformUtils
 
 from .config import ICON_PATH, PLATFORM_PATH, base_config
@@ -94,22 +95,16 @@ class ShopParam(BaseModel):
 async def gold_rank(
     session: Uninfo, group_id: str | None, num: int
 ) -> BuildImage | str:
-    query = UserConsole
-    if group_id:
-        uid_list = await GroupInfoUser.filter(group_id=group_id).values_list(
-            "user_id", flat=True
-        )
-        if uid_list:
-            query = query.filter(user_id__in=uid_list)
-    user_list = await query.annotate().order_by("-gold").values_list("user_id", "gold")
+    if group_id and not await GroupInfoUser.exists(group_id=group_id):
+        group_id = None
+    user_list, index = await LeaderboardManager.get_rank(
+        LeaderboardManager.GOLD, session.user.id, num, group_id
+    )
     if not user_list:
         return "当前还没有人拥有金币哦..."
-    user_id_list = [user[0] for user in user_list]
-    if session.user.id in user_id_list:
-        index = user_id_list.index(session.user.id) + 1
-    else:
+    if index is None:
         index = "-1（未统计）"
-    user_list = user_list[:num] if num < len(user_list) else user_list
+    user_id_list = [user[0] for user in user_list]
     friend_user = await FriendUser.filter(user_id__in=user_id_list).values_list(
         "user_id", "user_name"
     )
@@ -121,21 +116,23 @@ async def gold_rank(
         for g in group_user:
             uid2name[g[0]] = g[1]
     column_name = ["排名", "-", "名称", "金币", "平台"]
-    data_list = []
     platform = PlatformUtils.get_platform(session)
-    for i, user in enumerate(user_list):
-        ava_bytes = await PlatformUtils.get_user_avatar(
-            user[0], platform, session.self_id
-        )
-        data_list.append(
-            [
-                f"{i + 1}",
-                (ava_bytes, 30, 30) if platform == "qq" else "",
-                uid2name.get(user[0]),
-                user[1],
-                (PLATFORM_PATH.get(platform), 30, 30),
-            ]
+    avatar_list = await asyncio.gather(
+        *(
+            PlatformUtils.get_user_avatar(uid, platform, session.self_id)
+            for uid in user_id_list
         )
+    )
+    data_list = [
+        [
+            f"{i + 1}",
+            (ava_bytes, 30, 30) if platform == "qq" else "",
+            uid2name.get(user[0]),
+            int(user[1]),
+            (PLATFORM_PATH.get(platform), 30, 30),
+        ]
+        for i, (user, ava_bytes) in enumerate(zip(user_list, avatar_list))
+    ]
     if group_id:
         title = "金币群组内排行"
         tip = f"你的排名在本群第 {index} 位哦!"
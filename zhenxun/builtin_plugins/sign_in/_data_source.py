@@ -1,3 +1,4 @@
+import asyncio
 from datetime import datetime
 from pathlib import Path
 import random
@@ -14,6 +15,7 @@ from zhenxun.models.sign_user import SignUser
 from zhenxun.models.user_console import UserConsole
 from zhenxun.services.log import logger
 from zhenxun.utils.image_utils import BuildImage, ImageTemplate
+from zhenxun.utils.manager.leaderboard_manager import LeaderboardManager
 from zhenxun.utils.platform import PlatformUtils
 
 from ._random_event import random_event
@@ -44,26 +46,22 @@ class SignManage:
         返回:
             BuildImage: 构造图片
         """
-        query = SignUser
-        if group_id:
-            user_list = await GroupInfoUser.filter(group_id=group_id).values_list(
-                "user_id", flat=True
-            )
-            if user_list:
-                query = query.filter(user_id__in=user_list)
-        user_list = (
-            await query.annotate()
-            .order_by("-impression")
-            .values_list("user_id", "impression", "sign_count", "platform")
+        if group_id and not await GroupInfoUser.exists(group_id=group_id):
+            group_id = None
+        rank_list, index = await LeaderboardManager.get_rank(
+            LeaderboardManager.IMPRESSION, session.user.id, num, group_id
         )
-        if not user_list:
+        if not rank_list:
             return "当前还没有人签到过哦..."
-        user_id_list = [user[0] for user in user_list]
-        if session.user.id in user_id_list:
-            index = user_id_list.index(session.user.id) + 1
-        else:
+        if index is None:
             index = "-1（未统计）"
-        user_list = user_list[:num] if num < len(user_list) else user_list
+        user_id_list = [user[0] for user in rank_list]
+        uid2info = {
+            user[0]: user[1:]
+            for user in await SignUser.filter(user_id__in=user_id_list).values_list(
+                "user_id", "sign_count", "platform"
+            )
+        }
         column_name = ["排名", "-", "名称", "好感度", "签到次数", "平台"]
         friend_list = await FriendUser.filter(user_id__in=user_id_list).values_list(
             "user_id", "user_name"
@@ -75,20 +73,24 @@ class SignManage:
             )
             for g in group_user:
                 uid2name[g[0]] = g[1]
-        data_list = []
         platform = PlatformUtils.get_platform(session)
-        for i, user in enumerate(user_list):
-            bytes = await PlatformUtils.get_user_avatar(
-                user[0], platform, session.self_id
+        avatar_list = await asyncio.gather(
+            *(
+                PlatformUtils.get_user_avatar(uid, platform, session.self_id)
+                for uid in user_id_list
             )
+        )
+        data_list = []
+        for i, ((uid, impression), avatar) in enumerate(zip(rank_list, avatar_list)):
+            sign_count, user_platform = uid2info.get(uid, (0, None))
             data_list.append(
                 [
                     f"{i + 1}",
-                    (bytes, 30, 30) if user[3] == "qq" else "",
-                    uid2name.get(user[0]),
-                    user[1],
-                    user[2],
-                    (PLATFORM_PATH.get(user[3]), 30, 30),
+                    (avatar, 30, 30) if user_platform == "qq" else "",
+                    uid2name.get(uid),
+                    round(impression, 3),
+                    sign_count,
+                    (PLATFORM_PATH.get(user_platform), 30, 30),  # type: ignore
                 ]
             )
         if group_id:
@@ -4,6 +4,7 @@ from zhenxun.models.group_console import GroupConsole
 from zhenxun.models.group_member_info import GroupInfoUser
 from zhenxun.models.plugin_info import PluginInfo
 from zhenxun.models.statistics import Statistics
+from zhenxun.models.statistics_rollup import StatisticsRollup
 from zhenxun.utils.echart_utils import ChartUtils
 from zhenxun.utils.echart_utils.models import Barh
 from zhenxun.utils.enum import PluginType
@@ -61,16 +62,20 @@ class StatisticsManage:
     async def get_global_statistics(
         cls, plugin_name: str | None, day: int | None, title: str
     ) -> BuildImage | str:
-        query = Statistics
-        if plugin_name:
-            query = query.filter(plugin_name=plugin_name)
-        if day:
-            query = query.filter(create_time__gte=TimeUtils.get_day_start())
-        data_list = (
-            await query.annotate(count=Count("id"))
-            .group_by("plugin_name")
-            .values_list("plugin_name", "count")
-        )
+        if StatisticsRollup.ready:
+            filters = {"plugin_name": plugin_name} if plugin_name else {}
+            data_list = await cls.__get_rollup_data(day, **filters)
+        else:
+            query = Statistics
+            if plugin_name:
+                query = query.filter(plugin_name=plugin_name)
+            if day:
+                query = query.filter(create_time__gte=TimeUtils.get_day_start())
+            data_list = (
+                await query.annotate(count=Count("id"))
+                .group_by("plugin_name")
+                .values_list("plugin_name", "count")
+            )
         return (
             await cls.__build_image(data_list, title)
             if data_list
@@ -81,16 +86,20 @@ class StatisticsManage:
     async def get_my_statistics(
         cls, user_id: str, group_id: str | None, day: int | None, title: str
     ):
-        query = Statistics.filter(user_id=user_id)
-        if group_id:
-            query = query.filter(group_id=group_id)
-        if day:
-            query = query.filter(create_time__gte=TimeUtils.get_day_start())
-        data_list = (
-            await query.annotate(count=Count("id"))
-            .group_by("plugin_name")
-            .values_list("plugin_name", "count")
-        )
+        if StatisticsRollup.ready:
+            filters = {"group_id": group_id} if group_id else {}
+            data_list = await cls.__get_rollup_data(day, user_id=user_id, **filters)
+        else:
+            query = Statistics.filter(user_id=user_id)
+            if group_id:
+                query = query.filter(group_id=group_id)
+            if day:
+                query = query.filter(create_time__gte=TimeUtils.get_day_start())
+            data_list = (
+                await query.annotate(count=Count("id"))
+                .group_by("plugin_name")
+                .values_list("plugin_name", "count")
+            )
         return (
             await cls.__build_image(data_list, title)
             if data_list
@@ -99,20 +108,41 @@ class StatisticsManage:
 
     @classmethod
     async def get_group_statistics(cls, group_id: str, day: int | None, title: str):
-        query = Statistics.filter(group_id=group_id)
-        if day:
-            query = query.filter(create_time__gte=TimeUtils.get_day_start())
-        data_list = (
-            await query.annotate(count=Count("id"))
-            .group_by("plugin_name")
-            .values_list("plugin_name", "count")
-        )
+        if StatisticsRollup.ready:
+            data_list = await cls.__get_rollup_data(day, group_id=group_id)
+        else:
+            query = Statistics.filter(group_id=group_id)
+            if day:
+                query = query.filter(create_time__gte=TimeUtils.get_day_start())
+            data_list = (
+                await query.annotate(count=Count("id"))
+                .group_by("plugin_name")
+                .values_list("plugin_name", "count")
+            )
         return (
             await cls.__build_image(data_list, title)
             if data_list
             else "统计数据为空..."
         )
 
+    @classmethod
+    async def __get_rollup_data(
+        cls, day: int | None, **filters
+    ) -> list[tuple[str, int]]:
+        """从汇总表获取各插件调用次数
+
+        参数:
+            day: 是否只统计今日
+            **filters: 筛选条件
+
+        返回:
+            list[tuple[str, int]]: 插件模块名与调用次数
+        """
+        start = TimeUtils.get_day_start() if day else None
+        return await StatisticsRollup.top(
+            StatisticsRollup.CALL, "plugin_name", start, **filters
+        )
+
     @classmethod
     async def __build_image(cls, data_list: list[tuple[str, int]], title: str):
         module2count = {x[0]: x[1] for x in data_list}
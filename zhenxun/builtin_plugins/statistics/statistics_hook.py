@@ -1,18 +1,17 @@
-from datetime import datetime
-
 from nonebot.adapters import Bot, Event
 from nonebot.adapters.onebot.v11 import PokeNotifyEvent
 from nonebot.matcher import Matcher
 from nonebot.message import run_postprocessor
 from nonebot.plugin import PluginMetadata
-from nonebot_plugin_apscheduler import scheduler
 from nonebot_plugin_session import EventSession
 
 from zhenxun.configs.utils import PluginExtraData
 from zhenxun.models.plugin_info import PluginInfo
 from zhenxun.models.statistics import Statistics
+from zhenxun.services.ingest import IngestPipeline
 from zhenxun.services.log import logger
 from zhenxun.utils.enum import PluginType
+from zhenxun.utils.manager.rollup_manager import RollupManager
 
 __plugin_meta__ = PluginMetadata(
     name="功能调用统计",
@@ -23,7 +22,10 @@ __plugin_meta__ = PluginMetadata(
     ).to_dict(),
 )
 
-TEMP_LIST = []
+statistics_pipeline = IngestPipeline(
+    "statistics", Statistics, ("user_id", "group_id", "plugin_name", "bot_id")
+)
+statistics_pipeline.add_flush_listener(RollupManager.on_call_flush, transactional=True)
 
 
 @run_postprocessor
@@ -42,24 +44,11 @@ async def _(
         plugin_type = plugin.plugin_type if plugin else None
         if plugin_type == PluginType.NORMAL:
             logger.debug(f"提交调用记录: {matcher.plugin_name}...", session=session)
-            TEMP_LIST.append(
-                Statistics(
-                    user_id=session.id1,
-                    group_id=session.id3 or session.id2,
-                    plugin_name=matcher.plugin_name,
-                    create_time=datetime.now(),
-                    bot_id=bot.self_id,
+            await statistics_pipeline.put(
+                (
+                    session.id1,
+                    session.id3 or session.id2,
+                    matcher.plugin_name,
+                    bot.self_id,
                 )
             )
-
-
-@scheduler.scheduled_job("interval", minutes=1, max_instances=5)
-async def _():
-    try:
-        call_list = TEMP_LIST.copy()
-        TEMP_LIST.clear()
-        if call_list:
-            await Statistics.bulk_create(call_list)
-        logger.debug(f"批量添加调用记录 {len(call_list)} 条", "定时任务")
-    except Exception as e:
-        logger.error("定时批量添加调用记录", "定时任务", e=e)
@@ -39,8 +39,6 @@ from .message_processor import (
     send_broadcast_and_notify,
 )
 
-BROADCAST_SEND_DELAY_RANGE = (1, 3)
-
 __plugin_meta__ = PluginMetadata(
     name="广播",
     description="昭告天下！",
@@ -1,5 +1,4 @@
 import asyncio
-import random
 import traceback
 from typing import ClassVar
 
@@ -12,12 +11,21 @@ from nonebot_plugin_session import EventSession
 
 from zhenxun.models.group_console import GroupConsole
 from zhenxun.services.log import logger
+from zhenxun.utils.broadcast import (
+    BroadcastLane,
+    BroadcastScheduler,
+    ProgressFunc,
+    SendFunc,
+)
 from zhenxun.utils.common_utils import CommonUtils
 from zhenxun.utils.platform import PlatformUtils
 
 from .models import BroadcastDetailResult, BroadcastResult
 from .utils import custom_nodes_to_v11_nodes, uni_message_to_v11_list_of_dicts
 
+PROGRESS_INTERVAL = 30
+"""广播进度通知间隔（秒）"""
+
 
 class BroadcastManager:
     """广播管理器"""
@@ -102,8 +110,20 @@ class BroadcastManager:
         message: UniMessage,
         target_groups: list[GroupConsole],
         session_info: EventSession | str | None = None,
+        on_progress: ProgressFunc | None = None,
     ) -> BroadcastResult:
-        """发送广播到指定群组"""
+        """发送广播到指定群组
+
+        参数:
+            bot: Bot
+            message: 广播消息
+            target_groups: 目标群组
+            session_info: 会话信息
+            on_progress: 进度回调，广播期间定时调用
+
+        返回:
+            BroadcastResult: 成功数与失败数
+        """
         log_session = session_info or bot.self_id
         logger.debug(
             f"开始广播，目标 {len(target_groups)} 个群组，Bot ID: {bot.self_id}",
@@ -165,7 +185,7 @@ class BroadcastManager:
                 )
                 return 0, len(target_groups)
             success_count, error_count, skip_count = await cls._broadcast_forward(
-                bot, log_session, target_groups, v11_nodes
+                bot, log_session, target_groups, v11_nodes, on_progress
             )
         else:
             if is_forward_broadcast:
@@ -175,7 +195,7 @@ class BroadcastManager:
                     session=log_session,
                 )
             success_count, error_count, skip_count = await cls._broadcast_normal(
-                bot, log_session, target_groups, message
+                bot, log_session, target_groups, message, on_progress
             )
 
         total = len(target_groups)
@@ -297,6 +317,21 @@ class BroadcastManager:
 
         return True
 
+    @classmethod
+    async def _run_scheduler(
+        cls,
+        bot: Bot,
+        group_list: list[GroupConsole],
+        send_func: SendFunc,
+        on_progress: ProgressFunc | None = None,
+    ) -> BroadcastDetailResult:
+        """使用广播调度器发送，按配置限速并在失败时重试"""
+        lane = BroadcastLane(bot, PlatformUtils.get_platform(bot), group_list)
+        progress = await BroadcastScheduler(
+            send_func, "广播", PROGRESS_INTERVAL, on_progress
+        ).run([lane])
+        return progress.success, progress.failed, progress.skipped
+
     @classmethod
     async def _broadcast_forward(
         cls,
@@ -304,54 +339,28 @@ class BroadcastManager:
         session_info: EventSession | str,
         group_list: list[GroupConsole],
         v11_nodes: list[dict],
+        on_progress: ProgressFunc | None = None,
     ) -> BroadcastDetailResult:
         """发送合并转发"""
-        success_count = 0
-        error_count = 0
-        skip_count = 0
-
-        for _, group in enumerate(group_list):
-            group_key = group.group_id or group.channel_id
 
+        async def send_func(bot: V11Bot, group: GroupConsole) -> bool:
             if not await cls._check_group_availability(bot, group):
-                skip_count += 1
-                continue
-
-            try:
-                result = await bot.send_group_forward_msg(
-                    group_id=int(group.group_id), messages=v11_nodes
-                )
-
-                logger.debug(
-                    f"合并转发消息发送结果: {result}, 类型: {type(result)}",
-                    "广播",
-                    session=session_info,
-                )
-
-                await cls._extract_message_id_from_result(
-                    result, group_key, session_info, "合并转发"
-                )
-
-                success_count += 1
-                await asyncio.sleep(random.randint(1, 3))
-            except ActionFailed as af_e:
-                error_count += 1
-                logger.error(
-                    f"发送失败(合并转发) to {group_key}: {af_e}",
-                    "广播",
-                    session=session_info,
-                    e=af_e,
-                )
-            except Exception as e:
-                error_count += 1
-                logger.error(
-                    f"发送失败(合并转发) to {group_key}: {e}",
-                    "广播",
-                    session=session_info,
-                    e=e,
-                )
+                return False
+            group_key = group.group_id or group.channel_id
+            result = await bot.send_group_forward_msg(
+                group_id=int(group.group_id), messages=v11_nodes
+            )
+            logger.debug(
+                f"合并转发消息发送结果: {result}, 类型: {type(result)}",
+                "广播",
+                session=session_info,
+            )
+            await cls._extract_message_id_from_result(
+                result, group_key, session_info, "合并转发"
+            )
+            return True
 
-        return success_count, error_count, skip_count
+        return await cls._run_scheduler(bot, group_list, send_func, on_progress)
 
     @classmethod
     async def _broadcast_normal(
@@ -360,58 +369,36 @@ class BroadcastManager:
         session_info: EventSession | str,
         group_list: list[GroupConsole],
         message: UniMessage,
+        on_progress: ProgressFunc | None = None,
     ) -> BroadcastDetailResult:
         """发送普通消息"""
-        success_count = 0
-        error_count = 0
-        skip_count = 0
 
-        for _, group in enumerate(group_list):
+        async def send_func(bot: Bot, group: GroupConsole) -> bool:
+            if not await cls._check_group_availability(bot, group):
+                return False
             group_key = (
                 f"{group.group_id}:{group.channel_id}"
                 if group.channel_id
                 else str(group.group_id)
             )
-
-            if not await cls._check_group_availability(bot, group):
-                skip_count += 1
-                continue
-
-            try:
-                target = PlatformUtils.get_target(
-                    group_id=group.group_id, channel_id=group.channel_id
-                )
-
-                if target:
-                    receipt: Receipt = await message.send(target, bot=bot)
-
-                    logger.debug(
-                        f"广播消息发送结果: {receipt}, 类型: {type(receipt)}",
-                        "广播",
-                        session=session_info,
-                    )
-
-                    await cls._extract_message_id_from_result(
-                        receipt, group_key, session_info
-                    )
-
-                    success_count += 1
-                    await asyncio.sleep(random.randint(1, 3))
-                else:
-                    logger.warning(
-                        "target为空", "广播", session=session_info, target=group_key
-                    )
-                    skip_count += 1
-            except Exception as e:
-                error_count += 1
-                logger.error(
-                    f"发送失败(普通) to {group_key}: {e}",
-                    "广播",
-                    session=session_info,
-                    e=e,
+            target = PlatformUtils.get_target(
+                group_id=group.group_id, channel_id=group.channel_id
+            )
+            if not target:
+                logger.warning(
+                    "target为空", "广播", session=session_info, target=group_key
                 )
+                return False
+            receipt: Receipt = await message.send(target, bot=bot)
+            logger.debug(
+                f"广播消息发送结果: {receipt}, 类型: {type(receipt)}",
+                "广播",
+                session=session_info,
+            )
+            await cls._extract_message_id_from_result(receipt, group_key, session_info)
+            return True
 
-        return success_count, error_count, skip_count
+        return await cls._run_scheduler(bot, group_list, send_func, on_progress)
 
     @classmethod
     async def recall_last_broadcast(
@@ -22,6 +22,7 @@ from nonebot_plugin_alconna.uniseg.tools import reply_fetch
 from nonebot_plugin_session import EventSession
 
 from zhenxun.services.log import logger
+from zhenxun.utils.broadcast import BroadcastProgress
 from zhenxun.utils.common_utils import CommonUtils
 from zhenxun.utils.message import MessageUtils
 
@@ -565,9 +566,14 @@ async def send_broadcast_and_notify(
     session: EventSession,
 ) -> None:
     """发送广播并通知结果"""
+    user_id = str(event.get_user_id())
+
+    async def on_progress(progress: BroadcastProgress):
+        await bot.send_private_msg(user_id=user_id, message=f"广播进度: {progress}")
+
     BroadcastManager.clear_last_broadcast_msg_ids()
     count, error_count = await BroadcastManager.send_to_specific_groups(
-        bot, message, enabled_groups, session
+        bot, message, enabled_groups, session, on_progress
     )
 
     result = f"成功广播 {count} 个群组"
@@ -575,7 +581,6 @@ async def send_broadcast_and_notify(
         result += f"\n发送失败 {error_count} 个群组"
     result += f"\n有效: {len(enabled_groups)} / 总计: {len(target_groups)}"
 
-    user_id = str(event.get_user_id())
     await bot.send_private_msg(user_id=user_id, message=f"发送广播完成!\n{result}")
 
     BroadcastManager.log_info(
@@ -204,7 +204,9 @@ async def _(bot: Bot, session: EventSession, arparma: Arparma, group_id: int):
                 target=group_id,
             )
             await MessageUtils.build_message(f"退出群组 {group_id} 成功!").send()
-            await GroupConsole.filter(group_id=group_id).delete()
+            # 逐条删除以触发缓存失效与数据变更监听
+            for group in await GroupConsole.filter(group_id=group_id).all():
+                await group.delete()
         except Exception as e:
             logger.error("退出群组失败", "退群", session=session, target=group_id, e=e)
             await MessageUtils.build_message(f"退出群组 {group_id} 失败...").send()
@@ -0,0 +1,60 @@
+from nonebot.permission import SUPERUSER
+from nonebot.plugin import PluginMetadata
+from nonebot.rule import to_me
+from nonebot_plugin_alconna import Alconna, Arparma, Option, on_alconna, store_true
+from nonebot_plugin_session import EventSession
+
+from zhenxun.configs.utils import PluginExtraData
+from zhenxun.services.log import logger
+from zhenxun.utils.enum import PluginType
+from zhenxun.utils.manager.rollup_manager import RollupManager
+from zhenxun.utils.message import MessageUtils
+
+__plugin_meta__ = PluginMetadata(
+    name="统计汇总补全",
+    description="为启用汇总前的聊天记录与功能调用记录生成汇总数据",
+    usage="""
+    启动时自动在后台补全历史数据汇总，补全完成前统计查询使用原始数据表
+    补全统计汇总: 补全失败或中断后重新在后台补全
+    补全统计汇总 -s: 查看补全进度
+    """.strip(),
+    extra=PluginExtraData(
+        author="HibiKier",
+        version="0.1",
+        plugin_type=PluginType.SUPERUSER,
+    ).to_dict(),
+)
+
+
+_matcher = on_alconna(
+    Alconna(
+        "补全统计汇总",
+        Option("-s|--status", action=store_true, help_text="查看进度"),
+    ),
+    permission=SUPERUSER,
+    rule=to_me(),
+    priority=1,
+    block=True,
+)
+
+
+@_matcher.handle()
+async def _(session: EventSession, arparma: Arparma):
+    progress = RollupManager.get_progress()
+    if arparma.find("status"):
+        if progress["backfilled"]:
+            await MessageUtils.build_message("统计汇总已补全完成").finish()
+        lines = [
+            f"{kind}: {progress[kind]['done_id']}/{progress[kind]['max_id']}"
+            for kind in RollupManager.SOURCES
+            if kind in progress
+        ]
+        status = "补全中" if progress["running"] else "未开始"
+        await MessageUtils.build_message("\n".join([status, *lines])).finish()
+    if not RollupManager.start_backfill():
+        msg = "统计汇总已补全完成" if progress["backfilled"] else "统计汇总正在补全中"
+        await MessageUtils.build_message(msg).finish()
+    logger.info("开始补全统计汇总", arparma.header_result, session=session)
+    await MessageUtils.build_message(
+        "已开始在后台补全统计汇总，可使用 补全统计汇总 -s 查看进度"
+    ).send()
@@ -4,12 +4,21 @@ import nonebot
 from nonebot import require
 from nonebot.config import Config
 
+from zhenxun.services.image_cache import ImageCache
+from zhenxun.services.ingest import IngestPipeline
 from zhenxun.services.log import logger
 
 from ....base_model import BaseResultModel, QueryModel, Result
 from ....utils import authentication
 from .data_source import ApiDataSource
-from .model import AllChatAndCallCount, BotInfo, ChatCallMonthCount, QueryChatCallCount
+from .model import (
+    AllChatAndCallCount,
+    BotInfo,
+    ChatCallMonthCount,
+    ImageCacheStats,
+    IngestStats,
+    QueryChatCallCount,
+)
 
 require("plugin_store")
 
@@ -110,3 +119,28 @@ async def _(query: QueryModel) -> Result[BaseResultModel]:
 )
 async def _() -> Result[Config]:
     return Result.ok(driver.config)
+
+
+@router.get(
+    "/get_image_cache_stats",
+    dependencies=[authentication()],
+    response_model=Result[ImageCacheStats],
+    response_class=JSONResponse,
+    description="获取头像等图片缓存的命中率与占用空间",  # type: ignore
+)
+async def _() -> Result[ImageCacheStats]:
+    return Result.ok(ImageCacheStats(**ImageCache.get_metrics()), "拿到信息啦!")
+
+
+@router.get(
+    "/get_ingest_stats",
+    dependencies=[authentication()],
+    response_model=Result[list[IngestStats]],
+    response_class=JSONResponse,
+    description="获取聊天记录与调用统计写入队列的状态",  # type: ignore
+)
+async def _() -> Result[list[IngestStats]]:
+    return Result.ok(
+        [IngestStats(**metrics) for metrics in IngestPipeline.get_all_metrics()],
+        "拿到信息啦!",
+    )
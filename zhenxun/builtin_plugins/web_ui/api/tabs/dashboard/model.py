@@ -80,3 +80,67 @@ class AllChatAndCallCount(BaseModel):
     """一月内调用次数"""
     call_year: int
     """一年内调用次数"""
+
+
+class ImageCacheStats(BaseModel):
+    """
+    图片缓存统计
+    """
+
+    requests: int
+    """请求次数"""
+    hits: int
+    """命中次数"""
+    misses: int
+    """下载次数"""
+    revalidated: int
+    """过期后验证未修改次数"""
+    stale: int
+    """下载失败时使用过期缓存次数"""
+    coalesced: int
+    """合并的并发请求次数"""
+    errors: int
+    """下载失败次数"""
+    evictions: int
+    """淘汰次数"""
+    hit_rate: float
+    """命中率"""
+    entries: int
+    """url数量"""
+    files: int
+    """文件数量"""
+    size: int
+    """占用空间(字节)"""
+    max_size: int
+    """最大占用空间(字节)"""
+
+
+class IngestStats(BaseModel):
+    """
+    写入队列统计
+    """
+
+    name: str
+    """队列名称"""
+    queue_depth: int
+    """队列中等待写入的条数"""
+    max_size: int
+    """队列最大长度"""
+    queued: int
+    """入队条数"""
+    inserted: int
+    """写入条数"""
+    dropped: int
+    """队列已满时丢弃条数"""
+    failures: int
+    """写入失败次数"""
+    dead_lettered: int
+    """移至死信文件条数"""
+    replayed: int
+    """启动时从落盘文件恢复条数"""
+    flushes: int
+    """批量写入次数"""
+    last_flush_latency: str
+    """最近一次写入耗时"""
+    avg_flush_latency: str
+    """平均写入耗时"""
@@ -1,3 +1,4 @@
+import asyncio
 from datetime import datetime, timedelta
 from pathlib import Path
 import time
@@ -13,6 +14,7 @@ from zhenxun.models.chat_history import ChatHistory
 from zhenxun.models.group_console import GroupConsole
 from zhenxun.models.plugin_info import PluginInfo
 from zhenxun.models.statistics import Statistics
+from zhenxun.models.statistics_rollup import StatisticsRollup
 from zhenxun.models.task_info import TaskInfo
 from zhenxun.services.log import logger
 from zhenxun.utils.common_utils import CommonUtils
@@ -105,10 +107,17 @@ class ApiDataSource:
         """
         now = datetime.now()
         # 今日累计接收消息
-        select_bot.received_messages = await ChatHistory.filter(
-            bot_id=select_bot.self_id,
-            create_time__gte=now - timedelta(hours=now.hour),
-        ).count()
+        if StatisticsRollup.ready:
+            select_bot.received_messages = await StatisticsRollup.total(
+                StatisticsRollup.CHAT,
+                now - timedelta(hours=now.hour),
+                bot_id=select_bot.self_id,
+            )
+        else:
+            select_bot.received_messages = await ChatHistory.filter(
+                bot_id=select_bot.self_id,
+                create_time__gte=now - timedelta(hours=now.hour),
+            ).count()
         # 群聊数量
         try:
             select_bot.group_count = len(
@@ -129,9 +138,14 @@ class ApiDataSource:
             connect_date = datetime.fromtimestamp(select_bot.connect_time)
             select_bot.connect_date = connect_date.strftime("%Y-%m-%d %H:%M:%S")
         select_bot.version = cls.__get_bot_version()
-        day_call = await Statistics.filter(
-            create_time__gte=now - timedelta(hours=now.hour)
-        ).count()
+        if StatisticsRollup.ready:
+            day_call = await StatisticsRollup.total(
+                StatisticsRollup.CALL, now - timedelta(hours=now.hour)
+            )
+        else:
+            day_call = await Statistics.filter(
+                create_time__gte=now - timedelta(hours=now.hour)
+            ).count()
         select_bot.day_call = day_call
         select_bot.connect_count = await BotConnectLog.filter(
             bot_id=select_bot.self_id
@@ -173,6 +187,8 @@ class ApiDataSource:
         返回:
             QueryCount: 数据内容
         """
+        if StatisticsRollup.ready:
+            return await cls.__get_rollup_count(StatisticsRollup.CHAT, bot_id)
         now = datetime.now()
         query = ChatHistory
         if bot_id:
@@ -210,6 +226,8 @@ class ApiDataSource:
         返回:
             QueryCount: 数据内容
         """
+        if StatisticsRollup.ready:
+            return await cls.__get_rollup_count(StatisticsRollup.CALL, bot_id)
         now = datetime.now()
         query = Statistics
         if bot_id:
@@ -237,6 +255,55 @@ class ApiDataSource:
             year=year_count,
         )
 
+    @classmethod
+    async def __get_rollup_count(cls, kind: str, bot_id: str | None) -> QueryCount:
+        """从汇总表获取年/月/周/日条数
+
+        参数:
+            kind: 汇总类型
+            bot_id: bot id
+
+        返回:
+            QueryCount: 数据内容
+        """
+        filters = {"bot_id": bot_id} if bot_id else {}
+        num, day, week, month, year = await asyncio.gather(
+            *[
+                StatisticsRollup.total(kind, cls.__get_start(date_type), **filters)
+                for date_type in [
+                    None,
+                    QueryDateType.DAY,
+                    QueryDateType.WEEK,
+                    QueryDateType.MONTH,
+                    QueryDateType.YEAR,
+                ]
+            ]
+        )
+        return QueryCount(num=num, day=day, week=week, month=month, year=year)
+
+    @classmethod
+    def __get_start(cls, date_type: QueryDateType | None) -> datetime | None:
+        """获取日期类型对应的开始时间
+
+        参数:
+            date_type: 日期类型
+
+        返回:
+            datetime | None: 开始时间，为None时不限制
+        """
+        days = {
+            QueryDateType.DAY: 0,
+            QueryDateType.WEEK: 7,
+            QueryDateType.MONTH: 30,
+            QueryDateType.YEAR: 365,
+        }.get(date_type)  # type: ignore
+        if days is None:
+            return None
+        now = datetime.now()
+        return now.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(
+            days=days
+        )
+
     @classmethod
     def __get_query(
         cls,
@@ -295,15 +362,26 @@ class ApiDataSource:
         返回:
             list[ActiveGroup]: 活跃群组列表
         """
-        query = cls.__get_query(ChatHistory, date_type, bot_id)
-        data_list = (
-            await query.annotate(count=Count("id"))
-            .filter(group_id__not_isnull=True)
-            .group_by("group_id")
-            .order_by("-count")
-            .limit(5)
-            .values_list("group_id", "count")
-        )
+        if StatisticsRollup.ready:
+            filters = {"bot_id": bot_id} if bot_id else {}
+            data_list = await StatisticsRollup.top(
+                StatisticsRollup.CHAT,
+                "group_id",
+                cls.__get_start(date_type),
+                limit=5,
+                group_id__not="",
+                **filters,
+            )
+        else:
+            query = cls.__get_query(ChatHistory, date_type, bot_id)
+            data_list = (
+                await query.annotate(count=Count("id"))
+                .filter(group_id__not_isnull=True)
+                .group_by("group_id")
+                .order_by("-count")
+                .limit(5)
+                .values_list("group_id", "count")
+            )
         id2name = {}
         if data_list:
             if info_list := await GroupConsole.filter(
@@ -340,14 +418,24 @@ class ApiDataSource:
         返回:
             list[HotPlugin]: 热门插件列表
         """
-        query = cls.__get_query(Statistics, date_type, bot_id)
-        data_list = (
-            await query.annotate(count=Count("id"))
-            .group_by("plugin_name")
-            .order_by("-count")
-            .limit(5)
-            .values_list("plugin_name", "count")
-        )
+        if StatisticsRollup.ready:
+            filters = {"bot_id": bot_id} if bot_id else {}
+            data_list = await StatisticsRollup.top(
+                StatisticsRollup.CALL,
+                "plugin_name",
+                cls.__get_start(date_type),
+                limit=5,
+                **filters,
+            )
+        else:
+            query = cls.__get_query(Statistics, date_type, bot_id)
+            data_list = (
+                await query.annotate(count=Count("id"))
+                .group_by("plugin_name")
+                .order_by("-count")
+                .limit(5)
+                .values_list("plugin_name", "count")
+            )
         hot_plugin_list = []
         module_list = [x[0] for x in data_list]
         plugins = await PluginInfo.filter(module__in=module_list).all()
@@ -157,11 +157,15 @@ class BotConsole(Model):
             ValueError: 未找到 bot_id
         """
         if bot_id:
-            affected_rows = await cls.filter(bot_id=bot_id).update(status=status)
-            if not affected_rows:
+            bots = await cls.filter(bot_id=bot_id).all()
+            if not bots:
                 raise ValueError(f"未找到 bot_id: {bot_id}")
         else:
-            await cls.all().update(status=status)
+            bots = await cls.all()
+        # 逐条保存以触发缓存失效与数据变更监听
+        for bot in bots:
+            bot.status = status
+            await bot.save(update_fields=["status"])
 
     @overload
     @classmethod
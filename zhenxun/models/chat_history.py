@@ -1,11 +1,15 @@
+from collections import Counter
 from datetime import datetime, timedelta
+from operator import itemgetter
 from typing import Literal
 from typing_extensions import Self
 
 from tortoise import fields
 from tortoise.functions import Count
 
+from zhenxun.models.statistics_rollup import StatisticsRollup
 from zhenxun.services.db_context import Model
+from zhenxun.utils.manager.chat_archive_manager import ChatArchiveManager
 
 
 class ChatHistory(Model):
@@ -46,6 +50,17 @@ class ChatHistory(Model):
             order: 排序类型，desc，des
             date_scope: 日期范围
         """
+        if StatisticsRollup.ready:
+            start, end = date_scope or (None, None)
+            filters = {"group_id": gid} if gid else {}
+            return await StatisticsRollup.top(
+                StatisticsRollup.CHAT, "user_id", start, end, limit, order, **filters
+            )  # type: ignore
+        if ChatArchiveManager.has_archive(date_scope and date_scope[0], gid):
+            # 已归档的记录不在数据库中，需要合并计数后再排序
+            counts = await cls.get_user_msg_count(gid, date_scope)
+            counts.sort(key=itemgetter(1), reverse=order == "DESC")
+            return counts[:limit]  # type: ignore
         o = "-" if order == "DESC" else ""
         query = cls.filter(group_id=gid) if gid else cls
         if date_scope:
@@ -59,6 +74,38 @@ class ChatHistory(Model):
             .values_list("user_id", "count")
         )  # type: ignore
 
+    @classmethod
+    async def get_user_msg_count(
+        cls, gid: str | None, date_scope: tuple[datetime, datetime] | None = None
+    ) -> list[tuple[str, int]]:
+        """获取每个用户的消息数量，包含已归档的记录
+
+        参数:
+            gid: 群号，为None时为所有记录
+            date_scope: 日期范围
+
+        返回:
+            list[tuple[str, int]]: 用户id与消息数量
+        """
+        query = cls.filter(group_id=gid) if gid else cls
+        start, end = date_scope or (None, None)
+        if date_scope:
+            filter_scope = (date_scope[0].isoformat(" "), date_scope[1].isoformat(" "))
+            query = query.filter(create_time__range=filter_scope)
+        counts = Counter(
+            dict(
+                await query.annotate(count=Count("user_id"))
+                .group_by("user_id")
+                .values_list("user_id", "count")
+            )
+        )
+        if ChatArchiveManager.has_archive(start, gid):
+            archived = await ChatArchiveManager.read(
+                start, end, lambda row: not gid or row["group_id"] == gid
+            )
+            counts.update(row["user_id"] for row in archived)
+        return list(counts.items())
+
     @classmethod
     async def get_group_first_msg_datetime(
         cls, group_id: str | None
@@ -68,6 +115,9 @@ class ChatHistory(Model):
         参数:
             group_id: 群组id
         """
+        # 已归档的记录早于数据库中的记录
+        if archive_time := ChatArchiveManager.first_time(group_id):
+            return archive_time
         if group_id:
             message = (
                 await cls.filter(group_id=group_id).order_by("create_time").first()
@@ -84,15 +134,20 @@ class ChatHistory(Model):
         type_: Literal["user", "group"],
         msg_type: Literal["private", "group"] | None = None,
         days: int | tuple[datetime, datetime] | None = None,
+        include_archive: bool = True,
     ) -> list[Self]:
         """获取消息查询query
 
+        查询范围早于归档截止时间时合并读取归档记录
+
         参数:
             uid: 用户id
             gid: 群聊id
             type_: 类型，私聊或群聊
             msg_type: 消息类型，用户或群聊
             days: 限制日期
+            include_archive: 未指定日期范围时是否合并全部归档记录，
+                为False时只读取数据库，避免解压全部归档文件
         """
         if type_ == "user":
             query = cls.filter(user_id=uid)
@@ -104,14 +159,35 @@ class ChatHistory(Model):
             query = cls.filter(group_id=gid)
             if uid:
                 query = query.filter(user_id=uid)
+        start = end = None
         if days:
             if isinstance(days, int):
-                query = query.filter(
-                    create_time__gte=datetime.now() - timedelta(days=days)
-                )
+                start = datetime.now() - timedelta(days=days)
+                query = query.filter(create_time__gte=start)
             elif isinstance(days, tuple):
+                start, end = days
                 query = query.filter(create_time__range=days)
-        return await query.all()  # type: ignore
+        result = await query.all()
+        if start is None and not include_archive:
+            return result  # type: ignore
+        if not ChatArchiveManager.has_archive(start, gid if type_ == "group" else None):
+            return result  # type: ignore
+
+        def predicate(row: dict) -> bool:
+            if type_ == "user":
+                if row["user_id"] != uid:
+                    return False
+                if msg_type == "private":
+                    return row["group_id"] is None
+                if msg_type == "group":
+                    return row["group_id"] is not None
+                return True
+            return row["group_id"] == gid and (not uid or row["user_id"] == uid)
+
+        # 查询范围跨越归档边界时合并归档记录
+        archived = await ChatArchiveManager.read(start, end, predicate)
+        exists = {message.id for message in result}
+        return [cls(**row) for row in archived if row["id"] not in exists] + result  # type: ignore
 
     @classmethod
     async def _run_script(cls):
@@ -54,6 +54,10 @@ class PluginInfo(Model):
     """是否显示在帮助中"""
     impression = fields.FloatField(default=0, description="插件好感度限制")
     """插件好感度限制"""
+    metadata_hash = fields.CharField(
+        max_length=64, null=True, description="插件元数据指纹"
+    )
+    """插件元数据指纹，启动同步时用于跳过未变化的插件"""
 
     class Meta:  # pyright: ignore [reportIncompatibleVariableOverride]
         table = "plugin_info"
@@ -109,4 +113,5 @@ class PluginInfo(Model):
             "ALTER TABLE plugin_info ADD COLUMN is_show boolean DEFAULT true;",
             "ALTER TABLE plugin_info ADD COLUMN ignore_prompt boolean DEFAULT false;",
             "ALTER TABLE plugin_info ADD COLUMN impression float DEFAULT 0;",
+            "ALTER TABLE plugin_info ADD COLUMN metadata_hash character varying(64);",
         ]
@@ -1,7 +1,12 @@
 from tortoise import fields
 
 from zhenxun.services.db_context import Model
-from zhenxun.utils.enum import LimitCheckType, LimitWatchType, PluginLimitType
+from zhenxun.utils.enum import (
+    CacheType,
+    LimitCheckType,
+    LimitWatchType,
+    PluginLimitType,
+)
 
 
 class PluginLimit(Model):
@@ -38,3 +43,6 @@ class PluginLimit(Model):
     class Meta:  # pyright: ignore [reportIncompatibleVariableOverride]
         table = "plugin_limit"
         table_description = "插件限制"
+
+    cache_type = CacheType.LIMIT
+    """缓存类型，仅用于在REDIS/HYBRID模式下向其他进程发布变更"""
@@ -0,0 +1,264 @@
+import asyncio
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, ClassVar
+
+from pypika.terms import Case, Field
+from tortoise import fields
+from tortoise.expressions import Q
+from tortoise.functions import Sum
+from tortoise.timezone import get_default_timezone, make_aware
+from tortoise.transactions import in_transaction
+
+from zhenxun.services.db_context import Model
+
+
+class StatisticsRollup(Model):
+    id = fields.IntField(pk=True, generated=True, auto_increment=True)
+    """自增id"""
+    kind = fields.CharField(16)
+    """汇总类型，chat: 聊天记录, call: 功能调用"""
+    period = fields.CharField(8)
+    """时间粒度，hour: 小时, day: 天"""
+    bucket = fields.DatetimeField()
+    """时间段起点"""
+    bot_id = fields.CharField(255, default="")
+    """bot id，为空时为空字符串"""
+    group_id = fields.CharField(255, default="")
+    """群聊id，私聊时为空字符串"""
+    user_id = fields.CharField(255)
+    """用户id"""
+    plugin_name = fields.CharField(255, default="")
+    """插件名称，聊天记录汇总时为空字符串"""
+    num = fields.IntField(default=0)
+    """条数"""
+
+    class Meta:  # pyright: ignore [reportIncompatibleVariableOverride]
+        table = "statistics_rollup"
+        table_description = "聊天记录/功能调用汇总数据表"
+        unique_together = (
+            "kind",
+            "period",
+            "bucket",
+            "bot_id",
+            "group_id",
+            "user_id",
+            "plugin_name",
+        )
+        indexes = [("kind", "period", "bucket"), ("kind", "group_id")]  # noqa: RUF012
+
+    CHAT = "chat"
+    CALL = "call"
+    HOUR = "hour"
+    DAY = "day"
+
+    ready: ClassVar[bool] = False
+    """历史数据是否已全部汇总，未完成时查询应使用原始数据表"""
+    _lock: ClassVar[asyncio.Lock] = asyncio.Lock()
+    """串行化增量累加，避免并发写入时重复创建同一汇总行"""
+    UPDATE_CHUNK_SIZE: ClassVar[int] = 500
+    """单条累加语句更新的最大行数"""
+
+    @classmethod
+    def localize(cls, dt: datetime) -> datetime:
+        """转换为默认时区的时间，与记录的create_time保持一致
+
+        参数:
+            dt: 时间
+
+        返回:
+            datetime: 默认时区时间
+        """
+        if dt.tzinfo is None:
+            return make_aware(dt)
+        return dt.astimezone(get_default_timezone())
+
+    @classmethod
+    def floor(cls, dt: datetime, period: str) -> datetime:
+        """获取时间所在时间段的起点
+
+        参数:
+            dt: 时间
+            period: 时间粒度
+
+        返回:
+            datetime: 时间段起点
+        """
+        dt = cls.localize(dt).replace(minute=0, second=0, microsecond=0)
+        return dt.replace(hour=0) if period == cls.DAY else dt
+
+    @classmethod
+    async def add_rows(cls, kind: str, rows: list[dict[str, Any]]):
+        """将原始记录增量累加到小时/天汇总
+
+        参数:
+            kind: 汇总类型
+            rows: 原始记录，包含create_time, bot_id, group_id, user_id
+                (功能调用还包含plugin_name)
+        """
+        counter: Counter[tuple] = Counter()
+        for row in rows:
+            dims = (
+                row.get("bot_id") or "",
+                row.get("group_id") or "",
+                row["user_id"],
+                row.get("plugin_name") or "",
+            )
+            create_time = row["create_time"]
+            counter[(cls.HOUR, cls.floor(create_time, cls.HOUR), *dims)] += 1
+            counter[(cls.DAY, cls.floor(create_time, cls.DAY), *dims)] += 1
+        if not counter:
+            return
+        # 先进入事务再加锁，与在写入队列事务中调用时的顺序一致，避免死锁
+        async with in_transaction(), cls._lock:
+            for period in (cls.HOUR, cls.DAY):
+                keys = {k: v for k, v in counter.items() if k[0] == period}
+                buckets = [k[1] for k in keys]
+                # 按时间范围匹配，bucket__in在SQLite下与存储格式不一致无法命中
+                existing = await cls.filter(
+                    kind=kind,
+                    period=period,
+                    bucket__gte=min(buckets),
+                    bucket__lte=max(buckets),
+                    user_id__in=list({k[4] for k in keys}),
+                ).values_list(
+                    "id", "bucket", "bot_id", "group_id", "user_id", "plugin_name"
+                )
+                increments = [
+                    (pk, num)
+                    for pk, bucket, *dims in existing
+                    if (num := keys.pop((period, cls.localize(bucket), *dims), None))
+                ]
+                # 已有汇总行合并为一条按id分支累加的语句
+                for i in range(0, len(increments), cls.UPDATE_CHUNK_SIZE):
+                    chunk = increments[i : i + cls.UPDATE_CHUNK_SIZE]
+                    case = Case()
+                    for pk, num in chunk:
+                        case = case.when(Field("id") == pk, Field("num") + num)
+                    await cls.filter(id__in=[pk for pk, _ in chunk]).update(
+                        num=case.else_(Field("num"))
+                    )
+                if keys:
+                    await cls.bulk_create(
+                        [
+                            cls(
+                                kind=kind,
+                                period=period,
+                                bucket=bucket,
+                                bot_id=bot_id,
+                                group_id=group_id,
+                                user_id=user_id,
+                                plugin_name=plugin_name,
+                                num=num,
+                            )
+                            for (
+                                _,
+                                bucket,
+                                bot_id,
+                                group_id,
+                                user_id,
+                                plugin_name,
+                            ), num in keys.items()
+                        ],
+                        500,
+                    )
+
+    @classmethod
+    def range_query(cls, start: datetime | None, end: datetime | None = None) -> Q:
+        """构建时间范围条件，整天部分使用天汇总，不足一天的部分使用小时汇总
+
+        小时汇总的精度为一小时，start所在小时会被完整计入
+
+        参数:
+            start: 开始时间，为None时不限制
+            end: 结束时间，为None时不限制
+
+        返回:
+            Q: 查询条件
+        """
+        if start is None:
+            day_start = None
+        else:
+            hour_start = cls.floor(start, cls.HOUR)
+            day_start = cls.floor(start, cls.DAY)
+            if day_start < hour_start:
+                day_start += timedelta(days=1)
+        day_end = None if end is None else cls.floor(end, cls.DAY)
+        if day_start and day_end and day_start > day_end:
+            # 开始与结束在同一天内
+            return Q(period=cls.HOUR, bucket__gte=hour_start, bucket__lt=end)
+        day_query = Q(period=cls.DAY)
+        if day_start:
+            day_query &= Q(bucket__gte=day_start)
+        if day_end:
+            day_query &= Q(bucket__lt=day_end)
+        query = day_query
+        if start is not None and hour_start < day_start:  # type: ignore
+            query |= Q(period=cls.HOUR, bucket__gte=hour_start, bucket__lt=day_start)
+        if end is not None and day_end:
+            query |= Q(period=cls.HOUR, bucket__gte=day_end, bucket__lt=end)
+        return query
+
+    @classmethod
+    async def total(
+        cls,
+        kind: str,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        **filters,
+    ) -> int:
+        """获取时间范围内的总条数
+
+        参数:
+            kind: 汇总类型
+            start: 开始时间
+            end: 结束时间
+            **filters: 其他筛选条件
+
+        返回:
+            int: 总条数
+        """
+        result = (
+            await cls.filter(cls.range_query(start, end), kind=kind, **filters)
+            .annotate(total=Sum("num"))
+            .values_list("total", flat=True)
+        )
+        return int(result[0] or 0) if result else 0
+
+    @classmethod
+    async def top(
+        cls,
+        kind: str,
+        group_by: str,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        limit: int | None = None,
+        order: str = "DESC",
+        **filters,
+    ) -> list[tuple[str, int]]:
+        """按字段分组获取时间范围内的条数排行
+
+        参数:
+            kind: 汇总类型
+            group_by: 分组字段
+            start: 开始时间
+            end: 结束时间
+            limit: 获取数量
+            order: 排序类型，DESC为降序
+            **filters: 其他筛选条件
+
+        返回:
+            list[tuple[str, int]]: 分组字段值与条数
+        """
+        query = (
+            cls.filter(cls.range_query(start, end), kind=kind, **filters)
+            .annotate(total=Sum("num"))
+            .group_by(group_by)
+            .order_by("-total" if order == "DESC" else "total")
+        )
+        if limit:
+            query = query.limit(limit)
+        return [
+            (key, int(total))
+            for key, total in await query.values_list(group_by, "total")
+        ]
@@ -58,9 +58,12 @@ await message_list.save()
 
 import asyncio
 from collections.abc import Callable
+import contextlib
+import copy
 from datetime import datetime
 from functools import wraps
-from typing import Any, ClassVar, Generic, TypeVar, get_type_hints
+from typing import Any, ClassVar, Generic, TypeVar, cast, get_type_hints
+import uuid
 
 from aiocache import Cache as AioCache
 from aiocache import SimpleMemoryCache
@@ -78,10 +81,14 @@ from .config import (
     CACHE_KEY_PREFIX,
     CACHE_KEY_SEPARATOR,
     DEFAULT_EXPIRE,
+    DEFAULT_LOCAL_EXPIRE,
+    DEFAULT_LOCAL_MAX_SIZE,
+    INVALIDATE_CHANNEL,
     LOG_COMMAND,
     SPECIAL_KEY_FORMATS,
     CacheMode,
 )
+from .local_cache import LocalCache
 
 __all__ = [
     "Cache",
@@ -100,7 +107,7 @@ class Config(BaseModel):
     """缓存配置"""
 
     cache_mode: str = CacheMode.NONE
-    """缓存模式: MEMORY(内存缓存), REDIS(Redis缓存), NONE(不使用缓存)"""
+    """缓存模式: MEMORY(内存), REDIS(Redis), HYBRID(本地+Redis), NONE(不使用缓存)"""
     redis_host: str | None = None
     """redis地址"""
     redis_port: int | None = None
@@ -109,6 +116,12 @@ class Config(BaseModel):
     """redis密码"""
     redis_expire: int = DEFAULT_EXPIRE
     """redis过期时间"""
+    local_cache_size: int = DEFAULT_LOCAL_MAX_SIZE
+    """HYBRID模式下本地缓存最大条数"""
+    local_cache_expire: int = DEFAULT_LOCAL_EXPIRE
+    """HYBRID模式下本地缓存过期时间"""
+    redis_limiter: bool = False
+    """插件限制状态是否保存在Redis中供多进程共享，需要REDIS或HYBRID模式"""
 
 
 # 获取配置
@@ -267,6 +280,16 @@ class CacheManager:
     _list_caches: ClassVar[dict[str, "CacheList"]] = {}
     _dict_caches: ClassVar[dict[str, "CacheDict"]] = {}
     _enabled = False  # 缓存启用标记
+    _local_cache: LocalCache | None = None
+    _listen_task: asyncio.Task | None = None
+    _instance_id: ClassVar[str] = uuid.uuid4().hex
+    _invalidate_listeners: ClassVar[
+        list[Callable[[str | None, str | None, bool], Any]]
+    ] = []
+    _tier_stats: ClassVar[dict[str, dict[str, int]]] = {
+        "local": {"hits": 0, "misses": 0},
+        "remote": {"hits": 0, "misses": 0},
+    }
 
     def __new__(cls) -> "CacheManager":
         """单例模式"""
@@ -397,7 +420,10 @@ class CacheManager:
             if cache_config.cache_mode == CacheMode.NONE:
                 ttl = 0
                 logger.info("缓存功能已禁用，使用非持久化内存缓存", LOG_COMMAND)
-            elif cache_config.cache_mode == CacheMode.REDIS and cache_config.redis_host:
+            elif (
+                cache_config.cache_mode in (CacheMode.REDIS, CacheMode.HYBRID)
+                and cache_config.redis_host
+            ):
                 try:
                     from aiocache import RedisCache
 
@@ -438,6 +464,197 @@ class CacheManager:
         """获取缓存后端（别名）"""
         return self.cache_backend
 
+    @property
+    def local_cache(self) -> LocalCache | None:
+        """获取本地缓存层，仅HYBRID模式下存在"""
+        if self._local_cache is None and cache_config.cache_mode == CacheMode.HYBRID:
+            self._local_cache = LocalCache(
+                cache_config.local_cache_size, cache_config.local_cache_expire
+            )
+        return self._local_cache
+
+    def get_tier_stats(self) -> dict[str, dict[str, Any]]:
+        """获取各缓存层的命中统计
+
+        返回:
+            dict[str, dict[str, Any]]: local(本地缓存层)与remote(缓存后端)的命中统计
+        """
+        result = {}
+        for tier, stats in self._tier_stats.items():
+            total = stats["hits"] + stats["misses"]
+            hit_rate = stats["hits"] / total * 100 if total else 0
+            result[tier] = {**stats, "hit_rate": f"{hit_rate:.2f}%"}
+        if local := self._local_cache:
+            result["local"]["size"] = len(local)
+        return result
+
+    def reset_tier_stats(self):
+        """重置各缓存层的命中统计"""
+        for stats in self._tier_stats.values():
+            stats["hits"] = 0
+            stats["misses"] = 0
+
+    def _local_ttl(self, ttl: int) -> int:
+        """计算本地缓存层的过期时间，不超过远程缓存的过期时间
+
+        参数:
+            ttl: 远程缓存的过期时间（秒），0表示永不过期
+
+        返回:
+            int: 本地缓存层的过期时间（秒）
+        """
+        local_ttl = cast(LocalCache, self._local_cache).ttl
+        if not ttl:
+            return local_ttl
+        return min(local_ttl, ttl) if local_ttl else ttl
+
+    def copy_value(self, value: Any) -> Any:
+        """复制缓存中的对象，避免调用方的修改影响缓存或其他调用方
+
+        只复制容器与模型对象本身，省去每次命中时的反序列化与校验
+
+        参数:
+            value: 需要复制的对象
+
+        返回:
+            Any: 复制后的对象
+        """
+        if isinstance(value, list):
+            return [self.copy_value(item) for item in value]
+        if isinstance(value, dict):
+            return {k: self.copy_value(v) for k, v in value.items()}
+        if isinstance(value, set):
+            return set(value)
+        if isinstance(value, BaseModel) or hasattr(value, "_meta"):
+            value = copy.copy(value)
+            for name, attr in vars(value).items():
+                if isinstance(attr, list | dict | set | BaseModel):
+                    vars(value)[name] = self.copy_value(attr)
+        return value
+
+    def _evict_local(self, cache_key: str | None):
+        """清除本地缓存层
+
+        参数:
+            cache_key: 完整缓存键，为None时清空本地缓存
+        """
+        if local := self._local_cache:
+            if cache_key is None:
+                local.clear()
+            else:
+                local.delete(cache_key)
+
+    def add_invalidate_listener(
+        self, func: Callable[[str | None, str | None, bool], Any]
+    ):
+        """注册缓存失效监听器
+
+        监听器签名为 func(cache_type, cache_key, remote)，
+        在 invalidate_cache 时同步调用，不应执行耗时操作；
+        REDIS/HYBRID模式下其他进程的缓存失效通过发布订阅通知，此时 remote 为True，
+        cache_type 为None表示全部类型，cache_key 为None表示整个类型
+
+        参数:
+            func: 监听函数
+        """
+        self._invalidate_listeners.append(func)
+
+    def _notify_invalidate(
+        self, cache_type: str | None, cache_key: str | None, remote: bool
+    ):
+        """通知缓存失效监听器
+
+        参数:
+            cache_type: 缓存类型
+            cache_key: 完整缓存键
+            remote: 是否来自其他进程
+        """
+        for func in self._invalidate_listeners:
+            try:
+                func(cache_type, cache_key, remote)
+            except Exception as e:
+                logger.error("缓存失效监听器执行失败", LOG_COMMAND, e=e)
+
+    async def _publish_invalidation(
+        self, cache_key: str | list[str] | None, *, notify: bool = False
+    ):
+        """通知其他进程清除本地缓存层
+
+        参数:
+            cache_key: 完整缓存键或缓存键列表，为None时清空本地缓存
+            notify: 是否由数据变更导致，其他进程会同时通知缓存失效监听器，
+                REDIS模式下也会发布
+        """
+        if cache_config.cache_mode != CacheMode.HYBRID and not (
+            notify and cache_config.cache_mode == CacheMode.REDIS
+        ):
+            return
+        client = getattr(self.cache_backend, "client", None)
+        if client is None:
+            return
+        if isinstance(cache_key, list):
+            cache_key = "\n".join(cache_key)
+        try:
+            await client.publish(
+                INVALIDATE_CHANNEL,
+                f"{self._instance_id}|{int(notify)}|{cache_key or '*'}",
+            )
+        except Exception as e:
+            logger.warning("发布缓存失效消息失败", LOG_COMMAND, e=e)
+
+    async def _listen_invalidation(self):
+        """订阅其他进程发布的缓存失效消息"""
+        client = getattr(self.cache_backend, "client", None)
+        if client is None:
+            logger.warning(
+                "缓存后端不支持发布订阅，本地缓存仅依赖过期时间", LOG_COMMAND
+            )
+            return
+        while True:
+            try:
+                pubsub = client.pubsub()
+                await pubsub.subscribe(INVALIDATE_CHANNEL)
+                logger.info("已订阅缓存失效消息", LOG_COMMAND)
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    data = message["data"]
+                    if isinstance(data, bytes):
+                        data = data.decode()
+                    sender, _, data = data.partition("|")
+                    if sender == self._instance_id:
+                        continue
+                    notify, _, cache_keys = data.partition("|")
+                    if cache_keys == "*":
+                        self._evict_local(None)
+                        if notify == "1":
+                            self._notify_invalidate(None, None, True)
+                        continue
+                    for cache_key in cache_keys.split("\n"):
+                        self._evict_local(cache_key)
+                        if notify == "1":
+                            cache_type, _, key = cache_key.partition(
+                                CACHE_KEY_SEPARATOR
+                            )
+                            self._notify_invalidate(
+                                cache_type, None if key == "*" else cache_key, True
+                            )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # 订阅断开期间无法收到失效消息，重连前清空本地缓存避免读到旧数据
+                self._evict_local(None)
+                logger.warning("缓存失效订阅断开，5秒后重试", LOG_COMMAND, e=e)
+                await asyncio.sleep(5)
+
+    def start_listener(self):
+        """启动缓存失效订阅（仅REDIS/HYBRID模式）"""
+        if (
+            cache_config.cache_mode in (CacheMode.REDIS, CacheMode.HYBRID)
+            and self._listen_task is None
+        ):
+            self._listen_task = asyncio.create_task(self._listen_invalidation())
+
     async def get_cache_data(self, name: str) -> Any:
         """获取缓存数据
 
@@ -476,6 +693,16 @@ class CacheManager:
         返回:
             bool: 是否成功
         """
+        # 缓存被禁用时数据仍可能已变化，监听器需要照常通知
+        cache_type = cache_type.upper()
+        cache_key = None
+        if key is not None:
+            try:
+                cache_key = self._build_key(cache_type, key)
+            except CacheException:
+                cache_key = f"{cache_type}{CACHE_KEY_SEPARATOR}{key}"
+        self._notify_invalidate(cache_type, cache_key, False)
+
         # 如果缓存被禁用或缓存模式为NONE，直接返回True
         if not self.enabled or cache_config.cache_mode == CacheMode.NONE:
             return True
@@ -484,12 +711,17 @@ class CacheManager:
             if key is not None:
                 # 只清除特定的缓存项
                 cache_key = self._build_key(cache_type, key)
+                self._evict_local(cache_key)
                 await self.cache_backend.delete(cache_key)  # type: ignore
+                await self._publish_invalidation(cache_key, notify=True)
                 logger.debug(f"清除缓存: {cache_type}, 键: {key}", LOG_COMMAND)
                 return True
             else:
                 # 清除指定类型的所有缓存
                 logger.debug(f"清除所有 {cache_type} 缓存", LOG_COMMAND)
+                await self._publish_invalidation(
+                    f"{cache_type}{CACHE_KEY_SEPARATOR}*", notify=True
+                )
                 return await self.clear(cache_type)
         except Exception as e:
             if f"缓存类型 {cache_type} 不存在" not in str(e):
@@ -517,20 +749,30 @@ class CacheManager:
         cache_key = None
         try:
             cache_key = self._build_key(cache_type, key)
+            model = self.get_model(cache_type)
+            local = self.local_cache
+            if local is not None:
+                value = local.get(cache_key)
+                if value is not LocalCache.MISS:
+                    self._tier_stats["local"]["hits"] += 1
+                    return self.copy_value(value)
+                self._tier_stats["local"]["misses"] += 1
+
             data = await asyncio.wait_for(
                 self.cache_backend.get(cache_key),  # type: ignore
                 timeout=DB_TIMEOUT_SECONDS,
             )
 
             if data is None:
+                self._tier_stats["remote"]["misses"] += 1
                 return default
-
-            # 获取缓存模型
-            model = self.get_model(cache_type)
-
+            self._tier_stats["remote"]["hits"] += 1
             # 反序列化
             if model.result_type:
-                return self._deserialize_value(data, model.result_type)
+                data = self._deserialize_value(data, model.result_type)
+            if local is not None:
+                local.set(cache_key, data, self._local_ttl(model.expire))
+                return self.copy_value(data)
             return data
         except asyncio.TimeoutError:
             logger.error(f"获取缓存 {cache_type}:{cache_key} 超时", LOG_COMMAND)
@@ -545,6 +787,8 @@ class CacheManager:
         key: str | dict[str, Any],
         value: Any,
         expire: int | None = None,
+        *,
+        publish: bool = True,
     ) -> bool:
         """设置缓存数据
 
@@ -553,6 +797,8 @@ class CacheManager:
             key: 键或键参数
             value: 值
             expire: 过期时间（秒），为None时使用默认值
+            publish: 是否通知其他进程清除本地缓存层，
+                查询数据库后回填缓存时数据未变化，无需通知
 
         返回:
             bool: 是否成功
@@ -578,6 +824,14 @@ class CacheManager:
                 self.cache_backend.set(cache_key, serialized_value, ttl=ttl),  # type: ignore
                 timeout=DB_TIMEOUT_SECONDS,
             )
+            if (local := self.local_cache) is not None:
+                local.set(
+                    cache_key,
+                    self._deserialize_value(serialized_value, model.result_type),
+                    self._local_ttl(ttl),
+                )
+                if publish:
+                    await self._publish_invalidation(cache_key)
             return True
         except asyncio.TimeoutError:
             logger.error(f"设置缓存 {cache_type}:{cache_key} 超时", LOG_COMMAND)
@@ -602,12 +856,169 @@ class CacheManager:
 
         try:
             cache_key = self._build_key(cache_type, key)
+            self._evict_local(cache_key)
             await self.cache_backend.delete(cache_key)  # type: ignore
+            await self._publish_invalidation(cache_key)
             return True
         except Exception as e:
             logger.error(f"删除缓存 {cache_type} 失败", LOG_COMMAND, e=e)
             return False
 
+    async def get_many(
+        self,
+        cache_type: str,
+        keys: list[str | dict[str, Any]],
+        default: Any = None,
+    ) -> list[Any]:
+        """批量获取缓存数据，Redis下使用MGET一次取回
+
+        参数:
+            cache_type: 缓存类型
+            keys: 键或键参数列表
+            default: 默认值
+
+        返回:
+            list[Any]: 与keys顺序一致的缓存数据，不存在的项为默认值
+        """
+        from zhenxun.services.db_context import DB_TIMEOUT_SECONDS
+
+        if not keys:
+            return []
+        # 如果缓存被禁用或缓存模式为NONE，直接返回默认值
+        if not self.enabled or cache_config.cache_mode == CacheMode.NONE:
+            return [default] * len(keys)
+        result = [default] * len(keys)
+        try:
+            cache_keys = [self._build_key(cache_type, key) for key in keys]
+            model = self.get_model(cache_type)
+            pending = list(range(len(keys)))
+            local = self.local_cache
+            if local is not None:
+                remaining = []
+                for i in pending:
+                    value = local.get(cache_keys[i])
+                    if value is LocalCache.MISS:
+                        remaining.append(i)
+                    else:
+                        result[i] = self.copy_value(value)
+                self._tier_stats["local"]["hits"] += len(pending) - len(remaining)
+                self._tier_stats["local"]["misses"] += len(remaining)
+                pending = remaining
+            if not pending:
+                return result
+
+            values = await asyncio.wait_for(
+                self.cache_backend.multi_get([cache_keys[i] for i in pending]),  # type: ignore
+                timeout=DB_TIMEOUT_SECONDS,
+            )
+            for i, data in zip(pending, values):
+                if data is None:
+                    self._tier_stats["remote"]["misses"] += 1
+                    continue
+                self._tier_stats["remote"]["hits"] += 1
+                if model.result_type:
+                    data = self._deserialize_value(data, model.result_type)
+                if local is not None:
+                    local.set(cache_keys[i], data, self._local_ttl(model.expire))
+                    data = self.copy_value(data)
+                result[i] = data
+            return result
+        except asyncio.TimeoutError:
+            logger.error(f"批量获取缓存 {cache_type} 超时", LOG_COMMAND)
+            return result
+        except Exception as e:
+            logger.error(f"批量获取缓存 {cache_type} 失败", LOG_COMMAND, e=e)
+            return result
+
+    async def set_many(
+        self,
+        cache_type: str,
+        items: dict[str, Any] | list[tuple[str | dict[str, Any], Any]],
+        expire: int | None = None,
+        *,
+        publish: bool = True,
+    ) -> bool:
+        """批量设置缓存数据，Redis下使用pipeline一次写入
+
+        参数:
+            cache_type: 缓存类型
+            items: 键值字典或(键或键参数, 值)列表
+            expire: 过期时间（秒），为None时使用默认值
+            publish: 是否通知其他进程清除本地缓存层，
+                查询数据库后回填缓存时数据未变化，无需通知
+
+        返回:
+            bool: 是否成功
+        """
+        from zhenxun.services.db_context import DB_TIMEOUT_SECONDS
+
+        # 如果缓存被禁用或缓存模式为NONE，直接返回False
+        if not self.enabled or cache_config.cache_mode == CacheMode.NONE:
+            return False
+        pairs = list(items.items()) if isinstance(items, dict) else items
+        if not pairs:
+            return True
+        try:
+            model = self.get_model(cache_type)
+            ttl = expire if expire is not None else model.expire
+            serialized = [
+                (self._build_key(cache_type, key), self._serialize_value(value))
+                for key, value in pairs
+            ]
+            await asyncio.wait_for(
+                self.cache_backend.multi_set(serialized, ttl=ttl),  # type: ignore
+                timeout=DB_TIMEOUT_SECONDS,
+            )
+            if (local := self.local_cache) is not None:
+                local_ttl = self._local_ttl(ttl)
+                for cache_key, value in serialized:
+                    local.set(
+                        cache_key,
+                        self._deserialize_value(value, model.result_type),
+                        local_ttl,
+                    )
+                if publish:
+                    await self._publish_invalidation([k for k, _ in serialized])
+            return True
+        except asyncio.TimeoutError:
+            logger.error(f"批量设置缓存 {cache_type} 超时", LOG_COMMAND)
+            return False
+        except Exception as e:
+            logger.error(f"批量设置缓存 {cache_type} 失败", LOG_COMMAND, e=e)
+            return False
+
+    async def delete_many(
+        self, cache_type: str, keys: list[str | dict[str, Any]]
+    ) -> bool:
+        """批量删除缓存数据，Redis下使用一次DEL删除
+
+        参数:
+            cache_type: 缓存类型
+            keys: 键或键参数列表
+
+        返回:
+            bool: 是否成功
+        """
+        # 如果缓存被禁用或缓存模式为NONE，直接返回False
+        if not self.enabled or cache_config.cache_mode == CacheMode.NONE:
+            return False
+        if not keys:
+            return True
+        try:
+            cache_keys = [self._build_key(cache_type, key) for key in keys]
+            for cache_key in cache_keys:
+                self._evict_local(cache_key)
+            backend = self.cache_backend
+            if client := getattr(backend, "client", None):
+                await client.delete(*[backend.build_key(k) for k in cache_keys])  # type: ignore
+            else:
+                await asyncio.gather(*[backend.delete(k) for k in cache_keys])  # type: ignore
+            await self._publish_invalidation(cache_keys)
+            return True
+        except Exception as e:
+            logger.error(f"批量删除缓存 {cache_type} 失败", LOG_COMMAND, e=e)
+            return False
+
     async def exists(self, cache_type: str, key: str | dict[str, Any]) -> bool:
         """检查缓存是否存在
 
@@ -624,6 +1035,10 @@ class CacheManager:
 
         try:
             cache_key = self._build_key(cache_type, key)
+            if (local := self.local_cache) is not None and local.get(
+                cache_key
+            ) is not LocalCache.MISS:
+                return True
             # 由于aiocache可能没有exists方法，使用get检查
             data = await self.cache_backend.get(cache_key)  # type: ignore
             return data is not None
@@ -645,6 +1060,8 @@ class CacheManager:
             return False
 
         try:
+            self._evict_local(None)
+            await self._publish_invalidation(None)
             if cache_type:
                 # 清除指定类型的缓存
                 # pattern = f"{cache_type.upper()}{CACHE_KEY_SEPARATOR}*"
@@ -662,6 +1079,11 @@ class CacheManager:
 
     async def close(self):
         """关闭缓存连接"""
+        if self._listen_task:
+            self._listen_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._listen_task
+            self._listen_task = None
         if self._cache_backend:
             try:
                 await self._cache_backend.close()  # type: ignore
@@ -1000,7 +1422,12 @@ class Cache(Generic[T]):
         return await CacheRoot.get(self.cache_type, key, default)
 
     async def set(
-        self, key: str | dict[str, Any], value: T, expire: int | None = None
+        self,
+        key: str | dict[str, Any],
+        value: T,
+        expire: int | None = None,
+        *,
+        publish: bool = True,
     ) -> bool:
         """设置缓存数据
 
@@ -1008,11 +1435,12 @@ class Cache(Generic[T]):
             key: 键或键参数
             value: 值
             expire: 过期时间（秒），为None时使用默认值
+            publish: 是否通知其他进程清除本地缓存层
 
         返回:
             bool: 是否成功
         """
-        return await CacheRoot.set(self.cache_type, key, value, expire)
+        return await CacheRoot.set(self.cache_type, key, value, expire, publish=publish)
 
     async def delete(self, key: str | dict[str, Any]) -> bool:
         """删除缓存数据
@@ -1025,6 +1453,50 @@ class Cache(Generic[T]):
         """
         return await CacheRoot.delete(self.cache_type, key)
 
+    async def get_many(
+        self, keys: list[str | dict[str, Any]], default: T | None = None
+    ) -> list[T | None]:
+        """批量获取缓存数据
+
+        参数:
+            keys: 键或键参数列表
+            default: 默认值
+
+        返回:
+            list[T | None]: 与keys顺序一致的缓存数据，不存在的项为默认值
+        """
+        return await CacheRoot.get_many(self.cache_type, keys, default)
+
+    async def set_many(
+        self,
+        items: dict[str, T] | list[tuple[str | dict[str, Any], T]],
+        expire: int | None = None,
+        *,
+        publish: bool = True,
+    ) -> bool:
+        """批量设置缓存数据
+
+        参数:
+            items: 键值字典或(键或键参数, 值)列表
+            expire: 过期时间（秒），为None时使用默认值
+            publish: 是否通知其他进程清除本地缓存层
+
+        返回:
+            bool: 是否成功
+        """
+        return await CacheRoot.set_many(self.cache_type, items, expire, publish=publish)
+
+    async def delete_many(self, keys: list[str | dict[str, Any]]) -> bool:
+        """批量删除缓存数据
+
+        参数:
+            keys: 键或键参数列表
+
+        返回:
+            bool: 是否成功
+        """
+        return await CacheRoot.delete_many(self.cache_type, keys)
+
     async def exists(self, key: str | dict[str, Any]) -> bool:
         """检查缓存是否存在
 
@@ -1048,6 +1520,7 @@ class Cache(Generic[T]):
 @driver.on_startup
 async def _():
     CacheRoot.enabled = True
+    CacheRoot.start_listener()
     logger.info("缓存系统已启用", LOG_COMMAND)
 
 
@@ -14,6 +14,15 @@ CACHE_KEY_PREFIX = "ZHENXUN"
 # 缓存键分隔符
 CACHE_KEY_SEPARATOR = ":"
 
+# 二级缓存模式下缓存失效消息的发布订阅频道
+INVALIDATE_CHANNEL = f"{CACHE_KEY_PREFIX}:INVALIDATE"
+
+# 二级缓存模式下本地缓存默认最大条数
+DEFAULT_LOCAL_MAX_SIZE = 10000
+
+# 二级缓存模式下本地缓存默认过期时间（秒）
+DEFAULT_LOCAL_EXPIRE = 60
+
 # 复合键分隔符（用于分隔tuple类型的cache_key_field）
 COMPOSITE_KEY_SEPARATOR = "_"
 
@@ -24,6 +33,8 @@ class CacheMode:
     MEMORY = "MEMORY"
     # Redis缓存 - 使用Redis服务器存储缓存数据
     REDIS = "REDIS"
+    # 二级缓存 - 进程内LRU缓存 + Redis，通过Redis发布订阅同步各进程的缓存失效
+    HYBRID = "HYBRID"
     # 不使用缓存 - 将使用ttl=0的内存缓存，相当于直接从数据库获取数据
     NONE = "NONE"
 
@@ -0,0 +1,74 @@
+from collections import OrderedDict
+import time
+from typing import Any
+
+
+class LocalCache:
+    """进程内LRU缓存，带过期时间，用于二级缓存模式下的本地缓存层
+
+    存储反序列化后的对象，由 CacheManager 在每次命中时返回浅层复制，
+    调用方修改返回的对象不会影响缓存中的数据
+    """
+
+    MISS = object()
+    """未命中标记"""
+
+    def __init__(self, max_size: int, ttl: int):
+        """初始化本地缓存
+
+        参数:
+            max_size: 最大缓存条数
+            ttl: 默认过期时间（秒），0表示永不过期
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: str) -> Any:
+        """获取缓存数据
+
+        参数:
+            key: 缓存键
+
+        返回:
+            Any: 缓存数据，不存在或已过期时返回 LocalCache.MISS
+        """
+        item = self._data.get(key)
+        if item is None:
+            return self.MISS
+        expire_at, value = item
+        if expire_at and expire_at < time.monotonic():
+            del self._data[key]
+            return self.MISS
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: int | None = None):
+        """设置缓存数据
+
+        参数:
+            key: 缓存键
+            value: 缓存数据
+            ttl: 过期时间（秒），为None时使用默认值
+        """
+        ttl = self.ttl if ttl is None else ttl
+        expire_at = time.monotonic() + ttl if ttl else 0
+        self._data[key] = (expire_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def delete(self, key: str):
+        """删除缓存数据
+
+        参数:
+            key: 缓存键
+        """
+        self._data.pop(key, None)
+
+    def clear(self):
+        """清空缓存"""
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -0,0 +1,173 @@
+"""
+多实例共享的限制器状态
+
+多个进程使用同一账号运行时，将插件的CD、阻塞与每日次数限制保存在Redis中，
+一次命令检测的所有限制通过一个Lua脚本原子完成，只需一次往返。
+Redis不可用时返回None，由调用方回退到进程内限制器
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+import time
+from typing import Any, ClassVar
+
+from zhenxun.services.log import logger
+
+from . import CacheRoot, cache_config
+from .config import CACHE_KEY_PREFIX, CACHE_KEY_SEPARATOR, LOG_COMMAND, CacheMode
+
+# 依次检测每个限制，触发限制时返回其序号(从1开始)与剩余毫秒数，
+# 未触发的限制立即记录，与进程内限制器逐个检测的行为一致
+HIT_SCRIPT = """
+for i, key in ipairs(KEYS) do
+    local kind = ARGV[i * 3 - 2]
+    local p1 = tonumber(ARGV[i * 3 - 1])
+    local p2 = tonumber(ARGV[i * 3])
+    if kind == "cd" then
+        local ttl = redis.call("PTTL", key)
+        if ttl > 0 then
+            return {i, ttl}
+        end
+        redis.call("SET", key, 1, "PX", p1)
+    elseif kind == "block" then
+        if not redis.call("SET", key, 1, "NX", "PX", p1) then
+            return {i, redis.call("PTTL", key)}
+        end
+    elseif kind == "count" then
+        local num = tonumber(redis.call("GET", key) or "0")
+        if num >= p1 then
+            return {i, redis.call("PTTL", key)}
+        end
+        redis.call("INCR", key)
+        redis.call("PEXPIREAT", key, p2)
+    end
+end
+return {0, 0}
+"""
+
+LimitOp = tuple[str, str, int, int]
+"""(Redis键, 限制类型, 参数1, 参数2)"""
+
+
+class SharedLimiter:
+    """Redis共享限制器状态"""
+
+    retry_interval: ClassVar[float] = 30
+    """Redis调用失败后使用进程内限制器的时间（秒）"""
+
+    _script: ClassVar[Any] = None
+    _retry_at: ClassVar[float] = 0
+    _tasks: ClassVar[set[asyncio.Task]] = set()
+
+    @classmethod
+    def _client(cls) -> Any:
+        """获取Redis客户端，未启用或暂时不可用时返回None"""
+        if (
+            not cache_config.redis_limiter
+            or cache_config.cache_mode not in (CacheMode.REDIS, CacheMode.HYBRID)
+            or not cache_config.redis_host
+            or time.monotonic() < cls._retry_at
+        ):
+            return None
+        return getattr(CacheRoot.cache_backend, "client", None)
+
+    @classmethod
+    def _key(cls, kind: str, module: str, key: str) -> str:
+        return CACHE_KEY_SEPARATOR.join([CACHE_KEY_PREFIX, "LIMIT", kind, module, key])
+
+    @classmethod
+    def cd(cls, module: str, key: str, seconds: float) -> LimitOp:
+        """CD限制
+
+        参数:
+            module: 模块名
+            key: 限制对象
+            seconds: CD时长
+        """
+        return cls._key("cd", module, key), "cd", max(1, int(seconds * 1000)), 0
+
+    @classmethod
+    def block(cls, module: str, key: str, timeout: float) -> LimitOp:
+        """阻塞限制
+
+        参数:
+            module: 模块名
+            key: 限制对象
+            timeout: 阻塞超时时间
+        """
+        return cls._key("block", module, key), "block", int(timeout * 1000), 0
+
+    @classmethod
+    def count(cls, module: str, key: str, max_count: int) -> LimitOp:
+        """每日次数限制，次日零点过期
+
+        参数:
+            module: 模块名
+            key: 限制对象
+            max_count: 每日最大次数
+        """
+        today = datetime.now().date()
+        expire_at = datetime.combine(today + timedelta(days=1), datetime.min.time())
+        return (
+            cls._key("count", module, f"{today:%Y%m%d}{CACHE_KEY_SEPARATOR}{key}"),
+            "count",
+            max_count,
+            int(expire_at.timestamp() * 1000),
+        )
+
+    @classmethod
+    async def hit(cls, ops: list[LimitOp]) -> tuple[int, float] | None:
+        """依次检测并记录限制
+
+        参数:
+            ops: 限制列表
+
+        返回:
+            tuple[int, float] | None: 触发限制的序号(未触发时为-1)与剩余秒数,
+                Redis不可用时返回None
+        """
+        client = cls._client()
+        if client is None or not ops:
+            return None
+        if cls._script is None:
+            cls._script = client.register_script(HIT_SCRIPT)
+        args = []
+        for _, kind, p1, p2 in ops:
+            args.extend((kind, p1, p2))
+        try:
+            index, left = await cls._script(keys=[op[0] for op in ops], args=args)
+        except Exception as e:
+            cls._retry_at = time.monotonic() + cls.retry_interval
+            logger.warning(
+                f"Redis限制器调用失败，{cls.retry_interval}秒内使用进程内限制器",
+                LOG_COMMAND,
+                e=e,
+            )
+            return None
+        return int(index) - 1, max(int(left), 0) / 1000
+
+    @classmethod
+    def release(cls, module: str, key: str) -> bool:
+        """解除阻塞限制
+
+        参数:
+            module: 模块名
+            key: 限制对象
+
+        返回:
+            bool: 是否已提交到Redis
+        """
+        client = cls._client()
+        if client is None:
+            return False
+        task = asyncio.create_task(cls._delete(client, cls._key("block", module, key)))
+        cls._tasks.add(task)
+        task.add_done_callback(cls._tasks.discard)
+        return True
+
+    @classmethod
+    async def _delete(cls, client: Any, key: str):
+        try:
+            await client.delete(key)
+        except Exception as e:
+            logger.warning("Redis解除阻塞限制失败", LOG_COMMAND, e=e)
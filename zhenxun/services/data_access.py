@@ -1,5 +1,8 @@
+import asyncio
 from typing import Any, ClassVar, Generic, TypeVar, cast
 
+from tortoise.expressions import Q
+
 from zhenxun.services.cache import Cache, CacheRoot, cache_config
 from zhenxun.services.cache.config import COMPOSITE_KEY_SEPARATOR, CacheMode
 from zhenxun.services.db_context import Model, with_db_timeout
@@ -39,8 +42,14 @@ class DataAccess(Generic[T]):
 
     # 添加缓存统计信息
     _cache_stats: ClassVar[dict] = {}
+    # 正在进行中的数据库查询，用于合并同一键的并发查询
+    _inflight: ClassVar[dict[str, asyncio.Task]] = {}
     # 空结果标记
     _NULL_RESULT = "__NULL_RESULT_PLACEHOLDER__"
+    _MANY_IN_SIZE = 500
+    """get_many 单个 field__in 条件的最大取值数量"""
+    _MANY_OR_SIZE = 100
+    """get_many 单次查询合并的最大条件数量"""
     # 默认空结果缓存时间（秒）- 设置为5分钟，避免频繁查询数据库
     _NULL_RESULT_TTL = 300
 
@@ -91,6 +100,7 @@ class DataAccess(Generic[T]):
                 "sets": 0,  # 缓存设置次数
                 "null_sets": 0,  # 空结果缓存设置次数
                 "deletes": 0,  # 缓存删除次数
+                "coalesced": 0,  # 合并的并发查询次数
             }
 
     @classmethod
@@ -112,6 +122,7 @@ class DataAccess(Generic[T]):
                     "sets": stats["sets"],
                     "null_sets": stats.get("null_sets", 0),
                     "deletes": stats["deletes"],
+                    "coalesced": stats.get("coalesced", 0),
                     "hit_rate": f"{hit_rate:.2f}%",
                 }
             )
@@ -127,6 +138,17 @@ class DataAccess(Generic[T]):
             stats["sets"] = 0
             stats["null_sets"] = 0
             stats["deletes"] = 0
+            stats["coalesced"] = 0
+        CacheRoot.reset_tier_stats()
+
+    @classmethod
+    def get_cache_tier_stats(cls) -> dict[str, dict[str, Any]]:
+        """获取缓存分层命中统计（HYBRID模式下区分本地缓存层与Redis）
+
+        返回:
+            dict[str, dict[str, Any]]: 各缓存层的命中统计
+        """
+        return CacheRoot.get_tier_stats()
 
     def _build_cache_key_from_kwargs(self, **kwargs) -> str | None:
         """从关键字参数构建缓存键
@@ -163,7 +185,9 @@ class DataAccess(Generic[T]):
         """
         # 如果没有缓存类型，直接从数据库获取
         if not self.cache_type or cache_config.cache_mode == CacheMode.NONE:
-            logger.debug(f"{self.model_cls.__name__} 直接从数据库获取数据: {kwargs}")
+            logger.debug(
+                lambda: f"{self.model_cls.__name__} 直接从数据库获取数据: {kwargs}"
+            )
             return await with_db_timeout(
                 db_query_func(*args, **kwargs),
                 operation=f"{self.model_cls.__name__}.{db_query_func.__name__}",
@@ -179,18 +203,19 @@ class DataAccess(Generic[T]):
             if cache_key is not None:
                 data = await self.cache.get(cache_key)
                 logger.debug(
-                    f"{self.model_cls.__name__} self.cache.get(cache_key)"
+                    lambda: f"{self.model_cls.__name__} self.cache.get(cache_key)"
                     f" 从缓存获取到的数据 {type(data)}: {data}"
                 )
                 if data == self._NULL_RESULT:
                     # 空结果缓存命中
                     self._cache_stats[self.cache_type]["null_hits"] += 1
                     logger.debug(
-                        f"{self.model_cls.__name__} 从缓存获取到空结果: {cache_key}"
+                        lambda: f"{self.model_cls.__name__} "
+                        f"从缓存获取到空结果: {cache_key}"
                     )
                     if allow_not_exist:
                         logger.debug(
-                            f"{self.model_cls.__name__} 从缓存获取"
+                            lambda: f"{self.model_cls.__name__} 从缓存获取"
                             f"到空结果: {cache_key}, 允许数据不存在，返回None"
                         )
                         return None
@@ -198,18 +223,56 @@ class DataAccess(Generic[T]):
                     # 缓存命中
                     self._cache_stats[self.cache_type]["hits"] += 1
                     logger.debug(
-                        f"{self.model_cls.__name__} 从缓存获取数据成功: {cache_key}"
+                        lambda: f"{self.model_cls.__name__} "
+                        f"从缓存获取数据成功: {cache_key}"
                     )
                     return cast(T, data)
                 else:
                     # 缓存未命中
                     self._cache_stats[self.cache_type]["misses"] += 1
-                    logger.debug(f"{self.model_cls.__name__} 缓存未命中: {cache_key}")
+                    logger.debug(
+                        lambda: f"{self.model_cls.__name__} 缓存未命中: {cache_key}"
+                    )
         except Exception as e:
             logger.error(f"{self.model_cls.__name__} 从缓存获取数据失败: {kwargs}", e=e)
 
-        # 如果缓存中没有，从数据库获取
-        logger.debug(f"{self.model_cls.__name__} 从数据库获取数据: {kwargs}")
+        if cache_key is None:
+            return await self._load_from_db(db_query_func, cache_key, *args, **kwargs)
+
+        # 同一查询的并发未命中共享一次数据库查询，结果只写入一次缓存
+        flight_key = (
+            f"{self.cache_type}:{db_query_func.__qualname__}:"
+            f"{args!r}:{sorted(kwargs.items())!r}"
+        )
+        task = self._inflight.get(flight_key)
+        if task is None:
+            task = asyncio.create_task(
+                self._load_from_db(db_query_func, cache_key, *args, **kwargs)
+            )
+            self._inflight[flight_key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(flight_key, None))
+            # shield: 单个调用方被取消时不影响其他等待同一查询的调用方
+            return await asyncio.shield(task)
+        self._cache_stats[self.cache_type]["coalesced"] += 1
+        logger.debug(lambda: f"{self.model_cls.__name__} 合并并发查询: {cache_key}")
+        # 合并的调用方获得副本，修改返回的对象不会相互影响
+        return CacheRoot.copy_value(await asyncio.shield(task))
+
+    async def _load_from_db(
+        self, db_query_func, cache_key: str | None, *args, **kwargs
+    ) -> T | None:
+        """从数据库获取数据并写入缓存
+
+        参数:
+            db_query_func: 数据库查询函数
+            cache_key: 查询对应的缓存键，为None时不缓存空结果
+            *args: 查询参数
+            **kwargs: 查询参数
+
+        返回:
+            Optional[T]: 查询结果，如果不存在返回None
+        """
+        logger.debug(lambda: f"{self.model_cls.__name__} 从数据库获取数据: {kwargs}")
         data = await db_query_func(*args, **kwargs)
 
         # 如果获取到数据，存入缓存
@@ -219,10 +282,10 @@ class DataAccess(Generic[T]):
                 cache_key = self._build_cache_key_for_item(data)
                 if cache_key is not None:
                     # 存入缓存
-                    await self.cache.set(cache_key, data)
+                    await self.cache.set(cache_key, data, publish=False)
                     self._cache_stats[self.cache_type]["sets"] += 1
                     logger.debug(
-                        f"{self.model_cls.__name__} 数据已存入缓存: {cache_key}"
+                        lambda: f"{self.model_cls.__name__} 数据已存入缓存: {cache_key}"
                     )
             except Exception as e:
                 logger.error(
@@ -233,11 +296,14 @@ class DataAccess(Generic[T]):
             try:
                 # 存入空结果缓存，使用较短的过期时间
                 await self.cache.set(
-                    cache_key, self._NULL_RESULT, expire=self._NULL_RESULT_TTL
+                    cache_key,
+                    self._NULL_RESULT,
+                    expire=self._NULL_RESULT_TTL,
+                    publish=False,
                 )
                 self._cache_stats[self.cache_type]["null_sets"] += 1
                 logger.debug(
-                    f"{self.model_cls.__name__} 空结果已存入缓存: {cache_key},"
+                    lambda: f"{self.model_cls.__name__} 空结果已存入缓存: {cache_key},"
                     f" TTL={self._NULL_RESULT_TTL}秒"
                 )
             except Exception as e:
@@ -294,6 +360,144 @@ class DataAccess(Generic[T]):
         """
         return await self._get_with_cache(func, allow_not_exist, *args, **kwargs)
 
+    @classmethod
+    def _build_many_queries(cls, key_kwargs: list[dict[str, Any]]) -> list[Q]:
+        """将多个键合并为若干查询条件
+
+        选择取值最分散的字段生成 field__in 条件，其余字段相同的键归为一组；
+        每个 in 条件的取值数量与每次查询合并的条件数量都有上限
+
+        参数:
+            key_kwargs: 键字段字典列表（值为None表示该字段为空）
+
+        返回:
+            list[Q]: 每次查询使用的条件
+        """
+        fields = list(dict.fromkeys(f for kwargs in key_kwargs for f in kwargs))
+
+        def _group(in_field: str) -> dict[tuple, dict[Any, None]]:
+            groups: dict[tuple, dict[Any, None]] = {}
+            for kwargs in key_kwargs:
+                value = kwargs.get(in_field)
+                # 该字段为空的键无法放入 in 条件，单独成组
+                rest = tuple(
+                    (f, kwargs.get(f)) for f in fields if f != in_field or value is None
+                )
+                values = groups.setdefault(rest, {})
+                if value is not None:
+                    values[value] = None
+            return groups
+
+        in_field, groups = min(
+            ((f, _group(f)) for f in fields), key=lambda item: len(item[1])
+        )
+        conditions: list[Q] = []
+        for rest, values in groups.items():
+            filters = {
+                (f"{field}__isnull" if value is None else field): (
+                    True if value is None else value
+                )
+                for field, value in rest
+            }
+            if not values:
+                conditions.append(Q(**filters))
+                continue
+            value_list = list(values)
+            for i in range(0, len(value_list), cls._MANY_IN_SIZE):
+                filters[f"{in_field}__in"] = value_list[i : i + cls._MANY_IN_SIZE]
+                conditions.append(Q(**filters))
+        return [
+            Q(*conditions[i : i + cls._MANY_OR_SIZE], join_type=Q.OR)
+            for i in range(0, len(conditions), cls._MANY_OR_SIZE)
+        ]
+
+    async def get_many(self, keys: list[Any]) -> list[T | None]:
+        """按主键批量获取数据，缓存命中部分批量读取，未命中部分合并为一次查询
+
+        参数:
+            keys: 主键值列表，复合主键时为字段字典列表（值为None表示该字段为空）
+
+        返回:
+            list[T | None]: 与keys顺序一致的查询结果，不存在的项为None
+        """
+        if not keys:
+            return []
+        key_kwargs = [
+            key if isinstance(key, dict) else {self.key_field: key} for key in keys
+        ]
+        # 与 safe_get_or_none(field__isnull=True) 的缓存键保持一致
+        cache_keys = [
+            self._build_cache_key_from_kwargs(
+                **{k: v for k, v in kwargs.items() if v is not None}
+            )
+            for kwargs in key_kwargs
+        ]
+        result: list[T | None] = [None] * len(keys)
+        pending = list(range(len(keys)))
+
+        use_cache = cache_config.cache_mode != CacheMode.NONE
+        if use_cache:
+            try:
+                values = await self.cache.get_many(cast(list, cache_keys))
+                stats = self._cache_stats[self.cache_type]
+                remaining = []
+                for i, data in zip(pending, values):
+                    if data == self._NULL_RESULT:
+                        stats["null_hits"] += 1
+                    elif data:
+                        stats["hits"] += 1
+                        result[i] = cast(T, data)
+                    else:
+                        stats["misses"] += 1
+                        remaining.append(i)
+                pending = remaining
+            except Exception as e:
+                logger.error(f"{self.model_cls.__name__} 批量获取缓存失败", e=e)
+        if not pending:
+            return result
+
+        # 未命中部分按 field__in 分组合并查询，避免逐键 OR 导致表达式过深
+        data_list: list[T] = []
+        for query in self._build_many_queries([key_kwargs[i] for i in pending]):
+            data_list.extend(
+                await with_db_timeout(
+                    self.model_cls.filter(query).all(),
+                    operation=f"{self.model_cls.__name__}.get_many",
+                )
+            )
+        found: dict[str, T] = {}
+        for item in data_list:
+            if (key := self._build_composite_key(item)) is not None:
+                found.setdefault(key, item)
+        for i in pending:
+            result[i] = found.get(cast(str, cache_keys[i]))
+
+        if use_cache:
+            try:
+                hit_items = [
+                    (cache_key, item)
+                    for item in found.values()
+                    if (cache_key := self._build_cache_key_for_item(item)) is not None
+                ]
+                null_keys = [
+                    cache_keys[i]
+                    for i in pending
+                    if result[i] is None and cache_keys[i] is not None
+                ]
+                if hit_items:
+                    await self.cache.set_many(cast(list, hit_items), publish=False)
+                    self._cache_stats[self.cache_type]["sets"] += len(hit_items)
+                if null_keys:
+                    await self.cache.set_many(
+                        [(key, self._NULL_RESULT) for key in null_keys],
+                        expire=self._NULL_RESULT_TTL,
+                        publish=False,
+                    )
+                    self._cache_stats[self.cache_type]["null_sets"] += len(null_keys)
+            except Exception as e:
+                logger.error(f"{self.model_cls.__name__} 批量存入缓存失败", e=e)
+        return result
+
     async def clear_cache(self, **kwargs) -> bool:
         """只清除缓存，不影响数据库数据
 
@@ -330,7 +534,7 @@ class DataAccess(Generic[T]):
             # 删除缓存
             await self.cache.delete(cache_key)
             self._cache_stats[self.cache_type]["deletes"] += 1
-            logger.debug(f"已清除{self.model_cls.__name__}缓存: {cache_key}")
+            logger.debug(lambda: f"已清除{self.model_cls.__name__}缓存: {cache_key}")
             return True
         except Exception as e:
             logger.error(f"清除{self.model_cls.__name__}缓存失败", e=e)
@@ -413,12 +617,13 @@ class DataAccess(Generic[T]):
             for item in data_list:
                 cache_key = self._build_cache_key_for_item(item)
                 if cache_key is not None:
-                    await self.cache.set(cache_key, item)
+                    await self.cache.set(cache_key, item, publish=False)
                     cached_count += 1
                     self._cache_stats[self.cache_type]["sets"] += 1
 
             logger.debug(
-                f"{self.model_cls.__name__} 批量缓存: {cached_count}/{len(data_list)}项"
+                lambda: f"{self.model_cls.__name__} "
+                f"批量缓存: {cached_count}/{len(data_list)}项"
             )
         except Exception as e:
             logger.error(f"{self.model_cls.__name__} 批量缓存失败", e=e)
@@ -434,10 +639,12 @@ class DataAccess(Generic[T]):
             List[T]: 查询结果列表
         """
         # 从数据库获取数据
-        logger.debug(f"{self.model_cls.__name__} filter: 从数据库查询, 参数: {kwargs}")
+        logger.debug(
+            lambda: f"{self.model_cls.__name__} filter: 从数据库查询, 参数: {kwargs}"
+        )
         data_list = await self.model_cls.filter(*args, **kwargs)
         logger.debug(
-            f"{self.model_cls.__name__} filter: 查询结果数量: {len(data_list)}"
+            lambda: f"{self.model_cls.__name__} filter: 查询结果数量: {len(data_list)}"
         )
 
         # 将数据存入缓存
@@ -452,9 +659,11 @@ class DataAccess(Generic[T]):
             List[T]: 所有数据列表
         """
         # 直接从数据库获取
-        logger.debug(f"{self.model_cls.__name__} all: 从数据库查询所有数据")
+        logger.debug(lambda: f"{self.model_cls.__name__} all: 从数据库查询所有数据")
         data_list = await self.model_cls.all()
-        logger.debug(f"{self.model_cls.__name__} all: 查询结果数量: {len(data_list)}")
+        logger.debug(
+            lambda: f"{self.model_cls.__name__} all: 查询结果数量: {len(data_list)}"
+        )
 
         # 将数据存入缓存
         await self._cache_items(data_list)
@@ -497,7 +706,9 @@ class DataAccess(Generic[T]):
             T: 创建的数据
         """
         # 创建数据
-        logger.debug(f"{self.model_cls.__name__} create: 创建数据, 参数: {kwargs}")
+        logger.debug(
+            lambda: f"{self.model_cls.__name__} create: 创建数据, 参数: {kwargs}"
+        )
         data = await self.model_cls.create(**kwargs)
 
         # 如果有缓存类型，将数据存入缓存
@@ -510,7 +721,7 @@ class DataAccess(Generic[T]):
                     await self.cache.set(cache_key, data)
                     self._cache_stats[self.cache_type]["sets"] += 1
                     logger.debug(
-                        f"{self.model_cls.__name__} create: "
+                        lambda: f"{self.model_cls.__name__} create: "
                         f"新创建的数据已存入缓存: {cache_key}"
                     )
             except Exception as e:
@@ -547,7 +758,7 @@ class DataAccess(Generic[T]):
                     # 存入缓存
                     await self.cache.set(cache_key, data)
                     self._cache_stats[self.cache_type]["sets"] += 1
-                    logger.debug(f"更新或创建的数据已存入缓存: {cache_key}")
+                    logger.debug(lambda: f"更新或创建的数据已存入缓存: {cache_key}")
             except Exception as e:
                 logger.error(f"存入缓存失败，参数: {kwargs}", e=e)
 
@@ -563,7 +774,9 @@ class DataAccess(Generic[T]):
         返回:
             int: 删除的数据数量
         """
-        logger.debug(f"{self.model_cls.__name__} delete: 删除数据, 参数: {kwargs}")
+        logger.debug(
+            lambda: f"{self.model_cls.__name__} delete: 删除数据, 参数: {kwargs}"
+        )
 
         # 如果有缓存类型且有key_field参数，先尝试删除缓存
         if self.cache_type and cache_config.cache_mode != CacheMode.NONE:
@@ -576,13 +789,14 @@ class DataAccess(Generic[T]):
                     await self.cache.delete(cache_key)
                     self._cache_stats[self.cache_type]["deletes"] += 1
                     logger.debug(
-                        f"{self.model_cls.__name__} delete: 已删除缓存: {cache_key}"
+                        lambda: f"{self.model_cls.__name__} "
+                        f"delete: 已删除缓存: {cache_key}"
                     )
                 else:
                     # 否则需要先查询出要删除的数据，然后删除对应的缓存
                     items = await self.model_cls.filter(*args, **kwargs)
                     logger.debug(
-                        f"{self.model_cls.__name__} delete:"
+                        lambda: f"{self.model_cls.__name__} delete:"
                         f" 查询到 {len(items)} 条要删除的数据"
                     )
                     for item in items:
@@ -592,7 +806,7 @@ class DataAccess(Generic[T]):
                             self._cache_stats[self.cache_type]["deletes"] += 1
                     if items:
                         logger.debug(
-                            f"{self.model_cls.__name__} delete:"
+                            lambda: f"{self.model_cls.__name__} delete:"
                             f" 已删除 {len(items)} 条数据的缓存"
                         )
             except Exception as e:
@@ -601,7 +815,7 @@ class DataAccess(Generic[T]):
         # 删除数据
         result = await self.model_cls.filter(*args, **kwargs).delete()
         logger.debug(
-            f"{self.model_cls.__name__} delete: 已从数据库删除 {result} 条数据"
+            lambda: f"{self.model_cls.__name__} delete: 已从数据库删除 {result} 条数据"
         )
         return result
 
@@ -1,5 +1,5 @@
 import asyncio
-from collections.abc import Iterable
+from collections.abc import Callable, Iterable
 import contextlib
 from typing import Any, ClassVar
 from typing_extensions import Self
@@ -24,6 +24,8 @@ class Model(TortoiseModel):
 
     sem_data: ClassVar[dict[str, dict[str, asyncio.Semaphore]]] = {}
     _current_locks: ClassVar[dict[int, DbLockType]] = {}  # 跟踪当前协程持有的锁
+    _change_listeners: ClassVar[dict[str, list[Callable[[Any, bool], Any]]]] = {}
+    """数据变更监听器，键为模型类名"""
 
     def __init_subclass__(cls, **kwargs):
         super().__init_subclass__(**kwargs)
@@ -76,6 +78,32 @@ class Model(TortoiseModel):
 
         return None
 
+    @classmethod
+    def add_change_listener(cls, func: Callable[[Any, bool], Any]):
+        """注册数据变更监听器
+
+        在 create/save/delete 等操作使缓存失效的同时同步调用，
+        监听器签名为 func(instance, deleted)，不应执行耗时操作
+
+        参数:
+            func: 监听函数
+        """
+        cls._change_listeners.setdefault(cls.__name__, []).append(func)
+
+    @classmethod
+    def _notify_change(cls, instance: Any, deleted: bool = False):
+        """通知数据变更
+
+        参数:
+            instance: 变更的模型实例
+            deleted: 是否为删除操作
+        """
+        for func in cls._change_listeners.get(cls.__name__, []):
+            try:
+                func(instance, deleted)
+            except Exception as e:
+                logger.error(f"{cls.__name__} 数据变更监听器执行失败", LOG_COMMAND, e=e)
+
     @classmethod
     def get_semaphore(cls, lock_type: DbLockType):
         enable_lock = getattr(cls, "enable_lock", None)
@@ -119,6 +147,7 @@ class Model(TortoiseModel):
             result = await super().create(using_db=using_db, **kwargs)
             if cache_type := cls.get_cache_type():
                 await CacheRoot.invalidate_cache(cache_type, cls.get_cache_key(result))
+            cls._notify_change(result)
             return result
 
     @classmethod
@@ -134,6 +163,8 @@ class Model(TortoiseModel):
         )
         if cache_type := cls.get_cache_type():
             await CacheRoot.invalidate_cache(cache_type, cls.get_cache_key(result[0]))
+        if result[1]:
+            cls._notify_change(result[0])
         return result
 
     @classmethod
@@ -160,6 +191,7 @@ class Model(TortoiseModel):
                     await CacheRoot.invalidate_cache(
                         cache_type, cls.get_cache_key(result[0])
                     )
+                cls._notify_change(result[0])
                 return result
             except IntegrityError:
                 # 处理极端情况下的唯一约束冲突
@@ -190,6 +222,7 @@ class Model(TortoiseModel):
                 await CacheRoot.invalidate_cache(
                     cache_type, self.__class__.get_cache_key(self)
                 )
+            self.__class__._notify_change(self)
 
     async def delete(self, using_db: BaseDBAsyncClient | None = None):
         cache_type = getattr(self, "cache_type", None)
@@ -200,6 +233,7 @@ class Model(TortoiseModel):
         # 清除缓存
         if cache_type:
             await CacheRoot.invalidate_cache(cache_type, key)
+        self.__class__._notify_change(self, deleted=True)
 
     @classmethod
     async def safe_get_or_none(
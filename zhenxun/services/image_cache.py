@@ -0,0 +1,373 @@
+"""
+图片缓存服务
+
+头像等远程图片按内容哈希保存在本地，内存中维护url到文件的索引：
+- 相同内容的图片只保存一份，总大小超过上限时按最近最少使用淘汰
+- 过期后携带 ETag/Last-Modified 重新验证，未修改时只刷新过期时间
+- 同一url的并发请求只下载一次，下载失败时返回已过期的缓存
+- 使用全局共享的 httpx 客户端
+"""
+
+import asyncio
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass
+import hashlib
+import time
+from typing import Any, ClassVar
+
+import aiofiles
+from httpx import Response
+import nonebot
+import ujson as json
+
+from zhenxun.configs.config import Config
+from zhenxun.configs.path_config import DATA_PATH
+from zhenxun.services.log import logger
+from zhenxun.utils.http_utils import get_client
+from zhenxun.utils.manager.priority_manager import PriorityLifecycle
+
+LOG_COMMAND = "ImageCache"
+
+CACHE_PATH = DATA_PATH / "image_cache"
+
+Config.add_plugin_config(
+    "image_cache",
+    "MAX_SIZE",
+    200,
+    help="头像等远程图片本地缓存的最大占用空间(MB)，为0时不缓存",
+    default_value=200,
+    type=int,
+)
+Config.add_plugin_config(
+    "image_cache",
+    "TTL",
+    86400,
+    help="远程图片缓存的有效时间(秒)，过期后向源站验证是否更新",
+    default_value=86400,
+    type=int,
+)
+
+driver = nonebot.get_driver()
+
+
+@dataclass
+class CacheEntry:
+    digest: str
+    """内容sha256"""
+    size: int
+    """大小"""
+    expire: float
+    """过期时间戳"""
+    etag: str | None = None
+    last_modified: str | None = None
+
+
+class ImageCache:
+    """远程图片缓存
+
+    使用示例:
+    ```python
+    from zhenxun.services.image_cache import ImageCache
+
+    data = await ImageCache.get(url)
+    await ImageCache.prefetch(url_list)
+    ```
+    """
+
+    index: ClassVar[OrderedDict[str, CacheEntry]] = OrderedDict()
+    """url索引，按最近使用排序"""
+    refs: ClassVar[dict[str, int]] = {}
+    """内容文件被引用次数"""
+    total_size: ClassVar[int] = 0
+    """内容文件总大小"""
+
+    _pending: ClassVar[dict[str, asyncio.Future[bytes | None]]] = {}
+    _lock: ClassVar[asyncio.Lock] = asyncio.Lock()
+    _dirty: ClassVar[bool] = False
+    _loaded: ClassVar[bool] = False
+    _task: ClassVar[asyncio.Task | None] = None
+    _metrics: ClassVar[dict[str, int]] = {
+        "requests": 0,
+        "hits": 0,
+        "misses": 0,
+        "revalidated": 0,
+        "stale": 0,
+        "coalesced": 0,
+        "errors": 0,
+        "evictions": 0,
+    }
+
+    @classmethod
+    def _blob_path(cls, digest: str):
+        return CACHE_PATH / digest[:2] / digest
+
+    @classmethod
+    def _load(cls):
+        """加载索引，丢弃文件已不存在的记录"""
+        cls._loaded = True
+        file = CACHE_PATH / "index.json"
+        if not file.exists():
+            return
+        try:
+            with file.open(encoding="utf8") as f:
+                data = json.load(f)
+        except ValueError as e:
+            logger.warning("图片缓存索引损坏，已重置", LOG_COMMAND, e=e)
+            return
+        for url, item in data.items():
+            entry = CacheEntry(**item)
+            if (
+                entry.digest not in cls.refs
+                and not cls._blob_path(entry.digest).exists()
+            ):
+                continue
+            cls.index[url] = entry
+            if entry.digest not in cls.refs:
+                cls.refs[entry.digest] = 0
+                cls.total_size += entry.size
+            cls.refs[entry.digest] += 1
+
+    @classmethod
+    def save(cls):
+        """保存索引"""
+        if not cls._dirty:
+            return
+        CACHE_PATH.mkdir(parents=True, exist_ok=True)
+        with (CACHE_PATH / "index.json").open("w", encoding="utf8") as f:
+            json.dump({url: asdict(entry) for url, entry in cls.index.items()}, f)
+        cls._dirty = False
+
+    @classmethod
+    async def get(
+        cls, url: str, *, ttl: int | None = None, timeout: float = 10
+    ) -> bytes | None:
+        """获取图片，优先使用缓存
+
+        参数:
+            url: 图片url
+            ttl: 缓存有效时间（秒），默认使用配置
+            timeout: 下载超时时间
+
+        返回:
+            bytes | None: 图片内容，下载失败且无缓存时为None
+        """
+        if not cls._loaded:
+            cls._load()
+        cls._metrics["requests"] += 1
+        if not Config.get_config("image_cache", "MAX_SIZE"):
+            try:
+                return (await cls._download(url, timeout)).content
+            except Exception as e:
+                cls._metrics["errors"] += 1
+                logger.warning(f"图片下载失败: {url}", LOG_COMMAND, e=e)
+                return None
+        entry = cls.index.get(url)
+        if entry and entry.expire > time.time():
+            if (data := await cls._read(url, entry)) is not None:
+                cls._metrics["hits"] += 1
+                return data
+            entry = None
+        if future := cls._pending.get(url):
+            cls._metrics["coalesced"] += 1
+            return await asyncio.shield(future)
+        future = asyncio.get_running_loop().create_future()
+        cls._pending[url] = future
+        data = None
+        try:
+            data = await cls._fetch(url, entry, ttl, timeout)
+        except Exception as e:
+            logger.warning(f"写入图片缓存失败: {url}", LOG_COMMAND, e=e)
+        finally:
+            del cls._pending[url]
+            future.set_result(data)
+        return data
+
+    @classmethod
+    async def prefetch(cls, urls: Iterable[str], limit: int = 8):
+        """批量预取图片
+
+        参数:
+            urls: 图片url
+            limit: 最大并发数
+        """
+        semaphore = asyncio.Semaphore(limit)
+
+        async def _get(url: str):
+            async with semaphore:
+                await cls.get(url)
+
+        await asyncio.gather(*(_get(url) for url in set(urls)))
+
+    @classmethod
+    async def _read(cls, url: str, entry: CacheEntry) -> bytes | None:
+        try:
+            async with aiofiles.open(cls._blob_path(entry.digest), "rb") as f:
+                data = await f.read()
+        except FileNotFoundError:
+            cls._remove(url)
+            return None
+        cls.index.move_to_end(url)
+        return data
+
+    @classmethod
+    async def _download(
+        cls, url: str, timeout: float, headers: dict[str, str] | None = None
+    ) -> Response:
+        response = await get_client().get(url, headers=headers, timeout=timeout)
+        if response.status_code != 304:
+            response.raise_for_status()
+        return response
+
+    @classmethod
+    async def _fetch(
+        cls, url: str, entry: CacheEntry | None, ttl: int | None, timeout: float
+    ) -> bytes | None:
+        """下载或重新验证图片并写入缓存
+
+        参数:
+            url: 图片url
+            entry: 已过期的缓存
+            ttl: 缓存有效时间
+            timeout: 下载超时时间
+
+        返回:
+            bytes | None: 图片内容
+        """
+        ttl = ttl or Config.get_config("image_cache", "TTL") or 86400
+        headers = {}
+        if entry and entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry and entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        try:
+            response = await cls._download(url, timeout, headers)
+        except Exception as e:
+            cls._metrics["errors"] += 1
+            if entry and (data := await cls._read(url, entry)) is not None:
+                cls._metrics["stale"] += 1
+                logger.debug(f"图片下载失败，使用过期缓存: {url}", LOG_COMMAND, e=e)
+                return data
+            logger.warning(f"图片下载失败: {url}", LOG_COMMAND, e=e)
+            return None
+        if response.status_code == 304 and entry:
+            cls._metrics["revalidated"] += 1
+            entry.expire = time.time() + ttl
+            cls._dirty = True
+            return await cls._read(url, entry)
+        cls._metrics["misses"] += 1
+        if data := response.content:
+            await cls._store(
+                url,
+                data,
+                CacheEntry(
+                    "",
+                    len(data),
+                    time.time() + ttl,
+                    response.headers.get("ETag"),
+                    response.headers.get("Last-Modified"),
+                ),
+            )
+        return data
+
+    @classmethod
+    async def _store(cls, url: str, data: bytes, entry: CacheEntry):
+        """写入内容文件并更新索引
+
+        参数:
+            url: 图片url
+            data: 图片内容
+            entry: 缓存记录
+        """
+        entry.digest = hashlib.sha256(data).hexdigest()
+        # 相同内容的不同url可能同时写入
+        async with cls._lock:
+            old = cls.index.get(url)
+            if old and old.digest == entry.digest:
+                # 内容未变化，只刷新过期时间与验证信息
+                old.expire = entry.expire
+                old.etag = entry.etag
+                old.last_modified = entry.last_modified
+                cls.index.move_to_end(url)
+                cls._dirty = True
+                return
+            # 先释放旧内容的引用，避免与新内容的去重判断互相影响
+            cls._remove(url)
+            if entry.digest not in cls.refs:
+                path = cls._blob_path(entry.digest)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_suffix(".tmp")
+                async with aiofiles.open(tmp, "wb") as f:
+                    await f.write(data)
+                tmp.replace(path)
+                cls.refs[entry.digest] = 0
+                cls.total_size += entry.size
+            cls.refs[entry.digest] += 1
+            cls.index[url] = entry
+        cls._dirty = True
+        cls._evict()
+
+    @classmethod
+    def _remove(cls, url: str):
+        """移除url索引，内容文件不再被引用时删除"""
+        if not (entry := cls.index.pop(url, None)):
+            return
+        cls._dirty = True
+        cls.refs[entry.digest] -= 1
+        if cls.refs[entry.digest] <= 0:
+            del cls.refs[entry.digest]
+            cls.total_size -= entry.size
+            cls._blob_path(entry.digest).unlink(missing_ok=True)
+
+    @classmethod
+    def _evict(cls):
+        """超过最大占用空间时淘汰最近最少使用的图片"""
+        max_size = (Config.get_config("image_cache", "MAX_SIZE") or 0) * 1024 * 1024
+        while cls.total_size > max_size and cls.index:
+            cls._remove(next(iter(cls.index)))
+            cls._metrics["evictions"] += 1
+
+    @classmethod
+    def get_metrics(cls) -> dict[str, Any]:
+        """获取缓存指标
+
+        返回:
+            dict[str, Any]: 命中率、条数与占用空间等指标
+        """
+        metrics = cls._metrics
+        hits = metrics["hits"] + metrics["revalidated"] + metrics["coalesced"]
+        return {
+            **metrics,
+            "hit_rate": round(hits / metrics["requests"], 4)
+            if metrics["requests"]
+            else 0.0,
+            "entries": len(cls.index),
+            "files": len(cls.refs),
+            "size": cls.total_size,
+            "max_size": (Config.get_config("image_cache", "MAX_SIZE") or 0)
+            * 1024
+            * 1024,
+        }
+
+    @classmethod
+    async def _run(cls):
+        while True:
+            await asyncio.sleep(60)
+            try:
+                cls.save()
+            except Exception as e:
+                logger.warning("保存图片缓存索引失败", LOG_COMMAND, e=e)
+
+
+@PriorityLifecycle.on_startup(priority=5)
+async def _():
+    if not ImageCache._loaded:
+        ImageCache._load()
+    ImageCache._task = asyncio.create_task(ImageCache._run())
+
+
+@driver.on_shutdown
+async def _():
+    if ImageCache._task:
+        ImageCache._task.cancel()
+    ImageCache.save()
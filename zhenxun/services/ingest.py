@@ -0,0 +1,581 @@
+"""
+写入缓冲服务
+
+为聊天记录、调用统计这类高频追加写入的数据提供有界的批量写入队列：
+- 队列有上限，写满时调用方等待（背压），超时仍无法写入则丢弃并计数；
+  不能等待的调用方（如消息响应器）使用 put_nowait 直接丢弃并计数
+- 写入失败时区分数据库暂时不可用与数据错误：前者保留队列并指数退避重试，
+  后者对半拆分批次定位错误记录，确认单条失败而相邻记录可写入后才移至死信文件
+- 达到批量大小或到达刷新间隔时批量写入，按块执行 executemany
+- 队列中只保存普通元组，写入时才转换为数据库值，不构造模型对象
+- 可选追加写入的落盘文件，按间隔在线程中批量写入，启动时重放未写入数据库的记录
+"""
+
+import asyncio
+from collections import deque
+from collections.abc import Awaitable, Callable, Sequence
+import contextlib
+from datetime import datetime
+import json
+import time
+from typing import Any, ClassVar
+
+import nonebot
+from tortoise import timezone
+from tortoise.exceptions import IntegrityError, ValidationError
+from tortoise.fields import DatetimeField
+from tortoise.transactions import in_transaction
+
+from zhenxun.configs.config import Config
+from zhenxun.configs.path_config import DATA_PATH
+from zhenxun.services.db_context import Model
+from zhenxun.services.log import logger
+from zhenxun.utils.manager.priority_manager import PriorityLifecycle
+
+LOG_COMMAND = "Ingest"
+
+SPOOL_PATH = DATA_PATH / "ingest"
+
+SPOOL_INTERVAL = 1
+"""落盘文件写入间隔（秒）"""
+MAX_DEAD_RUN = 10
+"""连续单条写入失败且没有任何记录写入成功时，视为数据库异常而非数据错误"""
+
+Config.add_plugin_config(
+    "ingest",
+    "SPOOL",
+    False,
+    help="是否将待写入的聊天记录/调用统计追加写入本地文件，异常退出后启动时重放",
+    default_value=False,
+    type=bool,
+)
+
+driver = nonebot.get_driver()
+
+
+class _ListenerError(Exception):
+    """事务监听执行失败"""
+
+
+class IngestPipeline:
+    """有界批量写入队列
+
+    使用示例:
+    ```python
+    from zhenxun.services.ingest import IngestPipeline
+
+    pipeline = IngestPipeline(
+        "chat_history", ChatHistory, ("user_id", "group_id", "text")
+    )
+
+    await pipeline.put((user_id, group_id, text))
+    ```
+    """
+
+    _pipelines: ClassVar[dict[str, "IngestPipeline"]] = {}
+
+    def __init__(
+        self,
+        name: str,
+        model: type[Model],
+        fields: Sequence[str],
+        *,
+        max_size: int = 20000,
+        batch_size: int = 500,
+        flush_interval: float = 60,
+        put_timeout: float = 5,
+        max_backoff: float = 300,
+    ):
+        """初始化写入队列
+
+        参数:
+            name: 队列名称，同时作为落盘文件名
+            model: 写入的模型
+            fields: 元组中各项对应的字段名
+            max_size: 队列最大长度
+            batch_size: 单次写入条数，队列达到该长度时立即刷新
+            flush_interval: 刷新间隔（秒）
+            put_timeout: 队列已满时等待的最长时间（秒），超时后丢弃该条记录
+            max_backoff: 数据库不可用时重试的最长退避时间（秒）
+        """
+        self.name = name
+        self.model = model
+        self.fields = tuple(fields)
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self.max_backoff = max_backoff
+        self._retries = 0
+        self._retry_at = 0.0
+        # 未指定的自动时间字段在入队时记录时间戳，写入时转换为时间
+        self._auto_time_fields = tuple(
+            field_name
+            for field_name, field in model._meta.fields_map.items()
+            if isinstance(field, DatetimeField)
+            and (field.auto_now or field.auto_now_add)
+            and field_name not in self.fields
+        )
+        self._buffer: deque[tuple] = deque()
+        self._wakeup = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._not_full.set()
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self._spool = None
+        self._spool_lines: list[str] = []
+        self._spool_lock = asyncio.Lock()
+        self._spool_task: asyncio.Task | None = None
+        self._flush_listeners: list[
+            Callable[[list[dict[str, Any]]], Awaitable[None]]
+        ] = []
+        self._tx_listeners: list[Callable[[list[dict[str, Any]]], Awaitable[None]]] = []
+        self._metrics = {
+            "queued": 0,
+            "inserted": 0,
+            "dropped": 0,
+            "failures": 0,
+            "dead_lettered": 0,
+            "flushes": 0,
+            "replayed": 0,
+            "last_flush_latency": 0.0,
+            "total_flush_latency": 0.0,
+        }
+        self._pipelines[name] = self
+
+    @property
+    def spool_file(self):
+        return SPOOL_PATH / f"{self.name}.jsonl"
+
+    @property
+    def dead_letter_file(self):
+        return SPOOL_PATH / f"{self.name}.dead.jsonl"
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    async def put(self, row: tuple):
+        """写入一条记录，队列已满时等待，超时后丢弃
+
+        参数:
+            row: 与fields顺序一致的值元组
+        """
+        if len(self._buffer) >= self.max_size:
+            self._notify()
+            self._not_full.clear()
+            try:
+                await asyncio.wait_for(self._not_full.wait(), self.put_timeout)
+            except asyncio.TimeoutError:
+                self._drop()
+                return
+        self._append(row)
+
+    def put_nowait(self, row: tuple) -> bool:
+        """写入一条记录，队列已满时不等待，直接丢弃
+
+        参数:
+            row: 与fields顺序一致的值元组
+
+        返回:
+            bool: 是否写入队列
+        """
+        if len(self._buffer) >= self.max_size:
+            self._notify()
+            self._drop()
+            return False
+        self._append(row)
+        return True
+
+    def _drop(self):
+        self._metrics["dropped"] += 1
+        logger.warning(
+            f"{self.name} 写入队列已满({self.max_size})，丢弃记录", LOG_COMMAND
+        )
+
+    def _append(self, row: tuple):
+        if self._auto_time_fields:
+            row = (*row, time.time())
+        self._buffer.append(row)
+        self._metrics["queued"] += 1
+        if self._spool:
+            self._spool_lines.append(json.dumps(row, ensure_ascii=False) + "\n")
+        if len(self._buffer) >= self.batch_size:
+            self._notify()
+
+    def _notify(self):
+        """唤醒刷新任务，退避期间不提前唤醒"""
+        if time.monotonic() >= self._retry_at:
+            self._wakeup.set()
+
+    def add_flush_listener(
+        self,
+        func: Callable[[list[dict[str, Any]]], Awaitable[None]],
+        *,
+        transactional: bool = False,
+    ):
+        """注册写入完成监听，用于增量维护汇总数据等
+
+        参数:
+            func: 回调函数，参数为本次写入的记录（字段名到值的字典）
+            transactional: 是否与写入在同一事务中执行，执行失败时本批记录
+                一同回滚并等待重试，用于必须与原始数据保持一致的汇总
+        """
+        if transactional:
+            self._tx_listeners.append(func)
+        else:
+            self._flush_listeners.append(func)
+
+    def _to_dicts(self, rows: list[tuple]) -> list[dict[str, Any]]:
+        """将元组转换为字段字典，自动时间字段转换为时间
+
+        参数:
+            rows: 值元组列表
+
+        返回:
+            list[dict[str, Any]]: 字段字典列表
+        """
+        names = self.fields + self._auto_time_fields
+        tz = timezone.get_default_timezone()
+        result = []
+        for row in rows:
+            data = dict(zip(names, row))
+            for field_name in self._auto_time_fields:
+                data[field_name] = datetime.fromtimestamp(data[field_name], tz)
+            result.append(data)
+        return result
+
+    def _build_values(self, executor, rows: list[tuple]) -> list[list[Any]]:
+        """将元组转换为插入语句参数
+
+        参数:
+            executor: 模型的数据库执行器
+            rows: 值元组列表
+
+        返回:
+            list[list[Any]]: executemany参数
+        """
+        fields_map = self.model._meta.fields_map
+        names = self.fields + self._auto_time_fields
+        tz = timezone.get_default_timezone()
+        getters = []
+        for column in executor.regular_columns:
+            to_db = executor.column_map[column]
+            if column in self._auto_time_fields:
+                index = names.index(column)
+                getters.append(
+                    lambda row, i=index, f=to_db: f(
+                        datetime.fromtimestamp(row[i], tz), self.model
+                    )
+                )
+            elif column in names:
+                index = names.index(column)
+                getters.append(lambda row, i=index, f=to_db: f(row[i], self.model))
+            else:
+                default = fields_map[column].default
+                getters.append(
+                    lambda _, d=default, f=to_db: f(
+                        d() if callable(d) else d, self.model
+                    )
+                )
+        return [[getter(row) for getter in getters] for row in rows]
+
+    async def _insert(self, rows: list[tuple]):
+        db = self.model._meta.db
+        executor = db.executor_class(model=self.model, db=db)
+        await db.execute_many(executor.insert_query, self._build_values(executor, rows))
+
+    async def _write(self, rows: list[tuple]):
+        """写入一批记录，存在事务监听时与监听在同一事务中执行
+
+        参数:
+            rows: 值元组列表
+        """
+        if not self._tx_listeners:
+            await self._insert(rows)
+            return
+        data = self._to_dicts(rows)
+        async with in_transaction(self.model._meta.default_connection):
+            await self._insert(rows)
+            for func in self._tx_listeners:
+                try:
+                    await func(data)
+                except Exception as e:
+                    # 监听失败与数据本身无关，按暂时不可用处理
+                    raise _ListenerError(f"{self.name} 写入事务监听执行失败") from e
+
+    def _is_bad_data(self, e: Exception) -> bool:
+        """判断写入失败是否由数据本身导致，重试无法恢复
+
+        参数:
+            e: 写入异常
+
+        返回:
+            bool: 是否为数据错误
+        """
+        # 连接失败、数据库锁定等 OperationalError 均视为暂时不可用，保留记录重试
+        return isinstance(e, IntegrityError | ValidationError | ValueError | TypeError)
+
+    def _backoff(self):
+        """数据库暂时不可用时按指数退避推迟下次刷新"""
+        self._retries += 1
+        delay = min(self.max_backoff, 2 ** (self._retries - 1))
+        self._retry_at = time.monotonic() + delay
+        self._wakeup.clear()
+
+    def _dead_letter(self, suspects: list[tuple[tuple, Exception]]):
+        """将确认无法写入的记录追加到死信文件
+
+        参数:
+            suspects: 值元组与写入异常
+        """
+        self._metrics["dead_lettered"] += len(suspects)
+        self._not_full.set()
+        for row, e in suspects:
+            logger.warning(
+                f"{self.name} 记录无法写入，已移至死信文件: {row}", LOG_COMMAND, e=e
+            )
+        try:
+            SPOOL_PATH.mkdir(parents=True, exist_ok=True)
+            with self.dead_letter_file.open("a", encoding="utf-8") as f:
+                f.writelines(
+                    json.dumps(row, ensure_ascii=False, default=str) + "\n"
+                    for row, _ in suspects
+                )
+        except Exception as ex:
+            logger.error(f"{self.name} 写入死信文件失败", LOG_COMMAND, e=ex)
+
+    async def flush(self) -> int:
+        """将队列中的记录写入数据库
+
+        数据库暂时不可用时保留队列并退避重试；数据错误时对半拆分批次，
+        单条写入失败的记录在相邻记录写入成功后才移至死信文件，
+        连续多条单独失败时视为数据库异常，保留记录等待重试
+
+        返回:
+            int: 写入条数
+        """
+        async with self._lock:
+            total = 0
+            dead = 0
+            size = self.batch_size
+            # 单独写入失败，等待相邻记录写入成功后确认的记录
+            suspects: list[tuple[tuple, Exception]] = []
+            while self._buffer:
+                rows = [self._buffer[i] for i in range(min(size, len(self._buffer)))]
+                start = time.perf_counter()
+                try:
+                    await self._write(rows)
+                except Exception as e:
+                    self._metrics["failures"] += 1
+                    if not self._is_bad_data(e):
+                        self._restore(suspects)
+                        suspects = []
+                        self._backoff()
+                        logger.warning(
+                            f"{self.name} 批量写入失败，"
+                            f"剩余 {len(self._buffer)} 条等待重试",
+                            LOG_COMMAND,
+                            e=e,
+                        )
+                        break
+                    if len(rows) > 1:
+                        size = len(rows) // 2
+                        continue
+                    suspects.append((self._buffer.popleft(), e))
+                    size = self.batch_size
+                    if len(suspects) >= MAX_DEAD_RUN:
+                        self._restore(suspects)
+                        suspects = []
+                        self._backoff()
+                        logger.error(
+                            f"{self.name} 连续 {MAX_DEAD_RUN} 条记录单独写入失败，"
+                            "暂停写入等待重试",
+                            LOG_COMMAND,
+                            e=e,
+                        )
+                        break
+                    continue
+                latency = time.perf_counter() - start
+                self._retries = 0
+                self._retry_at = 0.0
+                if suspects:
+                    self._dead_letter(suspects)
+                    dead += len(suspects)
+                    suspects = []
+                for _ in rows:
+                    self._buffer.popleft()
+                total += len(rows)
+                self._metrics["inserted"] += len(rows)
+                self._metrics["flushes"] += 1
+                self._metrics["last_flush_latency"] = latency
+                self._metrics["total_flush_latency"] += latency
+                self._not_full.set()
+                if self._flush_listeners:
+                    data = self._to_dicts(rows)
+                    for func in self._flush_listeners:
+                        try:
+                            await func(data)
+                        except Exception as e:
+                            logger.error(
+                                f"{self.name} 写入完成监听执行失败", LOG_COMMAND, e=e
+                            )
+            if suspects:
+                # 队列末尾的记录没有相邻记录可以确认，本次有写入成功时才视为数据错误
+                if total:
+                    self._dead_letter(suspects)
+                    dead += len(suspects)
+                else:
+                    self._restore(suspects)
+            if total or dead:
+                await self._rewrite_spool()
+            if total:
+                logger.debug(f"{self.name} 批量写入 {total} 条", LOG_COMMAND)
+            return total
+
+    def _restore(self, suspects: list[tuple[tuple, Exception]]):
+        """将未确认的记录放回队列头部"""
+        self._buffer.extendleft(row for row, _ in reversed(suspects))
+
+    async def _rewrite_spool(self):
+        """落盘文件只保留尚未写入数据库的记录"""
+        if not self._spool:
+            return
+        async with self._spool_lock:
+            self._spool_lines.clear()
+            lines = [json.dumps(row, ensure_ascii=False) + "\n" for row in self._buffer]
+            await asyncio.to_thread(self._replace_spool, lines)
+
+    def _replace_spool(self, lines: list[str]):
+        if self._spool:
+            self._spool.close()
+        with self.spool_file.open("w", encoding="utf-8") as f:
+            f.writelines(lines)
+        self._spool = self.spool_file.open("a", encoding="utf-8")
+
+    async def _write_spool(self):
+        """将入队后尚未落盘的记录追加写入落盘文件"""
+        if not self._spool_lines:
+            return
+        async with self._spool_lock:
+            lines, self._spool_lines = self._spool_lines, []
+            if lines and self._spool:
+                await asyncio.to_thread(self._append_spool, self._spool, lines)
+
+    @staticmethod
+    def _append_spool(spool, lines: list[str]):
+        spool.writelines(lines)
+        spool.flush()
+
+    def _replay_spool(self):
+        """读取上次退出时未写入数据库的记录"""
+        if not self.spool_file.exists():
+            return
+        width = len(self.fields) + (1 if self._auto_time_fields else 0)
+        with self.spool_file.open(encoding="utf-8") as f:
+            for line in f:
+                try:
+                    row = tuple(json.loads(line))
+                except ValueError:
+                    # 异常退出时最后一行可能不完整
+                    continue
+                if len(row) == width:
+                    self._buffer.append(row)
+                    self._metrics["replayed"] += 1
+        if self._metrics["replayed"]:
+            logger.info(
+                f"{self.name} 从落盘文件恢复 {self._metrics['replayed']} 条记录",
+                LOG_COMMAND,
+            )
+
+    async def _run(self):
+        while True:
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            self._wakeup.clear()
+            if (delay := self._retry_at - time.monotonic()) > 0:
+                await asyncio.sleep(delay)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"{self.name} 刷新写入队列失败", LOG_COMMAND, e=e)
+
+    async def _run_spool(self):
+        while True:
+            await asyncio.sleep(SPOOL_INTERVAL)
+            try:
+                await self._write_spool()
+            except Exception as e:
+                logger.error(f"{self.name} 写入落盘文件失败", LOG_COMMAND, e=e)
+
+    async def start(self):
+        """启动后台刷新任务，开启落盘时先重放上次未写入的记录"""
+        if self._task:
+            return
+        if Config.get_config("ingest", "SPOOL"):
+            SPOOL_PATH.mkdir(parents=True, exist_ok=True)
+            self._replay_spool()
+            self._spool = self.spool_file.open("a", encoding="utf-8")
+            await self._rewrite_spool()
+            self._spool_task = asyncio.create_task(self._run_spool())
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """停止后台任务并写入剩余记录"""
+        for task in (self._task, self._spool_task):
+            if task:
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await task
+        self._task = self._spool_task = None
+        await self.flush()
+        if self._spool:
+            await self._write_spool()
+            self._spool.close()
+            self._spool = None
+
+    def get_metrics(self) -> dict[str, Any]:
+        """获取队列指标
+
+        返回:
+            dict[str, Any]: 队列深度、写入条数与刷新耗时等指标
+        """
+        flushes = self._metrics["flushes"]
+        return {
+            "name": self.name,
+            "queue_depth": len(self._buffer),
+            "max_size": self.max_size,
+            "queued": self._metrics["queued"],
+            "inserted": self._metrics["inserted"],
+            "dropped": self._metrics["dropped"],
+            "failures": self._metrics["failures"],
+            "dead_lettered": self._metrics["dead_lettered"],
+            "replayed": self._metrics["replayed"],
+            "flushes": flushes,
+            "last_flush_latency": f"{self._metrics['last_flush_latency'] * 1000:.2f}ms",
+            "avg_flush_latency": (
+                f"{self._metrics['total_flush_latency'] / flushes * 1000:.2f}ms"
+                if flushes
+                else "0.00ms"
+            ),
+        }
+
+    @classmethod
+    def get_all_metrics(cls) -> list[dict[str, Any]]:
+        """获取所有写入队列的指标
+
+        返回:
+            list[dict[str, Any]]: 各队列指标
+        """
+        return [pipeline.get_metrics() for pipeline in cls._pipelines.values()]
+
+
+@PriorityLifecycle.on_startup(priority=5)
+async def _():
+    for pipeline in IngestPipeline._pipelines.values():
+        await pipeline.start()
+
+
+@driver.on_shutdown
+async def _():
+    for pipeline in IngestPipeline._pipelines.values():
+        await pipeline.stop()
@@ -11,6 +11,7 @@ from .api import (
     code,
     embed,
     generate,
+    generate_stream,
     pipeline_chat,
     search,
     search_multimodal,
@@ -41,7 +42,10 @@ from .types import (
     LLMErrorCode,
     LLMException,
     LLMMessage,
+    LLMPriority,
     LLMResponse,
+    LLMStreamChunk,
+    LLMStreamCollector,
     LLMTool,
     MCPCompatible,
     ModelDetail,
@@ -53,7 +57,13 @@ from .types import (
     ToolMetadata,
     UsageInfo,
 )
-from .utils import create_multimodal_message, message_to_unimessage, unimsg_to_llm_parts
+from .utils import (
+    create_multimodal_message,
+    iter_sentences,
+    message_to_unimessage,
+    send_stream_reply,
+    unimsg_to_llm_parts,
+)
 
 __all__ = [
     "AI",
@@ -65,7 +75,10 @@ __all__ = [
     "LLMException",
     "LLMGenerationConfig",
     "LLMMessage",
+    "LLMPriority",
     "LLMResponse",
+    "LLMStreamChunk",
+    "LLMStreamCollector",
     "LLMTool",
     "MCPCompatible",
     "ModelDetail",
@@ -85,9 +98,11 @@ __all__ = [
     "create_multimodal_message",
     "embed",
     "generate",
+    "generate_stream",
     "get_cache_stats",
     "get_global_default_model_name",
     "get_model_instance",
+    "iter_sentences",
     "list_available_models",
     "list_embedding_models",
     "list_model_identifiers",
@@ -96,6 +111,7 @@ __all__ = [
     "register_llm_configs",
     "search",
     "search_multimodal",
+    "send_stream_reply",
     "set_global_default_model_name",
     "tool_registry",
     "unimsg_to_llm_parts",
@@ -3,14 +3,17 @@ LLM 适配器基类和通用数据结构
 """
 
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
+import json
 from typing import TYPE_CHECKING, Any
 
 from pydantic import BaseModel
 
 from zhenxun.services.log import logger
 
+from ..types.content import LLMStreamChunk
 from ..types.exceptions import LLMErrorCode, LLMException
-from ..types.models import LLMToolCall
+from ..types.models import LLMToolCall, LLMToolCallDelta
 
 if TYPE_CHECKING:
     from ..config.generation import LLMGenerationConfig
@@ -46,6 +49,45 @@ class ResponseData(BaseModel):
     citations: list[dict[str, Any]] | None = None
 
 
+def _load_sse_data(data: str) -> dict[str, Any]:
+    try:
+        return json.loads(data)
+    except json.JSONDecodeError as e:
+        raise LLMException(
+            f"解析流式响应失败: {data[:200]}",
+            code=LLMErrorCode.RESPONSE_PARSE_ERROR,
+            cause=e,
+        )
+
+
+async def iter_sse_events(lines: AsyncIterator[str]) -> AsyncIterator[dict[str, Any]]:
+    """解析 SSE 响应，产出每个事件 data 字段的 JSON，遇到 [DONE] 时结束
+
+    参数:
+        lines: 响应行
+
+    返回:
+        AsyncIterator[dict[str, Any]]: 事件数据
+    """
+    data_lines: list[str] = []
+    async for line in lines:
+        line = line.rstrip("\r\n")
+        if line:
+            name, _, value = line.partition(":")
+            if name == "data":
+                data_lines.append(value.removeprefix(" "))
+            continue
+        if not data_lines:
+            continue
+        data = "\n".join(data_lines)
+        data_lines = []
+        if data == "[DONE]":
+            return
+        yield _load_sse_data(data)
+    if data_lines and (data := "\n".join(data_lines)) != "[DONE]":
+        yield _load_sse_data(data)
+
+
 class BaseAdapter(ABC):
     """LLM API适配器基类"""
 
@@ -119,6 +161,35 @@ class BaseAdapter(ABC):
         """解析API响应"""
         pass
 
+    async def prepare_stream_request(
+        self,
+        model: "LLMModel",
+        api_key: str,
+        messages: list["LLMMessage"],
+        config: "LLMGenerationConfig | None" = None,
+        tools: list["LLMTool"] | None = None,
+        tool_choice: str | dict[str, Any] | None = None,
+    ) -> RequestData:
+        """准备流式请求，不支持流式响应的适配器不需要实现"""
+        raise LLMException(
+            f"API类型 {model.api_type} 不支持流式响应",
+            code=LLMErrorCode.CONFIGURATION_ERROR,
+        )
+
+    def parse_stream(
+        self, model: "LLMModel", events: AsyncIterator[dict[str, Any]]
+    ) -> AsyncIterator[LLMStreamChunk]:
+        """解析流式响应事件"""
+        raise LLMException(
+            f"API类型 {model.api_type} 不支持流式响应",
+            code=LLMErrorCode.CONFIGURATION_ERROR,
+        )
+
+    def get_max_embedding_batch_size(self, model: "LLMModel") -> int:
+        """单次嵌入请求最多包含的文本数量"""
+        _ = model
+        return 64
+
     @abstractmethod
     def prepare_embedding_request(
         self,
@@ -490,6 +561,59 @@ class OpenAICompatAdapter(BaseAdapter):
         _ = model, is_advanced
         return self.parse_openai_response(response_json)
 
+    async def prepare_stream_request(
+        self,
+        model: "LLMModel",
+        api_key: str,
+        messages: list["LLMMessage"],
+        config: "LLMGenerationConfig | None" = None,
+        tools: list["LLMTool"] | None = None,
+        tool_choice: str | dict[str, Any] | None = None,
+    ) -> RequestData:
+        """准备流式请求 - OpenAI兼容格式"""
+        request = await self.prepare_advanced_request(
+            model, api_key, messages, config, tools, tool_choice
+        )
+        request.body["stream"] = True
+        if model.api_type != "zhipu":
+            request.body["stream_options"] = {"include_usage": True}
+        return request
+
+    async def parse_stream(
+        self, model: "LLMModel", events: AsyncIterator[dict[str, Any]]
+    ) -> AsyncIterator[LLMStreamChunk]:
+        """解析流式响应 - OpenAI兼容格式，工具调用参数按 index 分片返回"""
+        _ = model
+        async for event in events:
+            self.validate_response(event)
+            usage_info = event.get("usage")
+            if not (choices := event.get("choices")):
+                if usage_info:
+                    yield LLMStreamChunk(usage_info=usage_info)
+                continue
+            choice = choices[0]
+            delta = choice.get("delta") or {}
+            tool_calls = []
+            for i, tc_data in enumerate(delta.get("tool_calls") or []):
+                function = tc_data.get("function") or {}
+                tool_calls.append(
+                    LLMToolCallDelta(
+                        index=tc_data.get("index", i),
+                        id=tc_data.get("id"),
+                        name=function.get("name"),
+                        arguments=function.get("arguments") or "",
+                    )
+                )
+            text = delta.get("content") or ""
+            finish_reason = choice.get("finish_reason")
+            if text or tool_calls or usage_info or finish_reason:
+                yield LLMStreamChunk(
+                    text=text,
+                    tool_calls=tool_calls or None,
+                    usage_info=usage_info,
+                    finish_reason=finish_reason,
+                )
+
     def prepare_embedding_request(
         self,
         model: "LLMModel",
@@ -2,11 +2,15 @@
 Gemini API 适配器
 """
 
+from collections.abc import AsyncIterator
+import json
 from typing import TYPE_CHECKING, Any
 
 from zhenxun.services.log import logger
 
+from ..types.content import LLMStreamChunk
 from ..types.exceptions import LLMErrorCode, LLMException
+from ..types.models import LLMToolCallDelta
 from .base import BaseAdapter, RequestData, ResponseData
 
 if TYPE_CHECKING:
@@ -89,8 +93,6 @@ class GeminiAdapter(BaseAdapter):
                         )
 
                 if msg.tool_calls:
-                    import json
-
                     for call in msg.tool_calls:
                         current_parts.append(
                             {
@@ -107,8 +109,6 @@ class GeminiAdapter(BaseAdapter):
                 if not msg.name:
                     raise ValueError("Gemini 工具消息必须包含 'name' 字段（函数名）。")
 
-                import json
-
                 try:
                     content_str = (
                         msg.content
@@ -212,6 +212,73 @@ class GeminiAdapter(BaseAdapter):
 
         return RequestData(url=url, headers=headers, body=body)
 
+    async def prepare_stream_request(
+        self,
+        model: "LLMModel",
+        api_key: str,
+        messages: list["LLMMessage"],
+        config: "LLMGenerationConfig | None" = None,
+        tools: list["LLMTool"] | None = None,
+        tool_choice: str | dict[str, Any] | None = None,
+    ) -> RequestData:
+        """准备流式请求，使用 streamGenerateContent 端点的 SSE 格式"""
+        request = await self.prepare_advanced_request(
+            model, api_key, messages, config, tools, tool_choice
+        )
+        request.url = (
+            request.url.replace(":generateContent", ":streamGenerateContent")
+            + "?alt=sse"
+        )
+        return request
+
+    async def parse_stream(
+        self, model: "LLMModel", events: AsyncIterator[dict[str, Any]]
+    ) -> AsyncIterator[LLMStreamChunk]:
+        """解析流式响应，Gemini 的 functionCall 不分片，每个作为一次完整的工具调用"""
+        tool_index = 0
+        async for event in events:
+            self.validate_response(event)
+            usage_info = event.get("usageMetadata")
+            if not (candidates := event.get("candidates")):
+                if usage_info:
+                    yield LLMStreamChunk(usage_info=usage_info)
+                continue
+            candidate = candidates[0]
+            text = ""
+            tool_calls = []
+            for part in (candidate.get("content") or {}).get("parts", []):
+                if "text" in part:
+                    text += part["text"]
+                elif "functionCall" in part:
+                    fc_data = part["functionCall"]
+                    tool_calls.append(
+                        LLMToolCallDelta(
+                            index=tool_index,
+                            id=f"call_{model.provider_name}_{tool_index}",
+                            name=fc_data.get("name"),
+                            arguments=json.dumps(fc_data.get("args", {})),
+                        )
+                    )
+                    tool_index += 1
+                elif "codeExecutionResult" in part:
+                    text += self._format_code_execution_result(
+                        part["codeExecutionResult"]
+                    )
+            finish_reason = candidate.get("finishReason")
+            if text or tool_calls or usage_info or finish_reason:
+                yield LLMStreamChunk(
+                    text=text,
+                    tool_calls=tool_calls or None,
+                    usage_info=usage_info,
+                    finish_reason=finish_reason,
+                )
+
+    @staticmethod
+    def _format_code_execution_result(result: dict[str, Any]) -> str:
+        if result.get("outcome") == "OK":
+            return f"\n[代码执行结果]:\n{result.get('output', '')}\n"
+        return f"\n[代码执行失败]: {result.get('outcome', 'UNKNOWN')}\n"
+
     def apply_config_override(
         self,
         model: "LLMModel",
@@ -419,8 +486,6 @@ class GeminiAdapter(BaseAdapter):
                         parsed_tool_calls = []
                     fc_data = part["functionCall"]
                     try:
-                        import json
-
                         from ..types.models import LLMToolCall, LLMToolFunction
 
                         call_id = f"call_{model.provider_name}_{len(parsed_tool_calls)}"
@@ -442,14 +507,9 @@ class GeminiAdapter(BaseAdapter):
                             f"解析Gemini functionCall时出错: {fc_data}, 错误: {e}"
                         )
                 elif "codeExecutionResult" in part:
-                    result = part["codeExecutionResult"]
-                    if result.get("outcome") == "OK":
-                        output = result.get("output", "")
-                        text_content += f"\n[代码执行结果]:\n{output}\n"
-                    else:
-                        text_content += (
-                            f"\n[代码执行失败]: {result.get('outcome', 'UNKNOWN')}\n"
-                        )
+                    text_content += self._format_code_execution_result(
+                        part["codeExecutionResult"]
+                    )
 
             usage_info = response_json.get("usageMetadata")
 
@@ -478,6 +538,11 @@ class GeminiAdapter(BaseAdapter):
                 cause=e,
             )
 
+    def get_max_embedding_batch_size(self, model: "LLMModel") -> int:
+        """batchEmbedContents 单次最多100条"""
+        _ = model
+        return 100
+
     def prepare_embedding_request(
         self,
         model: "LLMModel",
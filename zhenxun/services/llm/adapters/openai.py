@@ -31,6 +31,12 @@ class OpenAIAdapter(OpenAICompatAdapter):
             return "/api/paas/v4/chat/completions"
         return "/v1/chat/completions"
 
+    def get_max_embedding_batch_size(self, model: "LLMModel") -> int:
+        """OpenAI 单次最多2048条，其他兼容服务按默认值"""
+        if model.api_type == "openai":
+            return 2048
+        return super().get_max_embedding_batch_size(model)
+
     def get_embedding_endpoint(self, model: "LLMModel") -> str:
         """根据API类型返回嵌入端点"""
         if model.api_type == "zhipu":
@@ -2,6 +2,7 @@
 LLM 服务的高级 API 接口 - 便捷函数入口
 """
 
+from collections.abc import AsyncIterator
 from pathlib import Path
 from typing import Any
 
@@ -10,6 +11,7 @@ from nonebot_plugin_alconna.uniseg import UniMessage
 from zhenxun.services.log import logger
 
 from .manager import get_model_instance
+from .scheduler import LLMJobScheduler
 from .session import AI
 from .types import (
     EmbeddingTaskType,
@@ -17,7 +19,9 @@ from .types import (
     LLMErrorCode,
     LLMException,
     LLMMessage,
+    LLMPriority,
     LLMResponse,
+    LLMStreamChunk,
     LLMTool,
     ModelName,
 )
@@ -30,6 +34,7 @@ async def chat(
     model: ModelName = None,
     tools: list[LLMTool] | None = None,
     tool_choice: str | dict[str, Any] | None = None,
+    priority: LLMPriority | None = None,
     **kwargs: Any,
 ) -> LLMResponse:
     """
@@ -40,14 +45,16 @@ async def chat(
         model: 要使用的模型名称。
         tools: 本次对话可用的工具列表。
         tool_choice: 强制模型使用的工具。
+        priority: 任务优先级，默认为交互优先级。
         **kwargs: 传递给模型的其他参数。
 
     返回:
         LLMResponse: 模型的完整响应，可能包含文本或工具调用请求。
     """
     ai = AI()
-    return await ai.chat(
-        message, model=model, tools=tools, tool_choice=tool_choice, **kwargs
+    return await LLMJobScheduler.run(
+        ai.chat(message, model=model, tools=tools, tool_choice=tool_choice, **kwargs),
+        priority,
     )
 
 
@@ -56,6 +63,7 @@ async def code(
     *,
     model: ModelName = None,
     timeout: int | None = None,
+    priority: LLMPriority | None = None,
     **kwargs: Any,
 ) -> dict[str, Any]:
     """
@@ -65,13 +73,16 @@ async def code(
         prompt: 代码执行的提示词。
         model: 要使用的模型名称。
         timeout: 代码执行超时时间（秒）。
+        priority: 任务优先级，默认为交互优先级。
         **kwargs: 传递给模型的其他参数。
 
     返回:
         dict[str, Any]: 包含执行结果的字典。
     """
     ai = AI()
-    return await ai.code(prompt, model=model, timeout=timeout, **kwargs)
+    return await LLMJobScheduler.run(
+        ai.code(prompt, model=model, timeout=timeout, **kwargs), priority
+    )
 
 
 async def search(
@@ -79,6 +90,7 @@ async def search(
     *,
     model: ModelName = None,
     instruction: str = "",
+    priority: LLMPriority | None = None,
     **kwargs: Any,
 ) -> dict[str, Any]:
     """
@@ -88,13 +100,16 @@ async def search(
         query: 搜索查询内容。
         model: 要使用的模型名称。
         instruction: 搜索指令。
+        priority: 任务优先级，默认为交互优先级。
         **kwargs: 传递给模型的其他参数。
 
     返回:
         dict[str, Any]: 包含搜索结果的字典。
     """
     ai = AI()
-    return await ai.search(query, model=model, instruction=instruction, **kwargs)
+    return await LLMJobScheduler.run(
+        ai.search(query, model=model, instruction=instruction, **kwargs), priority
+    )
 
 
 async def analyze(
@@ -104,6 +119,7 @@ async def analyze(
     model: ModelName = None,
     use_tools: list[str] | None = None,
     tool_config: dict[str, Any] | None = None,
+    priority: LLMPriority | None = None,
     **kwargs: Any,
 ) -> str | LLMResponse:
     """
@@ -115,19 +131,23 @@ async def analyze(
         model: 要使用的模型名称。
         use_tools: 要使用的工具名称列表。
         tool_config: 工具配置。
+        priority: 任务优先级，默认为交互优先级。
         **kwargs: 传递给模型的其他参数。
 
     返回:
         str | LLMResponse: 分析结果。
     """
     ai = AI()
-    return await ai.analyze(
-        message,
-        instruction=instruction,
-        model=model,
-        use_tools=use_tools,
-        tool_config=tool_config,
-        **kwargs,
+    return await LLMJobScheduler.run(
+        ai.analyze(
+            message,
+            instruction=instruction,
+            model=model,
+            use_tools=use_tools,
+            tool_config=tool_config,
+            **kwargs,
+        ),
+        priority,
     )
 
 
@@ -139,6 +159,7 @@ async def analyze_multimodal(
     *,
     instruction: str = "",
     model: ModelName = None,
+    priority: LLMPriority | None = None,
     **kwargs: Any,
 ) -> str | LLMResponse:
     """
@@ -151,6 +172,7 @@ async def analyze_multimodal(
         audios: 音频文件路径、字节数据或列表。
         instruction: 分析指令。
         model: 要使用的模型名称。
+        priority: 任务优先级，默认为交互优先级。
         **kwargs: 传递给模型的其他参数。
 
     返回:
@@ -159,7 +181,9 @@ async def analyze_multimodal(
     message = create_multimodal_message(
         text=text, images=images, videos=videos, audios=audios
     )
-    return await analyze(message, instruction=instruction, model=model, **kwargs)
+    return await analyze(
+        message, instruction=instruction, model=model, priority=priority, **kwargs
+    )
 
 
 async def search_multimodal(
@@ -170,6 +194,7 @@ async def search_multimodal(
     *,
     instruction: str = "",
     model: ModelName = None,
+    priority: LLMPriority | None = None,
     **kwargs: Any,
 ) -> dict[str, Any]:
     """
@@ -182,6 +207,7 @@ async def search_multimodal(
         audios: 音频文件路径、字节数据或列表。
         instruction: 搜索指令。
         model: 要使用的模型名称。
+        priority: 任务优先级，默认为交互优先级。
         **kwargs: 传递给模型的其他参数。
 
     返回:
@@ -191,7 +217,9 @@ async def search_multimodal(
         text=text, images=images, videos=videos, audios=audios
     )
     ai = AI()
-    return await ai.search(message, model=model, instruction=instruction, **kwargs)
+    return await LLMJobScheduler.run(
+        ai.search(message, model=model, instruction=instruction, **kwargs), priority
+    )
 
 
 async def embed(
@@ -199,6 +227,7 @@ async def embed(
     *,
     model: ModelName = None,
     task_type: EmbeddingTaskType | str = EmbeddingTaskType.RETRIEVAL_DOCUMENT,
+    priority: LLMPriority | None = None,
     **kwargs: Any,
 ) -> list[list[float]]:
     """
@@ -208,13 +237,16 @@ async def embed(
         texts: 要生成嵌入向量的文本或文本列表。
         model: 要使用的嵌入模型名称。
         task_type: 嵌入任务类型。
+        priority: 任务优先级，默认为交互优先级，合并后的批次请求时才占用名额。
         **kwargs: 传递给模型的其他参数。
 
     返回:
         list[list[float]]: 文本的嵌入向量列表。
     """
     ai = AI()
-    return await ai.embed(texts, model=model, task_type=task_type, **kwargs)
+    return await ai.embed(
+        texts, model=model, task_type=task_type, priority=priority, **kwargs
+    )
 
 
 async def pipeline_chat(
@@ -223,6 +255,7 @@ async def pipeline_chat(
     *,
     initial_instruction: str = "",
     final_instruction: str = "",
+    priority: LLMPriority | None = LLMPriority.BACKGROUND,
     **kwargs: Any,
 ) -> LLMResponse:
     """
@@ -233,6 +266,7 @@ async def pipeline_chat(
         model_chain: 模型名称列表
         initial_instruction: 第一个模型的系统指令
         final_instruction: 最后一个模型的系统指令
+        priority: 任务优先级，默认为后台优先级，每一步单独排队
         **kwargs: 传递给模型实例的其他参数
 
     返回:
@@ -278,7 +312,9 @@ async def pipeline_chat(
         )
         try:
             async with await get_model_instance(model_name, **kwargs) as model:
-                response = await model.generate_response(messages_for_step)
+                response = await LLMJobScheduler.run(
+                    model.generate_response(messages_for_step), priority
+                )
             final_response = response
             current_content = response.text.strip()
             if not current_content and not is_last_step:
@@ -309,6 +345,7 @@ async def generate(
     model: ModelName = None,
     tools: list[LLMTool] | None = None,
     tool_choice: str | dict[str, Any] | None = None,
+    priority: LLMPriority | None = None,
     **kwargs: Any,
 ) -> LLMResponse:
     """
@@ -320,6 +357,7 @@ async def generate(
         model: 要使用的模型名称。
         tools: 可用的工具列表。
         tool_choice: 工具选择策略。
+        priority: 任务优先级，默认为交互优先级。
         **kwargs: 传递给模型的其他参数。
 
     返回:
@@ -333,13 +371,52 @@ async def generate(
         async with await get_model_instance(
             resolved_model_name, override_config=final_config_dict
         ) as model_instance:
-            return await model_instance.generate_response(
-                messages,
-                tools=tools,
-                tool_choice=tool_choice,
+            return await LLMJobScheduler.run(
+                model_instance.generate_response(
+                    messages,
+                    tools=tools,
+                    tool_choice=tool_choice,
+                ),
+                priority,
             )
     except LLMException:
         raise
     except Exception as e:
         logger.error(f"生成响应失败: {e}", e=e)
         raise LLMException(f"生成响应失败: {e}", cause=e)
+
+
+async def generate_stream(
+    messages: list[LLMMessage],
+    *,
+    model: ModelName = None,
+    tools: list[LLMTool] | None = None,
+    tool_choice: str | dict[str, Any] | None = None,
+    priority: LLMPriority | None = None,
+    **kwargs: Any,
+) -> AsyncIterator[LLMStreamChunk]:
+    """
+    根据完整的消息列表流式生成响应，不使用或修改任何会话历史。
+
+    参数:
+        messages: 用于生成响应的完整消息列表。
+        model: 要使用的模型名称。
+        tools: 可用的工具列表。
+        tool_choice: 工具选择策略。
+        priority: 任务优先级，默认为交互优先级。
+        **kwargs: 传递给模型的其他参数。
+
+    返回:
+        AsyncIterator[LLMStreamChunk]: 模型响应片段。
+    """
+    ai_instance = AI()
+    async with LLMJobScheduler.slot(priority):
+        async for chunk in ai_instance._execute_stream(
+            messages=messages,
+            model_name=model,
+            error_message="生成响应失败",
+            config_overrides=kwargs,
+            llm_tools=tools,
+            tool_choice=tool_choice,
+        ):
+            yield chunk
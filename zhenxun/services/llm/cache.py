@@ -0,0 +1,287 @@
+"""
+LLM 响应缓存
+
+在 LLMModel.generate_response 之前查找缓存：
+- 精确缓存：按模型、消息与生成配置的规范化哈希匹配
+- 语义缓存（可选）：上下文相同时，最后一条用户消息的嵌入向量余弦相似度
+  超过阈值即复用回答
+- 过期时间与条数上限由配置决定，按最近最少使用淘汰
+- 采样输出每次可能不同，只有传入 enable_caching=True 或 temperature 为0时才缓存，
+  传入 enable_caching=False 时总是跳过缓存
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+import hashlib
+import json
+import math
+import operator
+import time
+from typing import Any, ClassVar
+
+from zhenxun.services.log import logger
+
+from .config.generation import LLMGenerationConfig
+from .config.providers import get_ai_config
+from .types import LLMMessage, LLMResponse, LLMTool
+from .types.models import LLMCacheInfo
+
+LOG_COMMAND = "LLMCache"
+
+
+@dataclass
+class CacheKey:
+    """缓存查找结果，未命中时用于写入"""
+
+    key: str
+    """精确缓存键"""
+    context: str
+    """语义缓存上下文键，为除最后一条用户消息外的所有内容"""
+    vector: list[float] | None = None
+    """最后一条用户消息的归一化嵌入向量"""
+
+
+@dataclass
+class CacheEntry:
+    response: LLMResponse
+    expire: float
+    tokens: int
+    context: str
+    vector: list[float] | None = None
+
+
+def _hash(data: Any) -> str:
+    return hashlib.sha256(
+        json.dumps(data, sort_keys=True, ensure_ascii=False, default=str).encode()
+    ).hexdigest()
+
+
+def _normalize_message(message: LLMMessage) -> dict[str, Any]:
+    data = message.model_dump(exclude_none=True)
+    if isinstance(data.get("content"), str):
+        data["content"] = data["content"].strip()
+    return data
+
+
+def _get_prompt_text(message: LLMMessage) -> str | None:
+    """获取用户消息中的纯文本，包含非文本内容时返回None"""
+    if message.role != "user":
+        return None
+    if isinstance(message.content, str):
+        return message.content.strip() or None
+    if any(part.type != "text" for part in message.content):
+        return None
+    return "".join(part.text or "" for part in message.content).strip() or None
+
+
+def _get_total_tokens(usage_info: dict[str, Any] | None) -> int:
+    if not usage_info:
+        return 0
+    return int(usage_info.get("total_tokens") or usage_info.get("totalTokenCount") or 0)
+
+
+def _normalize_vector(vector: list[float]) -> list[float]:
+    norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+    return [x / norm for x in vector]
+
+
+class LLMResponseCache:
+    """LLM 响应缓存"""
+
+    entries: ClassVar[OrderedDict[str, CacheEntry]] = OrderedDict()
+    """缓存，按最近使用排序"""
+    contexts: ClassVar[dict[str, set[str]]] = {}
+    """语义缓存索引，键为上下文键"""
+
+    _metrics: ClassVar[dict[str, int]] = {
+        "requests": 0,
+        "hits": 0,
+        "semantic_hits": 0,
+        "misses": 0,
+        "bypass": 0,
+        "evictions": 0,
+        "saved_tokens": 0,
+    }
+
+    @classmethod
+    def _get_ttl(cls) -> int:
+        return get_ai_config().get("response_cache_ttl", 3600) or 0
+
+    @classmethod
+    def is_cacheable(
+        cls,
+        config: LLMGenerationConfig | None,
+        tools: list[LLMTool] | None,
+        default_temperature: float | None = None,
+    ) -> bool:
+        """请求是否可以使用缓存
+
+        需要显式启用缓存或temperature为0，工具调用、代码执行与联网搜索的结果不缓存
+
+        参数:
+            config: 生成配置
+            tools: 工具列表
+            default_temperature: 生成配置未指定时模型使用的temperature
+
+        返回:
+            bool: 是否可以使用缓存
+        """
+        config = config or LLMGenerationConfig()
+        temperature = (
+            default_temperature if config.temperature is None else config.temperature
+        )
+        if (
+            not cls._get_ttl()
+            or tools
+            or config.enable_caching is False
+            or config.enable_code_execution
+            or config.enable_grounding
+            or not (config.enable_caching or temperature == 0)
+        ):
+            cls._metrics["bypass"] += 1
+            return False
+        return True
+
+    @classmethod
+    async def get(
+        cls,
+        model_id: str,
+        messages: list[LLMMessage],
+        config: LLMGenerationConfig | None,
+    ) -> tuple[LLMResponse | None, CacheKey]:
+        """查找缓存
+
+        参数:
+            model_id: 模型标识
+            messages: 消息列表
+            config: 生成配置
+
+        返回:
+            tuple[LLMResponse | None, CacheKey]: 缓存的响应与用于写入的缓存键
+        """
+        cls._metrics["requests"] += 1
+        config_dict = config.to_dict() if config else {}
+        config_dict.pop("enable_caching", None)
+        normalized = [_normalize_message(m) for m in messages]
+        cache_key = CacheKey(
+            key=_hash([model_id, normalized, config_dict]),
+            context=_hash([model_id, normalized[:-1], config_dict]),
+        )
+        if response := cls._get_entry(cache_key.key):
+            cls._metrics["hits"] += 1
+            return response, cache_key
+        if messages and (text := _get_prompt_text(messages[-1])):
+            cache_key.vector = await cls._embed(text)
+            if cache_key.vector and (
+                response := cls._search(cache_key.context, cache_key.vector)
+            ):
+                cls._metrics["semantic_hits"] += 1
+                return response, cache_key
+        cls._metrics["misses"] += 1
+        return None, cache_key
+
+    @classmethod
+    def set(cls, cache_key: CacheKey, response: LLMResponse):
+        """写入缓存，空响应与工具调用响应不缓存
+
+        参数:
+            cache_key: 查找缓存时返回的缓存键
+            response: 响应
+        """
+        if not response.text or response.tool_calls:
+            return
+        cls._remove(cache_key.key)
+        cls.entries[cache_key.key] = CacheEntry(
+            response=response.model_copy(deep=True),
+            expire=time.time() + cls._get_ttl(),
+            tokens=_get_total_tokens(response.usage_info),
+            context=cache_key.context,
+            vector=cache_key.vector,
+        )
+        if cache_key.vector:
+            cls.contexts.setdefault(cache_key.context, set()).add(cache_key.key)
+        max_size = get_ai_config().get("response_cache_size", 500) or 0
+        while len(cls.entries) > max_size:
+            cls._remove(next(iter(cls.entries)))
+            cls._metrics["evictions"] += 1
+
+    @classmethod
+    def _get_entry(cls, key: str) -> LLMResponse | None:
+        if not (entry := cls.entries.get(key)):
+            return None
+        if entry.expire <= time.time():
+            cls._remove(key)
+            return None
+        cls.entries.move_to_end(key)
+        cls._metrics["saved_tokens"] += entry.tokens
+        response = entry.response.model_copy(deep=True)
+        response.cache_info = LLMCacheInfo(
+            cache_hit=True, cache_key=key, cache_ttl=int(entry.expire - time.time())
+        )
+        return response
+
+    @classmethod
+    def _search(cls, context: str, vector: list[float]) -> LLMResponse | None:
+        """在相同上下文的缓存中查找最相似的回答"""
+        threshold = get_ai_config().get("semantic_cache_threshold", 0.95) or 1.0
+        best_key, best_score = None, threshold
+        for key in list(cls.contexts.get(context, ())):
+            entry = cls.entries.get(key)
+            if not entry or not entry.vector or len(entry.vector) != len(vector):
+                continue
+            score = sum(map(operator.mul, entry.vector, vector))
+            if score >= best_score:
+                best_key, best_score = key, score
+        if best_key is None:
+            return None
+        logger.debug(f"语义缓存命中，相似度 {best_score:.4f}", LOG_COMMAND)
+        return cls._get_entry(best_key)
+
+    @classmethod
+    async def _embed(cls, text: str) -> list[float] | None:
+        """使用配置的嵌入模型生成归一化向量，未配置或失败时返回None"""
+        if not (model_name := get_ai_config().get("semantic_cache_model")):
+            return None
+        from .manager import get_model_instance
+
+        try:
+            async with await get_model_instance(model_name) as model:
+                vectors = await model.generate_embeddings([text])
+        except Exception as e:
+            logger.warning("语义缓存生成嵌入向量失败", LOG_COMMAND, e=e)
+            return None
+        return _normalize_vector(vectors[0]) if vectors else None
+
+    @classmethod
+    def _remove(cls, key: str):
+        if not (entry := cls.entries.pop(key, None)):
+            return
+        if keys := cls.contexts.get(entry.context):
+            keys.discard(key)
+            if not keys:
+                del cls.contexts[entry.context]
+
+    @classmethod
+    def clear(cls):
+        """清空缓存"""
+        cls.entries.clear()
+        cls.contexts.clear()
+
+    @classmethod
+    def get_stats(cls) -> dict[str, Any]:
+        """获取缓存统计
+
+        返回:
+            dict[str, Any]: 命中率、节省的token数与条数等
+        """
+        metrics = cls._metrics
+        hits = metrics["hits"] + metrics["semantic_hits"]
+        return {
+            **metrics,
+            "hit_rate": round(hits / metrics["requests"], 4)
+            if metrics["requests"]
+            else 0.0,
+            "entries": len(cls.entries),
+            "max_entries": get_ai_config().get("response_cache_size", 500) or 0,
+            "ttl": cls._get_ttl(),
+        }
@@ -54,6 +54,35 @@ class LLMConfig(BaseModel):
     retry_delay_llm: int = Field(
         default=2, description="LLM服务请求重试的基础延迟时间（秒）"
     )
+    llm_max_concurrent_jobs: int = Field(
+        default=16, description="同时执行的LLM任务数量上限，超出的任务按优先级排队"
+    )
+    provider_max_concurrency: int = Field(
+        default=16, description="每个提供商与每个API密钥的最大并发请求数"
+    )
+    provider_queue_timeout: int = Field(
+        default=60, description="并发已满时请求的最长排队时间（秒）"
+    )
+    response_cache_ttl: int = Field(
+        default=3600,
+        description="LLM响应缓存过期时间（秒），为0时关闭缓存，"
+        "只缓存显式启用缓存或temperature为0的请求",
+    )
+    response_cache_size: int = Field(default=500, description="LLM响应缓存最大条数")
+    semantic_cache_model: str | None = Field(
+        default=None,
+        description="语义缓存使用的嵌入模型 (格式: ProviderName/ModelName)，为空时关闭",
+    )
+    semantic_cache_threshold: float = Field(
+        default=0.95, description="语义缓存复用回答的最低余弦相似度"
+    )
+    embedding_batch_window: int = Field(
+        default=10,
+        description="嵌入请求合并等待时间（毫秒），为0时只合并同一时刻的请求",
+    )
+    embedding_cache: bool = Field(
+        default=True, description="是否将文本嵌入向量缓存到本地"
+    )
     providers: list[ProviderConfig] = Field(
         default_factory=list, description="配置多个 AI 服务提供商及其模型信息"
     )
@@ -286,6 +315,70 @@ def register_llm_configs():
         help="LLM服务请求重试的基础延迟时间（秒）",
         type=int,
     )
+    Config.add_plugin_config(
+        AI_CONFIG_GROUP,
+        "llm_max_concurrent_jobs",
+        llm_config.llm_max_concurrent_jobs,
+        help="同时执行的LLM任务数量上限，超出的任务按优先级与群组/用户公平排队",
+        type=int,
+    )
+    Config.add_plugin_config(
+        AI_CONFIG_GROUP,
+        "provider_max_concurrency",
+        llm_config.provider_max_concurrency,
+        help="每个提供商与每个API密钥的最大并发请求数，实际并发会根据限流自动调整",
+        type=int,
+    )
+    Config.add_plugin_config(
+        AI_CONFIG_GROUP,
+        "provider_queue_timeout",
+        llm_config.provider_queue_timeout,
+        help="并发已满时请求的最长排队时间（秒）",
+        type=int,
+    )
+    Config.add_plugin_config(
+        AI_CONFIG_GROUP,
+        "response_cache_ttl",
+        llm_config.response_cache_ttl,
+        help="LLM响应缓存过期时间（秒），为0时关闭缓存，"
+        "只缓存显式启用缓存或temperature为0的请求",
+        type=int,
+    )
+    Config.add_plugin_config(
+        AI_CONFIG_GROUP,
+        "response_cache_size",
+        llm_config.response_cache_size,
+        help="LLM响应缓存最大条数",
+        type=int,
+    )
+    Config.add_plugin_config(
+        AI_CONFIG_GROUP,
+        "semantic_cache_model",
+        llm_config.semantic_cache_model,
+        help="语义缓存使用的嵌入模型 (格式: ProviderName/ModelName)，为空时关闭",
+        type=str,
+    )
+    Config.add_plugin_config(
+        AI_CONFIG_GROUP,
+        "semantic_cache_threshold",
+        llm_config.semantic_cache_threshold,
+        help="语义缓存复用回答的最低余弦相似度",
+        type=float,
+    )
+    Config.add_plugin_config(
+        AI_CONFIG_GROUP,
+        "embedding_batch_window",
+        llm_config.embedding_batch_window,
+        help="嵌入请求合并等待时间（毫秒），为0时只合并同一时刻的请求",
+        type=int,
+    )
+    Config.add_plugin_config(
+        AI_CONFIG_GROUP,
+        "embedding_cache",
+        llm_config.embedding_cache,
+        help="是否将文本嵌入向量缓存到本地",
+        type=bool,
+    )
     Config.add_plugin_config(
         AI_CONFIG_GROUP,
         "gemini_safety_threshold",
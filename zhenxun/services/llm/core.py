@@ -5,12 +5,15 @@ LLM 核心基础设施模块
 """
 
 import asyncio
-from dataclasses import asdict, dataclass
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass, field
 from enum import IntEnum
 import json
 import os
 import time
-from typing import Any
+from typing import Any, ClassVar
 
 import aiofiles
 import httpx
@@ -106,6 +109,19 @@ class LLMHttpClient:
             async with self._lock:
                 self._active_requests -= 1
 
+    @asynccontextmanager
+    async def stream(self, url: str, **kwargs: Any) -> AsyncIterator[httpx.Response]:
+        """发送流式POST请求，响应体在上下文内逐步读取"""
+        client = await self._ensure_client_initialized()
+        async with self._lock:
+            self._active_requests += 1
+        try:
+            async with client.stream("POST", url, **kwargs) as response:
+                yield response
+        finally:
+            async with self._lock:
+                self._active_requests -= 1
+
     async def close(self):
         async with self._lock:
             if self._client and not self._client.is_closed:
@@ -280,6 +296,47 @@ class KeyStats:
         return status_actions.get(self.status, "未知")
 
 
+@dataclass
+class StreamStats:
+    """单个提供商的流式响应首字延迟统计"""
+
+    count: int = 0
+    total_ttft: float = 0.0
+    last_ttft: float = 0.0
+    max_ttft: float = 0.0
+
+    @property
+    def avg_ttft(self) -> float:
+        """平均首字延迟（毫秒）"""
+        return self.total_ttft / self.count if self.count else 0.0
+
+    def record(self, ttft: float):
+        """记录一次首字延迟
+
+        参数:
+            ttft: 从发起请求到收到第一个片段的耗时（毫秒）
+        """
+        self.count += 1
+        self.total_ttft += ttft
+        self.last_ttft = ttft
+        self.max_ttft = max(self.max_ttft, ttft)
+
+
+stream_stats: dict[str, StreamStats] = {}
+"""流式响应统计，键为提供商名称"""
+
+
+def record_ttft(provider_name: str, ttft: float):
+    """记录提供商的首字延迟
+
+    参数:
+        provider_name: 提供商名称
+        ttft: 首字延迟（毫秒）
+    """
+    stream_stats.setdefault(provider_name, StreamStats()).record(ttft)
+    logger.debug(f"流式响应首字延迟: {provider_name} {ttft:.2f}ms")
+
+
 class RetryConfig:
     """重试配置"""
 
@@ -427,7 +484,6 @@ class KeyStatusStore:
 
     def __init__(self):
         self._key_stats: dict[str, KeyStats] = {}
-        self._provider_key_index: dict[str, int] = {}
         self._lock = asyncio.Lock()
         self._file_path = DATA_PATH / "llm" / "key_status.json"
 
@@ -484,56 +540,6 @@ class KeyStatusStore:
             await self._save_to_file_internal()
         logger.info("KeyStatusStore 已在关闭前保存状态。")
 
-    async def get_next_available_key(
-        self,
-        provider_name: str,
-        api_keys: list[str],
-        exclude_keys: set[str] | None = None,
-    ) -> str | None:
-        """
-        获取下一个可用的API密钥（轮询策略）
-
-        参数:
-            provider_name: 提供商名称。
-            api_keys: API密钥列表。
-            exclude_keys: 要排除的密钥集合。
-
-        返回:
-            str | None: 可用的API密钥，如果没有可用密钥则返回None。
-        """
-        if not api_keys:
-            return None
-
-        exclude_keys = exclude_keys or set()
-
-        async with self._lock:
-            for key in api_keys:
-                if key not in self._key_stats:
-                    self._key_stats[key] = KeyStats()
-
-            available_keys = [
-                key
-                for key in api_keys
-                if key not in exclude_keys and self._key_stats[key].is_available
-            ]
-
-            if not available_keys:
-                return api_keys[0]
-
-            current_index = self._provider_key_index.get(provider_name, 0)
-            selected_key = available_keys[current_index % len(available_keys)]
-            self._provider_key_index[provider_name] = current_index + 1
-
-            total_usage = (
-                self._key_stats[selected_key].success_count
-                + self._key_stats[selected_key].failure_count
-            )
-            logger.debug(
-                f"轮询选择API密钥: {self._get_key_id(selected_key)} "
-                f"(使用次数: {total_usage})"
-            )
-            return selected_key
-
     async def record_success(self, api_key: str, latency: float):
         """记录成功使用，并持久化"""
         async with self._lock:
@@ -583,6 +589,10 @@ class KeyStatusStore:
 
         getattr(logger, log_level)(log_message)
 
+    def is_key_available(self, api_key: str) -> bool:
+        """密钥当前是否不在冷却中"""
+        return (stats := self._key_stats.get(api_key)) is None or stats.is_available
+
     async def reset_key_status(self, api_key: str):
         """重置密钥状态，并持久化"""
         async with self._lock:
@@ -632,6 +642,250 @@ class KeyStatusStore:
 key_store = KeyStatusStore()
 
 
+@dataclass
+class ConcurrencyWindow:
+    """AIMD 并发窗口，成功时加性增大，限流或服务端错误时减半"""
+
+    limit: float
+    """当前并发上限"""
+    in_flight: int = 0
+    """进行中的请求数"""
+    ewma_latency: float = 0.0
+    """成功请求延迟（毫秒）的指数加权移动平均"""
+    last_decrease: float = 0.0
+
+    @property
+    def has_capacity(self) -> bool:
+        return self.in_flight < int(self.limit)
+
+    def on_success(self, latency: float, max_limit: int, alpha: float):
+        self.limit = min(max_limit, self.limit + 1 / self.limit)
+        if self.ewma_latency:
+            self.ewma_latency += alpha * (latency - self.ewma_latency)
+        else:
+            self.ewma_latency = latency
+
+    def on_congestion(self, now: float, min_interval: float) -> bool:
+        """窗口减半，同一轮请求内的多次失败只减半一次"""
+        if now - self.last_decrease < min_interval:
+            return False
+        self.limit = max(1.0, self.limit / 2)
+        self.last_decrease = now
+        return True
+
+
+@dataclass
+class KeySlot:
+    """已获取的请求名额，请求结束后需要通过 ProviderScheduler.release 释放"""
+
+    provider_name: str
+    api_key: str
+    start: float = field(default_factory=time.monotonic)
+    released: bool = False
+
+
+@dataclass
+class ProviderQueue:
+    window: ConcurrencyWindow
+    """提供商并发窗口"""
+    keys: dict[str, ConcurrencyWindow] = field(default_factory=dict)
+    """密钥并发窗口"""
+    waiters: deque[asyncio.Future] = field(default_factory=deque)
+    """排队中的请求"""
+    queued: int = 0
+    max_queue_depth: int = 0
+    timeouts: int = 0
+
+
+class ProviderScheduler:
+    """提供商请求调度
+
+    每个提供商与每个密钥各有一个 AIMD 并发窗口，请求优先分配给
+    EWMA 延迟低且有空闲名额的密钥，没有名额时按先后顺序排队，超过期限后失败
+    """
+
+    INITIAL_WINDOW: ClassVar[float] = 4
+    """初始并发上限"""
+    ALPHA: ClassVar[float] = 0.3
+    """新延迟样本权重"""
+
+    def __init__(self):
+        self._providers: dict[str, ProviderQueue] = {}
+
+    @staticmethod
+    def _get_max_concurrency() -> int:
+        from .config.providers import get_ai_config
+
+        return max(1, get_ai_config().get("provider_max_concurrency", 16) or 1)
+
+    def _get_queue(self, provider_name: str) -> ProviderQueue:
+        if (queue := self._providers.get(provider_name)) is None:
+            limit = min(self.INITIAL_WINDOW, self._get_max_concurrency())
+            queue = self._providers[provider_name] = ProviderQueue(
+                ConcurrencyWindow(limit)
+            )
+        return queue
+
+    def _try_acquire(
+        self,
+        provider_name: str,
+        queue: ProviderQueue,
+        api_keys: list[str],
+        exclude_keys: set[str],
+    ) -> KeySlot | None:
+        if not queue.window.has_capacity:
+            return None
+        candidates = [k for k in api_keys if k not in exclude_keys] or api_keys
+        candidates = [
+            k for k in candidates if key_store.is_key_available(k)
+        ] or candidates
+        best_key, best_score = None, None
+        for key in candidates:
+            window = queue.keys.get(key)
+            if window is None:
+                window = queue.keys[key] = ConcurrencyWindow(queue.window.limit)
+            if not window.has_capacity:
+                continue
+            utilization = window.in_flight / window.limit
+            score = (window.ewma_latency * (window.in_flight + 1), utilization)
+            if best_score is None or score < best_score:
+                best_key, best_score = key, score
+        if best_key is None:
+            return None
+        queue.window.in_flight += 1
+        queue.keys[best_key].in_flight += 1
+        return KeySlot(provider_name, best_key)
+
+    def _wake(self, queue: ProviderQueue):
+        free = int(queue.window.limit) - queue.window.in_flight
+        while free > 0 and queue.waiters:
+            future = queue.waiters.popleft()
+            if not future.done():
+                future.set_result(None)
+                free -= 1
+
+    async def acquire(
+        self,
+        provider_name: str,
+        api_keys: list[str],
+        exclude_keys: set[str] | None = None,
+        timeout: float = 60,
+    ) -> KeySlot:
+        """获取请求名额与密钥，没有名额时排队等待
+
+        参数:
+            provider_name: 提供商名称
+            api_keys: 提供商的密钥列表
+            exclude_keys: 优先排除的密钥，全部被排除时仍会使用
+            timeout: 最长排队时间（秒）
+
+        返回:
+            KeySlot: 请求名额
+
+        异常:
+            LLMException: 排队超时
+        """
+        queue = self._get_queue(provider_name)
+        exclude_keys = exclude_keys or set()
+        if not queue.waiters and (
+            slot := self._try_acquire(provider_name, queue, api_keys, exclude_keys)
+        ):
+            return slot
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        queue.queued += 1
+        requeue = False
+        while True:
+            future = loop.create_future()
+            if requeue:
+                queue.waiters.appendleft(future)
+            else:
+                queue.waiters.append(future)
+            queue.max_queue_depth = max(queue.max_queue_depth, len(queue.waiters))
+            try:
+                await asyncio.wait_for(future, max(0, deadline - loop.time()))
+            except asyncio.TimeoutError:
+                queue.timeouts += 1
+                raise LLMException(
+                    f"提供商 {provider_name} 请求排队超时",
+                    code=LLMErrorCode.API_TIMEOUT,
+                    details={"queue_depth": len(queue.waiters)},
+                )
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    self._wake(queue)
+                raise
+            finally:
+                if future in queue.waiters:
+                    queue.waiters.remove(future)
+            if slot := self._try_acquire(provider_name, queue, api_keys, exclude_keys):
+                return slot
+            requeue = True
+
+    def release(
+        self, slot: KeySlot, latency: float | None = None, congested: bool = False
+    ):
+        """释放请求名额并调整并发窗口
+
+        参数:
+            slot: 请求名额
+            latency: 成功时的延迟（毫秒），为None时不增大窗口
+            congested: 是否遇到限流、服务端错误或超时，为True时窗口减半
+        """
+        if slot.released:
+            return
+        slot.released = True
+        queue = self._get_queue(slot.provider_name)
+        key_window = queue.keys[slot.api_key]
+        queue.window.in_flight -= 1
+        key_window.in_flight -= 1
+        if congested:
+            now = time.monotonic()
+            interval = (queue.window.ewma_latency or 1000) / 1000
+            key_window.on_congestion(now, interval)
+            if queue.window.on_congestion(now, interval):
+                logger.debug(
+                    f"提供商 {slot.provider_name} 并发上限减小为 "
+                    f"{int(queue.window.limit)}"
+                )
+        elif latency is not None:
+            max_limit = self._get_max_concurrency()
+            key_window.on_success(latency, max_limit, self.ALPHA)
+            queue.window.on_success(latency, max_limit, self.ALPHA)
+        self._wake(queue)
+
+    def get_stats(self, provider_name: str) -> dict[str, Any]:
+        """获取提供商的调度统计
+
+        参数:
+            provider_name: 提供商名称
+
+        返回:
+            dict[str, Any]: 并发上限、进行中与排队中的请求数，以及每个密钥的窗口
+        """
+        if not (queue := self._providers.get(provider_name)):
+            return {}
+        return {
+            "limit": int(queue.window.limit),
+            "in_flight": queue.window.in_flight,
+            "queue_depth": len(queue.waiters),
+            "max_queue_depth": queue.max_queue_depth,
+            "queued": queue.queued,
+            "timeouts": queue.timeouts,
+            "keys": {
+                key_store._get_key_id(key): {
+                    "limit": int(window.limit),
+                    "in_flight": window.in_flight,
+                    "ewma_latency": window.ewma_latency,
+                }
+                for key, window in queue.keys.items()
+            },
+        }
+
+
+provider_scheduler = ProviderScheduler()
+
+
 @driver.on_shutdown
 async def _shutdown_key_store():
     await key_store.shutdown()
@@ -0,0 +1,357 @@
+"""
+LLM 文本嵌入服务
+
+- 合并批处理：短时间窗口内的并发嵌入调用合并为一次请求，
+  单次请求不超过适配器支持的最大条数，相同文本只请求一次
+- 向量缓存：按 (模型, 任务类型, 文本哈希) 缓存到本地，
+  向量以 float32 紧凑存储，加载时使用 mmap 映射，不占用内存
+"""
+
+from array import array
+import asyncio
+from dataclasses import dataclass, field
+import hashlib
+import json
+import mmap
+import os
+from pathlib import Path
+import struct
+from typing import TYPE_CHECKING, Any, ClassVar
+
+from zhenxun.configs.path_config import DATA_PATH
+from zhenxun.services.log import logger
+
+from .config.providers import get_ai_config
+from .scheduler import LLMJobScheduler
+from .types.enums import LLMPriority
+
+if TYPE_CHECKING:
+    from .service import LLMModel
+    from .types import EmbeddingTaskType
+
+LOG_COMMAND = "LLMEmbedding"
+
+KEY_SIZE = 16
+"""文本哈希长度"""
+HEADER = struct.Struct("<I")
+"""向量文件头，记录向量维度"""
+
+
+def _digest(text: str) -> bytes:
+    return hashlib.blake2b(text.encode(), digest_size=KEY_SIZE).digest()
+
+
+class EmbeddingStore:
+    """单个模型与任务类型的向量存储
+
+    向量文件为维度头与连续的 float32 向量，键文件为连续的文本哈希，
+    第 i 个哈希对应第 i 个向量，两个文件均只追加写入
+    """
+
+    def __init__(self, path: Path):
+        self.vector_file = path.with_suffix(".f32")
+        self.key_file = path.with_suffix(".keys")
+        self.dim = 0
+        self.index: dict[bytes, int] = {}
+        """文本哈希与向量行号"""
+        self._mmap: mmap.mmap | None = None
+        self._view: memoryview | None = None
+        self._mapped = 0
+        """已映射的向量数量，之后写入的向量保存在 _tail 中"""
+        self._tail = array("f")
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def _load(self):
+        if not self.vector_file.exists() or not self.key_file.exists():
+            return
+        keys = self.key_file.read_bytes()
+        with self.vector_file.open("rb") as f:
+            header = f.read(HEADER.size)
+            if len(header) < HEADER.size or not (dim := HEADER.unpack(header)[0]):
+                return
+            row_size = dim * 4
+            size = os.fstat(f.fileno()).st_size
+            rows = min(len(keys) // KEY_SIZE, (size - HEADER.size) // row_size)
+            if size != HEADER.size + rows * row_size or len(keys) != rows * KEY_SIZE:
+                logger.warning(
+                    f"向量缓存文件不完整，已截断到 {rows} 条: {self.vector_file.name}",
+                    LOG_COMMAND,
+                )
+                os.truncate(self.vector_file, HEADER.size + rows * row_size)
+                os.truncate(self.key_file, rows * KEY_SIZE)
+            self.dim = dim
+            if rows:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self._view = memoryview(self._mmap)[
+                    HEADER.size : HEADER.size + rows * row_size
+                ].cast("f")
+        self._mapped = rows
+        for i in range(rows):
+            self.index.setdefault(keys[i * KEY_SIZE : (i + 1) * KEY_SIZE], i)
+
+    def get(self, key: bytes) -> list[float] | None:
+        """获取向量
+
+        参数:
+            key: 文本哈希
+
+        返回:
+            list[float] | None: 向量
+        """
+        if (row := self.index.get(key)) is None:
+            return None
+        if row < self._mapped and self._view is not None:
+            return self._view[row * self.dim : (row + 1) * self.dim].tolist()
+        start = (row - self._mapped) * self.dim
+        return self._tail[start : start + self.dim].tolist()
+
+    def add(self, items: list[tuple[bytes, list[float]]]):
+        """追加向量，已存在或维度不一致的向量会被忽略
+
+        参数:
+            items: 文本哈希与向量
+        """
+        if not items:
+            return
+        new_file = not self.dim
+        if new_file:
+            self.dim = len(items[0][1])
+        rows = array("f")
+        keys = bytearray()
+        for key, vector in items:
+            if key in self.index or len(vector) != self.dim:
+                continue
+            self.index[key] = self._mapped + len(self._tail) // self.dim
+            self._tail.extend(vector)
+            rows.extend(vector)
+            keys += key
+        if not keys:
+            return
+        self.vector_file.parent.mkdir(parents=True, exist_ok=True)
+        with self.vector_file.open("wb" if new_file else "ab") as f:
+            if new_file:
+                f.write(HEADER.pack(self.dim))
+            rows.tofile(f)
+        with self.key_file.open("wb" if new_file else "ab") as f:
+            f.write(keys)
+
+    def close(self):
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+
+@dataclass
+class _Batch:
+    model: "LLMModel"
+    task_type: "EmbeddingTaskType | str"
+    kwargs: dict[str, Any]
+    priority: LLMPriority
+    """批次中最高的优先级"""
+    texts: list[str] = field(default_factory=list)
+    timer: asyncio.TimerHandle | None = None
+
+
+class EmbeddingService:
+    """文本嵌入服务"""
+
+    path: ClassVar[Path] = DATA_PATH / "llm" / "embeddings"
+
+    stores: ClassVar[dict[str, EmbeddingStore]] = {}
+    """向量存储，键为模型与任务类型"""
+
+    _pending: ClassVar[dict[str, _Batch]] = {}
+    """等待发送的批次，键为模型、任务类型与参数"""
+    _inflight: ClassVar[dict[tuple[str, str], asyncio.Future]] = {}
+    """等待结果的文本"""
+    _tasks: ClassVar[set[asyncio.Task]] = set()
+
+    _metrics: ClassVar[dict[str, int]] = {
+        "calls": 0,
+        "texts": 0,
+        "cache_hits": 0,
+        "coalesced": 0,
+        "requests": 0,
+        "requested_texts": 0,
+    }
+
+    @staticmethod
+    def _get_task_name(task_type: "EmbeddingTaskType | str") -> str:
+        return getattr(task_type, "value", task_type)
+
+    @classmethod
+    def _get_store(
+        cls, model: "LLMModel", task_type: "EmbeddingTaskType | str"
+    ) -> EmbeddingStore | None:
+        if not get_ai_config().get("embedding_cache", True):
+            return None
+        task_name = cls._get_task_name(task_type)
+        name = f"{model.provider_name}/{model.model_name}:{task_name}"
+        if (store := cls.stores.get(name)) is None:
+            file_name = hashlib.sha1(name.encode()).hexdigest()[:16]
+            store = cls.stores[name] = EmbeddingStore(cls.path / file_name)
+        return store
+
+    @classmethod
+    async def embed(
+        cls,
+        model: "LLMModel",
+        texts: list[str],
+        task_type: "EmbeddingTaskType | str",
+        *,
+        priority: LLMPriority | None = None,
+        **kwargs: Any,
+    ) -> list[list[float]]:
+        """生成文本嵌入向量，优先使用缓存，未缓存的文本合并到批次中请求
+
+        批次只在请求时占用 LLM 任务名额，等待合并与读取缓存不占用名额
+
+        参数:
+            model: 模型实例
+            texts: 文本列表
+            task_type: 嵌入任务类型
+            priority: 任务优先级，默认为 INTERACTIVE
+            **kwargs: 传递给 LLMModel._request_embeddings 的参数
+
+        返回:
+            list[list[float]]: 与文本一一对应的向量
+        """
+        cls._metrics["calls"] += 1
+        cls._metrics["texts"] += len(texts)
+        store = cls._get_store(model, task_type)
+        results: list[list[float] | None] = [None] * len(texts)
+        missing: dict[str, list[int]] = {}
+        for i, text in enumerate(texts):
+            if store is not None and (vector := store.get(_digest(text))) is not None:
+                cls._metrics["cache_hits"] += 1
+                results[i] = vector
+            else:
+                missing.setdefault(text, []).append(i)
+        if missing:
+            futures = cls._submit(
+                model,
+                list(missing),
+                task_type,
+                kwargs,
+                priority or LLMPriority.INTERACTIVE,
+            )
+            vectors = await asyncio.gather(*(asyncio.shield(f) for f in futures))
+            for indexes, vector in zip(missing.values(), vectors):
+                for i in indexes:
+                    results[i] = list(vector)
+        return results  # type: ignore
+
+    @classmethod
+    def _submit(
+        cls,
+        model: "LLMModel",
+        texts: list[str],
+        task_type: "EmbeddingTaskType | str",
+        kwargs: dict[str, Any],
+        priority: LLMPriority,
+    ) -> list[asyncio.Future]:
+        key = json.dumps(
+            [
+                model.provider_name,
+                model.model_name,
+                cls._get_task_name(task_type),
+                kwargs,
+            ],
+            sort_keys=True,
+            default=str,
+        )
+        loop = asyncio.get_running_loop()
+        max_size = model._get_adapter().get_max_embedding_batch_size(model)
+        window = (get_ai_config().get("embedding_batch_window", 10) or 0) / 1000
+        weights = LLMJobScheduler.WEIGHTS
+        futures = []
+        for text in texts:
+            if (future := cls._inflight.get((key, text))) is not None:
+                cls._metrics["coalesced"] += 1
+                futures.append(future)
+                continue
+            future = cls._inflight[(key, text)] = loop.create_future()
+            futures.append(future)
+            batch = cls._pending.get(key)
+            if batch is None:
+                batch = cls._pending[key] = _Batch(model, task_type, kwargs, priority)
+                batch.timer = loop.call_later(window, cls._flush, key)
+            elif weights[priority] > weights[batch.priority]:
+                batch.priority = priority
+            batch.texts.append(text)
+            if len(batch.texts) >= max_size:
+                cls._flush(key)
+        return futures
+
+    @classmethod
+    def _flush(cls, key: str):
+        if not (batch := cls._pending.pop(key, None)):
+            return
+        if batch.timer:
+            batch.timer.cancel()
+        task = asyncio.create_task(cls._run(key, batch))
+        cls._tasks.add(task)
+        task.add_done_callback(cls._tasks.discard)
+
+    @classmethod
+    async def _run(cls, key: str, batch: _Batch):
+        cls._metrics["requests"] += 1
+        cls._metrics["requested_texts"] += len(batch.texts)
+        futures = [cls._inflight.pop((key, text)) for text in batch.texts]
+        try:
+            async with LLMJobScheduler.slot(batch.priority):
+                vectors = await batch.model._request_embeddings(
+                    batch.texts, batch.task_type, **batch.kwargs
+                )
+            if len(vectors) != len(batch.texts):
+                from .types import LLMErrorCode, LLMException
+
+                raise LLMException(
+                    f"嵌入向量数量 {len(vectors)} 与文本数量 {len(batch.texts)} 不一致",
+                    code=LLMErrorCode.EMBEDDING_FAILED,
+                )
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for future, vector in zip(futures, vectors):
+            if not future.done():
+                future.set_result(vector)
+        if (store := cls._get_store(batch.model, batch.task_type)) is not None:
+            try:
+                store.add(
+                    [
+                        (_digest(text), vector)
+                        for text, vector in zip(batch.texts, vectors)
+                    ]
+                )
+            except OSError as e:
+                logger.warning("写入向量缓存失败", LOG_COMMAND, e=e)
+
+    @classmethod
+    def close(cls):
+        """关闭所有向量存储"""
+        for store in cls.stores.values():
+            store.close()
+        cls.stores.clear()
+
+    @classmethod
+    def get_stats(cls) -> dict[str, Any]:
+        """获取嵌入服务统计
+
+        返回:
+            dict[str, Any]: 缓存命中数、合并数、实际请求数与相比逐次请求节省的请求数
+        """
+        metrics = cls._metrics
+        return {
+            **metrics,
+            "saved_requests": max(0, metrics["calls"] - metrics["requests"]),
+            "cached_vectors": sum(len(store) for store in cls.stores.values()),
+        }
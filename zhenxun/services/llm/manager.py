@@ -12,9 +12,16 @@ from typing import Any
 from zhenxun.configs.config import Config
 from zhenxun.services.log import logger
 
+from .cache import LLMResponseCache
 from .config import validate_override_params
 from .config.providers import AI_CONFIG_GROUP, PROVIDERS_CONFIG_KEY, get_ai_config
-from .core import http_client_manager, key_store
+from .core import (
+    http_client_manager,
+    key_store,
+    provider_scheduler,
+    stream_stats,
+)
+from .embedding import EmbeddingService
 from .service import LLMModel
 from .types import LLMErrorCode, LLMException, ModelDetail, ProviderConfig
 from .types.capabilities import get_model_capabilities
@@ -99,6 +106,8 @@ def get_cache_stats() -> dict[str, Any]:
         "max_cache_size": _max_cache_size,
         "cache_ttl": _cache_ttl,
         "cached_models": list(_model_cache.keys()),
+        "response_cache": LLMResponseCache.get_stats(),
+        "embedding": EmbeddingService.get_stats(),
     }
 
 
@@ -398,6 +407,19 @@ async def get_key_usage_stats() -> dict[str, Any]:
             ),
             "key_stats": provider_stats,
         }
+        if scheduler_stats := provider_scheduler.get_stats(provider.name):
+            stats[provider.name]["scheduler"] = scheduler_stats
+            for key_id, key_window in scheduler_stats["keys"].items():
+                if key_id in provider_stats:
+                    provider_stats[key_id]["in_flight"] = key_window["in_flight"]
+                    provider_stats[key_id]["concurrency_limit"] = key_window["limit"]
+        if provider_stream := stream_stats.get(provider.name):
+            stats[provider.name]["stream"] = {
+                "count": provider_stream.count,
+                "avg_ttft": provider_stream.avg_ttft,
+                "last_ttft": provider_stream.last_ttft,
+                "max_ttft": provider_stream.max_ttft,
+            }
 
     return stats
 
@@ -0,0 +1,255 @@
+"""
+LLM 任务调度
+
+限制同时执行的 LLM 任务数量，超出的任务排队：
+- 按 (优先级, 群组/用户) 划分队列，使用开始时间公平队列 (SFQ) 分配名额，
+  优先级决定权重，同一优先级内各群组/用户轮流执行
+- 排队或执行超过期限的任务会失败，被取消的任务立即让出名额
+"""
+
+import asyncio
+from collections.abc import AsyncIterator, Coroutine
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+import heapq
+import itertools
+import time
+from typing import Any, ClassVar, TypeVar
+
+from nonebot.internal.matcher import current_event
+
+from .config.providers import get_ai_config
+from .types import LLMErrorCode, LLMException, LLMPriority
+
+T = TypeVar("T")
+
+
+@dataclass
+class LLMJob:
+    priority: LLMPriority
+    owner: str
+    start_tag: float
+    """SFQ 开始标签，越小越先执行"""
+    future: asyncio.Future | None = None
+    enqueued: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class PriorityStats:
+    queued: int = 0
+    running: int = 0
+    submitted: int = 0
+    started: int = 0
+    completed: int = 0
+    cancelled: int = 0
+    expired: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    def record_wait(self, wait: float):
+        self.started += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+
+def get_current_owner() -> str:
+    """获取当前事件的群组或用户，不在事件处理中时返回 global"""
+    try:
+        event = current_event.get()
+    except LookupError:
+        return "global"
+    if group_id := getattr(event, "group_id", None):
+        return f"group:{group_id}"
+    try:
+        return f"user:{event.get_user_id()}"
+    except Exception:
+        return "global"
+
+
+class LLMJobScheduler:
+    """LLM 任务调度器"""
+
+    WEIGHTS: ClassVar[dict[LLMPriority, float]] = {
+        LLMPriority.INTERACTIVE: 16,
+        LLMPriority.BACKGROUND: 4,
+        LLMPriority.BATCH: 1,
+    }
+    """优先级权重，所有队列都有任务时按权重比例分配名额"""
+
+    _running: ClassVar[int] = 0
+    _queue: ClassVar[list[tuple[float, int, LLMJob]]] = []
+    _seq: ClassVar[itertools.count] = itertools.count()
+    _virtual_time: ClassVar[float] = 0.0
+    _finish_tags: ClassVar[dict[tuple[LLMPriority, str], float]] = {}
+    """每个队列最后一个任务的结束标签"""
+    _stats: ClassVar[dict[LLMPriority, PriorityStats]] = {
+        priority: PriorityStats() for priority in LLMPriority
+    }
+
+    @staticmethod
+    def _get_max_running() -> int:
+        return max(1, get_ai_config().get("llm_max_concurrent_jobs", 16) or 1)
+
+    @classmethod
+    def _new_job(cls, priority: LLMPriority, owner: str) -> LLMJob:
+        flow = (priority, owner)
+        start = max(cls._virtual_time, cls._finish_tags.get(flow, 0.0))
+        cls._finish_tags[flow] = start + 1 / cls.WEIGHTS[priority]
+        return LLMJob(priority, owner, start)
+
+    @classmethod
+    def _start(cls, job: LLMJob):
+        cls._running += 1
+        cls._virtual_time = max(cls._virtual_time, job.start_tag)
+        stats = cls._stats[job.priority]
+        stats.running += 1
+        stats.record_wait(time.monotonic() - job.enqueued)
+
+    @classmethod
+    def _dispatch(cls):
+        max_running = cls._get_max_running()
+        while cls._running < max_running and cls._queue:
+            _, _, job = heapq.heappop(cls._queue)
+            if job.future is None or job.future.done():
+                continue
+            cls._stats[job.priority].queued -= 1
+            cls._start(job)
+            job.future.set_result(None)
+        if not cls._queue:
+            cls._finish_tags.clear()
+
+    @classmethod
+    def _release(cls, job: LLMJob):
+        cls._running -= 1
+        stats = cls._stats[job.priority]
+        stats.running -= 1
+        stats.completed += 1
+        cls._dispatch()
+
+    @classmethod
+    async def _acquire(
+        cls, priority: LLMPriority, owner: str, timeout: float | None
+    ) -> LLMJob:
+        stats = cls._stats[priority]
+        stats.submitted += 1
+        job = cls._new_job(priority, owner)
+        if not cls._queue and cls._running < cls._get_max_running():
+            cls._start(job)
+            return job
+        job.future = asyncio.get_running_loop().create_future()
+        heapq.heappush(cls._queue, (job.start_tag, next(cls._seq), job))
+        stats.queued += 1
+        cls._dispatch()
+        try:
+            await asyncio.wait_for(job.future, timeout)
+        except asyncio.TimeoutError:
+            if job.future.done() and not job.future.cancelled():
+                return job
+            stats.queued -= 1
+            stats.expired += 1
+            raise LLMException(
+                "LLM任务排队超时", code=LLMErrorCode.API_TIMEOUT
+            ) from None
+        except asyncio.CancelledError:
+            if job.future.done() and not job.future.cancelled():
+                cls._release(job)
+            else:
+                stats.queued -= 1
+            stats.cancelled += 1
+            raise
+        return job
+
+    @classmethod
+    @asynccontextmanager
+    async def slot(
+        cls,
+        priority: LLMPriority | None = None,
+        owner: str | None = None,
+        timeout: float | None = None,
+    ) -> AsyncIterator[None]:
+        """获取执行名额，退出时释放
+
+        参数:
+            priority: 优先级，默认为 INTERACTIVE
+            owner: 群组或用户，默认为当前事件的群组或用户
+            timeout: 最长排队时间（秒）
+
+        异常:
+            LLMException: 排队超时
+        """
+        job = await cls._acquire(
+            priority or LLMPriority.INTERACTIVE, owner or get_current_owner(), timeout
+        )
+        try:
+            yield
+        finally:
+            cls._release(job)
+
+    @classmethod
+    async def run(
+        cls,
+        coro: Coroutine[Any, Any, T],
+        priority: LLMPriority | None = None,
+        owner: str | None = None,
+        timeout: float | None = None,
+    ) -> T:
+        """排队执行 LLM 任务
+
+        参数:
+            coro: 任务
+            priority: 优先级，默认为 INTERACTIVE
+            owner: 群组或用户，默认为当前事件的群组或用户
+            timeout: 任务期限（秒），包含排队时间，超时后任务会被取消
+
+        返回:
+            T: 任务结果
+
+        异常:
+            LLMException: 任务超时
+        """
+        priority = priority or LLMPriority.INTERACTIVE
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        try:
+            job = await cls._acquire(priority, owner or get_current_owner(), timeout)
+        except BaseException:
+            coro.close()
+            raise
+        try:
+            if deadline is None:
+                return await coro
+            return await asyncio.wait_for(coro, max(0, deadline - time.monotonic()))
+        except asyncio.TimeoutError:
+            if deadline is None or time.monotonic() < deadline:
+                raise
+            cls._stats[priority].expired += 1
+            raise LLMException("LLM任务超时", code=LLMErrorCode.API_TIMEOUT) from None
+        finally:
+            cls._release(job)
+
+    @classmethod
+    def get_stats(cls) -> dict[str, Any]:
+        """获取调度统计
+
+        返回:
+            dict[str, Any]: 执行中的任务数、名额上限与各优先级的统计
+        """
+        return {
+            "running": cls._running,
+            "max_running": cls._get_max_running(),
+            "queued": sum(stats.queued for stats in cls._stats.values()),
+            "priorities": {
+                priority.value: {
+                    "queued": stats.queued,
+                    "running": stats.running,
+                    "submitted": stats.submitted,
+                    "completed": stats.completed,
+                    "cancelled": stats.cancelled,
+                    "expired": stats.expired,
+                    "avg_wait": stats.total_wait / stats.started * 1000
+                    if stats.started
+                    else 0.0,
+                    "max_wait": stats.max_wait * 1000,
+                }
+                for priority, stats in cls._stats.items()
+            },
+        }
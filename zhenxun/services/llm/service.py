@@ -5,29 +5,40 @@ LLM 模型实现类
 """
 
 from abc import ABC, abstractmethod
-from collections.abc import Awaitable, Callable
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable
 from contextlib import AsyncExitStack
 import json
+import time
 from typing import Any
 
+import httpx
+
 from zhenxun.services.log import logger
 
-from .adapters.base import RequestData
+from .adapters.base import RequestData, iter_sse_events
+from .cache import LLMResponseCache
 from .config import LLMGenerationConfig
 from .config.providers import get_ai_config
 from .core import (
+    KeySlot,
     KeyStatusStore,
     LLMHttpClient,
     RetryConfig,
+    _should_retry_llm_error,
     http_client_manager,
+    provider_scheduler,
+    record_ttft,
     with_smart_retry,
 )
+from .embedding import EmbeddingService
 from .types import (
     EmbeddingTaskType,
     LLMErrorCode,
     LLMException,
     LLMMessage,
     LLMResponse,
+    LLMStreamChunk,
     LLMTool,
     ModelDetail,
     ProviderConfig,
@@ -36,6 +47,11 @@ from .types.capabilities import ModelCapabilities, ModelModality
 from .utils import _sanitize_request_body_for_logging
 
 
+def _is_congested(status_code: int) -> bool:
+    """限流与服务端错误说明提供商过载，需要减小并发窗口"""
+    return status_code == 429 or status_code >= 500
+
+
 class LLMModelBase(ABC):
     """LLM模型抽象基类"""
 
@@ -145,29 +161,31 @@ class LLMModel(LLMModelBase):
             )
         return self.http_client
 
-    async def _select_api_key(self, failed_keys: set[str] | None = None) -> str:
-        """选择可用的API密钥（使用轮询策略）"""
+    async def _acquire_api_key(self, failed_keys: set[str] | None = None) -> KeySlot:
+        """获取请求名额，由调度器选择延迟低且有空闲名额的API密钥"""
         if not self.api_keys:
             raise LLMException(
                 f"提供商 {self.provider_name} 没有配置API密钥",
                 code=LLMErrorCode.NO_AVAILABLE_KEYS,
             )
 
-        selected_key = await self.key_store.get_next_available_key(
-            self.provider_name, self.api_keys, failed_keys
+        return await provider_scheduler.acquire(
+            self.provider_name,
+            self.api_keys,
+            failed_keys,
+            timeout=get_ai_config().get("provider_queue_timeout", 60),
         )
 
-        if not selected_key:
-            raise LLMException(
-                f"提供商 {self.provider_name} 的所有API密钥当前都不可用",
-                code=LLMErrorCode.NO_AVAILABLE_KEYS,
-                details={
-                    "total_keys": len(self.api_keys),
-                    "failed_keys": len(failed_keys or set()),
-                },
-            )
-
-        return selected_key
+    @staticmethod
+    def _get_http_error_code(status_code: int) -> LLMErrorCode:
+        """根据HTTP状态码获取错误码"""
+        if status_code in [401, 403]:
+            return LLMErrorCode.API_KEY_INVALID
+        if status_code == 429:
+            return LLMErrorCode.API_RATE_LIMITED
+        if status_code in [402, 413]:
+            return LLMErrorCode.API_QUOTA_EXCEEDED
+        return LLMErrorCode.API_REQUEST_FAILED
 
     async def _perform_api_call(
         self,
@@ -178,7 +196,10 @@ class LLMModel(LLMModelBase):
         log_context: str = "API",
     ) -> tuple[Any, str]:
         """执行API调用的通用核心方法"""
-        api_key = await self._select_api_key(failed_keys)
+        slot = await self._acquire_api_key(failed_keys)
+        api_key = slot.api_key
+        latency = None
+        congested = False
 
         try:
             request_data = await prepare_request_func(api_key)
@@ -208,6 +229,7 @@ class LLMModel(LLMModelBase):
             logger.debug(f"📄 响应头: {dict(http_response.headers)}")
 
             if http_response.status_code != 200:
+                congested = _is_congested(http_response.status_code)
                 error_text = http_response.text
                 logger.error(
                     f"❌ HTTP请求失败: {http_response.status_code} - {error_text} "
@@ -219,18 +241,9 @@ class LLMModel(LLMModelBase):
                     api_key, http_response.status_code, error_text
                 )
 
-                if http_response.status_code in [401, 403]:
-                    error_code = LLMErrorCode.API_KEY_INVALID
-                elif http_response.status_code == 429:
-                    error_code = LLMErrorCode.API_RATE_LIMITED
-                elif http_response.status_code in [402, 413]:
-                    error_code = LLMErrorCode.API_QUOTA_EXCEEDED
-                else:
-                    error_code = LLMErrorCode.API_REQUEST_FAILED
-
                 raise LLMException(
                     f"HTTP请求失败: {http_response.status_code}",
-                    code=error_code,
+                    code=self._get_http_error_code(http_response.status_code),
                     details={
                         "status_code": http_response.status_code,
                         "response": error_text,
@@ -259,11 +272,13 @@ class LLMModel(LLMModelBase):
                     )
 
             logger.info(f"🎯 LLM响应解析完成 [{log_context}]")
+            latency = (time.monotonic() - slot.start) * 1000
             return parsed_data, api_key
 
         except LLMException:
             raise
         except Exception as e:
+            congested = isinstance(e, httpx.TimeoutException)
             error_log_msg = f"生成 {log_context.lower()} 时发生未预期错误: {e}"
             logger.error(error_log_msg, e=e)
             await self.key_store.record_failure(api_key, None, str(e))
@@ -274,6 +289,8 @@ class LLMModel(LLMModelBase):
                 else LLMErrorCode.EMBEDDING_FAILED,
                 cause=e,
             )
+        finally:
+            provider_scheduler.release(slot, latency, congested)
 
     async def _execute_embedding_request(
         self,
@@ -478,8 +495,218 @@ class LLMModel(LLMModelBase):
         """生成高级响应"""
         self._check_not_closed()
 
+        adapter = self._get_adapter()
+        final_request_config = self._build_request_config(config, kwargs)
+
+        cache_key = None
+        if LLMResponseCache.is_cacheable(final_request_config, tools, self.temperature):
+            cached, cache_key = await LLMResponseCache.get(
+                f"{self.provider_name}/{self.model_name}",
+                messages,
+                final_request_config,
+            )
+            if cached:
+                logger.debug(
+                    f"命中响应缓存 - 模型: {self.provider_name}/{self.model_name}"
+                )
+                return cached
+
+        http_client = await self._get_http_client()
+
+        async with AsyncExitStack() as stack:
+            activated_tools = await self._activate_tools(stack, tools)
+            llm_response = await self._execute_with_smart_retry(
+                adapter,
+                messages,
+                final_request_config,
+                activated_tools,
+                tool_choice,
+                http_client,
+            )
+
+        if cache_key:
+            LLMResponseCache.set(cache_key, llm_response)
+        return llm_response
+
+    async def generate_stream(
+        self,
+        messages: list[LLMMessage],
+        config: LLMGenerationConfig | None = None,
+        tools: list[LLMTool] | None = None,
+        tool_choice: str | dict[str, Any] | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[LLMStreamChunk]:
+        """流式生成响应，逐个产出文本增量与工具调用片段
+
+        只有在收到第一个片段之前失败时才会切换密钥重试，
+        可使用 LLMStreamCollector 拼接为完整响应
+
+        参数:
+            messages: 消息列表
+            config: 生成配置
+            tools: 可用的工具列表
+            tool_choice: 工具选择策略
+            **kwargs: 其他生成参数
+
+        返回:
+            AsyncIterator[LLMStreamChunk]: 响应片段
+        """
+        self._check_not_closed()
+        adapter = self._get_adapter()
+        final_request_config = self._build_request_config(config, kwargs)
+        http_client = await self._get_http_client()
+
+        ai_config = get_ai_config()
+        max_retries = ai_config.get("max_retries_llm", 3)
+        retry_delay = ai_config.get("retry_delay_llm", 2)
+
+        async with AsyncExitStack() as stack:
+            activated_tools = await self._activate_tools(stack, tools)
+            failed_keys: set[str] = set()
+            for attempt in range(max_retries + 1):
+                received = False
+                try:
+                    async for chunk in self._execute_stream_request(
+                        adapter,
+                        messages,
+                        final_request_config,
+                        activated_tools,
+                        tool_choice,
+                        http_client,
+                        failed_keys,
+                    ):
+                        received = True
+                        yield chunk
+                    return
+                except LLMException as e:
+                    if (
+                        received
+                        or attempt >= max_retries
+                        or not _should_retry_llm_error(e, attempt, max_retries)
+                    ):
+                        raise
+                    if api_key := e.details.get("api_key"):
+                        failed_keys.add(api_key)
+                    wait_time = retry_delay * 2**attempt
+                    logger.warning(
+                        f"流式请求失败，{wait_time:.2f}秒后重试 "
+                        f"(第{attempt + 1}次): {e}"
+                    )
+                    await asyncio.sleep(wait_time)
+
+    async def _execute_stream_request(
+        self,
+        adapter,
+        messages: list[LLMMessage],
+        config: LLMGenerationConfig | None,
+        tools: list[LLMTool] | None,
+        tool_choice: str | dict[str, Any] | None,
+        http_client: LLMHttpClient,
+        failed_keys: set[str],
+    ) -> AsyncIterator[LLMStreamChunk]:
+        """执行单次流式请求，记录首字延迟与密钥状态"""
+        slot = await self._acquire_api_key(failed_keys)
+        api_key = slot.api_key
+        ttft = None
+        congested = False
+        try:
+            async for chunk in self._stream_with_key(
+                adapter, api_key, messages, config, tools, tool_choice, http_client
+            ):
+                if ttft is None and (chunk.text or chunk.tool_calls):
+                    ttft = (time.monotonic() - slot.start) * 1000
+                    record_ttft(self.provider_name, ttft)
+                yield chunk
+        except LLMException as e:
+            status_code = e.details.get("status_code")
+            congested = (status_code is not None and _is_congested(status_code)) or (
+                isinstance(e.cause, httpx.TimeoutException)
+            )
+            raise
+        finally:
+            provider_scheduler.release(slot, ttft, congested)
+
+    async def _stream_with_key(
+        self,
+        adapter,
+        api_key: str,
+        messages: list[LLMMessage],
+        config: LLMGenerationConfig | None,
+        tools: list[LLMTool] | None,
+        tool_choice: str | dict[str, Any] | None,
+        http_client: LLMHttpClient,
+    ) -> AsyncIterator[LLMStreamChunk]:
+        """使用指定密钥发起流式请求"""
+        request_data = await adapter.prepare_stream_request(
+            model=self,
+            api_key=api_key,
+            messages=messages,
+            config=config,
+            tools=tools,
+            tool_choice=tool_choice,
+        )
+        logger.info(
+            f"🌐 发起LLM流式请求 - 模型: {self.provider_name}/{self.model_name}"
+        )
+        logger.debug(f"📡 请求URL: {request_data.url}")
+        sanitized_body = _sanitize_request_body_for_logging(request_data.body)
+        logger.debug(
+            f"📦 请求体: {json.dumps(sanitized_body, ensure_ascii=False, indent=2)}"
+        )
+
+        start = time.monotonic()
+        try:
+            async with http_client.stream(
+                request_data.url,
+                headers=request_data.headers,
+                json=request_data.body,
+            ) as http_response:
+                if http_response.status_code != 200:
+                    error_text = (await http_response.aread()).decode(errors="ignore")
+                    logger.error(
+                        f"❌ HTTP请求失败: {http_response.status_code} - {error_text} "
+                        "[Stream]"
+                    )
+                    await self.key_store.record_failure(
+                        api_key, http_response.status_code, error_text
+                    )
+                    raise LLMException(
+                        f"HTTP请求失败: {http_response.status_code}",
+                        code=self._get_http_error_code(http_response.status_code),
+                        details={
+                            "status_code": http_response.status_code,
+                            "response": error_text,
+                            "api_key": api_key,
+                        },
+                    )
+                try:
+                    async for chunk in adapter.parse_stream(
+                        self, iter_sse_events(http_response.aiter_lines())
+                    ):
+                        yield chunk
+                except LLMException as e:
+                    await self.key_store.record_failure(api_key, None, e.message)
+                    e.details.setdefault("api_key", api_key)
+                    raise
+        except LLMException:
+            raise
+        except Exception as e:
+            logger.error(f"流式生成时发生错误: {e}", e=e)
+            await self.key_store.record_failure(api_key, None, str(e))
+            raise LLMException(
+                f"流式生成时发生错误: {e}",
+                code=LLMErrorCode.API_REQUEST_FAILED,
+                details={"api_key": api_key},
+                cause=e,
+            )
+        await self.key_store.record_success(api_key, (time.monotonic() - start) * 1000)
+        logger.info(
+            f"🎯 LLM流式响应完成 - 模型: {self.provider_name}/{self.model_name}"
+        )
+
+    def _get_adapter(self):
+        """获取当前API类型的适配器"""
         from .adapters import get_adapter_for_api_type
-        from .config.generation import create_generation_config_from_kwargs
 
         adapter = get_adapter_for_api_type(self.api_type)
         if not adapter:
@@ -487,6 +714,13 @@ class LLMModel(LLMModelBase):
                 f"未找到适用于 API 类型 '{self.api_type}' 的适配器",
                 code=LLMErrorCode.CONFIGURATION_ERROR,
             )
+        return adapter
+
+    def _build_request_config(
+        self, config: LLMGenerationConfig | None, kwargs: dict[str, Any]
+    ) -> LLMGenerationConfig:
+        """合并模型默认配置、关键字参数与本次请求的配置"""
+        from .config.generation import create_generation_config_from_kwargs
 
         final_request_config = self._generation_config or LLMGenerationConfig()
         if kwargs:
@@ -499,44 +733,33 @@ class LLMModel(LLMModelBase):
             merged_dict = final_request_config.to_dict()
             merged_dict.update(config.to_dict())
             final_request_config = LLMGenerationConfig(**merged_dict)
+        return final_request_config
+
+    async def _activate_tools(
+        self, stack: AsyncExitStack, tools: list[LLMTool] | None
+    ) -> list[LLMTool] | None:
+        """激活 MCP 工具会话，会话在 stack 关闭时结束"""
+        if not tools:
+            return None
+        activated_tools = []
+        for tool in tools:
+            if tool.type == "mcp" and callable(tool.mcp_session):
+                func_obj = getattr(tool.mcp_session, "func", None)
+                tool_name = (
+                    getattr(func_obj, "__name__", "unknown") if func_obj else "unknown"
+                )
+                logger.debug(f"正在激活 MCP 工具会话: {tool_name}")
 
-        http_client = await self._get_http_client()
-
-        async with AsyncExitStack() as stack:
-            activated_tools = []
-            if tools:
-                for tool in tools:
-                    if tool.type == "mcp" and callable(tool.mcp_session):
-                        func_obj = getattr(tool.mcp_session, "func", None)
-                        tool_name = (
-                            getattr(func_obj, "__name__", "unknown")
-                            if func_obj
-                            else "unknown"
-                        )
-                        logger.debug(f"正在激活 MCP 工具会话: {tool_name}")
-
-                        active_session = await stack.enter_async_context(
-                            tool.mcp_session()
-                        )
-
-                        activated_tools.append(
-                            LLMTool.from_mcp_session(
-                                session=active_session, annotations=tool.annotations
-                            )
-                        )
-                    else:
-                        activated_tools.append(tool)
+                active_session = await stack.enter_async_context(tool.mcp_session())
 
-            llm_response = await self._execute_with_smart_retry(
-                adapter,
-                messages,
-                final_request_config,
-                activated_tools if activated_tools else None,
-                tool_choice,
-                http_client,
-            )
-
-        return llm_response
+                activated_tools.append(
+                    LLMTool.from_mcp_session(
+                        session=active_session, annotations=tool.annotations
+                    )
+                )
+            else:
+                activated_tools.append(tool)
+        return activated_tools or None
 
     async def generate_embeddings(
         self,
@@ -544,11 +767,19 @@ class LLMModel(LLMModelBase):
         task_type: EmbeddingTaskType | str = EmbeddingTaskType.RETRIEVAL_DOCUMENT,
         **kwargs: Any,
     ) -> list[list[float]]:
-        """生成文本嵌入向量"""
+        """生成文本嵌入向量，优先使用向量缓存，并发调用会合并为批量请求"""
         self._check_not_closed()
         if not texts:
             return []
+        return await EmbeddingService.embed(self, texts, task_type, **kwargs)
 
+    async def _request_embeddings(
+        self,
+        texts: list[str],
+        task_type: EmbeddingTaskType | str = EmbeddingTaskType.RETRIEVAL_DOCUMENT,
+        **kwargs: Any,
+    ) -> list[list[float]]:
+        """直接请求文本嵌入向量"""
         from .adapters import get_adapter_for_api_type
 
         adapter = get_adapter_for_api_type(self.api_type)
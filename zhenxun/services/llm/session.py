@@ -4,6 +4,7 @@ LLM 服务 - 会话客户端
 提供一个有状态的、面向会话的 LLM 客户端，用于进行多轮对话和复杂交互。
 """
 
+from collections.abc import AsyncIterator
 import copy
 from dataclasses import dataclass
 from typing import Any
@@ -23,6 +24,8 @@ from .types import (
     LLMException,
     LLMMessage,
     LLMResponse,
+    LLMStreamChunk,
+    LLMStreamCollector,
     LLMTool,
     ModelName,
 )
@@ -149,23 +152,7 @@ class AI:
         返回:
             LLMResponse: 模型的完整响应，可能包含文本或工具调用请求。
         """
-        current_message: LLMMessage
-        if isinstance(message, str):
-            current_message = LLMMessage.user(message)
-        elif isinstance(message, list) and all(
-            isinstance(part, LLMContentPart) for part in message
-        ):
-            current_message = LLMMessage.user(message)
-        elif isinstance(message, LLMMessage):
-            current_message = message
-        else:
-            raise LLMException(
-                f"AI.chat 不支持的消息类型: {type(message)}. "
-                "请使用 str, LLMMessage, 或 list[LLMContentPart]. "
-                "对于更复杂的多模态输入或文件路径，请使用 AI.analyze().",
-                code=LLMErrorCode.API_REQUEST_FAILED,
-            )
-
+        current_message = self._to_user_message(message)
         final_messages = [*self.history, current_message]
 
         response = await self._execute_generation(
@@ -176,7 +163,78 @@ class AI:
             llm_tools=tools,
             tool_choice=tool_choice,
         )
+        self._update_history(current_message, response, preserve_media_in_history)
+        return response
+
+    async def chat_stream(
+        self,
+        message: str | LLMMessage | list[LLMContentPart],
+        *,
+        model: ModelName = None,
+        preserve_media_in_history: bool | None = None,
+        tools: list[LLMTool] | None = None,
+        tool_choice: str | dict[str, Any] | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[LLMStreamChunk]:
+        """
+        流式聊天对话，逐个产出文本增量与工具调用片段。
+        完整接收后才会写入会话历史记录，中途停止迭代时不记录本轮对话。
 
+        参数:
+            message: 用户输入的消息。
+            model: 本次对话要使用的模型。
+            preserve_media_in_history: 是否在历史记录中保留原始多模态信息。
+            tools: 本次对话可用的工具列表。
+            tool_choice: 强制模型使用的工具。
+            **kwargs: 传递给模型的其他生成参数。
+
+        返回:
+            AsyncIterator[LLMStreamChunk]: 模型响应片段。
+        """
+        current_message = self._to_user_message(message)
+        final_messages = [*self.history, current_message]
+
+        collector = LLMStreamCollector()
+        async for chunk in self._execute_stream(
+            messages=final_messages,
+            model_name=model,
+            error_message="聊天失败",
+            config_overrides=kwargs,
+            llm_tools=tools,
+            tool_choice=tool_choice,
+        ):
+            collector.add(chunk)
+            yield chunk
+        self._update_history(
+            current_message, collector.to_response(), preserve_media_in_history
+        )
+
+    def _to_user_message(
+        self, message: str | LLMMessage | list[LLMContentPart]
+    ) -> LLMMessage:
+        """将聊天输入转换为用户消息"""
+        if isinstance(message, str):
+            return LLMMessage.user(message)
+        if isinstance(message, list) and all(
+            isinstance(part, LLMContentPart) for part in message
+        ):
+            return LLMMessage.user(message)
+        if isinstance(message, LLMMessage):
+            return message
+        raise LLMException(
+            f"AI.chat 不支持的消息类型: {type(message)}. "
+            "请使用 str, LLMMessage, 或 list[LLMContentPart]. "
+            "对于更复杂的多模态输入或文件路径，请使用 AI.analyze().",
+            code=LLMErrorCode.API_REQUEST_FAILED,
+        )
+
+    def _update_history(
+        self,
+        current_message: LLMMessage,
+        response: LLMResponse,
+        preserve_media_in_history: bool | None,
+    ):
+        """将本轮对话写入会话历史记录"""
         should_preserve = (
             preserve_media_in_history
             if preserve_media_in_history is not None
@@ -197,8 +255,6 @@ class AI:
             )
         )
 
-        return response
-
     async def code(
         self,
         prompt: str,
@@ -426,6 +482,37 @@ class AI:
             logger.error(f"{error_message}: {e}", e=e)
             raise LLMException(f"{error_message}: {e}", cause=e)
 
+    async def _execute_stream(
+        self,
+        messages: list[LLMMessage],
+        model_name: ModelName,
+        error_message: str,
+        config_overrides: dict[str, Any],
+        llm_tools: list[LLMTool] | None = None,
+        tool_choice: str | dict[str, Any] | None = None,
+    ) -> AsyncIterator[LLMStreamChunk]:
+        """通用的流式生成执行方法，封装模型获取和单次流式API调用"""
+        try:
+            resolved_model_name = self._resolve_model_name(
+                model_name or self.config.model
+            )
+            final_config_dict = self._merge_config(config_overrides)
+
+            async with await get_model_instance(
+                resolved_model_name, override_config=final_config_dict
+            ) as model_instance:
+                async for chunk in model_instance.generate_stream(
+                    messages,
+                    tools=llm_tools,
+                    tool_choice=tool_choice,
+                ):
+                    yield chunk
+        except LLMException:
+            raise
+        except Exception as e:
+            logger.error(f"{error_message}: {e}", e=e)
+            raise LLMException(f"{error_message}: {e}", cause=e)
+
     def _resolve_model_name(self, model_name: ModelName) -> str:
         """解析模型名称"""
         if model_name:
@@ -9,9 +9,12 @@ from .content import (
     LLMContentPart,
     LLMMessage,
     LLMResponse,
+    LLMStreamChunk,
+    LLMStreamCollector,
 )
 from .enums import (
     EmbeddingTaskType,
+    LLMPriority,
     ModelProvider,
     ResponseFormat,
     TaskType,
@@ -25,6 +28,7 @@ from .models import (
     LLMGroundingMetadata,
     LLMTool,
     LLMToolCall,
+    LLMToolCallDelta,
     LLMToolFunction,
     ModelDetail,
     ModelInfo,
@@ -45,9 +49,13 @@ __all__ = [
     "LLMGroundingAttribution",
     "LLMGroundingMetadata",
     "LLMMessage",
+    "LLMPriority",
     "LLMResponse",
+    "LLMStreamChunk",
+    "LLMStreamCollector",
     "LLMTool",
     "LLMToolCall",
+    "LLMToolCallDelta",
     "LLMToolFunction",
     "MCPCompatible",
     "ModelCapabilities",
@@ -14,6 +14,8 @@ from pydantic import BaseModel
 
 from zhenxun.services.log import logger
 
+from .models import LLMToolCall, LLMToolCallDelta, LLMToolFunction
+
 
 class LLMContentPart(BaseModel):
     """LLM 消息内容部分 - 支持多模态内容"""
@@ -431,3 +433,63 @@ class LLMResponse(BaseModel):
     code_executions: list[Any] | None = None
     grounding_metadata: Any | None = None
     cache_info: Any | None = None
+
+
+class LLMStreamChunk(BaseModel):
+    """LLM 流式响应片段"""
+
+    text: str = ""
+    """文本增量"""
+    tool_calls: list[LLMToolCallDelta] | None = None
+    """工具调用片段"""
+    usage_info: dict[str, Any] | None = None
+    finish_reason: str | None = None
+
+
+class LLMStreamCollector:
+    """拼接流式响应片段，流结束后得到完整的 LLMResponse"""
+
+    def __init__(self):
+        self.text = ""
+        self.usage_info: dict[str, Any] | None = None
+        self.finish_reason: str | None = None
+        self._tool_calls: dict[int, LLMToolCallDelta] = {}
+
+    def add(self, chunk: LLMStreamChunk):
+        """添加片段
+
+        参数:
+            chunk: 流式响应片段
+        """
+        self.text += chunk.text
+        for delta in chunk.tool_calls or []:
+            if call := self._tool_calls.get(delta.index):
+                call.id = call.id or delta.id
+                call.name = call.name or delta.name
+                call.arguments += delta.arguments
+            else:
+                self._tool_calls[delta.index] = delta.model_copy()
+        if chunk.usage_info:
+            self.usage_info = chunk.usage_info
+        if chunk.finish_reason:
+            self.finish_reason = chunk.finish_reason
+
+    @property
+    def tool_calls(self) -> list[LLMToolCall]:
+        return [
+            LLMToolCall(
+                id=call.id or f"call_{index}",
+                function=LLMToolFunction(
+                    name=call.name or "", arguments=call.arguments or "{}"
+                ),
+            )
+            for index, call in sorted(self._tool_calls.items())
+        ]
+
+    def to_response(self) -> LLMResponse:
+        """转换为完整响应"""
+        return LLMResponse(
+            text=self.text,
+            usage_info=self.usage_info,
+            tool_calls=self.tool_calls or None,
+        )
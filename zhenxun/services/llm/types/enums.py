@@ -34,6 +34,17 @@ class EmbeddingTaskType(str, Enum):
     FACT_VERIFICATION = "FACT_VERIFICATION"
 
 
+class LLMPriority(str, Enum):
+    """LLM 任务优先级"""
+
+    INTERACTIVE = "interactive"
+    """用户正在等待回复"""
+    BACKGROUND = "background"
+    """后台任务"""
+    BATCH = "batch"
+    """批量任务"""
+
+
 class ToolCategory(Enum):
     """工具分类枚举"""
 
@@ -107,6 +107,15 @@ class LLMToolCall(BaseModel):
     function: LLMToolFunction
 
 
+class LLMToolCallDelta(BaseModel):
+    """流式响应中的工具调用片段，相同 index 的片段拼接为一次工具调用"""
+
+    index: int = 0
+    id: str | None = None
+    name: str | None = None
+    arguments: str = ""
+
+
 class LLMTool(BaseModel):
     """LLM 工具定义（支持 MCP 风格）"""
 
@@ -3,8 +3,10 @@ LLM 模块的工具和转换函数
 """
 
 import base64
+from collections.abc import AsyncIterator, Awaitable, Callable
 import copy
 from pathlib import Path
+from typing import Any
 
 from nonebot.adapters import Message as PlatformMessage
 from nonebot_plugin_alconna.uniseg import (
@@ -21,7 +23,10 @@ from nonebot_plugin_alconna.uniseg import (
 from zhenxun.services.log import logger
 from zhenxun.utils.http_utils import AsyncHttpx
 
-from .types import LLMContentPart
+from .types import LLMContentPart, LLMResponse, LLMStreamChunk, LLMStreamCollector
+
+SENTENCE_ENDINGS = "。！？!?；;…\n"
+"""分句时作为句末的字符"""
 
 
 async def unimsg_to_llm_parts(message: UniMessage) -> list[LLMContentPart]:
@@ -282,3 +287,67 @@ def _sanitize_request_body_for_logging(body: dict) -> dict:
     except Exception as e:
         logger.warning(f"日志净化失败: {e}，将记录原始请求体。")
         return body
+
+
+async def iter_sentences(
+    stream: AsyncIterator[LLMStreamChunk],
+    min_length: int = 20,
+    max_length: int = 300,
+    collector: LLMStreamCollector | None = None,
+) -> AsyncIterator[str]:
+    """
+    将流式响应的文本增量合并为按句切分的片段。
+
+    参数:
+        stream: 流式响应。
+        min_length: 片段的最小长度，不足时继续等待后续句子。
+        max_length: 片段的最大长度，超过时即使没有句末也会切分。
+        collector: 可选的收集器，用于在迭代结束后获取完整响应。
+
+    返回:
+        AsyncIterator[str]: 文本片段。
+    """
+    buffer = ""
+    async for chunk in stream:
+        if collector:
+            collector.add(chunk)
+        buffer += chunk.text
+        while len(buffer) >= min_length:
+            # 在不超过最大长度的范围内取最后一个句末，没有时在最大长度处切分
+            end = max(buffer.rfind(c, 0, max_length) for c in SENTENCE_ENDINGS) + 1
+            if end < min_length:
+                if len(buffer) < max_length:
+                    break
+                end = max_length
+            if text := buffer[:end].strip():
+                yield text
+            buffer = buffer[end:]
+    if text := buffer.strip():
+        yield text
+
+
+async def send_stream_reply(
+    stream: AsyncIterator[LLMStreamChunk],
+    send_func: Callable[[str], Awaitable[Any]] | None = None,
+    min_length: int = 20,
+    max_length: int = 300,
+) -> LLMResponse:
+    """
+    边接收流式响应边按句发送，减少用户等待完整回复的时间。
+
+    参数:
+        stream: 流式响应，例如 AI.chat_stream() 的返回值。
+        send_func: 发送函数，默认在当前事件中回复文本消息。
+        min_length: 每条消息的最小长度。
+        max_length: 每条消息的最大长度。
+
+    返回:
+        LLMResponse: 拼接后的完整响应。
+    """
+    collector = LLMStreamCollector()
+    async for text in iter_sentences(stream, min_length, max_length, collector):
+        if send_func:
+            await send_func(text)
+        else:
+            await UniMessage.text(text).send()
+    return collector.to_response()
@@ -1,5 +1,10 @@
-from datetime import timedelta
-from typing import Any, overload
+import atexit
+from collections.abc import Callable
+from datetime import date, timedelta
+import queue
+import sys
+import threading
+from typing import Any, ClassVar, TextIO, overload
 
 import nonebot
 from nonebot import require
@@ -16,24 +21,100 @@ driver = nonebot.get_driver()
 
 log_level = driver.config.log_level or "INFO"
 
+log_json: bool = getattr(driver.config, "log_json", False)
+"""是否额外输出JSON格式日志，便于日志采集"""
+
+
+class LogWriter:
+    """后台日志写入线程
+
+    作为loguru的sink使用，事件循环中只完成格式化并放入队列，
+    文件写入、按天切分与过期清理均在线程中进行
+    """
+
+    def __init__(self, prefix: str = "", retention: timedelta = timedelta(days=30)):
+        """
+        参数:
+            prefix: 日志文件名前缀，文件名为 {prefix}YYYY-MM-DD.log
+            retention: 日志保留时间
+        """
+        self.prefix = prefix
+        self.retention = retention
+        self._queue: queue.SimpleQueue[str | None] = queue.SimpleQueue()
+        self._date: date | None = None
+        self._file: TextIO | None = None
+        self._thread = threading.Thread(
+            target=self._run, name=f"log-writer-{prefix or 'main'}", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def write(self, message: str):
+        self._queue.put(message)
+
+    def stop(self):
+        """写入队列中剩余的日志并停止线程"""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(5)
+
+    def _run(self):
+        while (message := self._queue.get()) is not None:
+            try:
+                today = date.today()
+                if today != self._date:
+                    self._rotate(today)
+                self._file.write(message)  # type: ignore
+                if self._queue.empty():
+                    self._file.flush()  # type: ignore
+            except Exception as e:
+                sys.stderr.write(f"写入日志文件失败: {e}\n")
+        if self._file:
+            self._file.close()
+
+    def _rotate(self, today: date):
+        if self._file:
+            self._file.close()
+        LOG_PATH.mkdir(parents=True, exist_ok=True)
+        self._file = (LOG_PATH / f"{self.prefix}{today:%Y-%m-%d}.log").open(
+            "a", encoding="utf8"
+        )
+        self._date = today
+        for file in LOG_PATH.glob(f"{self.prefix}*.log"):
+            try:
+                day = date.fromisoformat(file.stem.removeprefix(self.prefix))
+            except ValueError:
+                continue
+            if today - day > self.retention:
+                file.unlink(missing_ok=True)
+
+
 logger_.add(
-    LOG_PATH / "{time:YYYY-MM-DD}.log",
+    LogWriter().write,
     level=log_level,
-    rotation="00:00",
     format=default_format,
     filter=default_filter,
-    retention=timedelta(days=30),
 )
 
 logger_.add(
-    LOG_PATH / "error_{time:YYYY-MM-DD}.log",
+    LogWriter("error_").write,
     level="ERROR",
-    rotation="00:00",
     format=default_format,
     filter=default_filter,
-    retention=timedelta(days=30),
 )
 
+if log_json:
+    logger_.add(
+        LogWriter("json_").write,
+        level=log_level,
+        filter=default_filter,
+        serialize=True,
+    )
+
+
+LogMessage = str | Callable[[], str]
+"""日志内容，为函数时只在日志等级启用时调用"""
+
 
 class logger:
     """
@@ -48,10 +129,32 @@ class logger:
     TEMPLATE_TARGET = "[Target]([<u><e>{}</e></u>])"
     SUCCESS_TEMPLATE = "[<u><c>{}</c></u>]: {} | 参数[{}] 返回: [<y>{}</y>]"
 
+    level_no: int = (
+        logger_.level(log_level).no if isinstance(log_level, str) else log_level
+    )
+    """启用的最低日志等级"""
+
+    _colored = logger_.opt(colors=True)
+    _level_nos: ClassVar[dict[str, int]] = {}
+
+    @classmethod
+    def is_enabled(cls, level: str) -> bool:
+        """判断日志等级是否启用，用于跳过耗时的日志内容构建
+
+        参数:
+            level: 日志等级
+
+        返回:
+            bool: 是否启用
+        """
+        if (no := cls._level_nos.get(level)) is None:
+            no = cls._level_nos[level] = logger_.level(level.upper()).no
+        return no >= cls.level_no
+
     @classmethod
     def __parser_template(
         cls,
-        info: str,
+        info: LogMessage,
         command: str | None = None,
         user_id: int | str | None = None,
         group_id: int | str | None = None,
@@ -83,7 +186,7 @@ class logger:
     def _log(
         cls,
         level: str,
-        info: str,
+        info: LogMessage,
         command: str | None = None,
         session: int | str | Session | uninfoSession | None = None,
         group_id: int | str | None = None,
@@ -94,7 +197,12 @@ class logger:
     ):
         """
         核心日志处理方法，处理所有日志级别的通用逻辑。
+        日志等级未启用时不进行任何格式化。
         """
+        if not cls.is_enabled(level):
+            return
+        if callable(info):
+            info = info()
         user_id: str | None = str(session) if isinstance(session, int | str) else None
 
         if isinstance(session, Session):
@@ -116,8 +224,18 @@ class logger:
         if e:
             template += f" || 错误 <r>{type(e).__name__}: {e}</r>"
 
+        colored = cls._colored
+        if log_json:
+            colored = colored.bind(
+                command=command,
+                user_id=user_id,
+                group_id=group_id,
+                adapter=adapter,
+                platform=platform,
+                error=type(e).__name__ if e else None,
+            )
         try:
-            log_func = getattr(logger_.opt(colors=True), level)
+            log_func = getattr(colored, level)
             log_func(template)
         except Exception:
             log_func_fallback = getattr(logger_, level)
@@ -127,7 +245,7 @@ class logger:
     @classmethod
     def info(
         cls,
-        info: str,
+        info: LogMessage,
         command: str | None = None,
         *,
         session: int | str | None = None,
@@ -140,7 +258,7 @@ class logger:
     @classmethod
     def info(
         cls,
-        info: str,
+        info: LogMessage,
         command: str | None = None,
         *,
         session: Session | None = None,
@@ -151,7 +269,7 @@ class logger:
     @classmethod
     def info(
         cls,
-        info: str,
+        info: LogMessage,
         command: str | None = None,
         *,
         session: uninfoSession | None = None,
@@ -162,7 +280,7 @@ class logger:
     @classmethod
     def info(
         cls,
-        info: str,
+        info: LogMessage,
         command: str | None = None,
         *,
         session: int | str | Session | uninfoSession | None = None,
@@ -190,12 +308,14 @@ class logger:
         param: dict[str, Any] | None = None,
         result: str = "",
     ):
+        if not cls.is_enabled("success"):
+            return
         param_str = (
             ",".join([f"<m>{k}</m>:<g>{v}</g>" for k, v in param.items()])
             if param
             else ""
         )
-        logger_.opt(colors=True).success(
+        cls._colored.success(
             cls.SUCCESS_TEMPLATE.format(command, info, param_str, result)
         )
 
@@ -203,7 +323,7 @@ class logger:
     @classmethod
     def warning(
         cls,
-        info: str,
+        info: LogMessage,
         command: str | None = None,
         *,
         session: int | str | None = None,
@@ -217,7 +337,7 @@ class logger:
     @classmethod
     def warning(
         cls,
-        info: str,
+        info: LogMessage,
         command: str | None = None,
         *,
         session: Session | None = None,
@@ -229,7 +349,7 @@ class logger:
     @classmethod
     def warning(
         cls,
-        info: str,
+        info: LogMessage,
         command: str | None = None,
         *,
         session: uninfoSession | None = None,
@@ -241,7 +361,7 @@ class logger:
     @classmethod
     def warning(
         cls,
-        info: str,
+        info: LogMessage,
         command: str | None = None,
         *,
         session: int | str | Session | uninfoSession | None = None,
@@ -267,7 +387,7 @@ class logger:
     @classmethod
     def error(
         cls,
-        info: str,
+        info: LogMessage,
         command: str | None = None,
         *,
         session: int | str | None = None,
@@ -281,7 +401,7 @@ class logger:
     @classmethod
     def error(
         cls,
-        info: str,
+        info: LogMessage,
         command: str | None = None,
         *,
         session: Session | None = None,
@@ -293,7 +413,7 @@ class logger:
     @classmethod
     def error(
         cls,
-        info: str,
+        info: LogMessage,
         command: str | None = None,
         *,
         session: uninfoSession | None = None,
@@ -305,7 +425,7 @@ class logger:
     @classmethod
     def error(
         cls,
-        info: str,
+        info: LogMessage,
         command: str | None = None,
         *,
         session: int | str | Session | uninfoSession | None = None,
@@ -331,7 +451,7 @@ class logger:
     @classmethod
     def debug(
         cls,
-        info: str,
+        info: LogMessage,
         command: str | None = None,
         *,
         session: int | str | None = None,
@@ -345,7 +465,7 @@ class logger:
     @classmethod
     def debug(
         cls,
-        info: str,
+        info: LogMessage,
         command: str | None = None,
         *,
         session: Session | None = None,
@@ -357,7 +477,7 @@ class logger:
     @classmethod
     def debug(
         cls,
-        info: str,
+        info: LogMessage,
         command: str | None = None,
         *,
         session: uninfoSession | None = None,
@@ -369,7 +489,7 @@ class logger:
     @classmethod
     def debug(
         cls,
-        info: str,
+        info: LogMessage,
         command: str | None = None,
         *,
         session: int | str | Session | uninfoSession | None = None,
@@ -395,7 +515,7 @@ class logger:
     @classmethod
     def trace(
         cls,
-        info: str,
+        info: LogMessage,
         command: str | None = None,
         *,
         session: int | str | None = None,
@@ -409,7 +529,7 @@ class logger:
     @classmethod
     def trace(
         cls,
-        info: str,
+        info: LogMessage,
         command: str | None = None,
         *,
         session: Session | None = None,
@@ -421,7 +541,7 @@ class logger:
     @classmethod
     def trace(
         cls,
-        info: str,
+        info: LogMessage,
         command: str | None = None,
         *,
         session: uninfoSession | None = None,
@@ -433,7 +553,7 @@ class logger:
     @classmethod
     def trace(
         cls,
-        info: str,
+        info: LogMessage,
         command: str | None = None,
         *,
         session: int | str | Session | uninfoSession | None = None,
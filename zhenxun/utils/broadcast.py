@@ -0,0 +1,245 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+import random
+import time
+from typing import ClassVar, NamedTuple
+
+from nonebot.adapters import Bot
+from nonebot.exception import ActionFailed
+
+from zhenxun.configs.config import Config
+from zhenxun.models.group_console import GroupConsole
+from zhenxun.services.log import logger
+
+Config.add_plugin_config(
+    "broadcast",
+    "BOT_RATE",
+    1.0,
+    help="广播时单个Bot每秒最多发送的消息数，小于等于0时不限制",
+    default_value=1.0,
+    type=float,
+)
+Config.add_plugin_config(
+    "broadcast",
+    "BOT_BURST",
+    3,
+    help="广播时单个Bot允许连续发送的消息数",
+    default_value=3,
+    type=int,
+)
+Config.add_plugin_config(
+    "broadcast",
+    "PLATFORM_RATE",
+    {},
+    help="广播时同一平台所有Bot合计每秒最多发送的消息数，未配置的平台不限制，"
+    "例如 {'qq': 5}",
+    default_value={},
+    type=dict[str, float],
+)
+Config.add_plugin_config(
+    "broadcast",
+    "MAX_RETRY",
+    2,
+    help="广播消息发送失败(ActionFailed)时的重试次数",
+    default_value=2,
+    type=int,
+)
+
+SendFunc = Callable[[Bot, GroupConsole], Awaitable[bool]]
+"""发送函数，返回False表示跳过该群组"""
+
+
+class TokenBucket:
+    """令牌桶，按固定速率补充令牌，允许一定的突发"""
+
+    def __init__(self, rate: float, capacity: float = 1):
+        """
+        参数:
+            rate: 每秒补充的令牌数，小于等于0时不限制
+            capacity: 令牌桶容量
+        """
+        self.rate = rate
+        self.capacity = max(capacity, 1)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """获取一个令牌，令牌不足时等待"""
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class BroadcastLane(NamedTuple):
+    """单个Bot的发送队列"""
+
+    bot: Bot
+    platform: str
+    groups: list[GroupConsole]
+
+
+class BroadcastProgress:
+    """广播进度"""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.success = 0
+        self.failed = 0
+        self.skipped = 0
+        self.start_time = time.monotonic()
+
+    @property
+    def done(self) -> int:
+        return self.success + self.failed + self.skipped
+
+    @property
+    def throughput(self) -> float:
+        """每秒成功发送数"""
+        return self.success / max(time.monotonic() - self.start_time, 1e-6)
+
+    def __str__(self) -> str:
+        return (
+            f"{self.done}/{self.total} 成功: {self.success} 失败: {self.failed} "
+            f"跳过: {self.skipped} 速率: {self.throughput:.2f}条/秒"
+        )
+
+
+ProgressFunc = Callable[[BroadcastProgress], Awaitable]
+"""进度回调，每隔 progress_interval 秒调用一次"""
+
+
+class BroadcastScheduler:
+    """广播调度器
+
+    每个Bot一条发送队列并行发送，Bot与平台分别使用令牌桶限速，
+    ActionFailed 时退避重试
+    """
+
+    bot_buckets: ClassVar[dict[str, TokenBucket]] = {}
+    """Bot令牌桶，多个广播任务共享"""
+    platform_buckets: ClassVar[dict[str, TokenBucket]] = {}
+    """平台令牌桶，多个广播任务共享"""
+
+    def __init__(
+        self,
+        send_func: SendFunc,
+        log_cmd: str | None = None,
+        progress_interval: float = 10,
+        on_progress: ProgressFunc | None = None,
+    ):
+        """
+        参数:
+            send_func: 发送函数
+            log_cmd: 日志标记
+            progress_interval: 进度报告间隔（秒）
+            on_progress: 进度回调
+        """
+        self.send_func = send_func
+        self.log_cmd = log_cmd
+        self.progress_interval = progress_interval
+        self.on_progress = on_progress
+        self.progress = BroadcastProgress(0)
+
+    @classmethod
+    def _get_bucket(
+        cls, buckets: dict[str, TokenBucket], key: str, rate: float, capacity: float
+    ) -> TokenBucket:
+        if bucket := buckets.get(key):
+            # 配置可能已修改
+            bucket.rate = rate
+            bucket.capacity = max(capacity, 1)
+        else:
+            bucket = buckets[key] = TokenBucket(rate, capacity)
+        return bucket
+
+    async def run(self, lanes: list[BroadcastLane]) -> BroadcastProgress:
+        """执行广播
+
+        参数:
+            lanes: 各Bot的发送队列
+
+        返回:
+            BroadcastProgress: 广播结果
+        """
+        self.progress = BroadcastProgress(sum(len(lane.groups) for lane in lanes))
+        reporter = asyncio.create_task(self._report())
+        try:
+            await asyncio.gather(*(self._run_lane(lane) for lane in lanes))
+        finally:
+            reporter.cancel()
+        logger.info(f"广播完成 {self.progress}", self.log_cmd)
+        return self.progress
+
+    async def _report(self):
+        while True:
+            await asyncio.sleep(self.progress_interval)
+            logger.info(f"广播进度 {self.progress}", self.log_cmd)
+            if self.on_progress:
+                try:
+                    await self.on_progress(self.progress)
+                except Exception as e:
+                    logger.warning("广播进度回调失败", self.log_cmd, e=e)
+
+    async def _run_lane(self, lane: BroadcastLane):
+        bot_bucket = self._get_bucket(
+            self.bot_buckets,
+            lane.bot.self_id,
+            Config.get_config("broadcast", "BOT_RATE"),
+            Config.get_config("broadcast", "BOT_BURST"),
+        )
+        platform_bucket = None
+        platform_rate = Config.get_config("broadcast", "PLATFORM_RATE") or {}
+        if rate := platform_rate.get(lane.platform):
+            platform_bucket = self._get_bucket(
+                self.platform_buckets, lane.platform, rate, rate
+            )
+        for group in lane.groups:
+            await self._send(lane.bot, group, bot_bucket, platform_bucket)
+
+    async def _send(
+        self,
+        bot: Bot,
+        group: GroupConsole,
+        bot_bucket: TokenBucket,
+        platform_bucket: TokenBucket | None,
+    ):
+        key = f"{group.group_id}:{group.channel_id}"
+        max_retry = Config.get_config("broadcast", "MAX_RETRY") or 0
+        for attempt in range(max_retry + 1):
+            await bot_bucket.acquire()
+            if platform_bucket:
+                await platform_bucket.acquire()
+            try:
+                sent = await self.send_func(bot, group)
+            except ActionFailed as e:
+                if attempt < max_retry:
+                    delay = 2**attempt + random.random()
+                    logger.warning(
+                        f"广播消息发送失败，{delay:.1f}秒后重试",
+                        self.log_cmd,
+                        target=key,
+                    )
+                    await asyncio.sleep(delay)
+                    continue
+                self.progress.failed += 1
+                logger.warning("广播消息发送失败", self.log_cmd, target=key, e=e)
+            except Exception as e:
+                self.progress.failed += 1
+                logger.warning("广播消息发送失败", self.log_cmd, target=key, e=e)
+            else:
+                if sent:
+                    self.progress.success += 1
+                else:
+                    self.progress.skipped += 1
+            return
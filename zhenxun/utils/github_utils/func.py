@@ -1,6 +1,4 @@
-from aiocache import cached
-
-from zhenxun.utils.http_utils import AsyncHttpx
+from zhenxun.utils.manager.mirror_manager import MirrorManager
 
 from .const import (
     ARCHIVE_URL_FORMAT,
@@ -12,13 +10,11 @@ from .const import (
 
 
 async def __get_fastest_formats(formats: dict[str, str]) -> list[str]:
-    sorted_urls = await AsyncHttpx.get_fastest_mirror(list(formats.keys()))
-    if not sorted_urls:
-        raise Exception("无法获取任意GitHub资源加速地址，请检查网络")
-    return [formats[url] for url in sorted_urls]
+    """按镜像健康度排序，不发起探测请求"""
+    MirrorManager.register(formats)
+    return [formats[url] for url in MirrorManager.rank(formats)]
 
 
-@cached()
 async def get_fastest_raw_formats() -> list[str]:
     """获取最快的raw下载地址格式"""
     formats: dict[str, str] = {
@@ -31,7 +27,6 @@ async def get_fastest_raw_formats() -> list[str]:
     return await __get_fastest_formats(formats)
 
 
-@cached()
 async def get_fastest_archive_formats() -> list[str]:
     """获取最快的归档下载地址格式"""
     formats: dict[str, str] = {
@@ -42,7 +37,6 @@ async def get_fastest_archive_formats() -> list[str]:
     return await __get_fastest_formats(formats)
 
 
-@cached()
 async def get_fastest_release_formats() -> list[str]:
     """获取最快的发行版资源下载地址格式"""
     formats: dict[str, str] = {
@@ -53,7 +47,6 @@ async def get_fastest_release_formats() -> list[str]:
     return await __get_fastest_formats(formats)
 
 
-@cached()
 async def get_fastest_release_source_formats() -> list[str]:
     """获取最快的发行版源码下载地址格式"""
     formats: dict[str, str] = {
@@ -1,14 +1,24 @@
 import asyncio
+from collections import defaultdict
 from collections.abc import AsyncGenerator, Awaitable, Callable, Sequence
 from contextlib import asynccontextmanager
+import hashlib
 import os
 from pathlib import Path
+import shutil
 import time
 from typing import Any, ClassVar, cast
 
 import aiofiles
 import httpx
-from httpx import AsyncClient, AsyncHTTPTransport, HTTPStatusError, Proxy, Response
+from httpx import (
+    AsyncClient,
+    AsyncHTTPTransport,
+    HTTPError,
+    HTTPStatusError,
+    Proxy,
+    Response,
+)
 import nonebot
 from rich.progress import (
     BarColumn,
@@ -23,6 +33,7 @@ from zhenxun.configs.config import BotConfig
 from zhenxun.services.log import logger
 from zhenxun.utils.decorator.retry import Retry
 from zhenxun.utils.exception import AllURIsFailedError
+from zhenxun.utils.manager.mirror_manager import MirrorManager
 from zhenxun.utils.manager.priority_manager import PriorityLifecycle
 from zhenxun.utils.user_agent import get_user_agent
 
@@ -30,10 +41,55 @@ from .browser import AsyncPlaywright, BrowserIsNone  # noqa: F401
 
 _SENTINEL = object()
 
+CHUNK_MIN_SIZE = 8 * 1024 * 1024
+"""多连接分块下载的最小文件大小"""
+
 driver = nonebot.get_driver()
 _client: AsyncClient | None = None
 
 
+class _PartChangedError(Exception):
+    """续传时远程文件已变化"""
+
+
+def _part_meta_path(part: Path) -> Path:
+    return part.with_name(f"{part.name}.meta")
+
+
+def _load_part_meta(part: Path) -> dict[str, Any] | None:
+    """读取临时文件对应的来源与校验信息"""
+    try:
+        return json.loads(_part_meta_path(part).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _discard_part(part: Path):
+    part.unlink(missing_ok=True)
+    _part_meta_path(part).unlink(missing_ok=True)
+
+
+def _response_validator(response: Response) -> str | None:
+    """获取可用于 If-Range 的校验值，弱 ETag 不能用于 If-Range"""
+    etag = response.headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return response.headers.get("Last-Modified")
+
+
+def _content_range_total(response: Response) -> int | None:
+    total = response.headers.get("Content-Range", "").rsplit("/", 1)[-1]
+    return int(total) if total.isdigit() else None
+
+
+def _file_sha256(path: Path) -> str:
+    sha256 = hashlib.sha256()
+    with path.open("rb") as f:
+        while chunk := f.read(1024 * 1024):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
 @PriorityLifecycle.on_startup(priority=0)
 async def _():
     """
@@ -223,10 +279,16 @@ class AsyncHttpx:
         async with cls._get_active_client_context(
             client=client, **client_kwargs
         ) as active_client:
-            response = await cls()._execute_request_inner(
-                active_client, method, url, **request_kwargs
-            )
-            response.raise_for_status()
+            start = time.perf_counter()
+            try:
+                response = await cls()._execute_request_inner(
+                    active_client, method, url, **request_kwargs
+                )
+                response.raise_for_status()
+            except HTTPError:
+                MirrorManager.record(url, None)
+                raise
+            MirrorManager.record(url, (time.perf_counter() - start) * 1000)
             return response
 
     @classmethod
@@ -463,40 +525,193 @@ class AsyncHttpx:
             return default
 
     @classmethod
-    @Retry.api(log_name="文件下载(流式)")
+    @Retry.api(log_name="文件下载(流式)", exception=(_PartChangedError,))
     async def _stream_download(
-        cls, url: str, path: Path, *, client: AsyncClient | None = None, **kwargs
+        cls,
+        url: str,
+        path: Path,
+        *,
+        client: AsyncClient | None = None,
+        byte_range: tuple[int, int] | None = None,
+        **kwargs,
     ) -> None:
         """
         执行单个流式下载的私有方法，被重试装饰器包裹。
+
+        说明:
+            写入 path 时从已有内容末尾通过 Range 续传，重试时无需从头下载；
+            服务器不支持 Range 时从头写入。
+            来源url、校验值(ETag/Last-Modified)与文件大小记录在 `<path>.meta`，
+            续传时携带 If-Range，来源或分块范围不一致、缺少校验值
+            或远程文件大小变化时丢弃已有内容重新下载。
+
+        参数:
+            url: 文件 URL。
+            path: 写入的临时文件路径。
+            client: (可选) 指定的HTTP客户端。
+            byte_range: (可选) 只下载该闭区间内的字节，用于分块下载。
         """
         client_kwargs, request_kwargs = cls._split_kwargs(kwargs)
         show_progress = request_kwargs.pop("show_progress", False)
+        headers = dict(request_kwargs.pop("headers", None) or {})
+
+        offset = path.stat().st_size if path.exists() else 0
+        meta = _load_part_meta(path) if offset else None
+        if offset:
+            if (
+                not meta
+                or meta.get("url") != url
+                or not meta.get("validator")
+                or meta.get("range") != (list(byte_range) if byte_range else None)
+            ):
+                # 无法确认已有内容与当前下载是同一文件
+                _discard_part(path)
+                offset = 0
+                meta = None
+            else:
+                headers["If-Range"] = meta["validator"]
+        start, end = byte_range or (0, None)
+        if end is not None and start + offset > end:
+            return
+        if byte_range or offset:
+            headers["Range"] = f"bytes={start + offset}-{'' if end is None else end}"
 
         async with cls._get_active_client_context(
             client=client, **client_kwargs
         ) as active_client:
-            async with active_client.stream("GET", url, **request_kwargs) as response:
-                response.raise_for_status()
-                total = int(response.headers.get("Content-Length", 0))
-
-                if show_progress:
-                    with Progress(
-                        TextColumn(path.name),
-                        "[progress.percentage]{task.percentage:>3.0f}%",
-                        BarColumn(bar_width=None),
-                        DownloadColumn(),
-                        TransferSpeedColumn(),
-                    ) as progress:
-                        task_id = progress.add_task("Download", total=total)
-                        async with aiofiles.open(path, "wb") as f:
+            begin = time.perf_counter()
+            try:
+                async with active_client.stream(
+                    "GET", url, headers=headers, **request_kwargs
+                ) as response:
+                    if response.status_code == 416 and offset:
+                        # 已有内容可能已经完整
+                        content_range = response.headers.get("Content-Range", "")
+                        if content_range.rsplit("/", 1)[-1] == str(offset):
+                            return
+                        _discard_part(path)
+                    response.raise_for_status()
+                    MirrorManager.record(url, (time.perf_counter() - begin) * 1000)
+                    if response.status_code != 206 and (byte_range or offset):
+                        if byte_range:
+                            raise ValueError(f"服务器不支持分块下载: {url}")
+                        # 服务器不支持 Range 或 If-Range 校验未通过，从头写入
+                        offset = 0
+                    size = (
+                        _content_range_total(response)
+                        if response.status_code == 206
+                        else int(response.headers.get("Content-Length", 0)) or None
+                    )
+                    if offset and meta and meta.get("size") and size != meta["size"]:
+                        _discard_part(path)
+                        raise _PartChangedError(f"远程文件已变化，重新下载: {url}")
+                    await asyncio.to_thread(
+                        _part_meta_path(path).write_text,
+                        json.dumps(
+                            {
+                                "url": url,
+                                "validator": _response_validator(response),
+                                "size": size,
+                                "range": list(byte_range) if byte_range else None,
+                            }
+                        ),
+                        encoding="utf-8",
+                    )
+                    total = int(response.headers.get("Content-Length", 0)) + offset
+
+                    async with aiofiles.open(path, "ab" if offset else "wb") as f:
+                        if show_progress:
+                            with Progress(
+                                TextColumn(path.name),
+                                "[progress.percentage]{task.percentage:>3.0f}%",
+                                BarColumn(bar_width=None),
+                                DownloadColumn(),
+                                TransferSpeedColumn(),
+                            ) as progress:
+                                task_id = progress.add_task(
+                                    "Download", total=total, completed=offset
+                                )
+                                async for chunk in response.aiter_bytes():
+                                    await f.write(chunk)
+                                    progress.update(task_id, advance=len(chunk))
+                        else:
                             async for chunk in response.aiter_bytes():
                                 await f.write(chunk)
-                                progress.update(task_id, advance=len(chunk))
-                else:
-                    async with aiofiles.open(path, "wb") as f:
-                        async for chunk in response.aiter_bytes():
-                            await f.write(chunk)
+            except HTTPError:
+                MirrorManager.record(url, None)
+                raise
+
+    @classmethod
+    async def _chunked_download(
+        cls,
+        url: str,
+        path: Path,
+        connections: int,
+        *,
+        client: AsyncClient | None = None,
+        **kwargs,
+    ) -> bool:
+        """
+        多连接分块下载到 path，每个分块单独续传，完成后按顺序合并。
+
+        参数:
+            url: 文件 URL。
+            path: 写入的临时文件路径。
+            connections: 连接数。
+            client: (可选) 指定的HTTP客户端。
+
+        返回:
+            bool: 是否使用了分块下载，文件过小或服务器不支持 Range 时为 False。
+        """
+        client_kwargs, request_kwargs = cls._split_kwargs(kwargs)
+        try:
+            async with cls._get_active_client_context(
+                client=client, **client_kwargs
+            ) as active_client:
+                response = await active_client.head(
+                    url,
+                    headers=request_kwargs.get("headers"),
+                    timeout=request_kwargs.get("timeout", 10),
+                    follow_redirects=True,
+                )
+        except Exception as e:
+            logger.debug(f"获取文件信息失败，使用单连接下载: {url}", e=e)
+            return False
+        size = int(response.headers.get("Content-Length", 0))
+        if (
+            response.is_error
+            or response.headers.get("Accept-Ranges") != "bytes"
+            or size < CHUNK_MIN_SIZE
+        ):
+            return False
+
+        chunk_size = -(-size // connections)
+        ranges = [
+            (begin, min(begin + chunk_size, size) - 1)
+            for begin in range(0, size, chunk_size)
+        ]
+        parts = [path.with_name(f"{path.name}{i}") for i in range(len(ranges))]
+        # 连接数变化后遗留的多余分块
+        for stale in path.parent.glob(f"{path.name}[0-9]*"):
+            if stale not in parts and not stale.name.endswith(".meta"):
+                _discard_part(stale)
+        await asyncio.gather(
+            *(
+                cls._stream_download(url, part, client=client, byte_range=r, **kwargs)
+                for part, r in zip(parts, ranges)
+            )
+        )
+
+        def merge():
+            with path.open("wb") as f:
+                for part in parts:
+                    with part.open("rb") as p:
+                        shutil.copyfileobj(p, f, 1024 * 1024)
+            for part in parts:
+                _discard_part(part)
+
+        await asyncio.to_thread(merge)
+        return True
 
     @classmethod
     async def download_file(
@@ -507,37 +722,51 @@ class AsyncHttpx:
         stream: bool = False,
         show_progress: bool = False,
         client: AsyncClient | None = None,
+        connections: int = 1,
+        sha256: str | None = None,
         **kwargs,
     ) -> bool:
         """下载文件到指定路径。
 
         说明:
-            支持多链接尝试和流式下载（带进度条）。
+            支持多链接尝试、断点续传与多连接分块下载。
+            内容先写入 `<文件名>.part`，下载失败时保留以便下次续传，
+            完成并校验通过后原子替换目标文件。
 
         参数:
             url: 单个文件 URL 或一个备用 URL 列表。
             path: 文件保存的本地路径。
-            stream: (可选) 是否使用流式下载，适用于大文件，默认为 False。
+            stream: (可选) 是否为大文件下载，为 True 时可显示进度条，默认为 False。
             show_progress: (可选) 当 stream=True 时，是否显示下载进度条。默认为 False。
             client: (可选) 指定的HTTP客户端。
-            **kwargs: 其他所有传递给 get() 方法或 httpx.stream() 的参数。
+            connections: (可选) 连接数，大于1时对支持 Range 的大文件分块并行下载。
+            sha256: (可选) 文件的sha256，校验失败时删除已下载内容。
+            **kwargs: 其他所有传递给 httpx.stream() 的参数。
 
         返回:
             bool: 是否下载成功。
         """
         path = Path(path)
         path.parent.mkdir(parents=True, exist_ok=True)
+        part = path.with_name(f"{path.name}.part")
 
         async def worker(current_url: str, **worker_kwargs) -> bool:
-            if not stream:
-                content = await cls.get_content(current_url, **worker_kwargs)
-                async with aiofiles.open(path, "wb") as f:
-                    await f.write(content)
-            else:
+            if connections <= 1 or not await cls._chunked_download(
+                current_url, part, connections, **worker_kwargs
+            ):
                 await cls._stream_download(
-                    current_url, path, show_progress=show_progress, **worker_kwargs
+                    current_url,
+                    part,
+                    show_progress=stream and show_progress,
+                    **worker_kwargs,
                 )
-
+            if sha256:
+                digest = await asyncio.to_thread(_file_sha256, part)
+                if digest != sha256.lower():
+                    _discard_part(part)
+                    raise ValueError(f"文件校验失败: {digest} != {sha256}")
+            os.replace(part, path)
+            _part_meta_path(part).unlink(missing_ok=True)
             logger.info(
                 f"下载 {current_url} 成功 -> {path.absolute()}",
                 "AsyncHttpx:download",
@@ -565,12 +794,16 @@ class AsyncHttpx:
     ) -> list[bool]:
         """并发下载多个文件，支持为每个文件提供备用镜像链接。
 
+        说明:
+            镜像按 MirrorManager 记录的健康度排序，每个镜像站点单独限制并发，
+            任务优先分配给排名靠前且有空闲的镜像，失败时按排名尝试其余镜像。
+
         参数:
             url_list: 包含所有文件下载任务的列表。每个元素可以是：
                       - 一个字符串 (str): 代表该任务的唯一URL。
                       - 一个字符串列表 (list[str]): 代表该任务的多个备用/镜像URL。
             path_list: 与 url_list 对应的文件保存路径列表。
-            limit_async_number: (可选) 最大并发下载数，默认为 5。
+            limit_async_number: (可选) 每个镜像站点的最大并发下载数，默认为 5。
             **kwargs: 其他所有传递给 download_file() 方法的参数。
 
         返回:
@@ -579,13 +812,25 @@ class AsyncHttpx:
         if len(url_list) != len(path_list):
             raise ValueError("URL 列表和路径列表的长度必须相等")
 
-        semaphore = asyncio.Semaphore(limit_async_number)
+        semaphores: dict[str, asyncio.Semaphore] = defaultdict(
+            lambda: asyncio.Semaphore(limit_async_number)
+        )
 
         async def _download_with_semaphore(
             urls_for_one_path: str | list[str], path: str | Path
         ):
-            async with semaphore:
-                return await cls.download_file(urls_for_one_path, path, **kwargs)
+            urls = (
+                [urls_for_one_path]
+                if isinstance(urls_for_one_path, str)
+                else MirrorManager.rank(urls_for_one_path)
+            )
+            url = next(
+                (u for u in urls if not semaphores[MirrorManager.get_host(u)].locked()),
+                urls[0],
+            )
+            urls.remove(url)
+            async with semaphores[MirrorManager.get_host(url)]:
+                return await cls.download_file([url, *urls], path, **kwargs)
 
         tasks = [
             _download_with_semaphore(url_group, path)
@@ -1,110 +1,211 @@
 import asyncio
-from collections import defaultdict, deque
+from collections import OrderedDict, defaultdict
+import datetime
+import heapq
 import time
 from typing import Any
 
+DEFAULT_MAX_KEYS = 100_000
+"""单个限制器默认最多记录的键数量"""
+SWEEP_INTERVAL = 60
+"""过期状态清理间隔（秒）"""
 
-class FreqLimiter:
+
+class _KeyState:
+    """有上限的键状态表
+
+    状态只在写入时创建，读取不会创建空记录；过期状态在读取时惰性删除，
+    并在写入时按间隔整体清理一次。超过上限时先清理过期状态，
+    仍然已满时淘汰最接近失效的键，避免大量新键挤掉仍在生效的限制。
+    所有操作均为同步操作，在事件循环中无需加锁
+    """
+
+    def __init__(self, max_keys: int = DEFAULT_MAX_KEYS):
+        self._data: OrderedDict[Any, Any] = OrderedDict()
+        self.max_keys = max_keys
+        self._next_sweep = time.monotonic() + SWEEP_INTERVAL
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _expired(self, value: Any, now: float) -> bool:
+        """状态是否已过期，过期状态等同于不存在"""
+        return False
+
+    def _remaining(self, value: Any, now: float) -> float:
+        """状态剩余的有效程度，空间不足时优先淘汰最小的键"""
+        return 0.0
+
+    def _put(self, key: Any, value: Any, now: float):
+        data = self._data
+        if now >= self._next_sweep:
+            self._sweep(now)
+        if key in data:
+            # 保持写入顺序，最早写入的键位于最前
+            data.move_to_end(key)
+        elif len(data) >= self.max_keys:
+            self._sweep(now)
+            if len(data) >= self.max_keys:
+                self._evict(now)
+        data[key] = value
+
+    def _evict(self, now: float):
+        """淘汰最接近失效的一批键，分摊持续写满时的查找开销"""
+        data = self._data
+        remaining = self._remaining
+        for key in heapq.nsmallest(
+            max(1, self.max_keys // 100), data, key=lambda k: remaining(data[k], now)
+        ):
+            del data[key]
+
+    def _sweep(self, now: float):
+        self._next_sweep = now + SWEEP_INTERVAL
+        expired = self._expired
+        for key in [k for k, v in self._data.items() if expired(v, now)]:
+            del self._data[key]
+
+
+class FreqLimiter(_KeyState):
     """
     命令冷却，检测用户是否处于冷却状态
     """
 
-    def __init__(self, default_cd_seconds: int):
-        self.next_time: dict[Any, float] = defaultdict(float)
+    def __init__(self, default_cd_seconds: int, max_keys: int = DEFAULT_MAX_KEYS):
+        super().__init__(max_keys)
         self.default_cd = default_cd_seconds
 
+    def _expired(self, value: float, now: float) -> bool:
+        return now >= value
+
+    def _remaining(self, value: float, now: float) -> float:
+        return value - now
+
     def check(self, key: Any) -> bool:
-        return time.time() >= self.next_time[key]
+        return time.monotonic() >= self._data.get(key, 0.0)
 
     def start_cd(self, key: Any, cd_time: int = 0):
-        self.next_time[key] = time.time() + (
-            cd_time if cd_time > 0 else self.default_cd
-        )
+        now = time.monotonic()
+        self._put(key, now + (cd_time if cd_time > 0 else self.default_cd), now)
 
     def left_time(self, key: Any) -> float:
-        return max(0.0, self.next_time[key] - time.time())
+        return max(0.0, self._data.get(key, 0.0) - time.monotonic())
 
 
-class CountLimiter:
+class CountLimiter(_KeyState):
     """
     每日调用命令次数限制
     """
 
     tz = None
 
-    def __init__(self, max_num: int):
-        self.today = -1
-        self.count: dict[Any, int] = defaultdict(int)
+    def __init__(self, max_num: int, max_keys: int = DEFAULT_MAX_KEYS):
+        super().__init__(max_keys)
         self.max = max_num
+        self._reset_at = 0.0
+
+    @property
+    def count(self) -> OrderedDict[Any, int]:
+        self._check_day()
+        return self._data
+
+    def _check_day(self):
+        """跨天时清空计数，只在到达次日零点时计算一次日期"""
+        if time.time() >= self._reset_at:
+            self._data.clear()
+            tomorrow = datetime.datetime.now(self.tz).date() + datetime.timedelta(1)
+            self._reset_at = datetime.datetime.combine(
+                tomorrow, datetime.time(), self.tz
+            ).timestamp()
+
+    def _remaining(self, value: int, now: float) -> float:
+        # 所有计数在同一时刻重置，优先淘汰调用次数最少的键
+        return value
 
     def check(self, key: Any) -> bool:
-        import datetime
-
-        day = datetime.datetime.now().day
-        if day != self.today:
-            self.today = day
-            self.count.clear()
-        return self.count[key] < self.max
+        return self.count.get(key, 0) < self.max
 
     def get_num(self, key: Any) -> int:
-        return self.count[key]
+        return self.count.get(key, 0)
 
     def increase(self, key: Any, num: int = 1):
-        self.count[key] += num
+        self._put(key, self.count.get(key, 0) + num, time.monotonic())
 
     def reset(self, key: Any):
-        self.count[key] = 0
+        self.count.pop(key, None)
 
 
-class UserBlockLimiter:
+class UserBlockLimiter(_KeyState):
     """
     检测用户是否正在调用命令 (简单阻塞锁)
     """
 
-    def __init__(self):
-        self.flag_data: dict[Any, bool] = defaultdict(bool)
-        self.time: dict[Any, float] = defaultdict(float)
+    timeout = 30
+    """阻塞超时时间（秒），超时后自动解除"""
+
+    def __init__(self, max_keys: int = DEFAULT_MAX_KEYS):
+        super().__init__(max_keys)
+
+    def _expired(self, value: float, now: float) -> bool:
+        return now - value > self.timeout
+
+    def _remaining(self, value: float, now: float) -> float:
+        return value + self.timeout - now
 
     def set_true(self, key: Any):
-        self.time[key] = time.time()
-        self.flag_data[key] = True
+        now = time.monotonic()
+        self._put(key, now, now)
 
     def set_false(self, key: Any):
-        self.flag_data[key] = False
+        self._data.pop(key, None)
 
     def check(self, key: Any) -> bool:
-        if self.flag_data[key] and time.time() - self.time[key] > 30:
+        start = self._data.get(key)
+        if start is None:
+            return True
+        if self._expired(start, time.monotonic()):
             self.set_false(key)
-        return not self.flag_data[key]
+            return True
+        return False
 
 
-class RateLimiter:
+class RateLimiter(_KeyState):
     """
     一个简单的基于时间窗口的速率限制器。
+
+    使用 GCRA 算法，每个键只记录一个理论到达时间：
+    允许连续触发 max_calls 次，之后每 time_window / max_calls 秒恢复一次。
     """
 
-    def __init__(self, max_calls: int, time_window: int):
-        self.requests: dict[Any, deque[float]] = defaultdict(deque)
+    def __init__(
+        self, max_calls: int, time_window: int, max_keys: int = DEFAULT_MAX_KEYS
+    ):
+        super().__init__(max_keys)
         self.max_calls = max_calls
         self.time_window = time_window
+        self._interval = time_window / max_calls
 
-    def check(self, key: Any) -> bool:
-        """检查是否超出速率限制。如果未超出，则记录本次调用。"""
-        now = time.time()
+    def _expired(self, value: float, now: float) -> bool:
+        return value <= now
 
-        while self.requests[key] and self.requests[key][0] <= now - self.time_window:
-            self.requests[key].popleft()
+    def _remaining(self, value: float, now: float) -> float:
+        return value - now
 
-        if len(self.requests[key]) < self.max_calls:
-            self.requests[key].append(now)
-            return True
-        return False
+    def check(self, key: Any) -> bool:
+        """检查是否超出速率限制。如果未超出，则记录本次调用。"""
+        now = time.monotonic()
+        tat = max(self._data.get(key, now), now) + self._interval
+        # 允许微小的浮点误差，保证窗口内能触发满 max_calls 次
+        if tat - now > self.time_window + 1e-6:
+            return False
+        self._put(key, tat, now)
+        return True
 
     def left_time(self, key: Any) -> float:
         """计算距离下次可调用还需等待的时间"""
-        if self.requests[key]:
-            return max(0.0, self.requests[key][0] + self.time_window - time.time())
-        return 0.0
+        tat = self._data.get(key)
+        if tat is None:
+            return 0.0
+        return max(0.0, tat + self._interval - self.time_window - time.monotonic())
 
 
 class ConcurrencyLimiter:
@@ -0,0 +1,194 @@
+from collections.abc import Callable
+from datetime import datetime
+import gzip
+from typing import Any, ClassVar
+
+from nonebot.utils import run_sync
+from tortoise.timezone import get_default_timezone, make_aware
+import ujson as json
+
+from zhenxun.configs.path_config import DATA_PATH
+from zhenxun.services.log import logger
+
+LOG_COMMAND = "ChatArchive"
+
+ARCHIVE_PATH = DATA_PATH / "chat_history" / "archive"
+
+
+class ChatArchiveManager:
+    """聊天记录归档文件
+
+    超过保留期限的聊天记录按月写入 gzip 压缩的 JSON Lines 文件，
+    索引中记录各群组最早与最晚的归档时间，
+    查询范围早于归档截止时间时由 ChatHistory 合并读取
+    """
+
+    index_file = ARCHIVE_PATH / "index.json"
+
+    _index: ClassVar[dict[str, Any] | None] = None
+
+    @classmethod
+    def _load_index(cls) -> dict[str, Any]:
+        if cls._index is None:
+            if cls.index_file.exists():
+                with cls.index_file.open(encoding="utf8") as f:
+                    index = json.load(f)
+            else:
+                index = {"months": [], "first": {}, "cutoff": {}}
+            if "cutoff" not in index:
+                # 旧版本索引没有截止时间，使用最后一个归档月份的月末
+                index["cutoff"] = {}
+                if months := index["months"]:
+                    year, month = map(int, months[-1].split("-"))
+                    month_end = make_aware(
+                        datetime(year + month // 12, month % 12 + 1, 1)
+                    ).isoformat()
+                    index["cutoff"] = dict.fromkeys(index["first"], month_end)
+            cls._index = index
+        return cls._index  # type: ignore
+
+    @classmethod
+    def _save_index(cls):
+        ARCHIVE_PATH.mkdir(parents=True, exist_ok=True)
+        with cls.index_file.open("w", encoding="utf8") as f:
+            json.dump(cls._index, f, ensure_ascii=False, indent=4)
+
+    @classmethod
+    def _aware(cls, dt: datetime) -> datetime:
+        """统一转换为默认时区的时间，避免与无时区时间比较"""
+        if dt.tzinfo is None:
+            return make_aware(dt)
+        return dt.astimezone(get_default_timezone())
+
+    @classmethod
+    def _month_file(cls, month: str):
+        return ARCHIVE_PATH / f"{month}.jsonl.gz"
+
+    @classmethod
+    @run_sync
+    def write(cls, rows: list[dict[str, Any]]):
+        """追加写入归档记录
+
+        参数:
+            rows: 聊天记录字典，create_time 为 datetime
+        """
+        index = cls._load_index()
+        months: dict[str, list[dict[str, Any]]] = {}
+        for row in rows:
+            create_time = cls._aware(row["create_time"])
+            months.setdefault(create_time.strftime("%Y-%m"), []).append(
+                {**row, "create_time": create_time.isoformat()}
+            )
+            group_key = row["group_id"] or ""
+            first = index["first"].get(group_key)
+            if not first or datetime.fromisoformat(first) > create_time:
+                index["first"][group_key] = create_time.isoformat()
+            cutoff = index["cutoff"].get(group_key)
+            if not cutoff or datetime.fromisoformat(cutoff) < create_time:
+                index["cutoff"][group_key] = create_time.isoformat()
+        ARCHIVE_PATH.mkdir(parents=True, exist_ok=True)
+        for month, data in months.items():
+            # gzip 支持多段拼接，追加写入的每一批数据为独立的一段
+            with gzip.open(cls._month_file(month), "at", encoding="utf8") as f:
+                f.writelines(json.dumps(d, ensure_ascii=False) + "\n" for d in data)
+            if month not in index["months"]:
+                index["months"].append(month)
+                index["months"].sort()
+        cls._save_index()
+
+    @classmethod
+    def cutoff_time(cls, group_id: str | None = None) -> datetime | None:
+        """获取归档中最晚的记录时间，晚于该时间的记录都在数据库中
+
+        参数:
+            group_id: 群组id，为None时为所有记录
+
+        返回:
+            datetime | None: 最晚的记录时间，没有归档记录时为None
+        """
+        cutoff = cls._load_index()["cutoff"]
+        if group_id:
+            value = cutoff.get(group_id)
+        else:
+            value = max(cutoff.values()) if cutoff else None
+        return datetime.fromisoformat(value) if value else None
+
+    @classmethod
+    def has_archive(cls, start: datetime | None, group_id: str | None = None) -> bool:
+        """判断时间范围是否可能包含归档记录
+
+        参数:
+            start: 开始时间，为None时不限制
+            group_id: 群组id，为None时为所有记录
+
+        返回:
+            bool: 是否需要读取归档
+        """
+        cutoff = cls.cutoff_time(group_id)
+        if cutoff is None:
+            return False
+        return start is None or cls._aware(start) <= cutoff
+
+    @classmethod
+    @run_sync
+    def read(
+        cls,
+        start: datetime | None,
+        end: datetime | None,
+        predicate: Callable[[dict[str, Any]], bool],
+    ) -> list[dict[str, Any]]:
+        """读取时间范围内的归档记录
+
+        参数:
+            start: 开始时间，为None时不限制
+            end: 结束时间，为None时不限制
+            predicate: 记录筛选函数
+
+        返回:
+            list[dict[str, Any]]: 聊天记录字典，create_time 为 datetime
+        """
+        start = cls._aware(start) if start else None
+        end = cls._aware(end) if end else None
+        start_month = start.strftime("%Y-%m") if start else None
+        end_month = end.strftime("%Y-%m") if end else None
+        result = {}
+        for month in cls._load_index()["months"]:
+            if (start_month and month < start_month) or (
+                end_month and month > end_month
+            ):
+                continue
+            try:
+                with gzip.open(cls._month_file(month), "rt", encoding="utf8") as f:
+                    for line in f:
+                        row = json.loads(line)
+                        create_time = cls._aware(
+                            datetime.fromisoformat(row["create_time"])
+                        )
+                        if (start and create_time < start) or (
+                            end and create_time > end
+                        ):
+                            continue
+                        if predicate(row):
+                            row["create_time"] = create_time
+                            # 归档后删除前中断会重复写入，按id去重
+                            result[row["id"]] = row
+            except (OSError, EOFError) as e:
+                logger.warning(f"读取聊天记录归档 {month} 失败", LOG_COMMAND, e=e)
+        return list(result.values())
+
+    @classmethod
+    def first_time(cls, group_id: str | None) -> datetime | None:
+        """获取归档中最早的记录时间
+
+        参数:
+            group_id: 群组id，为None时为所有记录
+
+        返回:
+            datetime | None: 最早的记录时间
+        """
+        first = cls._load_index()["first"]
+        if group_id:
+            value = first.get(group_id)
+        else:
+            value = min(first.values()) if first else None
+        return datetime.fromisoformat(value) if value else None
@@ -0,0 +1,377 @@
+import asyncio
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Iterable
+from operator import itemgetter
+import time
+from typing import Any, ClassVar
+
+from zhenxun.models.chat_history import ChatHistory
+from zhenxun.models.group_member_info import GroupInfoUser
+from zhenxun.models.sign_user import SignUser
+from zhenxun.models.statistics_rollup import StatisticsRollup
+from zhenxun.models.user_console import UserConsole
+from zhenxun.services.log import logger
+
+LOG_COMMAND = "Leaderboard"
+
+BUCKET_SIZE = 512
+"""排行排序键的分块大小"""
+
+
+class Leaderboard:
+    """单个范围内按分数降序排列的排行
+
+    排序键分块存放，每块不超过 2 * BUCKET_SIZE 条，
+    更新分数只移动所在块内的元素，而不是整个列表
+    """
+
+    __slots__ = ("_buckets", "_scores")
+
+    def __init__(self, items: Iterable[tuple[str, float]] = ()):
+        self._scores: dict[str, float] = dict(items)
+        keys = sorted((-score, uid) for uid, score in self._scores.items())
+        self._buckets: list[list[tuple[float, str]]] = [
+            keys[i : i + BUCKET_SIZE] for i in range(0, len(keys), BUCKET_SIZE)
+        ]
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def __contains__(self, uid: str) -> bool:
+        return uid in self._scores
+
+    def _bucket_index(self, key: tuple[float, str]) -> int:
+        """第一个最大键不小于key的块，key大于所有键时为块数量"""
+        return bisect_left(self._buckets, key, key=itemgetter(-1))
+
+    def _insert(self, key: tuple[float, str]):
+        buckets = self._buckets
+        if not buckets:
+            buckets.append([key])
+            return
+        index = min(self._bucket_index(key), len(buckets) - 1)
+        bucket = buckets[index]
+        insort(bucket, key)
+        if len(bucket) > BUCKET_SIZE * 2:
+            buckets[index : index + 1] = [bucket[:BUCKET_SIZE], bucket[BUCKET_SIZE:]]
+
+    def _delete(self, key: tuple[float, str]):
+        index = self._bucket_index(key)
+        bucket = self._buckets[index]
+        del bucket[bisect_left(bucket, key)]
+        if not bucket:
+            del self._buckets[index]
+
+    def get(self, uid: str) -> float | None:
+        return self._scores.get(uid)
+
+    def set(self, uid: str, score: float):
+        """设置分数
+
+        参数:
+            uid: 用户id
+            score: 分数
+        """
+        old = self._scores.get(uid)
+        if old == score:
+            return
+        if old is not None:
+            self._delete((-old, uid))
+        self._scores[uid] = score
+        self._insert((-score, uid))
+
+    def incr(self, uid: str, num: float):
+        """增加分数
+
+        参数:
+            uid: 用户id
+            num: 增加的分数
+        """
+        self.set(uid, self._scores.get(uid, 0) + num)
+
+    def remove(self, uid: str):
+        """移除用户
+
+        参数:
+            uid: 用户id
+        """
+        if (old := self._scores.pop(uid, None)) is not None:
+            self._delete((-old, uid))
+
+    def rank(self, uid: str) -> int | None:
+        """获取名次，分数相同时名次相同
+
+        参数:
+            uid: 用户id
+
+        返回:
+            int | None: 名次，不在排行中时为None
+        """
+        if (score := self._scores.get(uid)) is None:
+            return None
+        key = (-score, "")
+        index = self._bucket_index(key)
+        before = sum(len(bucket) for bucket in self._buckets[:index])
+        return before + bisect_left(self._buckets[index], key) + 1
+
+    def top(self, num: int) -> list[tuple[str, float]]:
+        """获取前num名
+
+        参数:
+            num: 数量
+
+        返回:
+            list[tuple[str, float]]: 用户id与分数
+        """
+        result = []
+        for bucket in self._buckets:
+            if len(result) >= num:
+                break
+            result.extend((uid, -score) for score, uid in bucket[: num - len(result)])
+        return result
+
+
+class LeaderboardManager:
+    """金币/好感度/发言排行
+
+    全局排行首次查询时一次性加载，之后由数据变更监听与聊天记录写入增量维护；
+    群组排行由全局分数与群成员构建，群成员变化或超过MEMBER_TTL后重新构建，
+    最多保留MAX_GROUP_BOARDS个，超过时移除最久未查询的群组排行
+    """
+
+    GOLD = "gold"
+    IMPRESSION = "impression"
+    CHAT = "chat"
+
+    MEMBER_TTL: ClassVar[float] = 600
+    """群组排行成员有效时间（秒），用于兜底批量更新群成员的情况"""
+    MAX_GROUP_BOARDS: ClassVar[int] = 500
+    """最多保留的群组排行数量"""
+
+    _boards: ClassVar[OrderedDict[tuple[str, str | None], Leaderboard]] = OrderedDict()
+    """排行，键为(排行类型, 群组id)，全局排行群组id为None"""
+    _built_time: ClassVar[dict[tuple[str, str | None], float]] = {}
+    _user_groups: ClassVar[dict[str, dict[str, set[str]]]] = {}
+    """已加载的群组排行中用户所在群组，键为排行类型"""
+    _group_members: ClassVar[dict[tuple[str, str], set[str]]] = {}
+    """已加载的群组排行成员"""
+    _locks: ClassVar[dict[tuple[str, str | None], asyncio.Lock]] = {}
+
+    @classmethod
+    async def _load_gold(cls) -> list[tuple[str, float]]:
+        return await UserConsole.all().values_list("user_id", "gold")  # type: ignore
+
+    @classmethod
+    async def _load_impression(cls) -> list[tuple[str, float]]:
+        return [
+            (uid, float(impression))
+            for uid, impression in await SignUser.all().values_list(
+                "user_id", "impression"
+            )
+        ]
+
+    @classmethod
+    async def _load_chat(cls, group_id: str | None) -> list[tuple[str, float]]:
+        filters = {"group_id": group_id} if group_id else {}
+        if StatisticsRollup.ready:
+            return await StatisticsRollup.top(  # type: ignore
+                StatisticsRollup.CHAT, "user_id", **filters
+            )
+        return await ChatHistory.get_user_msg_count(group_id)  # type: ignore
+
+    @classmethod
+    def _get_loader(
+        cls, kind: str
+    ) -> Callable[[], Awaitable[list[tuple[str, float]]]] | None:
+        return {
+            cls.GOLD: cls._load_gold,
+            cls.IMPRESSION: cls._load_impression,
+        }.get(kind)
+
+    @classmethod
+    def _is_valid(cls, kind: str, group_id: str | None) -> bool:
+        """排行是否已加载且未过期"""
+        key = (kind, group_id)
+        if key not in cls._boards:
+            return False
+        if not group_id or kind == cls.CHAT:
+            return True
+        return time.time() - cls._built_time[key] < cls.MEMBER_TTL
+
+    @classmethod
+    async def get_board(cls, kind: str, group_id: str | None = None) -> Leaderboard:
+        """获取排行，未加载时加载
+
+        参数:
+            kind: 排行类型
+            group_id: 群组id，为None时为全局排行
+
+        返回:
+            Leaderboard: 排行
+        """
+        key = (kind, group_id)
+        if cls._is_valid(kind, group_id):
+            if group_id:
+                cls._boards.move_to_end(key)
+            return cls._boards[key]
+        async with cls._locks.setdefault(key, asyncio.Lock()):
+            if cls._is_valid(kind, group_id):
+                return cls._boards[key]
+            start = time.perf_counter()
+            if kind == cls.CHAT:
+                board = Leaderboard(await cls._load_chat(group_id))
+            elif group_id:
+                board = await cls._build_group_board(kind, group_id)
+            elif loader := cls._get_loader(kind):
+                board = Leaderboard(await loader())
+            else:
+                raise ValueError(f"未知的排行类型: {kind}")
+            cls._boards[key] = board
+            cls._boards.move_to_end(key)
+            cls._built_time[key] = time.time()
+            if group_id:
+                cls._evict_group_boards()
+            logger.debug(
+                lambda: f"加载排行 {kind}:{group_id or 'global'} 共 {len(board)} 人，"
+                f"耗时 {(time.perf_counter() - start) * 1000:.2f}ms",
+                LOG_COMMAND,
+            )
+            return board
+
+    @classmethod
+    def _evict_group_boards(cls):
+        """群组排行超过MAX_GROUP_BOARDS时移除最久未查询的"""
+        group_keys = [key for key in cls._boards if key[1] is not None]
+        for key in group_keys[: max(len(group_keys) - cls.MAX_GROUP_BOARDS, 0)]:
+            kind, group_id = key
+            del cls._boards[key]
+            cls._built_time.pop(key, None)
+            cls._set_members(kind, group_id, set())  # type: ignore
+            if (lock := cls._locks.get(key)) and not lock.locked():
+                del cls._locks[key]
+
+    @classmethod
+    async def _build_group_board(cls, kind: str, group_id: str) -> Leaderboard:
+        """由全局分数与群成员构建群组排行
+
+        参数:
+            kind: 排行类型
+            group_id: 群组id
+
+        返回:
+            Leaderboard: 群组排行
+        """
+        global_board = await cls.get_board(kind)
+        members = set(
+            await GroupInfoUser.filter(group_id=group_id).values_list(
+                "user_id", flat=True
+            )
+        )
+        cls._set_members(kind, group_id, members)  # type: ignore
+        return Leaderboard(
+            (uid, score)
+            for uid in members
+            if (score := global_board.get(uid)) is not None  # type: ignore
+        )
+
+    @classmethod
+    def _set_members(cls, kind: str, group_id: str, members: set[str]):
+        """更新群组排行的成员索引
+
+        参数:
+            kind: 排行类型
+            group_id: 群组id
+            members: 群成员，为空时移除该群组
+        """
+        user_groups = cls._user_groups.setdefault(kind, {})
+        for uid in cls._group_members.pop((kind, group_id), set()) - members:
+            if groups := user_groups.get(uid):
+                groups.discard(group_id)
+                if not groups:
+                    del user_groups[uid]
+        if members:
+            cls._group_members[(kind, group_id)] = members
+            for uid in members:
+                user_groups.setdefault(uid, set()).add(group_id)
+
+    @classmethod
+    async def get_rank(
+        cls, kind: str, user_id: str, num: int, group_id: str | None = None
+    ) -> tuple[list[tuple[str, float]], int | None]:
+        """获取排行前num名与用户名次
+
+        参数:
+            kind: 排行类型
+            user_id: 用户id
+            num: 数量
+            group_id: 群组id，为None时为全局排行
+
+        返回:
+            tuple[list[tuple[str, float]], int | None]: 前num名与用户名次
+        """
+        board = await cls.get_board(kind, group_id)
+        return board.top(num), board.rank(user_id)
+
+    @classmethod
+    def _set_score(cls, kind: str, user_id: str, score: float | None):
+        """更新已加载的全局与群组排行中的分数
+
+        参数:
+            kind: 排行类型
+            user_id: 用户id
+            score: 分数，为None时移除
+        """
+        boards = [cls._boards.get((kind, None))]
+        boards.extend(
+            cls._boards.get((kind, group_id))
+            for group_id in cls._user_groups.get(kind, {}).get(user_id, ())
+        )
+        for board in boards:
+            if board is None:
+                continue
+            if score is None:
+                board.remove(user_id)
+            else:
+                board.set(user_id, score)
+
+    @classmethod
+    def on_user_change(cls, user: UserConsole, deleted: bool):
+        """用户金币变更监听"""
+        cls._set_score(cls.GOLD, user.user_id, None if deleted else user.gold)
+
+    @classmethod
+    def on_sign_change(cls, user: SignUser, deleted: bool):
+        """好感度变更监听"""
+        cls._set_score(
+            cls.IMPRESSION, user.user_id, None if deleted else float(user.impression)
+        )
+
+    @classmethod
+    def on_member_change(cls, member: GroupInfoUser, deleted: bool):
+        """群成员变更监听，新成员加入或退群时重新构建该群的金币/好感度排行"""
+        for kind in (cls.GOLD, cls.IMPRESSION):
+            if cls._boards.pop((kind, member.group_id), None) is not None:
+                cls._set_members(kind, member.group_id, set())
+
+    @classmethod
+    async def on_chat_flush(cls, rows: list[dict[str, Any]]):
+        """聊天记录写入后增量更新发言排行
+
+        参数:
+            rows: 写入的记录
+        """
+        global_board = cls._boards.get((cls.CHAT, None))
+        for row in rows:
+            if global_board is not None:
+                global_board.incr(row["user_id"], 1)
+            if (
+                row.get("group_id")
+                and (board := cls._boards.get((cls.CHAT, row["group_id"]))) is not None
+            ):
+                board.incr(row["user_id"], 1)
+
+
+UserConsole.add_change_listener(LeaderboardManager.on_user_change)
+SignUser.add_change_listener(LeaderboardManager.on_sign_change)
+GroupInfoUser.add_change_listener(LeaderboardManager.on_member_change)
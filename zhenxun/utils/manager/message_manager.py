@@ -1,25 +1,49 @@
+from collections import deque
 from typing import ClassVar
 
 
+class MessageRing:
+    """固定长度的消息id环形缓冲，写满后覆盖最早的id"""
+
+    __slots__ = ("_ids", "_index")
+
+    def __init__(self, size: int):
+        self._ids: deque[str] = deque(maxlen=size)
+        self._index: set[str] = set()
+
+    def add(self, msg_id: str):
+        if msg_id in self._index:
+            return
+        if len(self._ids) == self._ids.maxlen:
+            self._index.discard(self._ids[0])
+        self._ids.append(msg_id)
+        self._index.add(msg_id)
+
+    def __contains__(self, msg_id: str) -> bool:
+        return msg_id in self._index
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def to_list(self) -> list[str]:
+        return list(self._ids)
+
+
 class MessageManager:
-    data: ClassVar[dict[str, list[str]]] = {}
+    max_size: ClassVar[int] = 200
+    """每个用户保留的消息id数量"""
+    data: ClassVar[dict[str, MessageRing]] = {}
 
     @classmethod
     def add(cls, uid: str, msg_id: str):
         if uid not in cls.data:
-            cls.data[uid] = []
-        cls.data[uid].append(msg_id)
-        cls.remove_check(uid)
+            cls.data[uid] = MessageRing(cls.max_size)
+        cls.data[uid].add(msg_id)
 
     @classmethod
     def check(cls, uid: str, msg_id: str) -> bool:
-        return msg_id in cls.data.get(uid, [])
-
-    @classmethod
-    def remove_check(cls, uid: str):
-        if len(cls.data[uid]) > 200:
-            cls.data[uid] = cls.data[uid][100:]
+        return uid in cls.data and msg_id in cls.data[uid]
 
     @classmethod
     def get(cls, uid: str) -> list[str]:
-        return cls.data[uid] if uid in cls.data else []
+        return cls.data[uid].to_list() if uid in cls.data else []
@@ -0,0 +1,198 @@
+import asyncio
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass
+import time
+from typing import ClassVar
+from urllib.parse import urlparse
+
+import nonebot
+import ujson as json
+
+from zhenxun.configs.path_config import DATA_PATH
+from zhenxun.services.log import logger
+from zhenxun.utils.manager.priority_manager import PriorityLifecycle
+
+LOG_COMMAND = "MirrorHealth"
+
+driver = nonebot.get_driver()
+
+
+@dataclass
+class MirrorStat:
+    latency: float
+    """延迟（毫秒）的指数加权移动平均"""
+    failure: float = 0
+    """失败率的指数加权移动平均"""
+    samples: int = 0
+    """样本数"""
+    updated: float = 0
+    """最近更新时间戳"""
+
+
+class MirrorManager:
+    """镜像站点健康度
+
+    按站点维护延迟与失败率的指数加权移动平均，数据来源为后台定时探测与
+    AsyncHttpx 实际请求的结果，排序时不发起任何请求，数据持久化到本地
+    """
+
+    ALPHA: ClassVar[float] = 0.3
+    """新样本权重"""
+    FAILURE_PENALTY: ClassVar[float] = 10000
+    """失败率为1时增加的分数（毫秒）"""
+    REFRESH_INTERVAL: ClassVar[float] = 1800
+    """后台探测间隔（秒）"""
+    PROBE_TIMEOUT: ClassVar[float] = 6
+
+    file = DATA_PATH / "mirror_health.json"
+
+    stats: ClassVar[dict[str, MirrorStat]] = {}
+    """站点健康度，键为域名"""
+    probe_urls: ClassVar[dict[str, str]] = {}
+    """已注册的镜像站点与探测地址"""
+
+    _dirty: ClassVar[bool] = False
+    _loaded: ClassVar[bool] = False
+    _task: ClassVar[asyncio.Task | None] = None
+    _probing: ClassVar[asyncio.Task | None] = None
+
+    @staticmethod
+    def get_host(url: str) -> str:
+        return urlparse(url).netloc
+
+    @classmethod
+    def _load(cls):
+        cls._loaded = True
+        if not cls.file.exists():
+            return
+        try:
+            with cls.file.open(encoding="utf8") as f:
+                data = json.load(f)
+        except ValueError as e:
+            logger.warning("镜像健康度数据损坏，已重置", LOG_COMMAND, e=e)
+            return
+        for host, item in data.items():
+            cls.stats.setdefault(host, MirrorStat(**item))
+
+    @classmethod
+    def save(cls):
+        """保存健康度数据"""
+        if not cls._dirty:
+            return
+        cls.file.parent.mkdir(parents=True, exist_ok=True)
+        with cls.file.open("w", encoding="utf8") as f:
+            json.dump({host: asdict(stat) for host, stat in cls.stats.items()}, f)
+        cls._dirty = False
+
+    @classmethod
+    def register(cls, urls: Iterable[str]):
+        """注册镜像站点，后台定时探测，没有数据的站点立即在后台探测
+
+        参数:
+            urls: 镜像探测地址
+        """
+        if not cls._loaded:
+            cls._load()
+        unknown = []
+        for url in urls:
+            host = cls.get_host(url)
+            if host not in cls.probe_urls:
+                cls.probe_urls[host] = url
+                if host not in cls.stats:
+                    unknown.append(url)
+        if unknown and (cls._probing is None or cls._probing.done()):
+            cls._probing = asyncio.create_task(cls.probe(unknown))
+
+    @classmethod
+    def record(cls, url: str, elapsed: float | None):
+        """记录一次请求结果，只记录已注册的镜像站点
+
+        参数:
+            url: 请求地址
+            elapsed: 延迟（毫秒），为None时表示失败
+        """
+        host = cls.get_host(url)
+        if host not in cls.probe_urls:
+            return
+        failed = elapsed is None
+        if stat := cls.stats.get(host):
+            if not failed:
+                stat.latency += cls.ALPHA * (elapsed - stat.latency)
+            stat.failure += cls.ALPHA * (failed - stat.failure)
+        else:
+            stat = cls.stats[host] = MirrorStat(
+                cls.PROBE_TIMEOUT * 1000 if failed else elapsed, float(failed)
+            )
+        stat.samples += 1
+        stat.updated = time.time()
+        cls._dirty = True
+
+    @classmethod
+    def score(cls, url: str) -> float:
+        """站点分数，越小越好，没有数据的站点排在有数据的站点之后"""
+        if not cls._loaded:
+            cls._load()
+        if stat := cls.stats.get(cls.get_host(url)):
+            return stat.latency + stat.failure * cls.FAILURE_PENALTY
+        return cls.PROBE_TIMEOUT * 1000
+
+    @classmethod
+    def rank(cls, urls: Iterable[str]) -> list[str]:
+        """按健康度排序，分数相同时保持原顺序
+
+        参数:
+            urls: url列表
+
+        返回:
+            list[str]: 排序后的url列表
+        """
+        return sorted(urls, key=cls.score)
+
+    @classmethod
+    async def probe(cls, urls: Iterable[str]):
+        """发送HEAD请求探测镜像延迟
+
+        参数:
+            urls: 探测地址
+        """
+        from zhenxun.utils.http_utils import get_client
+
+        async def _probe(url: str):
+            start = time.perf_counter()
+            try:
+                response = await get_client().head(url, timeout=cls.PROBE_TIMEOUT)
+            except Exception as e:
+                logger.debug(f"镜像探测失败: {url}", LOG_COMMAND, e=e)
+                cls.record(url, None)
+                return
+            # 4xx 说明镜像上的文件不可用，同样记为失败
+            cls.record(
+                url,
+                None if response.is_error else (time.perf_counter() - start) * 1000,
+            )
+
+        await asyncio.gather(*(_probe(url) for url in urls))
+
+    @classmethod
+    async def _run(cls):
+        while True:
+            await asyncio.sleep(cls.REFRESH_INTERVAL)
+            try:
+                await cls.probe(list(cls.probe_urls.values()))
+                cls.save()
+            except Exception as e:
+                logger.warning("镜像健康度刷新失败", LOG_COMMAND, e=e)
+
+
+@PriorityLifecycle.on_startup(priority=5)
+async def _():
+    if not MirrorManager._loaded:
+        MirrorManager._load()
+    MirrorManager._task = asyncio.create_task(MirrorManager._run())
+
+
+@driver.on_shutdown
+async def _():
+    if MirrorManager._task:
+        MirrorManager._task.cancel()
+    MirrorManager.save()
@@ -69,7 +69,9 @@ class ResourceManager:
         repo_info = GithubUtils.parse_github_url(cls.GITHUB_URL)
         url = await repo_info.get_archive_download_urls()
         logger.debug("开始下载resources资源包...", CMD_STRING)
-        if not await AsyncHttpx.download_file(url, cls.ZIP_FILE, stream=True):
+        if not await AsyncHttpx.download_file(
+            url, cls.ZIP_FILE, stream=True, connections=4
+        ):
             logger.error(
                 "下载resources资源包失败，请尝试重启重新下载或前往 "
                 "https://github.com/zhenxun-org/zhenxun-bot-resources 手动下载..."
@@ -0,0 +1,155 @@
+import asyncio
+from typing import Any, ClassVar
+
+import ujson as json
+
+from zhenxun.configs.path_config import DATA_PATH
+from zhenxun.models.chat_history import ChatHistory
+from zhenxun.models.statistics import Statistics
+from zhenxun.models.statistics_rollup import StatisticsRollup
+from zhenxun.services.log import logger
+from zhenxun.utils.manager.priority_manager import PriorityLifecycle
+
+LOG_COMMAND = "StatisticsRollup"
+
+BACKFILL_CHUNK_SIZE = 20000
+
+
+class RollupManager:
+    """聊天记录/功能调用汇总维护
+
+    汇总启用后由写入队列在同一事务中增量维护，启用前的历史数据在启动时
+    自动于后台补全，补全完成前查询仍使用原始数据表
+    """
+
+    file = DATA_PATH / "statistics" / "rollup.json"
+
+    _state: ClassVar[dict[str, Any]] = {}
+    _backfill_task: ClassVar[asyncio.Task | None] = None
+
+    SOURCES: ClassVar[dict[str, type[ChatHistory | Statistics]]] = {
+        StatisticsRollup.CHAT: ChatHistory,
+        StatisticsRollup.CALL: Statistics,
+    }
+
+    @classmethod
+    def _save(cls):
+        cls.file.parent.mkdir(parents=True, exist_ok=True)
+        with cls.file.open("w", encoding="utf8") as f:
+            json.dump(cls._state, f, ensure_ascii=False, indent=4)
+
+    @classmethod
+    async def init(cls):
+        """加载汇总状态，首次启用时记录需要补全的历史数据范围"""
+        if cls.file.exists():
+            with cls.file.open(encoding="utf8") as f:
+                cls._state = json.load(f)
+        else:
+            # 此id及之前的记录由补全处理，之后的记录由写入队列增量汇总
+            cls._state = {"backfilled": False}
+            for kind, model in cls.SOURCES.items():
+                last = await model.all().order_by("-id").first()
+                cls._state[kind] = {"max_id": last.id if last else 0, "done_id": 0}
+            # 没有历史数据时无需补全
+            if not any(cls._state[kind]["max_id"] for kind in cls.SOURCES):
+                cls._state["backfilled"] = True
+            cls._save()
+        StatisticsRollup.ready = cls._state.get("backfilled", False)
+        if cls.start_backfill():
+            logger.info("开始在后台补全统计汇总", LOG_COMMAND)
+
+    @classmethod
+    async def on_chat_flush(cls, rows: list[dict[str, Any]]):
+        """聊天记录写入后增量汇总
+
+        参数:
+            rows: 写入的记录
+        """
+        if cls._state:
+            await StatisticsRollup.add_rows(StatisticsRollup.CHAT, rows)
+
+    @classmethod
+    async def on_call_flush(cls, rows: list[dict[str, Any]]):
+        """功能调用记录写入后增量汇总
+
+        参数:
+            rows: 写入的记录
+        """
+        if cls._state:
+            await StatisticsRollup.add_rows(StatisticsRollup.CALL, rows)
+
+    @classmethod
+    def get_progress(cls) -> dict[str, Any]:
+        """获取补全进度
+
+        返回:
+            dict[str, Any]: 补全状态
+        """
+        return {
+            "backfilled": cls._state.get("backfilled", False),
+            "running": bool(cls._backfill_task and not cls._backfill_task.done()),
+            **{kind: cls._state[kind] for kind in cls.SOURCES if kind in cls._state},
+        }
+
+    @classmethod
+    async def backfill(cls) -> int:
+        """补全启用汇总前的历史数据，按id分块处理并记录进度，中断后可继续
+
+        返回:
+            int: 本次补全的记录数
+        """
+        total = 0
+        for kind, model in cls.SOURCES.items():
+            state = cls._state[kind]
+            fields = ["id", "create_time", "bot_id", "group_id", "user_id"]
+            if model is Statistics:
+                fields.append("plugin_name")
+            while state["done_id"] < state["max_id"]:
+                data_list = (
+                    await model.filter(id__gt=state["done_id"], id__lte=state["max_id"])
+                    .order_by("id")
+                    .limit(BACKFILL_CHUNK_SIZE)
+                    .values(*fields)
+                )
+                if not data_list:
+                    break
+                await StatisticsRollup.add_rows(kind, data_list)
+                state["done_id"] = data_list[-1]["id"]
+                total += len(data_list)
+                cls._save()
+                logger.debug(
+                    f"补全 {kind} 汇总 {state['done_id']}/{state['max_id']}",
+                    LOG_COMMAND,
+                )
+            state["done_id"] = state["max_id"]
+        cls._state["backfilled"] = True
+        cls._save()
+        StatisticsRollup.ready = True
+        logger.info(f"汇总补全完成，共处理 {total} 条记录", LOG_COMMAND)
+        return total
+
+    @classmethod
+    def start_backfill(cls) -> bool:
+        """在后台执行补全
+
+        返回:
+            bool: 是否启动，已完成或正在执行时返回False
+        """
+        if cls._state.get("backfilled") or (
+            cls._backfill_task and not cls._backfill_task.done()
+        ):
+            return False
+        cls._backfill_task = asyncio.create_task(cls._run_backfill())
+        return True
+
+    @classmethod
+    async def _run_backfill(cls):
+        try:
+            await cls.backfill()
+        except Exception as e:
+            logger.error("补全统计汇总失败，可重新执行继续补全", LOG_COMMAND, e=e)
+
+
+@PriorityLifecycle.on_startup(priority=2)
+async def _():
+    await RollupManager.init()
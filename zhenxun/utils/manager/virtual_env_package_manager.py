@@ -122,22 +122,35 @@ class VirtualEnvPackageManager:
             return e.stderr
 
     @classmethod
-    def install_requirement(cls, requirement_file: Path):
-        """安装依赖文件
+    def install_requirement(
+        cls, requirement_file: Path | list[Path], *, check: bool = False
+    ) -> str:
+        """安装依赖文件，多个依赖文件在一次安装中合并解析
 
         参数:
-            requirement_file: requirement文件路径
+            requirement_file: requirement文件路径或路径列表
+            check: 安装失败时是否抛出异常
+
+        返回:
+            str: 安装输出，失败且check为False时为错误输出
 
         异常:
             FileNotFoundError: 文件不存在
+            CalledProcessError: check为True且安装失败
         """
-        if not requirement_file.exists():
-            raise FileNotFoundError(f"依赖文件 {requirement_file} 不存在", LOG_COMMAND)
+        files = (
+            requirement_file
+            if isinstance(requirement_file, list)
+            else [requirement_file]
+        )
+        for file in files:
+            if not file.exists():
+                raise FileNotFoundError(f"依赖文件 {file} 不存在", LOG_COMMAND)
         try:
             command = cls.__get_command()
             command.append("install")
-            command.append("-r")
-            command.append(str(requirement_file.absolute()))
+            for file in files:
+                command.extend(("-r", str(file.absolute())))
             logger.info(f"执行虚拟环境安装依赖文件指令: {command}", LOG_COMMAND)
             result = subprocess.run(
                 command,
@@ -155,6 +168,8 @@ class VirtualEnvPackageManager:
                 f"安装虚拟环境依赖文件指令执行失败: {e.stderr}.",
                 LOG_COMMAND,
             )
+            if check:
+                raise
             return e.stderr
 
     @classmethod
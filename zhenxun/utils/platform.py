@@ -1,9 +1,7 @@
 import asyncio
 from collections.abc import Awaitable, Callable
-import random
 from typing import cast
 
-import httpx
 import nonebot
 from nonebot.adapters import Bot
 from nonebot.utils import is_coroutine_callable
@@ -16,10 +14,12 @@ from pydantic import BaseModel
 from zhenxun.configs.config import BotConfig
 from zhenxun.models.friend_user import FriendUser
 from zhenxun.models.group_console import GroupConsole
+from zhenxun.services.image_cache import ImageCache
 from zhenxun.services.log import logger
+from zhenxun.utils.broadcast import BroadcastLane, BroadcastScheduler
 from zhenxun.utils.exception import NotFindSuperuser
-from zhenxun.utils.http_utils import AsyncHttpx
 from zhenxun.utils.message import MessageUtils
+from zhenxun.utils.reconcile import apply_reconcile, reconcile
 
 driver = nonebot.get_driver()
 
@@ -232,7 +232,7 @@ class PlatformUtils:
                 url = f"http://q1.qlogo.cn/g?b=qq&nk={user_id}&s=640"
             else:
                 url = f"https://q.qlogo.cn/qqapp/{appid}/{user_id}/640"
-        return await AsyncHttpx.get_content(url) if url else None
+        return await ImageCache.get(url) if url else None
 
     @classmethod
     def get_user_avatar_url(
@@ -260,15 +260,7 @@ class PlatformUtils:
             platform: 平台
         """
         if platform == "qq":
-            url = f"http://p.qlogo.cn/gh/{gid}/{gid}/640/"
-            async with httpx.AsyncClient() as client:
-                for _ in range(3):
-                    try:
-                        return (await client.get(url)).content
-                    except Exception:
-                        logger.error(
-                            "获取群头像错误", "Util", target=gid, platform=platform
-                        )
+            return await ImageCache.get(f"http://p.qlogo.cn/gh/{gid}/{gid}/640/")
         return None
 
     @classmethod
@@ -309,41 +301,27 @@ class PlatformUtils:
         返回:
             int: 更新个数
         """
-        create_list = []
-        update_list = []
         group_list, platform = await cls.get_group_list(bot)
-        if group_list:
-            db_group = await GroupConsole.all()
-            db_group_id: list[tuple[str, str]] = [
-                (group.group_id, group.channel_id) for group in db_group
-            ]
-            for group in group_list:
-                group.platform = platform
-                if (group.group_id, group.channel_id) not in db_group_id:
-                    create_list.append(group)
-                    logger.debug(
-                        "群聊信息更新成功",
-                        "更新群信息",
-                        target=f"{group.group_id}:{group.channel_id}",
-                    )
-                else:
-                    _group = next(
-                        g
-                        for g in db_group
-                        if g.group_id == group.group_id
-                        and g.channel_id == group.channel_id
-                    )
-                    _group.group_name = group.group_name
-                    _group.max_member_count = group.max_member_count
-                    _group.member_count = group.member_count
-                    update_list.append(_group)
-        if create_list:
-            await GroupConsole.bulk_create(create_list, 10)
-        if group_list:
-            await GroupConsole.bulk_update(
-                update_list, ["group_name", "max_member_count", "member_count"], 10
+        if not group_list:
+            return 0
+        for group in group_list:
+            group.platform = platform
+        result = reconcile(
+            await GroupConsole.all(),
+            group_list,
+            lambda g: (g.group_id, g.channel_id),
+            ["group_name", "max_member_count", "member_count"],
+        )
+        for group in result.create:
+            logger.debug(
+                "群聊信息更新成功",
+                "更新群信息",
+                target=f"{group.group_id}:{group.channel_id}",
             )
-        return len(create_list)
+        # channel_id为空时唯一约束不生效，可能存在重复数据，保留不删除
+        result.delete.clear()
+        await apply_reconcile(GroupConsole, result, 10)
+        return len(result.create)
 
     @classmethod
     def get_platform(cls, t: Bot | Uninfo) -> str:
@@ -430,17 +408,16 @@ class PlatformUtils:
         返回:
             int: 更新个数
         """
-        create_list = []
         friend_list, platform = await cls.get_friend_list(bot)
-        if friend_list:
-            user_id_list = await FriendUser.all().values_list("user_id", flat=True)
-            for friend in friend_list:
-                friend.platform = platform
-                if friend.user_id not in user_id_list:
-                    create_list.append(friend)
-        if create_list:
-            await FriendUser.bulk_create(create_list, 10)
-        return len(create_list)
+        if not friend_list:
+            return 0
+        for friend in friend_list:
+            friend.platform = platform
+        result = reconcile(
+            await FriendUser.all(), friend_list, lambda f: f.user_id, ["user_name"]
+        )
+        await apply_reconcile(FriendUser, result, 10)
+        return len(result.create)
 
     @classmethod
     async def get_friend_list(cls, bot: Bot) -> tuple[list[FriendUser], str]:
@@ -560,12 +537,15 @@ class BroadcastEngine:
             is_run = self.check_func(bot, group_id)
         return cast(bool, is_run)
 
-    async def __send_message(self, bot: Bot, group: GroupConsole):
+    async def __send_message(self, bot: Bot, group: GroupConsole) -> bool:
         """群组发送消息
 
         参数:
             bot: Bot
             group: GroupConsole
+
+        返回:
+            bool: 是否发送
         """
         key = f"{group.group_id}:{group.channel_id}"
         if not await self.call_check(bot, group.group_id):
@@ -574,43 +554,68 @@ class BroadcastEngine:
                 self.log_cmd,
                 group_id=group.group_id,
             )
-            return
+            return False
         if target := PlatformUtils.get_target(
             group_id=group.group_id,
             channel_id=group.channel_id,
         ):
-            self.ignore_group.append(key)
             await MessageUtils.build_message(self.message).send(target, bot)
             logger.debug("广播消息发送成功...", self.log_cmd, target=key)
-        else:
-            logger.warning("广播消息获取Target失败...", self.log_cmd, target=key)
+            return True
+        logger.warning("广播消息获取Target失败...", self.log_cmd, target=key)
+        return False
 
-    async def broadcast(self) -> int:
-        """广播消息
+    async def get_lanes(self) -> list[BroadcastLane]:
+        """并发获取各Bot群组列表并分配发送队列，多个Bot在同一群组时只由第一个Bot发送
 
         返回:
-            int: 成功发送次数
+            list[BroadcastLane]: 各Bot的发送队列
         """
-        for bot in self.bot_list:
-            if self.platform and self.platform != PlatformUtils.get_platform(bot):
-                continue
-            group_list, _ = await PlatformUtils.get_group_list(bot)
-            if not group_list:
+        bot_list = [
+            bot
+            for bot in self.bot_list
+            if not self.platform or self.platform == PlatformUtils.get_platform(bot)
+        ]
+        result_list = await asyncio.gather(
+            *(PlatformUtils.get_group_list(bot) for bot in bot_list),
+            return_exceptions=True,
+        )
+        ignore_group = set(self.ignore_group)
+        lanes = []
+        for bot, result in zip(bot_list, result_list):
+            if isinstance(result, BaseException):
+                logger.warning(
+                    f"广播获取Bot:{bot.self_id} 群组列表失败", self.log_cmd, e=result
+                )
                 continue
-            for group in group_list:
+            groups = []
+            for group in result[0]:
+                key = f"{group.group_id}:{group.channel_id}"
                 if (
-                    group.group_id in self.ignore_group
-                    or group.channel_id in self.ignore_group
+                    group.group_id in ignore_group
+                    or group.channel_id in ignore_group
+                    or key in ignore_group
                 ):
                     continue
-                try:
-                    await self.__send_message(bot, group)
-                    await asyncio.sleep(random.randint(1, 3))
-                    self.count += 1
-                except Exception as e:
-                    logger.warning(
-                        "广播消息发送失败", self.log_cmd, target=group.group_id, e=e
-                    )
+                ignore_group.add(key)
+                groups.append(group)
+            if groups:
+                lanes.append(
+                    BroadcastLane(bot, PlatformUtils.get_platform(bot), groups)
+                )
+        return lanes
+
+    async def broadcast(self) -> int:
+        """广播消息，每个Bot并行发送，按配置的Bot与平台速率限速
+
+        返回:
+            int: 成功发送次数
+        """
+        lanes = await self.get_lanes()
+        progress = await BroadcastScheduler(self.__send_message, self.log_cmd).run(
+            lanes
+        )
+        self.count = progress.success
         return self.count
 
 
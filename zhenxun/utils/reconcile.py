@@ -0,0 +1,98 @@
+from collections.abc import Callable, Hashable, Iterable, Sequence
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Generic, TypeVar
+
+if TYPE_CHECKING:
+    from zhenxun.services.db_context import Model
+
+T = TypeVar("T", bound="Model")
+
+
+@dataclass
+class ReconcileResult(Generic[T]):
+    """对比结果"""
+
+    create: list[T] = field(default_factory=list)
+    """需要创建的数据"""
+    update: dict[tuple[str, ...], list[T]] = field(default_factory=dict)
+    """需要更新的数据，键为发生变化的字段"""
+    delete: list[T] = field(default_factory=list)
+    """需要删除的数据，包含远端已不存在的数据与本地重复的数据"""
+    unchanged: int = 0
+    """未变化的数据数量"""
+
+    @property
+    def update_count(self) -> int:
+        return sum(len(items) for items in self.update.values())
+
+    def __bool__(self) -> bool:
+        return bool(self.create or self.update or self.delete)
+
+
+def reconcile(
+    existing: Iterable[T],
+    incoming: Iterable[T],
+    key: Callable[[T], Hashable],
+    fields: Sequence[str],
+    *,
+    delete_missing: bool = False,
+) -> ReconcileResult[T]:
+    """以键建立索引对比本地与远端数据，只记录发生变化的字段
+
+    参数:
+        existing: 本地数据
+        incoming: 远端数据，相同键只取第一条
+        key: 键函数
+        fields: 需要同步的字段
+        delete_missing: 是否删除远端已不存在的本地数据
+
+    返回:
+        ReconcileResult[T]: 对比结果，需要更新的本地数据已被赋值
+    """
+    result: ReconcileResult[T] = ReconcileResult()
+    index: dict[Hashable, T] = {}
+    for item in existing:
+        k = key(item)
+        if k in index:
+            result.delete.append(item)
+        else:
+            index[k] = item
+    seen: set[Hashable] = set()
+    for item in incoming:
+        k = key(item)
+        if k in seen:
+            continue
+        seen.add(k)
+        if (db_item := index.get(k)) is None:
+            result.create.append(item)
+            continue
+        changed = tuple(f for f in fields if getattr(db_item, f) != getattr(item, f))
+        if not changed:
+            result.unchanged += 1
+            continue
+        for f in changed:
+            setattr(db_item, f, getattr(item, f))
+        result.update.setdefault(changed, []).append(db_item)
+    if delete_missing:
+        result.delete.extend(v for k, v in index.items() if k not in seen)
+    return result
+
+
+async def apply_reconcile(
+    model: type[T], result: ReconcileResult[T], batch_size: int = 100
+):
+    """写入对比结果，按变化的字段分组批量更新
+
+    参数:
+        model: 模型
+        result: 对比结果
+        batch_size: 批量写入大小
+    """
+    if result.create:
+        await model.bulk_create(result.create, batch_size)
+    for changed, items in result.update.items():
+        await model.bulk_update(items, list(changed), batch_size)
+    if result.delete:
+        pk_list = [item.pk for item in result.delete]
+        for i in range(0, len(pk_list), batch_size):
+            await model.filter(pk__in=pk_list[i : i + batch_size]).delete()